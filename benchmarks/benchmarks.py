@@ -1,4 +1,5 @@
 import inspect
+import time
 
 import janim.examples as examples
 from janim.imports import Config, Timeline
@@ -40,6 +41,9 @@ def _wrap_timeline(timeline: type[Timeline]):
     def time_build(self):
         timeline().build()
 
+    def peakmem_build(self):
+        timeline().build()
+
     def time_write(self):
         VideoWriter.writes(self.built_anim, self.file_path)
 
@@ -49,6 +53,7 @@ def _wrap_timeline(timeline: type[Timeline]):
         {
             'setup': setup,
             'time_build': time_build,
+            'peakmem_build': peakmem_build,
             'time_write': time_write
         }
     )
@@ -59,3 +64,43 @@ for timeline in timelines:
     globals()[suite.__name__] = suite
 
 timeline = None
+
+
+class GLBackend:
+    '''
+    比较不同 OpenGL 后端（以及 llvmpipe 线程数）下的渲染帧率
+
+    无法创建上下文的组合会被跳过
+    '''
+    params = (['', 'egl'], [0, 1, 4])
+    param_names = ['gl_backend', 'gl_threads']
+    frame_count = 30
+
+    def setup(self, gl_backend, gl_threads):
+        from janim.render.base import create_standalone_context
+        from janim.render.framebuffer import create_framebuffer
+
+        with Config(fps=10, gl_backend=gl_backend, gl_threads=gl_threads):
+            self.built_anim = examples.TextExample().build(quiet=True)
+            try:
+                self.ctx = create_standalone_context()
+            except Exception:
+                raise NotImplementedError
+
+        cfg = self.built_anim.cfg
+        self.fbo = create_framebuffer(self.ctx, cfg.pixel_width, cfg.pixel_height)
+
+    def track_fps(self, gl_backend, gl_threads):
+        from janim.render.framebuffer import framebuffer_context
+
+        duration = self.built_anim.duration
+        with framebuffer_context(self.fbo):
+            start = time.perf_counter()
+            for i in range(self.frame_count):
+                self.fbo.clear()
+                self.built_anim.render_all(self.ctx, duration * i / self.frame_count)
+            self.ctx.finish()
+            elapsed = time.perf_counter() - start
+        return self.frame_count / elapsed
+
+    track_fps.unit = 'frames/s'
@@ -154,6 +154,61 @@ def write_parser(parser: ArgumentParser) -> None:
         action='store_true',
         help=_('Disable PBO (Pixel Buffer Object) for writing video')
     )
+    other_options.add_argument(
+        '--static_frame_cache',
+        action='store_true',
+        help=_('Reuse the previous frame for static frames instead of rendering them again')
+    )
+    other_options.add_argument(
+        '--incremental',
+        action='store_true',
+        help=_('Only re-render the segments of video that have changed since the last output')
+    )
+    other_options.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help=_('Number of processes used to render video in parallel, '
+               'the timeline is split into frame chunks and concatenated afterwards')
+    )
+    other_options.add_argument(
+        '--premultiplied_alpha',
+        action='store_true',
+        help=_('Use premultiplied alpha blending for transparent (mov) output, '
+               'which avoids flushing after every draw and is much faster')
+    )
+    other_options.add_argument(
+        '--cpu_render',
+        action='store_true',
+        help=_('Render frames on the CPU without an OpenGL context, '
+               'for machines without a GPU; items other than VItem, DotCloud and ImageItem are skipped')
+    )
+    other_options.add_argument(
+        '--tile_size',
+        type=int,
+        default=0,
+        help=_('Render each frame in tiles of the given size and stream them to ffmpeg row by row, '
+               'for resolutions beyond the framebuffer limit; 0 disables tiled rendering')
+    )
+    other_options.add_argument(
+        '--profile_build',
+        action='store_true',
+        help=_('Profile the building of timelines, print a report of the cost of each line and animation, '
+               'and save a Chrome trace file to the output directory')
+    )
+    other_options.add_argument(
+        '--profile_sort',
+        choices=['time', 'mem', 'calls', 'name'],
+        default='time',
+        help=_('Sort key of the build profile report used with --profile_build; '
+               '"mem" is the net change of traced memory rather than the total allocated')
+    )
+    other_options.add_argument(
+        '--profile_render',
+        action='store_true',
+        help=_('Record the time spent in each stage of rendering every frame, print a summary, '
+               'and save a CSV file and a Chrome trace file to the output directory')
+    )
 
     parser.set_defaults(func=write)
 
@@ -175,10 +230,23 @@ def examples_parser(parser: ArgumentParser) -> None:
 def tool_parser(parser: ArgumentParser) -> None:
     parser.add_argument(
         'tool_name',
-        choices=['richtext', 'fonts', 'color'],
+        choices=['richtext', 'fonts', 'color', 'encoder-bench'],
         nargs='*',
         help=_('Tool(s) that you want to use')
     )
+    parser.add_argument(
+        '-c', '--config',
+        nargs=2,
+        metavar=('key', 'value'),
+        action='append',
+        help=_('Override config (used by encoder-bench, e.g. pixel_width, fps and the video_ options)')
+    )
+    parser.add_argument(
+        '--bench_frames',
+        type=int,
+        default=120,
+        help=_('Number of frames piped to each encoder by encoder-bench')
+    )
     parser.set_defaults(func=tool)
 
 
@@ -4,10 +4,16 @@ from bisect import bisect_left, bisect_right
 from collections import defaultdict
 from typing import Generator
 
+import numpy as np
+import numpy.typing as npt
+
 from janim.anims.animation import ApplyAligner, ItemAnimation, TimeAligner
 from janim.anims.display import Display
 from janim.constants import FOREVER
 from janim.items.item import Item
+from janim.locale.i18n import get_local_strings
+
+_ = get_local_strings('anim_stack')
 
 type ComputeAnimsGenerator = Generator[ApplyAligner, None, Item]
 
@@ -40,7 +46,8 @@ class AnimStack:
         if self.prev_display is None:
             at = 0
         if self.prev_display is None or force or not self.prev_display.data_orig.not_changed(item):
-            anim = Display(item, item.store(), at=at, duration=FOREVER, show_at_begin=False)
+            # Display 内部会对 item 进行 store，因此这里直接传入 item 而不再额外拷贝
+            anim = Display(item, item, at=at, duration=FOREVER, show_at_begin=False)
             # finalize 会产生对 self.append 的调用，因此不用再另外 self.append
             anim.finalize()
             self.prev_display = anim
@@ -123,6 +130,15 @@ class AnimStack:
         assert idx >= 0
         return self.stacks[idx]
 
+    def get_static_display(self, as_time: float) -> Display | None:
+        '''
+        如果 ``as_time`` 所处的区段中只有 :class:`~.Display` 作用，也就是物件在该区段中保持不变，则返回该对象，否则返回 ``None``
+        '''
+        anims = self.get(as_time)
+        if len(anims) != 1 or not isinstance(anims[0], Display):
+            return None
+        return anims[0]
+
     def compute(self, as_time: float, readonly: bool, *, get_at_left: bool = False) -> Item:
         '''
         得到指定时间 ``as_time`` 的物件，考虑了动画的作用
@@ -209,6 +225,69 @@ class AnimStack:
 
         return self.cache_data if readonly else self.cache_data.store()
 
+    def compute_stacked(self, as_times: npt.ArrayLike, cmpt_name: str) -> np.ndarray | None:
+        '''
+        批量得到多个时间点 ``as_times`` 下物件 ``cmpt_name`` 组件的数据（例如 ``points``、``stroke``、``radius``），
+        结果是形状为 ``(len(as_times), *shape)`` 的数组
+
+        时间点会先按照所处的区段进行分组：
+
+        - 对于只有单个动画的区段（例如 :class:`~.Display`、通过 ``.anim`` 产生的插值），
+          由 :meth:`~.ItemAnimation.apply_stacked` 一次性算出整组结果，避免逐帧的 Python 开销
+        - 其它区段则退回到逐个时间点调用 :meth:`compute`
+
+        若组件不存在，或是各时间点的数据形状不一致而无法合并，则返回 ``None``；
+        若有时间点早于第一个区段的开始时刻，则抛出 :class:`ValueError`
+
+        .. note::
+
+            该方法仅作为批量读取组件数据的接口（例如用于分析或导出物件的运动轨迹），
+            视频输出时的逐帧渲染并不使用它，因为渲染需要的是完整的物件而不是单个组件的数据
+
+            :class:`~.Transform` 通过额外的渲染调用进行绘制，不会出现在 :class:`AnimStack` 中，
+            所以其插值过程不会被该方法批量计算；
+            目前支持批量计算的只有 :class:`~.Display` 以及通过 ``.anim`` 产生的插值
+        '''
+        as_times = np.asarray(as_times, dtype=np.float64)
+        if as_times.ndim != 1 or len(as_times) == 0:
+            return None
+
+        indices = np.searchsorted(self.times, as_times, side='right') - 1
+        if (indices < 0).any():
+            raise ValueError(
+                _('Cannot compute at {t} because it is earlier than the first time {first}')
+                .format(t=float(as_times[indices < 0].min()), first=self.times[0])
+            )
+
+        result: np.ndarray | None = None
+
+        for idx in np.unique(indices):
+            where = np.flatnonzero(indices == idx)
+            ts = as_times[where]
+            anims = self.stacks[idx]
+
+            datas = None
+            if len(anims) == 1:
+                datas = anims[0].apply_stacked(cmpt_name, ts)
+            if datas is None:
+                datas = []
+                for t in ts:
+                    cmpt = self.compute(float(t), True).components.get(cmpt_name, None)
+                    data = getattr(cmpt, 'get', lambda: None)()
+                    if not isinstance(data, np.ndarray):
+                        return None
+                    datas.append(data)
+                if any(data.shape != datas[0].shape for data in datas):
+                    return None
+
+            if result is None:
+                result = np.empty((len(as_times), *datas[0].shape), dtype=datas[0].dtype)
+            elif result.shape[1:] != datas[0].shape:
+                return None
+            result[where] = datas
+
+        return result
+
     def compute_anims(self, as_time: float, anims: list[ItemAnimation]) -> ComputeAnimsGenerator:
         params = ItemAnimation.ApplyParams(as_time, anims, 0)
 
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import math
 from bisect import bisect_left
 from contextvars import ContextVar
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Callable, Iterable, Self, overload
 
+import numpy as np
+
 from janim.constants import C_LABEL_ANIM_DEFAULT, DEFAULT_DURATION, FOREVER
 from janim.items.item import Item
 from janim.typing import ForeverType
@@ -197,6 +198,15 @@ class ItemAnimation(Animation):
         '''
         pass
 
+    def apply_stacked(self, cmpt_name: str, global_ts: np.ndarray) -> np.ndarray | None:
+        '''
+        批量得到 ``global_ts`` 各时刻下 ``cmpt_name`` 组件的数据，结果的形状为 ``(len(global_ts), *shape)``
+
+        仅在该动画单独占据 :class:`~.AnimStack` 的某个区段时被 :meth:`~.AnimStack.compute_stacked` 调用；
+        返回 ``None`` 表示不支持批量计算，此时会退回到逐帧调用 :meth:`apply`
+        '''
+        return None
+
 
 class ApplyAligner(ItemAnimation):
     def __init__(self, item: Item, stacks: list[AnimStack], **kwargs):
@@ -341,25 +351,111 @@ class TimeAligner:
         return t
 
 
-class TimeSegments[T]:
-    def __init__(self, iterable: Iterable[T], key: Callable[[T], TimeRange | Iterable[TimeRange]], *, step: float = 4):
-        self.step = step
-        self.segments: list[list[T]] = []
+class TimeIndex[T]:
+    '''
+    按时间区段索引一组对象，用于得到某一时刻处于其区段内的所有对象
+
+    - 构建时将所有区段的起止时刻作为事件按时间排序，
+      查询时从上一次查询的位置出发，只处理两次查询之间的事件，
+      因此按顺序逐帧查询时，开销只与两帧之间区段的变化量有关
+    - 向前跳转时同样只处理跨越的事件，跳转距离较远时则直接重新统计
+    - 区段是左闭右开的，即 ``at <= t < end``，``end`` 可以是 ``FOREVER``
+    - :meth:`get` 的结果是按照 ``iterable`` 中的原有顺序排列的元组
+    '''
+    def __init__(self, iterable: Iterable[T], key: Callable[[T], TimeRange | Iterable[TimeRange]]):
+        self.values: list[T] = list(iterable)
 
-        for val in iterable:
+        times: list[float] = []
+        indices: list[int] = []
+        deltas: list[int] = []
+        for i, val in enumerate(self.values):
             ret = key(val)
-            prev_right = None
             for t_range in [ret] if isinstance(ret, TimeRange) else ret:
-                left = math.floor(t_range.at / step)
-                right = math.ceil(t_range.end / step)
-                if prev_right is not None and left < prev_right:
-                    left = prev_right
-                if len(self.segments) < right:
-                    self.segments.extend([].copy() for _ in range(right - len(self.segments)))
-                for i in range(left, right):
-                    self.segments[i].append(val)
-                prev_right = right
-
-    def get(self, t: float) -> list[T]:
-        idx = math.floor(t / self.step)
-        return self.segments[idx] if idx < len(self.segments) else []
+                times.append(t_range.at)
+                indices.append(i)
+                deltas.append(1)
+                if t_range.end is not FOREVER:
+                    times.append(t_range.end)
+                    indices.append(i)
+                    deltas.append(-1)
+
+        order = np.argsort(np.array(times, dtype=np.float64), kind='stable')
+        self.times = np.array(times, dtype=np.float64)[order]
+        self.indices = np.array(indices, dtype=np.int64)[order]
+        self.deltas = np.array(deltas, dtype=np.int64)[order]
+
+        # 已处理的事件数量，以及此时每个对象所在区段的重叠数量
+        self.pos = 0
+        self.counts = np.zeros(len(self.values), dtype=np.int64)
+        # 当前处于区段内的对象的下标（升序）以及对应的对象
+        self.active: list[int] = []
+        self.active_values: list[T] = []
+        # 返回给调用方的结果，在区段发生变化时重新生成，使得内部的列表不会被外部修改
+        self.result: tuple[T, ...] = ()
+
+    def get(self, t: float) -> tuple[T, ...]:
+        '''
+        得到 ``t`` 时刻处于其区段内的所有对象
+        '''
+        pos = int(np.searchsorted(self.times, t, side='right'))
+        if pos == self.pos:
+            return self.result
+
+        lo, hi = sorted((self.pos, pos))
+        if hi - lo > pos:
+            # 比起处理跨越的事件，直接从头统计的开销更小
+            self.counts = np.bincount(self.indices[:pos], self.deltas[:pos], len(self.values)).astype(np.int64)
+            self.pos = pos
+            self._rebuild()
+            return self.result
+
+        changed = self.indices[lo:hi]
+        np.add.at(self.counts, changed, self.deltas[lo:hi] if pos > self.pos else -self.deltas[lo:hi])
+        self.pos = pos
+
+        if len(changed) > len(self.active) // 4 + 16:
+            self._rebuild()
+        else:
+            self._update(np.unique(changed).tolist())
+        return self.result
+
+    def _rebuild(self) -> None:
+        self.active = np.flatnonzero(self.counts > 0).tolist()
+        self.active_values = [self.values[i] for i in self.active]
+        self.result = tuple(self.active_values)
+
+    def _update(self, changed: list[int]) -> None:
+        active = self.active
+        for i in changed:
+            idx = bisect_left(active, i)
+            present = idx != len(active) and active[idx] == i
+            if self.counts[i] > 0:
+                if not present:
+                    active.insert(idx, i)
+                    self.active_values.insert(idx, self.values[i])
+            elif present:
+                del active[idx]
+                del self.active_values[idx]
+        self.result = tuple(self.active_values)
+
+
+class TimeSegments[T](TimeIndex[T]):
+    '''
+    已弃用，请使用 :class:`TimeIndex`
+
+    ``step`` 参数不再有作用，:meth:`~.TimeIndex.get` 只返回处于其区段内的对象
+    '''
+    def __init__(
+        self,
+        iterable: Iterable[T],
+        key: Callable[[T], TimeRange | Iterable[TimeRange]],
+        *,
+        step: float = 4
+    ):
+        from janim.utils.deprecation import deprecated
+        deprecated(
+            'TimeSegments',
+            'TimeIndex',
+            remove=(3, 3)
+        )
+        super().__init__(iterable, key)
@@ -1,5 +1,8 @@
+import numpy as np
+
 from janim.anims.animation import ItemAnimation
 from janim.items.item import Item
+from janim.render.base import RenderBounds
 
 
 class Display(ItemAnimation):
@@ -16,8 +19,34 @@ class Display(ItemAnimation):
     def __init__(self, item: Item, data: Item, **kwargs):
         super().__init__(item, **kwargs)
         self._cover_previous_anims = True
-        self.data = data
         self.data_orig = data.store()
+        self._data: Item | None = None
+        self._render_bounds: RenderBounds | None = None
+        self._render_bounds_computed: bool = False
+
+    @property
+    def data(self) -> Item:
+        '''
+        用于被后续动画修改的物件数据
+
+        大多数 :class:`Display` 在区段中没有后继动画，会直接使用 ``self.data_orig``，
+        所以只在第一次需要时才进行拷贝，减少构建时的内存与耗时
+        '''
+        if self._data is None:
+            self._data = self.data_orig.store()
+        return self._data
+
+    @property
+    def render_bounds(self) -> RenderBounds | None:
+        '''
+        ``self.data_orig`` 在绘制时所占的区域，参考 :meth:`~.Renderer.get_render_bounds`
+
+        ``self.data_orig`` 不会改变，因此只在第一次需要时计算
+        '''
+        if not self._render_bounds_computed:
+            self._render_bounds = self.data_orig.renderer_cls.get_render_bounds(self.data_orig)
+            self._render_bounds_computed = True
+        return self._render_bounds
 
     def apply(self, data: None, p: ItemAnimation.ApplyParams) -> Item:
         '''
@@ -29,3 +58,13 @@ class Display(ItemAnimation):
             return self.data_orig
         self.data.restore(self.data_orig)
         return self.data
+
+    def apply_stacked(self, cmpt_name: str, global_ts: np.ndarray) -> np.ndarray | None:
+        '''
+        各时刻的数据都相同，因此直接广播 ``self.data_orig`` 中的数据
+        '''
+        cmpt = self.data_orig.components.get(cmpt_name, None)
+        data = getattr(cmpt, 'get', lambda: None)()
+        if not isinstance(data, np.ndarray):
+            return None
+        return np.broadcast_to(data, (len(global_ts), *data.shape))
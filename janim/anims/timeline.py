@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import heapq
 import inspect
 import itertools as it
 import math
@@ -9,7 +10,7 @@ import traceback
 import types
 from abc import ABCMeta, abstractmethod
 from bisect import bisect, insort
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
 from contextlib import nullcontext
 from contextvars import ContextVar
 from dataclasses import dataclass
@@ -21,14 +22,16 @@ import OpenGL.GL as gl
 from PIL import Image
 
 from janim.anims.anim_stack import AnimStack
-from janim.anims.animation import (Animation, TimeAligner, TimeRange,
-                                   TimeSegments)
+from janim.anims.animation import (Animation, TimeAligner, TimeIndex,
+                                   TimeRange)
 from janim.anims.composition import AnimGroup
 from janim.anims.updater import updater_params_ctx
 from janim.camera.camera import Camera
 from janim.camera.camera_info import CameraInfo
+from janim.components.depth import Cmpt_Depth
 from janim.constants import (BLACK, DEFAULT_DURATION,
-                             DEFAULT_ITEM_TO_EDGE_BUFF, DOWN, SMALL_BUFF, UP)
+                             DEFAULT_ITEM_TO_EDGE_BUFF, DOWN, FOREVER,
+                             SMALL_BUFF, UP)
 from janim.exception import TimelineLookupError
 from janim.items.audio import Audio
 from janim.items.item import Item
@@ -38,15 +41,21 @@ from janim.items.svg.typst import TypstText
 from janim.items.text import Text
 from janim.locale.i18n import get_local_strings
 from janim.logger import log
-from janim.render.base import RenderData, Renderer, create_context
+from janim.render.arena import BufferArena
+from janim.render.base import (BoundsCuller, RenderBounds, RenderData,
+                               Renderer, create_standalone_context)
 from janim.render.framebuffer import (FRAME_BUFFER_BINDING, blend_context,
                                       create_framebuffer, framebuffer_context,
                                       uniforms)
+from janim.render.renderer_vitem import VItemBatchRenderer, VItemRenderer
 from janim.render.uniform import get_uniforms_context_var
 from janim.typing import JAnimColor, SupportsAnim
 from janim.utils.config import Config, ConfigGetter, config_ctx_var
 from janim.utils.data import ContextSetter
+from janim.utils.font.glyph_store import flush_glyph_stores
 from janim.utils.iterables import resize_preserving_order
+from janim.utils.prefetch import AssetPrefetcher
+from janim.utils.profiler import BuildProfiler, FrameProfiler
 from janim.utils.simple_functions import clip
 
 _ = get_local_strings('timeline')
@@ -209,15 +218,29 @@ class Timeline(metaclass=ABCMeta):
 
     build_indent_ctx: ContextVar[int] = ContextVar('Timeline.build_indent_ctx')
 
-    def build(self, *, quiet=False, hide_subtitles=False, show_debug_notice=False) -> BuiltTimeline:
+    def build(
+        self,
+        *,
+        quiet=False,
+        hide_subtitles=False,
+        show_debug_notice=False,
+        profile=False
+    ) -> BuiltTimeline:
         '''
         构建动画并返回
+
+        ``profile=True`` 时会对构建过程进行性能分析，结果记录在返回值的 ``build_profiler`` 中，
+        可以通过 :meth:`~.BuildProfiler.report` 得到报告，另见 :class:`~.BuildProfiler`
         '''
         indent = self.build_indent_ctx.get(-2) + 2
         indent_str = ' ' * indent
-        with self.with_config(), ContextSetter(self.ctx_var, self), ContextSetter(self.build_indent_ctx, indent):
+        profiler = BuildProfiler(self) if profile else None
+        with self.with_config(), ContextSetter(self.ctx_var, self), ContextSetter(self.build_indent_ctx, indent), \
+                profiler.profiling() if profiler else nullcontext():
 
             self.config_getter = ConfigGetter(config_ctx_var.get())
+            # 构建开始时深度的计数，使得同一进程中多次构建得到的绘制顺序可以相互比较，参考 fingerprint_segments
+            self.depth_counter_at_build = dict(Cmpt_Depth._counter)
             self.camera = Camera()
             self.track(self.camera)
             self.hide_subtitles = hide_subtitles
@@ -230,7 +253,9 @@ class Timeline(metaclass=ABCMeta):
             self._build_frame = inspect.currentframe()
 
             try:
-                self.construct()
+                with profiler.phase('construct') if profiler else nullcontext(), \
+                        AssetPrefetcher.prefetching(self) if Config.get.prefetch_assets else nullcontext():
+                    self.construct()
             finally:
                 self._build_frame = None
 
@@ -245,11 +270,17 @@ class Timeline(metaclass=ABCMeta):
                         )
                     )
 
-            for item, appr in self.item_appearances.items():
-                appr.stack.detect_change_if_not(item)
-                appr.stack.clear_cache()
+            with profiler.phase('detect_change_if_not') if profiler else nullcontext():
+                for item, appr in self.item_appearances.items():
+                    appr.stack.detect_change_if_not(item)
+                    appr.stack.clear_cache()
+
+            with profiler.phase('BuiltTimeline') if profiler else nullcontext():
+                built = BuiltTimeline(self)
+            built.build_profiler = profiler
 
-            built = BuiltTimeline(self)
+            # 使得之后的构建（例如 ParallelVideoWriter 的子进程）可以复用构建时读取的字形
+            flush_glyph_stores()
 
             if not quiet:   # pragma: no cover
                 elapsed = time.time() - start_time
@@ -834,33 +865,64 @@ class SourceTimeline(Timeline):
     def source_object(self) -> object:
         return self.__class__
 
-    def build(self, *, quiet=False, hide_subtitles=False, show_debug_notice=False) -> BuiltTimeline:
+    def build(
+        self,
+        *,
+        quiet=False,
+        hide_subtitles=False,
+        show_debug_notice=False,
+        profile=False
+    ) -> BuiltTimeline:
         from janim.items.text import SourceDisplayer
         with ContextSetter(self.ctx_var, self), self.with_config():
             self.source_displayer = SourceDisplayer(self.source_object(), depth=10000).show()
-        return super().build(quiet=quiet, hide_subtitles=hide_subtitles, show_debug_notice=show_debug_notice)
+        return super().build(
+            quiet=quiet,
+            hide_subtitles=hide_subtitles,
+            show_debug_notice=show_debug_notice,
+            profile=profile
+        )
 
 
 class BuiltTimeline:
     '''
     运行 :meth:`Timeline.build` 后返回的实例
     '''
+
+    batch_vitems: bool = True
+    '''
+    是否在开启 blending 时将连续的 :class:`~.VItem` 合并为一次批量绘制，另见 :meth:`batch_vitem_render_calls`
+    '''
+
+    cull_offscreen: bool = True
+    '''
+    是否剔除完全位于画面外的物件，使其不被计算与渲染，另见 :meth:`collect_render_datas`
+    '''
+
     def __init__(self, timeline: Timeline):
         self.timeline = timeline
         self.duration = timeline.time_aligner.align_t(timeline.current_time)
 
-        self.visible_item_segments = TimeSegments(
-            timeline.item_appearances.values(),
+        self.visible_item_index = TimeIndex(
+            timeline.item_appearances.items(),
             lambda x: (
-                TimeRange(*range) if len(range) == 2 else TimeRange(*range, self.duration + 1)
-                for range in it.batched(x.visibility, 2)
+                TimeRange(*range) if len(range) == 2 else TimeRange(range[0], FOREVER)
+                for range in it.batched(x[1].visibility, 2)
             )
         )
-        self.visible_additional_callbacks_segments = TimeSegments(
+        self.visible_additional_callbacks_index = TimeIndex(
             self.timeline.additional_render_calls_callbacks,
             lambda x: x.t_range
         )
 
+        self.vitem_batch_renderers: dict[mgl.Context, list[VItemBatchRenderer]] = {}
+        self.bounds_culler = BoundsCuller()
+        # 上一次排序时各物件的 (depth, order)、排序后的 (depth, order) 以及排序的结果，参考 sort_by_depth
+        self._depth_keys: list[tuple[float, int]] = []
+        self._depth_sorted_keys: list[tuple[float, int]] = []
+        self._depth_order: list[int] = []
+        self.build_profiler: BuildProfiler | None = None
+
         self._time: float = 0
 
     @property
@@ -917,9 +979,47 @@ class BuiltTimeline:
     def current_camera_info(self) -> CameraInfo:
         return self.timeline.compute_item(self.timeline.camera, self._time, True).points.info
 
-    def render_all(self, ctx: mgl.Context, global_t: float, *, blend_on: bool = True) -> bool:
+    def get_static_frame_key(self, global_t: float) -> tuple | None:
+        '''
+        得到 ``global_t`` 时刻画面状态的标识，用于判断相邻的帧画面是否相同
+
+        - 仅当可见物件（包括摄像机）在该时刻都只受 :class:`~.Display` 作用时，画面才是静止的，
+          此时返回由可见物件及其 :class:`~.Display` 对象组成的元组，两个时刻的返回值相等则说明画面相同
+        - 如果存在其它动画、额外的渲染调用，或是依赖时间的渲染器（例如视频），则返回 ``None``
+        '''
+        timeline = self.timeline
+        global_t = timeline.time_aligner.align_t_for_render(global_t)
+        if global_t == self.duration:
+            global_t -= 1e-4
+
+        if self.visible_additional_callbacks_index.get(global_t):
+            return None
+
+        camera_anim = timeline.item_appearances[timeline.camera].stack.get_static_display(global_t)
+        if camera_anim is None:
+            return None
+
+        key = [camera_anim]
+        for _, appr in self.visible_item_index.get(global_t):
+            anim = appr.stack.get_static_display(global_t)
+            if anim is None or anim.data_orig.renderer_cls.time_dependent:
+                return None
+            key.append(anim)
+
+        return tuple(key)
+
+    def render_all(
+        self,
+        ctx: mgl.Context,
+        global_t: float,
+        *,
+        blend_on: bool = True,
+        tile: tuple[tuple[float, float], tuple[float, float]] | None = None
+    ) -> bool:
         '''
         渲染所有可见物件
+
+        指定 ``tile=(ndc_min, ndc_max)`` 时，只渲染画面中对应的区域，参考 :meth:`~.CameraInfo.sub_frustum`
         '''
         timeline = self.timeline
         global_t = timeline.time_aligner.align_t_for_render(global_t)
@@ -927,12 +1027,16 @@ class BuiltTimeline:
         if global_t == self.duration:
             global_t -= 1e-4
         self._time = global_t
+        profiler = FrameProfiler.profiler_ctx.get()
         try:
             with ContextSetter(Animation.global_t_ctx, global_t),   \
                  ContextSetter(Timeline.ctx_var, self.timeline),    \
                  self.timeline.with_config():
-                camera = timeline.compute_item(timeline.camera, global_t, True)
+                with profiler.stage('compute') if profiler else nullcontext():
+                    camera = timeline.compute_item(timeline.camera, global_t, True)
                 camera_info = camera.points.info
+                if tile is not None:
+                    camera_info = camera_info.sub_frustum(*tile)
                 anti_alias_radius = self.cfg.anti_alias_width / 2 * camera_info.scaled_factor
 
                 with blend_context(ctx, True) if blend_on else nullcontext(), \
@@ -947,56 +1051,215 @@ class BuiltTimeline:
                      ContextSetter(Renderer.data_ctx, RenderData(ctx=ctx,
                                                                  camera_info=camera_info,
                                                                  anti_alias_radius=anti_alias_radius)):
-                    render_datas: list[tuple[Timeline.ItemAppearance, Item]] = []
-                    # 反向遍历一遍所有物件，这是为了让一些效果标记原有的物件不进行渲染
-                    # （会把所应用的物件的 render_disabled 置为 True，所以在下面可以判断这个变量过滤掉它们）
-                    for appr in reversed(self.visible_item_segments.get(global_t)):
-                        if not appr.is_visible_at(global_t):
-                            continue
-                        data = appr.stack.compute(global_t, True)
-                        data._mark_render_disabled()
-                        render_datas.append((appr, data))
-                    # 添加额外的渲染调用，例如 Transform 产生的
-                    # 这里也有可能产生 render_disabled 标记
-                    additional: list[list[tuple[Item, Callable[[Item], None]]]] = []
-                    for rcc in self.visible_additional_callbacks_segments.get(global_t):
-                        if not rcc.t_range.at <= global_t < rcc.t_range.end:
-                            continue
-                        additional.append(rcc.func())
-                    # 剔除被标记 render_disabled 的物件，得到 render_items_final
-                    render_datas_final: list[tuple[Item, Callable]] = []
-                    for appr, data in render_datas:
-                        if appr.render_disabled:
-                            appr.render_disabled = False    # 重置，因为每次都要重新标记
-                            continue
-                        render_datas_final.append((data, appr.render))
-                    render_datas_final.extend(it.chain(*additional))
-                    # 按深度排序
-                    render_datas_final.sort(key=lambda x: x[0].depth, reverse=True)
+                    render_datas_final = self.collect_render_datas(global_t)
                     # 渲染
                     blending = get_uniforms_context_var(ctx).get().get('JA_BLENDING')
+                    if blending and self.batch_vitems and ctx.version_code >= 430:
+                        render_datas_final = self.batch_vitem_render_calls(ctx, render_datas_final)
                     for data, render in render_datas_final:
-                        render(data)
+                        if profiler is None:
+                            render(data)
+                        else:
+                            self._profile_render(profiler, ctx, data, render)
                         # 如果没有 blending，我们认为当前是在向透明 framebuffer 绘制
                         # 所以每次都需要使用 glFlush 更新 framebuffer 信息使得正确渲染
                         if not blending:
                             gl.glFlush()
 
+                if profiler is not None:
+                    self._record_arena_stats(profiler, ctx)
+
         except Exception:
             traceback.print_exc()
             return False
 
         return True
 
+    def collect_render_datas(self, global_t: float) -> list[tuple[Item, Callable]]:
+        '''
+        计算 ``global_t`` 时刻需要渲染的物件以及对应的渲染调用，并按深度排序
+
+        需要在设置了 ``Animation.global_t_ctx`` 等上下文后调用，参考 :meth:`render_all` 以及 :class:`~.CPUFrameRenderer`
+
+        若 :attr:`cull_offscreen` 为 ``True``，则完全位于画面外的物件会被剔除：
+
+        - 只考虑在当前区段中保持不变（只受 :class:`~.Display` 作用）的物件，
+          其数据即为 :class:`~.Display` 所记录的数据，不需要进行计算
+        - 其绘制区域由 :attr:`~.Display.render_bounds` 得到并缓存在 :class:`~.Display` 中，在整个区段内都可以复用
+        - 其它物件的数据依赖于计算结果，不进行剔除
+        '''
+        profiler = FrameProfiler.profiler_ctx.get()
+        render_data = Renderer.data_ctx.get(None)
+        cull = self.cull_offscreen and render_data is not None
+        with profiler.stage('compute') if profiler else nullcontext():
+            render_datas: list[tuple[Timeline.ItemAppearance, Item]] = []
+            # 可以被剔除的物件在 render_datas 中的下标，以及对应的绘制区域
+            cull_indices: list[int] = []
+            cull_bounds: list[RenderBounds] = []
+            # 反向遍历一遍所有物件，这是为了让一些效果标记原有的物件不进行渲染
+            # （会把所应用的物件的 render_disabled 置为 True，所以在下面可以判断这个变量过滤掉它们）
+            for _, appr in reversed(self.visible_item_index.get(global_t)):
+                if cull:
+                    display = appr.stack.get_static_display(global_t)
+                    if display is not None and display.render_bounds is not None:
+                        cull_indices.append(len(render_datas))
+                        cull_bounds.append(display.render_bounds)
+                        render_datas.append((appr, display.data_orig))
+                        continue
+                data = appr.stack.compute(global_t, True)
+                data._mark_render_disabled()
+                render_datas.append((appr, data))
+
+            culled: set[int] = set()
+            if cull_indices:
+                mask = self.bounds_culler.outside_mask(cull_bounds,
+                                                       render_data.camera_info,
+                                                       render_data.anti_alias_radius)
+                for idx, outside in zip(cull_indices, mask):
+                    if outside:
+                        culled.add(idx)
+                    else:
+                        render_datas[idx][1]._mark_render_disabled()
+            # 添加额外的渲染调用，例如 Transform 产生的
+            # 这里也有可能产生 render_disabled 标记
+            additional: list[list[tuple[Item, Callable[[Item], None]]]] = []
+            for rcc in self.visible_additional_callbacks_index.get(global_t):
+                additional.append(rcc.func())
+            # 剔除被标记 render_disabled 的物件，得到 render_items_final
+            render_datas_final: list[tuple[Item, Callable]] = []
+            for idx, (appr, data) in enumerate(render_datas):
+                if appr.render_disabled:
+                    appr.render_disabled = False    # 重置，因为每次都要重新标记
+                    continue
+                if idx in culled:
+                    continue
+                render_datas_final.append((data, appr.render))
+            render_datas_final.extend(it.chain(*additional))
+        # 按深度排序
+        with profiler.stage('sort') if profiler else nullcontext():
+            render_datas_final = self.sort_by_depth(render_datas_final)
+        return render_datas_final
+
+    def sort_by_depth[T](self, render_datas: list[tuple[Item, T]]) -> list[tuple[Item, T]]:
+        '''
+        将 ``render_datas`` 按深度从大到小排序（深度相同时保持原有顺序）
+
+        排序的结果只取决于各物件的 ``(depth, order)`` 序列，相邻帧之间通常没有变化或者只有少量变化，
+        因此在帧之间保留排序的结果：
+
+        - 序列与上一次相同时，直接复用排序后的下标
+        - 否则只对新出现的以及深度发生变化的物件排序，再与上一次的排序结果中仍然存在的部分合并，参考 :meth:`_update_depth_order`
+
+        由于 ``render_all`` 每次调用都会经过这里，所以 :class:`~.VideoWriter` 与界面的预览都可以复用
+        '''
+        keys = [data.depth.get_raw() for data, _ in render_datas]
+        if keys != self._depth_keys:
+            self._depth_order = self._update_depth_order(keys)
+            self._depth_keys = keys
+        return [render_datas[i] for i in self._depth_order]
+
+    def _update_depth_order(self, keys: list[tuple[float, int]]) -> list[int]:
+        '''
+        在上一次的排序结果上更新，得到 ``keys`` 从大到小排序后的下标
+
+        物件在帧之间通过 ``(depth, order)`` 对应：上一次的排序结果中不再存在的会被移除，
+        新出现的（包括深度发生变化的）单独排序后合并进来；相同的 ``(depth, order)`` 按在 ``keys`` 中的顺序分配下标
+        '''
+        remaining = Counter(keys)
+        kept: list[tuple[float, int]] = []
+        for key in self._depth_sorted_keys:
+            if remaining[key] > 0:
+                remaining[key] -= 1
+                kept.append(key)
+        added = sorted(remaining.elements(), reverse=True)
+        self._depth_sorted_keys = sorted_keys = list(heapq.merge(kept, added, reverse=True)) if added else kept
+
+        indices: defaultdict[tuple[float, int], deque[int]] = defaultdict(deque)
+        for i, key in enumerate(keys):
+            indices[key].append(i)
+        return [indices[key].popleft() for key in sorted_keys]
+
+    @staticmethod
+    def _profile_render(
+        profiler: FrameProfiler,
+        ctx: mgl.Context,
+        data: Item | list[Item],
+        render: Callable
+    ) -> None:
+        # render 可能是渲染器的方法（例如额外的渲染调用以及批量绘制），也可能是 ItemAppearance.render
+        owner = getattr(render, '__self__', None)
+        renderer_cls = type(owner) if isinstance(owner, Renderer) else data.renderer_cls
+        if isinstance(data, list):
+            item = f'{len(data)} items'
+        else:
+            item = data.__class__.__name__
+        with profiler.stage(f'render:{renderer_cls.__name__}', item=item):
+            render(data)
+            if profiler.sync_gpu:
+                ctx.finish()
+
+    @staticmethod
+    def _record_arena_stats(profiler: FrameProfiler, ctx: mgl.Context) -> None:
+        arena = BufferArena.find(ctx)
+        if arena is None:
+            return
+        stats = arena.stats()
+        profiler.record('arena_uploaded_bytes', arena.take_uploaded())
+        profiler.record('arena_capacity_bytes', stats.capacity)
+        profiler.record('arena_fragmentation', stats.fragmentation)
+
+    def batch_vitem_render_calls(
+        self,
+        ctx: mgl.Context,
+        render_datas: list[tuple[Item, Callable]]
+    ) -> list[tuple[Item | list[Item], Callable]]:
+        '''
+        将 ``render_datas`` 中连续的、使用 :class:`~.VItemRenderer` 绘制的物件合并为一次批量绘制，
+        参考 :class:`~.VItemBatchRenderer`
+
+        额外的渲染调用（例如 :class:`~.Transform` 产生的）不参与合并
+        '''
+        renderers = self.vitem_batch_renderers.setdefault(ctx, [])
+        result: list[tuple[Item | list[Item], Callable]] = []
+        batch: list[tuple[Item, Callable]] = []
+
+        batch_count = 0
+
+        def flush() -> None:
+            nonlocal batch_count
+            if len(batch) == 1:
+                result.append(batch[0])
+            elif batch:
+                # 每一个批量绘制使用独立的渲染器，以便在下一帧中复用其中的 buffer 数据
+                if batch_count == len(renderers):
+                    renderers.append(VItemBatchRenderer())
+                result.append(([data for data, _ in batch], renderers[batch_count].render))
+                batch_count += 1
+            batch.clear()
+
+        for data, render in render_datas:
+            batchable = data.renderer_cls is VItemRenderer \
+                and isinstance(getattr(render, '__self__', None), Timeline.ItemAppearance)
+            # 点数不足的物件（例如作为容器的 TextLine）本就不会绘制任何内容，直接跳过，避免打断合并
+            if batchable and len(data.points._points.data) < 3:
+                continue
+            if not batchable:
+                flush()
+                result.append((data, render))
+                continue
+            if batch and batch[0][0]._fix_in_frame != data._fix_in_frame:
+                flush()
+            batch.append((data, render))
+
+        flush()
+        return result
+
     capture_ctx: mgl.Context | None = None
     capture_fbo: mgl.Framebuffer | None = None
 
     def capture(self, global_t: float) -> Image.Image:
         if BuiltTimeline.capture_ctx is None:
-            try:
-                BuiltTimeline.capture_ctx = create_context(standalone=True, require=430)
-            except ValueError:
-                BuiltTimeline.capture_ctx = create_context(standalone=True, require=330)
+            BuiltTimeline.capture_ctx = create_standalone_context()
 
             pw, ph = self.cfg.pixel_width, self.cfg.pixel_height
             BuiltTimeline.capture_fbo = create_framebuffer(BuiltTimeline.capture_ctx, pw, ph)
@@ -1058,6 +1321,8 @@ class TimelineItem(Item):
     '''
 
     class TIRenderer(Renderer):
+        time_dependent = True
+
         def render(self, item: TimelineItem):
             t = Animation.global_t_ctx.get() - item.at
             if 0 <= t <= item.duration:
@@ -6,9 +6,14 @@ from enum import Enum
 from functools import partial
 from typing import Callable, Generator, Iterable
 
+import numpy as np
+
 from janim.anims.animation import Animation, ItemAnimation
 from janim.anims.composition import AnimGroup
 from janim.anims.fading import FadeInFromPoint, FadeOutToPoint
+from janim.components.points import Cmpt_Points
+from janim.components.radius import Cmpt_Radius
+from janim.components.rgbas import Cmpt_Rgbas
 from janim.constants import C_LABEL_ANIM_STAY, OUT
 from janim.items.item import Item
 from janim.items.points import Points
@@ -16,9 +21,10 @@ from janim.items.vitem import VItem
 from janim.locale.i18n import get_local_strings
 from janim.logger import log
 from janim.typing import Vect
+from janim.utils.bezier import interpolate_stacked
 from janim.utils.data import AlignedData
 from janim.utils.iterables import resize_preserving_order
-from janim.utils.paths import PathFunc, get_path_func
+from janim.utils.paths import PathFunc, get_path_func, straight_path
 
 _ = get_local_strings('transform')
 
@@ -292,6 +298,27 @@ class _MethodTransform(ItemAnimation):
         )
         return self.aligned.union
 
+    def apply_stacked(self, cmpt_name: str, global_ts: np.ndarray) -> np.ndarray | None:
+        '''
+        对于线性插值的组件，将各时刻的插值合并为一次广播运算
+        '''
+        cmpt1 = self.aligned.data1.components.get(cmpt_name, None)
+        cmpt2 = self.aligned.data2.components.get(cmpt_name, None)
+        if not isinstance(cmpt1, (Cmpt_Points, Cmpt_Rgbas, Cmpt_Radius)) or type(cmpt1) is not type(cmpt2):
+            return None
+        if isinstance(cmpt1, Cmpt_Points) and self.path_func is not straight_path:
+            return None
+
+        data1 = cmpt1.get()
+        data2 = cmpt2.get()
+        # 与 interpolate 一致：数据共用时不进行插值，结果保持为 union 中原有的数据
+        if data1 is data2:
+            data = self.aligned.union.components[cmpt_name].get()
+            return np.broadcast_to(data, (len(global_ts), *data.shape))
+
+        alphas = [self.get_alpha_on_global_t(t) for t in global_ts]
+        return interpolate_stacked(data1, data2, alphas)
+
 
 class FadeTransform(AnimGroup):
     label_color = C_LABEL_ANIM_STAY
@@ -1,3 +1,6 @@
+from __future__ import annotations
+
+import copy
 import math
 from dataclasses import dataclass, field
 
@@ -64,6 +67,29 @@ class CameraInfo:
         mapped = aligned @ self.proj_matrix.T
         return mapped[:, :2] / mapped[:, 3][:, np.newaxis]
 
+    def sub_frustum(self, ndc_min: tuple[float, float], ndc_max: tuple[float, float]) -> CameraInfo:
+        '''
+        得到只渲染画面中 ``[ndc_min, ndc_max]`` 区域（以 ``[-1, 1]`` 的标准化坐标表示）的摄像机信息
+
+        摄像机的位置与视角不变，只对投影矩阵进行平移与缩放（即偏轴投影），
+        因此将各个区域的渲染结果拼接起来与直接渲染整个画面是一致的，用于分块渲染
+        '''
+        center = (np.asarray(ndc_min) + np.asarray(ndc_max)) / 2
+        scale = (np.asarray(ndc_max) - np.asarray(ndc_min)) / 2
+
+        # 在裁剪空间中进行变换，使得 (ndc - center) / scale 成为新的标准化坐标
+        tile_matrix = np.eye(4)
+        tile_matrix[0, 0] = 1 / scale[0]
+        tile_matrix[1, 1] = 1 / scale[1]
+        tile_matrix[0, 3] = -center[0] / scale[0]
+        tile_matrix[1, 3] = -center[1] / scale[1]
+
+        info = copy.copy(self)
+        info.proj_matrix = tile_matrix @ self.proj_matrix
+        info.proj_view_matrix = info.proj_matrix @ self.view_matrix
+        info.frame_radius = self.frame_radius * scale
+        return info
+
     def _compute_distance_from_plane(self, vertical_length: float) -> float:
         return vertical_length / 2 / math.tan(math.radians(self.fov / 2))
 
@@ -10,8 +10,9 @@ from janim.exception import (EXITCODE_MODULE_NOT_FOUND, EXITCODE_NOT_FILE,
                              ExitException)
 from janim.locale.i18n import get_local_strings
 from janim.logger import log
-from janim.utils.config import cli_config, default_config
+from janim.utils.config import Config, cli_config, default_config
 from janim.utils.file_ops import open_file
+from janim.utils.profiler import FrameProfiler
 
 _ = get_local_strings('cli')
 
@@ -77,12 +78,24 @@ def write(args: Namespace) -> None:
     if not timelines:
         return
 
-    from janim.render.writer import (AudioWriter, SRTWriter, VideoWriter,
+    from janim.render.writer import (AudioWriter, CPUVideoWriter,
+                                     ParallelVideoWriter, SRTWriter,
+                                     TiledVideoWriter, VideoWriter,
                                      merge_video_and_audio)
 
+    if args.cpu_render and (args.incremental or args.workers > 1):
+        log.warning(_("'--incremental' and '--workers' are ignored because '--cpu_render' is set"))
+    elif args.tile_size > 0 and (args.incremental or args.workers > 1):
+        log.warning(_("'--incremental' and '--workers' are ignored because '--tile_size' is set"))
+    elif args.profile_render and (args.incremental or args.workers > 1):
+        log.warning(_("'--incremental' and '--workers' are ignored because '--profile_render' is set"))
+
     log.info('======')
 
-    built = [timeline().build(hide_subtitles=args.hide_subtitles) for timeline in timelines]
+    built = [
+        timeline().build(hide_subtitles=args.hide_subtitles, profile=args.profile_build)
+        for timeline in timelines
+    ]
 
     # 当设定 video_with_audio 时，忽略 video 和 audio 选项
     if args.video_with_audio:
@@ -134,6 +147,16 @@ def write(args: Namespace) -> None:
 
         prev_is_skipped = skip
 
+        if anim.build_profiler is not None:
+            # 报告是多行的表格，直接输出以免被日志格式打乱
+            print(anim.build_profiler.report(sort=args.profile_sort))
+            file_path = os.path.join(output_dir, f'{name}_build_trace.json')
+            anim.build_profiler.save_chrome_trace(file_path)
+            log.info(
+                _('Saved the build profile to "{file_path}"')
+                .format(file_path=file_path)
+            )
+
         if skip:
             log.info(
                 _('Skipping "{name}": no part to output')
@@ -152,13 +175,46 @@ def write(args: Namespace) -> None:
         log.info(f'output_dir="{output_dir}"')
 
         if writes_video:
-            video_writer = VideoWriter(anim)
+            kwargs = {}
+            if args.profile_render:
+                kwargs['frame_profiler'] = frame_profiler = FrameProfiler()
+            if args.cpu_render:
+                video_writer = CPUVideoWriter(anim)
+            elif args.tile_size > 0:
+                # FrameEffect 需要作用于完整的画面，此时退回到 VideoWriter
+                if TiledVideoWriter.check(anim):
+                    video_writer = TiledVideoWriter(anim, args.tile_size)
+                else:
+                    video_writer = VideoWriter(anim)
+            elif args.profile_render:
+                # 性能分析需要在当前进程中逐帧进行，因此总是使用 VideoWriter
+                video_writer = VideoWriter(anim)
+            elif args.incremental:
+                from janim.render.incremental import IncrementalVideoWriter
+                video_writer = IncrementalVideoWriter(anim)
+            elif args.workers > 1:
+                video_writer = ParallelVideoWriter(anim, args.workers)
+            else:
+                video_writer = VideoWriter(anim)
             video_writer.write_all(
                 os.path.join(output_dir,
                              f'{name}.{args.format}'),
                 use_pbo=not args.disable_pbo,
-                _keep_temp=video_with_audio
+                static_frame_cache=args.static_frame_cache,
+                premultiplied_alpha=args.premultiplied_alpha,
+                _keep_temp=video_with_audio,
+                **kwargs
             )
+            if args.profile_render:
+                print(frame_profiler.report())
+                csv_path = os.path.join(output_dir, f'{name}_render_profile.csv')
+                trace_path = os.path.join(output_dir, f'{name}_render_trace.json')
+                frame_profiler.save_csv(csv_path)
+                frame_profiler.save_chrome_trace(trace_path)
+                log.info(
+                    _('Saved the render profile to "{csv_path}" and "{trace_path}"')
+                    .format(csv_path=csv_path, trace_path=trace_path)
+                )
             if open_result and not video_with_audio:
                 open_file(video_writer.final_file_path)
 
@@ -196,6 +252,12 @@ def tool(args: Namespace) -> None:
         log.error(_('No tool specified for use'))
         return
 
+    if 'encoder-bench' in args.tool_name:
+        encoder_bench(args)
+        args.tool_name = [key for key in args.tool_name if key != 'encoder-bench']
+        if not args.tool_name:
+            return
+
     # 不直接从对应的 module 导入，是为了经过 anim_viewer 中对 pyside6 安装的检查
     from janim.gui.anim_viewer import (ColorWidget, FontTable, QWidget,
                                        RichTextEditor)
@@ -228,6 +290,32 @@ def tool(args: Namespace) -> None:
     app.exec()
 
 
+def encoder_bench(args: Namespace) -> None:
+    '''
+    用于 ``janim tool encoder-bench``，测量本地各个可用编码器的速度
+    '''
+    from janim.render.encoder import bench_encoders
+
+    modify_default_config(args)
+    cfg = Config.get
+
+    log.info('======')
+    log.info(f'resolution="{cfg.pixel_width}x{cfg.pixel_height}"')
+    log.info(f'preset="{cfg.video_preset}" crf={cfg.video_crf} threads={cfg.video_threads}')
+
+    results = bench_encoders(cfg, frames=args.bench_frames)
+
+    log.info('======')
+    if not results:
+        log.error(_('No available encoder found'))
+        return
+
+    width = max(len(result.encoder) for result in results)
+    for result in results:
+        fps = _('failed') if result.fps is None else f'{result.fps:.1f} fps'
+        print(f'{result.codec:<8}{result.encoder:<{width + 2}}{fps}')
+
+
 def modify_default_config(args: Namespace) -> None:
     '''
     用于 CLI 的 ``-c`` 参数
@@ -235,7 +323,11 @@ def modify_default_config(args: Namespace) -> None:
     if args.config:
         for key, value in args.config:
             dtype = type(getattr(default_config, key))
-            setattr(cli_config, key, dtype(value))
+            if dtype is bool:
+                # bool('false') 为 True，所以需要单独处理
+                setattr(cli_config, key, value.lower() in ('1', 'true', 'yes', 'on'))
+            else:
+                setattr(cli_config, key, dtype(value))
 
 
 def get_module(file_name: str):
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from janim.items.item import Item
+    from janim.items.vitem import VItem
+
+# 每个属性的一行所占的字节数，用于由切片的地址得到其在打包数组中的位置
+_ROW_SIZES = {
+    'points': 3 * 4,
+    'radius': 4,
+    'colors': 4 * 4,
+}
+
+
+class PackedStore:
+    '''
+    将一组 :class:`~.VItem` 的点、半径、描边颜色与填充颜色分别打包到每个属性一个连续的 float32 数组中，
+    各物件组件中的 :class:`~.Array` 改为引用其中的切片（只读的视图），而不是各自持有单独的数组
+
+    - 通过 :meth:`pack` 创建，应在物件被显示或者用于动画之前调用，使得时间轴记录的数据就是打包后的切片，例如：
+
+      .. code-block:: python
+
+          txt = Text('...')
+          PackedStore.pack(txt)
+          txt.show()
+
+    - 打包后物件的使用方式不变：:class:`~.Array` 的数据是只读的，修改数据时会被替换为新的数组，
+      该物件随之脱离打包的数组，不影响其它物件；``store()``、``copy()`` 等复制操作与原先一样只复制引用，
+      得到的副本引用同样的切片
+    - 描边颜色与填充颜色依次存放在同一个数组中，与 :class:`~.VItemBatchRenderer` 中的布局一致
+    - :class:`~.VItemBatchRenderer` 绘制的一组物件恰好是打包数组中依次相连、且没有脱离的一段时，
+      直接上传打包数组中对应的范围，而不需要逐个物件预处理与拼接，参考 :meth:`find_run`
+
+    只打包点数量不少于 3 的物件，其余的物件不会被绘制；打包数组在所有切片都被回收后随之回收
+    '''
+    # 以打包的点数组的 id 索引，打包数组被回收时移除
+    stores: dict[int, PackedStore] = {}
+
+    def __init__(self, items: list[VItem]):
+        points = [item.points._points.data for item in items]
+        radius = [item.radius._radii.data for item in items]
+        stroke = [item.stroke._rgbas.data for item in items]
+        fill = [item.fill._rgbas.data for item in items]
+
+        self.count = len(items)
+        self.offsets = {
+            'points': self.get_offsets([len(data) for data in points]),
+            'radius': self.get_offsets([len(data) for data in radius]),
+            'colors': self.get_offsets([len(s) + len(f) for s, f in zip(stroke, fill)]),
+            'anchors': self.get_offsets([(len(data) + 1) // 2 for data in points]),
+        }
+        self.stroke_counts = np.array([len(data) for data in stroke])
+
+        bases = {
+            'points': np.concatenate(points),
+            'radius': np.concatenate(radius),
+            'colors': np.concatenate([data for pair in zip(stroke, fill) for data in pair]),
+        }
+        for base in bases.values():
+            base.setflags(write=False)
+        # 只以弱引用持有，使得打包数组的生命周期由物件的切片决定
+        self.bases = {attr: weakref.ref(base) for attr, base in bases.items()}
+        # 点数组中的偏移 -> 物件在其中的序号
+        self.index_of = {offset: i for i, offset in enumerate(self.offsets['points'][:-1].tolist())}
+
+        # 绘制时用到的、只与上述数据有关的信息
+        self.closepath_flags = np.concatenate([item.points.get_closepath_flags() for item in items]).astype(np.float32)
+        self.mins = np.fmin.reduceat(bases['points'], self.offsets['points'][:-1])
+        self.maxs = np.fmax.reduceat(bases['points'], self.offsets['points'][:-1])
+        self.radius_max = np.maximum.reduceat(bases['radius'], self.offsets['radius'][:-1])
+        # 描边与填充的起始位置交替排列，使得 reduceat 的奇数项对应填充颜色
+        color_starts = np.column_stack([
+            self.offsets['colors'][:-1],
+            self.offsets['colors'][:-1] + self.stroke_counts
+        ]).ravel()
+        self.fill_transparent = np.logical_and.reduceat(bases['colors'][:, 3] == 0, color_starts)[1::2]
+
+        for i, item in enumerate(items):
+            item.points._points._data = self.slice('points', bases['points'], i)
+            item.radius._radii._data = self.slice('radius', bases['radius'], i)
+            colors = self.slice('colors', bases['colors'], i)
+            item.stroke._rgbas._data = colors[:self.stroke_counts[i]]
+            item.fill._rgbas._data = colors[self.stroke_counts[i]:]
+
+        key = id(bases['points'])
+        PackedStore.stores[key] = self
+        weakref.finalize(bases['points'], PackedStore.stores.pop, key, None)
+
+    @staticmethod
+    def pack(*roots: Item) -> PackedStore:
+        '''
+        打包 ``roots`` 以及它们的后代物件中所有点数量不少于 3 的 :class:`~.VItem`
+        '''
+        from janim.items.vitem import VItem
+
+        items = [
+            item
+            for root in roots
+            for item in root.walk_self_and_descendants()
+            if isinstance(item, VItem) and len(item.points._points.data) >= 3
+        ]
+        return PackedStore(items)
+
+    @staticmethod
+    def get_offsets(counts: Iterable[int]) -> np.ndarray:
+        counts = list(counts)
+        offsets = np.zeros(len(counts) + 1, dtype=int)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets
+
+    def slice(self, attr: str, base: np.ndarray, i: int) -> np.ndarray:
+        offsets = self.offsets[attr]
+        return base[offsets[i]: offsets[i + 1]]
+
+    def corners(self, begin: int, end: int) -> np.ndarray:
+        '''
+        得到第 ``begin`` 至 ``end`` 个物件的包围框的顶点，与 :meth:`~.Cmpt_Points.BoundingBox.get_corners` 的顺序一致
+        '''
+        mins = self.mins[begin: end]
+        maxs = self.maxs[begin: end]
+        bits = np.array([[(i >> 2) & 1, (i >> 1) & 1, i & 1] for i in range(8)], dtype=bool)
+        return np.where(bits[np.newaxis], maxs[:, np.newaxis], mins[:, np.newaxis]).reshape(-1, 3)
+
+    @staticmethod
+    def find_run(items: list[VItem]) -> PackedRun | None:
+        '''
+        若 ``items`` 依次对应同一个 :class:`PackedStore` 中相连的、且没有脱离打包数组的物件，则返回对应的范围，否则返回 ``None``
+
+        只比较切片所在的数组与地址，因此对于 ``store()`` 得到的副本同样适用
+        '''
+        if not items:
+            return None
+        first = items[0].points._points._data
+        store = PackedStore.stores.get(id(first.base), None)
+        if store is None:
+            return None
+        bases = {attr: ref() for attr, ref in store.bases.items()}
+        if first.base is not bases['points']:
+            return None
+
+        begin = store.index_of.get((first.ctypes.data - bases['points'].ctypes.data) // _ROW_SIZES['points'], None)
+        if begin is None or begin + len(items) > store.count:
+            return None
+
+        addresses = {attr: base.ctypes.data for attr, base in bases.items()}
+        offsets = store.offsets
+        stroke_counts = store.stroke_counts
+        for i, item in enumerate(items, begin):
+            for attr, data in (
+                ('points', item.points._points._data),
+                ('radius', item.radius._radii._data),
+                ('colors', item.stroke._rgbas._data),
+            ):
+                if data.base is not bases[attr] \
+                        or data.ctypes.data != addresses[attr] + offsets[attr][i] * _ROW_SIZES[attr]:
+                    return None
+            if len(item.points._points._data) != offsets['points'][i + 1] - offsets['points'][i] \
+                    or len(item.radius._radii._data) != offsets['radius'][i + 1] - offsets['radius'][i] \
+                    or len(item.stroke._rgbas._data) != stroke_counts[i]:
+                return None
+            fill = item.fill._rgbas._data
+            if fill.base is not bases['colors'] \
+                    or fill.ctypes.data != addresses['colors'] + (offsets['colors'][i] + stroke_counts[i]) * 16 \
+                    or len(fill) != offsets['colors'][i + 1] - offsets['colors'][i] - stroke_counts[i]:
+                return None
+
+        return PackedRun(store, begin, begin + len(items), bases)
+
+
+@dataclass
+class PackedRun:
+    '''
+    :meth:`PackedStore.find_run` 的结果，表示 :class:`PackedStore` 中第 ``begin`` 至 ``end`` 个物件
+    '''
+    store: PackedStore
+    begin: int
+    end: int
+    bases: dict[str, np.ndarray]
+
+    def is_same(self, other: PackedRun | None) -> bool:
+        return other is not None \
+            and other.store is self.store \
+            and other.begin == self.begin \
+            and other.end == self.end
+
+    def offsets(self, attr: str) -> np.ndarray:
+        '''
+        该范围中各物件在 ``attr`` 中的起始位置，以该范围的开头为 0，长度为物件数量 + 1
+        '''
+        offsets = self.store.offsets[attr][self.begin: self.end + 1]
+        return offsets - offsets[0]
+
+    def array(self, attr: str) -> np.ndarray:
+        '''
+        该范围在打包数组中对应的部分，不产生拷贝
+        '''
+        offsets = self.store.offsets[attr]
+        return self.bases[attr][offsets[self.begin]: offsets[self.end]]
@@ -72,3 +72,6 @@ class AsTypeError(JAnimException): ...
 
 class ColorNotFoundError(JAnimException): ...
 class FontNotFoundError(JAnimException): ...
+
+
+class FFmpegError(JAnimException): ...
@@ -1,6 +1,5 @@
 import locale
 import os
-from typing import TYPE_CHECKING
 
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QPixmap
@@ -12,9 +11,6 @@ from janim.locale.i18n import get_local_strings
 from janim.utils.file_ops import get_janim_dir
 from janim.utils.font.database import get_database
 
-if TYPE_CHECKING:
-    from fontTools.ttLib.tables._n_a_m_e import NameRecord
-
 _ = get_local_strings('font_table')
 
 
@@ -66,20 +62,12 @@ class FontTable(QWidget):
         table.setHorizontalScrollMode(QTableWidget.ScrollMode.ScrollPerPixel)
 
         for row, info in enumerate(infos):
-            records: list[NameRecord] = [
-                record
-                for record in info.name.names
-                if record.nameID == 1
-            ]
-            records.sort(key=lambda x: x.langID, reverse=True)
+            records = sorted(info.record.family_names, key=lambda x: x[1], reverse=True)
 
-            names = []
-
-            for record in records:
-                platform_id = record.platformID
-                language_id = record.langID
-                displayname = record.string.decode('utf-16-be' if record.isUnicode() else 'latin-1')
-                names.append(f'({platform_id},{locale.windows_locale.get(language_id, language_id)}){displayname}')
+            names = [
+                f'({platform_id},{locale.windows_locale.get(language_id, language_id)}){displayname}'
+                for platform_id, language_id, displayname in records
+            ]
 
             contents = (
                 info.family_name,
@@ -131,14 +131,17 @@ class Relation[GRelT: 'Relation'](refresh.Refreshable):
     def _family(self, *, up: bool) -> list[GRelT]:  # use DFS
         lst = self.parents if up else self.children
         res = []
+        # 使用集合判断是否已添加，避免在后代较多（例如 Text 的大量字符）时退化为平方复杂度
+        added = set()
 
         for sub_obj in lst:
-            if sub_obj not in res:
+            if sub_obj not in added:
+                added.add(sub_obj)
                 res.append(sub_obj)
-            res.extend(filter(
-                lambda obj: obj not in res,
-                sub_obj._family(up=up)
-            ))
+            for obj in sub_obj._family(up=up):
+                if obj not in added:
+                    added.add(obj)
+                    res.append(obj)
 
         return res
 
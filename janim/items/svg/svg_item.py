@@ -20,6 +20,7 @@ from janim.logger import log
 from janim.utils.bezier import PathBuilder, quadratic_bezier_points_for_arc
 from janim.utils.config import Config
 from janim.utils.file_ops import find_file
+from janim.utils.prefetch import request_svg
 from janim.utils.space_ops import rotation_about_z
 
 _ = get_local_strings('svg_item')
@@ -131,13 +132,25 @@ class SVGItem(Group[SVGElemItem]):
         解析文件并得到物件列表
         '''
         file_path = find_file(file_path)
+        request_svg(file_path, cls.group_key)
+        return cls.build_items(*SVGItem.get_builders_from_file(file_path, cls.group_key))
+
+    @staticmethod
+    def get_builders_from_file(file_path: str, group_key: str | None) -> tuple[list[ItemBuilder], GroupIndexer]:
+        '''
+        解析文件并得到用于创建物件的函数，结果会被缓存，``group_key`` 参考 :attr:`group_key`
+
+        .. note::
+
+            可以在其它线程中调用，例如 :class:`~.AssetPrefetcher`
+        '''
         mtime = os.path.getmtime(file_path)
         name = os.path.splitext(os.path.basename(file_path))[0]
         key = (name, mtime)
 
         cached = SVGItem.vitem_builders_map.get(key, None)
         if cached is not None:
-            return cls.build_items(*cached)
+            return cached
 
         svg: se.SVG = se.SVG.parse(file_path)   # PPI=96
 
@@ -151,9 +164,9 @@ class SVGItem(Group[SVGElemItem]):
                 continue
 
             elif isinstance(shape, se.Group):
-                if cls.group_key is None:
+                if group_key is None:
                     continue
-                name = shape.values.get(cls.group_key, None)
+                name = shape.values.get(group_key, None)
                 if name is None:
                     continue
                 for elem in shape.select():
@@ -198,7 +211,7 @@ class SVGItem(Group[SVGElemItem]):
                 indexers[name].append(len(builders) - 1)
 
         SVGItem.vitem_builders_map[key] = (builders, indexers)
-        return cls.build_items(builders, indexers)
+        return builders, indexers
 
     @staticmethod
     def build_items(
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 import hashlib
 import itertools as it
+import math
 import os
+import shutil
 import subprocess as sp
+import tempfile
+import threading
 import types
-from typing import Iterable, Self, overload
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Self, overload
 
 import numpy as np
 
@@ -21,16 +26,38 @@ from janim.logger import log
 from janim.utils.config import Config
 from janim.utils.file_ops import get_janim_dir, get_typst_temp_dir
 from janim.utils.iterables import flatten
+from janim.utils.prefetch import request_typst
 from janim.utils.space_ops import rotation_between_vectors
 
 _ = get_local_strings('typst')
 
 type TypstPattern = TypstDoc | str
+type TypstArgs = tuple[str, str, str]   # (text, shared_preamble, additional_preamble)
+
+TYPST_BATCH_SIZE = 32
+'''批量编译时，每个 Typst 进程最多编译的文档数量'''
+
+# 批量编译时每一页开头重置的计数器，使得每一页与单独编译的结果一致
+TYPST_PAGE_RESET = (
+    '#counter(page).update(1)'
+    '#counter(math.equation).update(0)'
+    '#counter(heading).update(0)'
+    '#for kind in (image, table, raw) { counter(figure.where(kind: kind)).update(0) }'
+)
 
 
 class TypstDoc(SVGItem):
     '''
     Typst 文档
+
+    编译结果会以文档内容为键缓存到 ``temp_dir`` 中，之后以相同内容创建时直接使用缓存
+
+    创建物件时需要立即得到编译结果，所以在没有缓存的情况下，每个 :class:`TypstDoc` 都会单独启动一次 Typst 进程；
+    只有以下两种方式会使用 :meth:`compile_typst_batch` 将多个文档合并编译：
+
+    - 在创建物件之前，调用 :meth:`precompile` 预编译之后会用到的文档
+    - 启用 ``Config.prefetch_assets``，构建时会在后台批量编译上一次构建用到的文档（参考 :class:`~.AssetPrefetcher`），
+      因此只对第二次及之后的构建有效，首次构建或者新加入的文档仍然逐个编译
     '''
 
     group_key = 'data-typst-label'
@@ -45,12 +72,41 @@ class TypstDoc(SVGItem):
         **kwargs
     ):
         self.text = text
+        args = TypstDoc.get_typst_args(text, shared_preamble=shared_preamble, additional_preamble=additional_preamble)
+
+        super().__init__(self.compile_typst(*args), scale=scale, **kwargs)
+
+    @classmethod
+    def get_typst_args(
+        cls,
+        text: str,
+        *,
+        shared_preamble: str | None = None,
+        additional_preamble: str | None = None
+    ) -> TypstArgs:
+        '''
+        得到以相同参数创建该物件时传给 :meth:`compile_typst` 的参数
+        '''
         if shared_preamble is None:
             shared_preamble = Config.get.typst_shared_preamble
         if additional_preamble is None:
             additional_preamble = ''
+        return text, shared_preamble, additional_preamble
+
+    @classmethod
+    def precompile(cls, texts: Iterable[str], **kwargs) -> None:
+        '''
+        批量预编译 ``texts`` 中的文档，使得之后以相同参数创建这些物件时直接使用缓存
 
-        super().__init__(self.compile_typst(text, shared_preamble, additional_preamble), scale=scale, **kwargs)
+        ``kwargs`` 与创建物件时传入的 ``preamble`` 等参数相同，例如
+
+        .. code-block:: python
+
+            TypstMath.precompile(['x^2', 'y^2', 'x^2 + y^2'])
+
+        具体参考 :meth:`compile_typst_batch`
+        '''
+        TypstDoc.compile_typst_batch([cls.get_typst_args(text, **kwargs) for text in texts])
 
     def move_into_position(self) -> None:
         self.points.scale(0.9, about_point=ORIGIN).to_border(UP)
@@ -59,14 +115,11 @@ class TypstDoc(SVGItem):
     def compile_typst(text: str, shared_preamble: str, additional_preamble: str) -> str:
         '''
         编译 Typst 文档
-        '''
-        typst_temp_dir = get_typst_temp_dir()
-        md5 = hashlib.md5(text.encode())
-        md5.update(shared_preamble.encode())
-        md5.update(additional_preamble.encode())
-        hash_hex = md5.hexdigest()
 
-        svg_file_path = os.path.join(typst_temp_dir, hash_hex + '.svg')
+        没有缓存时会为该文档单独启动一次 Typst 进程，要合并编译多个文档请参考 :class:`TypstDoc` 中的说明
+        '''
+        svg_file_path = TypstDoc.get_svg_file_path(text, shared_preamble, additional_preamble)
+        request_typst((text, shared_preamble, additional_preamble), svg_file_path)
         if os.path.exists(svg_file_path):
             return svg_file_path
 
@@ -102,6 +155,149 @@ class TypstDoc(SVGItem):
 
         return svg_file_path
 
+    @staticmethod
+    def get_svg_file_path(text: str, shared_preamble: str, additional_preamble: str) -> str:
+        '''
+        得到编译结果在缓存目录中的路径
+        '''
+        md5 = hashlib.md5(text.encode())
+        md5.update(shared_preamble.encode())
+        md5.update(additional_preamble.encode())
+        return os.path.join(get_typst_temp_dir(), md5.hexdigest() + '.svg')
+
+    @staticmethod
+    def compile_typst_batch(
+        args_list: Iterable[TypstArgs],
+        workers: int | None = None,
+        *,
+        fallback: bool = True,
+        on_batch_done: Callable[[list[str]], None] | None = None,
+        stop_event: threading.Event | None = None
+    ) -> list[str]:
+        '''
+        批量编译 Typst 文档，返回与 ``args_list`` 对应的 SVG 文件路径，结果与逐个调用 :meth:`compile_typst` 相同
+
+        - 跳过已有缓存的文档，并将 preamble 相同的文档合并为多页文档，每一页对应一个文档，
+          这样多个文档只需要启动一次 Typst 进程
+        - 合并后的多页文档被分为多份，使用 ``workers`` 个线程（默认为 CPU 核心数）同时编译
+        - 每个文档都被放在单独的 ``#[...]`` 中，并且在每一页开头重置页码、公式编号等计数器，
+          使得与单独编译的结果一致；若某一份编译失败（例如其中有语法错误，或者页数与文档数不一致），
+          则对其中的文档逐个调用 :meth:`compile_typst`，以得到对应文档的报错信息，
+          并在编译完其余所有文档后抛出第一个编译错误；``fallback=False`` 时则跳过这些文档，不产生报错
+        - 每一份编译结束（无论是否成功）后，会在编译的线程中以其中文档的 SVG 文件路径调用 ``on_batch_done``
+        - ``stop_event`` 被设置后，尚未开始的部分会被跳过（同样会调用 ``on_batch_done``）
+        '''
+        args_list = list(args_list)
+        paths = [TypstDoc.get_svg_file_path(*args) for args in args_list]
+
+        # 按 preamble 分组，并去除重复以及已有缓存的文档
+        groups: dict[tuple[str, str], dict[str, str]] = {}
+        for (text, shared_preamble, additional_preamble), path in zip(args_list, paths):
+            if not os.path.exists(path):
+                groups.setdefault((shared_preamble, additional_preamble), {})[path] = text
+
+        if not groups:
+            return paths
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        count = sum(len(group) for group in groups.values())
+        batch_size = max(1, min(TYPST_BATCH_SIZE, math.ceil(count / workers)))
+
+        batches: list[tuple[str, str, list[tuple[str, str]]]] = []
+        for (shared_preamble, additional_preamble), group in groups.items():
+            items = list(group.items())
+            for i in range(0, len(items), batch_size):
+                batches.append((shared_preamble, additional_preamble, items[i: i + batch_size]))
+
+        log.debug(_('Compiling {count} typst documents in {batches} batches')
+                  .format(count=count, batches=len(batches)))
+
+        # Config 基于上下文变量，在其它线程中无法得到，所以先在这里取出
+        typst_bin = Config.get.typst_bin
+        output_dir = get_typst_temp_dir()
+
+        def compile_batch(batch: tuple[str, str, list[tuple[str, str]]]) -> bool:
+            try:
+                if stop_event is not None and stop_event.is_set():
+                    return False
+                return TypstDoc._compile_typst_pages(typst_bin, output_dir, *batch)
+            finally:
+                if on_batch_done is not None:
+                    on_batch_done([path for path, text in batch[2]])
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+            results = list(executor.map(compile_batch, batches))
+
+        if not fallback:
+            return paths
+
+        # 先编译完其余的文档，再抛出第一个编译错误，使得一个有语法错误的文档不影响同一份中的其它文档
+        error: ExitException | None = None
+        for (shared_preamble, additional_preamble, items), success in zip(batches, results):
+            if success:
+                continue
+            for path, text in items:
+                try:
+                    TypstDoc.compile_typst(text, shared_preamble, additional_preamble)
+                except ExitException as e:
+                    if e.exit_code != EXITCODE_TYPST_COMPILE_ERROR:
+                        raise
+                    if error is None:
+                        error = e
+
+        if error is not None:
+            raise error
+
+        return paths
+
+    @staticmethod
+    def _compile_typst_pages(
+        typst_bin: str,
+        typst_temp_dir: str,
+        shared_preamble: str,
+        additional_preamble: str,
+        items: list[tuple[str, str]]
+    ) -> bool:
+        '''
+        将 ``items`` 中的 ``(SVG 文件路径, 文档)`` 作为多页文档编译，并把每一页放到对应的路径，返回是否成功
+        '''
+        typst_content = get_typst_template().format(
+            shared_preamble=shared_preamble,
+            additional_preamble=additional_preamble,
+            typst_expression='\n#pagebreak()\n'.join(
+                f'{TYPST_PAGE_RESET}\n#[\n{text}\n]'
+                for path, text in items
+            )
+        )
+
+        output_dir = tempfile.mkdtemp(dir=typst_temp_dir)
+        try:
+            commands = [
+                typst_bin,
+                'compile',
+                '-',
+                os.path.join(output_dir, '{p}.svg'),
+                '-f', 'svg'
+            ]
+            try:
+                ret = sp.run(commands, input=typst_content.encode('utf-8'), capture_output=True).returncode
+            except FileNotFoundError:
+                return False
+
+            pages = [os.path.join(output_dir, f'{i}.svg') for i in range(1, len(items) + 1)]
+            if ret != 0 \
+                    or len(os.listdir(output_dir)) != len(items) \
+                    or not all(os.path.exists(page) for page in pages):
+                return False
+
+            for (path, text), page in zip(items, pages):
+                os.replace(page, path)
+            return True
+
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
     @classmethod
     def typstify(cls, obj: TypstPattern) -> TypstDoc:
         '''
@@ -361,16 +557,37 @@ class TypstText(TypstDoc):
         use_math_environment: bool = False,
         **kwargs
     ):
+        text, shared_preamble, preamble = TypstText.get_typst_args(
+            text,
+            shared_preamble=shared_preamble,
+            preamble=preamble,
+            use_math_environment=use_math_environment
+        )
+        super().__init__(
+            text,
+            shared_preamble=shared_preamble,
+            additional_preamble=preamble,
+            **kwargs
+        )
+
+    @classmethod
+    def get_typst_args(
+        cls,
+        text: str,
+        *,
+        shared_preamble: str | None = None,
+        preamble: str | None = None,
+        use_math_environment: bool = False
+    ) -> TypstArgs:
         if preamble is None:
             if use_math_environment:
                 preamble = Config.get.typst_math_preamble
             else:
                 preamble = Config.get.typst_text_preamble
-        super().__init__(
+        return TypstDoc.get_typst_args(
             f'$ {text} $' if use_math_environment else text,
             shared_preamble=shared_preamble,
-            additional_preamble=preamble,
-            **kwargs
+            additional_preamble=preamble
         )
 
     def move_into_position(self) -> None:
@@ -400,6 +617,22 @@ class TypstMath(TypstText):
             **kwargs
         )
 
+    @classmethod
+    def get_typst_args(
+        cls,
+        text: str,
+        *,
+        shared_preamble: str | None = None,
+        preamble: str | None = None,
+        use_math_environment: bool = True
+    ) -> TypstArgs:
+        return super().get_typst_args(
+            text,
+            shared_preamble=shared_preamble,
+            preamble=preamble,
+            use_math_environment=use_math_environment
+        )
+
 
 class Typst(TypstMath):
     def __init__(self, text: str, **kwargs):
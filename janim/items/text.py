@@ -24,7 +24,7 @@ from janim.typing import JAnimColor, Vect
 from janim.utils.config import Config
 from janim.utils.font.database import Font, get_font_info_by_attrs
 from janim.utils.font.variant import Style, StyleName, Weight, WeightName
-from janim.utils.simple_functions import decode_utf8
+from janim.utils.simple_functions import decode_utf8, gc_paused
 from janim.utils.space_ops import get_norm, normalize
 
 _ = get_local_strings('text')
@@ -111,6 +111,16 @@ _register_acts(
 )
 
 
+def _shifted(points: np.ndarray, vectors: Iterable[np.ndarray]) -> np.ndarray:
+    '''
+    依次加上 ``vectors`` 中的每个位移，每一步都转换回原本的数据类型，与逐次 ``shift`` 的结果保持一致
+    '''
+    dtype = points.dtype
+    for vector in vectors:
+        points = (points + vector).astype(dtype, copy=False)
+    return points
+
+
 class Cmpt_Mark_TextCharImpl[ItemT](Cmpt_Mark[ItemT], impl=True):
     names = ['orig', 'right', 'up', 'advance']
 
@@ -292,6 +302,33 @@ class TextLine(MarkedItem, VItem, Group[TextChar]):
     def get_mark_up(self) -> np.ndarray:
         return self.mark.get(2)
 
+    def get_char_shifts(self, buff: float = 0) -> np.ndarray:
+        '''
+        计算 :meth:`arrange_in_line` 中每个字符需要的位移，结果的形状为 ``(字符数, 3)``
+        '''
+        if len(self.children) == 0:
+            return np.zeros((0, 3))
+
+        marks = np.array([char.mark.get_points() for char in self])
+        origs = marks[:, 0]
+        advances = marks[:, 3]
+        shifts = np.zeros_like(advances)
+
+        if buff == 0 and not origs.any():
+            # 所有字符都以原点为起点时，每个字符的位移就是前面所有字符 advance 的累加
+            np.cumsum(advances[:-1], axis=0, out=shifts[1:])
+            return shifts
+
+        pos = None
+        for i, (orig, advance) in enumerate(zip(origs, advances)):
+            if i != 0:
+                shifts[i] = pos - orig
+                orig = _shifted(orig, (shifts[i],))
+                advance = _shifted(advance, (shifts[i],))
+            pos = advance if buff == 0 else advance + buff * normalize(advance - orig)
+
+        return shifts
+
     def arrange_in_line(self, buff: float = 0) -> Self:
         '''
         根据 ``advance`` 的标记信息排列该行
@@ -387,23 +424,20 @@ class Text(VItem, Group[TextLine]):
 
             self.text += text[idx:]
 
-        super().__init__(
-            *[
-                TextLine(line_text, fonts=fonts, font_size=font_size, **line_kwargs)
-                for line_text in self.text.split('\n')
-            ],
-            stroke_alpha=stroke_alpha,
-            fill_alpha=fill_alpha,
-            **kwargs
-        )
+        with gc_paused():
+            super().__init__(
+                *[
+                    TextLine(line_text, fonts=fonts, font_size=font_size, **line_kwargs)
+                    for line_text in self.text.split('\n')
+                ],
+                stroke_alpha=stroke_alpha,
+                fill_alpha=fill_alpha,
+                **kwargs
+            )
 
-        if format is Text.Format.RichText:
-            self.apply_rich_text()
-        for line in self.children:
-            line.arrange_in_line()
-        self.arrange_in_lines()
-        if center:
-            self.points.to_center()
+            if format is Text.Format.RichText:
+                self.apply_rich_text()
+            self.arrange_chars(center)
 
     def is_null(self) -> bool:
         return True
@@ -439,6 +473,23 @@ class Text(VItem, Group[TextLine]):
                 )
         return Group(*parts)
 
+    def get_line_shifts(self, buff: float = 0, base_buff: float = 0.85) -> np.ndarray:
+        '''
+        计算 :meth:`arrange_in_lines` 中每行需要的位移，结果的形状为 ``(行数, 3)``
+        '''
+        shifts = np.zeros((len(self.children), 3))
+        if len(self.children) == 0:
+            return shifts
+
+        pos = self.children[0].get_mark_orig()
+        for i, line in enumerate(self.children[1:], start=1):
+            vert = line.get_mark_orig() - line.get_mark_up()
+            target = pos + base_buff * vert + buff * normalize(vert)
+            shifts[i] = target - line.get_mark_orig()
+            pos = _shifted(line.get_mark_orig(), (shifts[i],))
+
+        return shifts
+
     def arrange_in_lines(self, buff: float = 0, base_buff: float = 0.85) -> Self:
         '''
         - ``buff``: 每行之间的额外间距
@@ -458,6 +509,47 @@ class Text(VItem, Group[TextLine]):
 
         return self
 
+    def arrange_chars(self, center: bool = True) -> Self:
+        '''
+        排列所有字符，结果与依次调用每行的 :meth:`~.TextLine.arrange_in_line`、:meth:`arrange_in_lines`
+        以及 ``points.to_center()`` 相同
+
+        但是先计算出每个字符最终的位移，再对每个字符只设置一次坐标，
+        避免了在字符较多时对所有字符多次进行 ``shift`` 以及计算包围框的开销
+        '''
+        line_shifts = self.get_line_shifts()
+
+        items: list[MarkedItem] = []
+        shifts: list[tuple[np.ndarray, ...]] = []
+        for line, line_shift in zip(self.children, line_shifts):
+            items.append(line)
+            shifts.append((line_shift,))
+            for char, char_shift in zip(line, line.get_char_shifts()):
+                items.append(char)
+                shifts.append((char_shift, line_shift))
+
+        # 保持与逐次 shift 相同的加法顺序，使得结果完全一致
+        points_list = [
+            _shifted(item.points.get(), vectors) if item.points.has() else None
+            for item, vectors in zip(items, shifts)
+        ]
+        if center:
+            non_empty = [points for points in points_list if points is not None]
+            if non_empty:
+                vector = -self.points.BoundingBox(np.vstack(non_empty)).center
+                shifts = [(*vectors, vector) for vectors in shifts]
+                points_list = [
+                    None if points is None else _shifted(points, (vector,))
+                    for points in points_list
+                ]
+
+        for item, vectors, points in zip(items, shifts, points_list):
+            if points is not None:
+                item.points.set(points)
+            item.mark.set_points(_shifted(item.mark.get_points(), vectors))
+
+        return self
+
     def apply_rich_text(self) -> None:
         '''
         应用富文本效果
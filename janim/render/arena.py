@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import weakref
+from dataclasses import dataclass
+
+import moderngl as mgl
+import OpenGL.GL as gl
+
+from janim.utils.config import Config
+
+MIN_BLOCK_SIZE = 256
+SLAB_BLOCKS = 16
+SLAB_SIZE = 1 << 20
+
+
+@dataclass
+class ArenaStats:
+    '''
+    :class:`BufferArena` 的统计信息，单位均为字节
+
+    - ``capacity``：所有 slab 的总大小，也就是实际占用的显存
+    - ``allocated``：已分配出去的块的大小之和（按大小等级向上取整后的大小）
+    - ``used``：已分配出去的块中实际使用的大小之和
+    - ``uploaded``：自上次 :meth:`BufferArena.take_uploaded` 以来上传的数据量
+    - ``slabs``：slab 的数量
+    '''
+    capacity: int
+    allocated: int
+    used: int
+    uploaded: int
+    slabs: int
+
+    @property
+    def fragmentation(self) -> float:
+        '''
+        未被实际使用的显存所占的比例，包括空闲的块以及块内部未使用的部分
+        '''
+        if self.capacity == 0:
+            return 0.0
+        return 1 - self.used / self.capacity
+
+
+class _Block:
+    '''
+    slab 中的一个块，对应 ``buffer`` 中 ``[offset, offset + capacity)`` 的范围
+    '''
+    __slots__ = ('buffer', 'offset', 'capacity', 'used')
+
+    def __init__(self, buffer: mgl.Buffer, offset: int, capacity: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.capacity = capacity
+        self.used = 0
+
+
+class BufferArena:
+    '''
+    每个 OpenGL 上下文共享的 buffer 分配器，渲染器从中分配 :class:`ArenaBuffer` 而不是各自创建 ``mgl.Buffer``
+
+    - 按 2 的幂划分大小等级，每个等级的块从 slab 中切分，
+      slab 的大小为 ``SLAB_BLOCKS`` 个块，但不超过 ``SLAB_SIZE``，超过 ``SLAB_SIZE`` 的块单独占用一个 slab
+    - 块被释放后放回对应等级的空闲列表，供之后的分配复用，slab 本身只在调用 :meth:`release` 时释放
+    - 数据的大小变化时，只要仍在原本块的范围内就不需要重新分配，
+      避免了 ``Transform`` 等点数量逐帧变化的情况下频繁调用 ``orphan()`` 导致的驱动重新分配
+
+    通过 :meth:`get` 得到对应上下文的分配器，通过 :meth:`stats` 得到统计信息
+
+    - 分配器保存在上下文对象上，随上下文一起被回收，而不会使上下文一直存活；
+      也可以通过 :meth:`release` 主动释放所有 slab
+    - 默认不启用，通过 ``Config.buffer_arena`` 启用（例如 ``-c buffer_arena true``），
+      不启用时 :meth:`create_buffer` 为每个渲染器创建单独的 buffer；
+      因为多个渲染器共用同一个 slab 后，写入仍在被 GPU 使用的 slab 可能导致隐式的同步，
+      而单独的 buffer 可以通过 ``orphan()`` 避免，在硬件驱动上的收益尚未经过测试
+    - 统计信息不会输出到日志，只在 :class:`~.FrameProfiler` 中逐帧记录为
+      ``arena_uploaded_bytes``、``arena_capacity_bytes`` 与 ``arena_fragmentation``，
+      也就是 ``janim write --profile_render`` 输出的报告与 CSV 文件中
+    '''
+    ATTR_NAME = '_janim_buffer_arena'
+
+    def __init__(self, ctx: mgl.Context):
+        self.ctx = ctx
+
+        # 绑定到 storage buffer 时，偏移需要是 GL_SHADER_STORAGE_BUFFER_OFFSET_ALIGNMENT 的倍数
+        # 由于块的偏移都是块大小的倍数，所以只需要保证最小的块不小于该值
+        self.min_block_size = MIN_BLOCK_SIZE
+        if ctx.version_code >= 430:
+            alignment = gl.glGetIntegerv(gl.GL_SHADER_STORAGE_BUFFER_OFFSET_ALIGNMENT)
+            while self.min_block_size < alignment:
+                self.min_block_size *= 2
+
+        self.slabs: list[mgl.Buffer] = []
+        self.free_blocks: dict[int, list[_Block]] = {}
+        self.live_blocks: set[_Block] = set()
+        self.uploaded: int = 0
+
+    @staticmethod
+    def get(ctx: mgl.Context) -> BufferArena:
+        arena = BufferArena.find(ctx)
+        if arena is None:
+            arena = BufferArena(ctx)
+            setattr(ctx, BufferArena.ATTR_NAME, arena)
+        return arena
+
+    @staticmethod
+    def find(ctx: mgl.Context) -> BufferArena | None:
+        '''
+        得到对应上下文已有的分配器，没有时返回 ``None``
+        '''
+        return getattr(ctx, BufferArena.ATTR_NAME, None)
+
+    @staticmethod
+    def create_buffer(ctx: mgl.Context) -> ArenaBuffer | DedicatedBuffer:
+        '''
+        创建渲染器使用的 buffer，根据 ``Config.get.buffer_arena`` 从共享的分配器中分配，或者创建单独的 buffer
+
+        渲染器在第一次绘制时创建 buffer，因此以那时的配置为准
+        '''
+        if Config.get.buffer_arena:
+            return BufferArena.get(ctx).buffer()
+        return DedicatedBuffer(ctx)
+
+    def release(self) -> None:
+        '''
+        释放所有 slab，并将该分配器从上下文中移除；之后从该分配器分配的 :class:`ArenaBuffer` 都不再可用
+        '''
+        for slab in self.slabs:
+            slab.release()
+        self.slabs.clear()
+        self.free_blocks.clear()
+        self.live_blocks.clear()
+        if BufferArena.find(self.ctx) is self:
+            delattr(self.ctx, BufferArena.ATTR_NAME)
+
+    def buffer(self) -> ArenaBuffer:
+        '''
+        创建一个从该分配器中分配空间的 :class:`ArenaBuffer`
+        '''
+        return ArenaBuffer(self)
+
+    def size_class(self, size: int) -> int:
+        '''
+        得到能容纳 ``size`` 字节的最小等级
+        '''
+        return max(self.min_block_size, 1 << (size - 1).bit_length())
+
+    def alloc(self, size: int) -> _Block:
+        capacity = self.size_class(size)
+        free = self.free_blocks.setdefault(capacity, [])
+        if not free:
+            self.new_slab(capacity)
+
+        block = free.pop()
+        block.used = size
+        self.live_blocks.add(block)
+        return block
+
+    def free(self, block: _Block) -> None:
+        # 调用 release 之后归还的块直接忽略
+        if block not in self.live_blocks:
+            return
+        self.live_blocks.remove(block)
+        block.used = 0
+        self.free_blocks[block.capacity].append(block)
+
+    def new_slab(self, capacity: int) -> None:
+        slab_size = max(capacity, min(SLAB_SIZE, capacity * SLAB_BLOCKS))
+        buffer = self.ctx.buffer(reserve=slab_size)
+        self.slabs.append(buffer)
+        # 倒序放入，使得 pop 时从 slab 的开头开始分配
+        self.free_blocks[capacity].extend(
+            _Block(buffer, offset, capacity)
+            for offset in reversed(range(0, slab_size, capacity))
+        )
+
+    def take_uploaded(self) -> int:
+        '''
+        返回自上次调用以来上传的数据量，并将其清零
+        '''
+        uploaded = self.uploaded
+        self.uploaded = 0
+        return uploaded
+
+    def stats(self) -> ArenaStats:
+        return ArenaStats(
+            capacity=sum(slab.size for slab in self.slabs),
+            allocated=sum(block.capacity for block in self.live_blocks),
+            used=sum(block.used for block in self.live_blocks),
+            uploaded=self.uploaded,
+            slabs=len(self.slabs)
+        )
+
+
+class ArenaBuffer:
+    '''
+    从 :class:`BufferArena` 中分配的 buffer，接口与 ``mgl.Buffer`` 中用到的部分一致，可以直接替换
+
+    - :meth:`orphan` 改变大小时，只有超出当前块的范围、或者不足当前块的四分之一时才会重新分配
+    - 被回收时，所占用的块会自动归还给 :class:`BufferArena`
+    - 由 compute shader 写入之前需要调用 :meth:`before_shader_write`
+    '''
+    def __init__(self, arena: BufferArena):
+        self.arena = arena
+        # 使用列表包装，使得回收时的回调不需要持有 self
+        self._block: list[_Block | None] = [None]
+        self._finalizer = weakref.finalize(self, ArenaBuffer._release, arena, self._block)
+
+    @staticmethod
+    def _release(arena: BufferArena, block: list[_Block | None]) -> None:
+        if block[0] is not None:
+            arena.free(block[0])
+            block[0] = None
+
+    @property
+    def size(self) -> int:
+        block = self._block[0]
+        return 0 if block is None else block.used
+
+    @property
+    def buffer(self) -> mgl.Buffer | None:
+        '''所在的 slab，未分配时为 ``None``'''
+        block = self._block[0]
+        return None if block is None else block.buffer
+
+    @property
+    def offset(self) -> int:
+        '''在 :attr:`buffer` 中的偏移'''
+        block = self._block[0]
+        return 0 if block is None else block.offset
+
+    def orphan(self, size: int) -> None:
+        '''
+        将大小设置为 ``size`` 字节，原有的数据不会被保留
+        '''
+        size = int(size)
+        block = self._block[0]
+        if block is not None and block.capacity // 4 < size <= block.capacity:
+            block.used = size
+            return
+
+        if block is not None:
+            self.arena.free(block)
+        self._block[0] = self.arena.alloc(size) if size > 0 else None
+
+    def write(self, data: bytes, *, offset: int = 0) -> None:
+        block = self._block[0]
+        assert block is not None and offset + len(data) <= block.used
+        block.buffer.write(data, offset=block.offset + offset)
+        self.arena.uploaded += len(data)
+
+    def bind_to_storage_buffer(self, binding: int) -> None:
+        block = self._block[0]
+        # 着色器中常以 vec4 的形式读取，因此绑定的范围向上取整到 16 字节
+        block.buffer.bind_to_storage_buffer(binding, offset=block.offset, size=(block.used + 15) & ~15)
+
+    def before_shader_write(self) -> None:
+        '''
+        在 compute shader 写入该 buffer 之前调用
+
+        块的存储不会像 ``mgl.Buffer.orphan`` 那样被替换，而此前读取同一块的绘制可能还未执行（例如 llvmpipe 会延迟执行绘制），
+        所以需要先插入内存屏障，否则这些绘制会读到之后写入的数据
+        '''
+        self.arena.ctx.memory_barrier()
+
+    def release(self) -> None:
+        self._finalizer()
+
+
+class DedicatedBuffer:
+    '''
+    单独占用一个 ``mgl.Buffer`` 的 buffer，接口与 :class:`ArenaBuffer` 一致，在不启用 :class:`BufferArena` 时使用
+
+    :meth:`orphan` 直接调用 ``mgl.Buffer.orphan``，由驱动重新分配存储，不会等待 GPU 使用完原有的数据
+    '''
+    def __init__(self, ctx: mgl.Context):
+        self.buffer = ctx.buffer(reserve=1)
+        self.offset = 0
+
+    @property
+    def size(self) -> int:
+        return self.buffer.size
+
+    def orphan(self, size: int) -> None:
+        self.buffer.orphan(size)
+
+    def write(self, data: bytes, *, offset: int = 0) -> None:
+        self.buffer.write(data, offset=offset)
+
+    def bind_to_storage_buffer(self, binding: int) -> None:
+        self.buffer.bind_to_storage_buffer(binding)
+
+    def before_shader_write(self) -> None:
+        '''
+        在 compute shader 写入该 buffer 之前调用
+
+        重新分配存储，使得此前读取该 buffer 但还未执行的绘制仍然读取原有的数据，
+        例如 :class:`~.ItemUpdater` 中同一个渲染器在一帧内依次绘制多个点数相同的物件时
+        '''
+        self.buffer.orphan(self.buffer.size)
+
+    def release(self) -> None:
+        self.buffer.release()
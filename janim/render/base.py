@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import operator
+import os
 from collections import defaultdict
 from contextvars import ContextVar
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
 import moderngl as mgl
+import numpy as np
 
 from janim.camera.camera_info import CameraInfo
 from janim.locale.i18n import get_local_strings
+from janim.logger import log
+from janim.utils.config import Config
 
 if TYPE_CHECKING:
     from janim.items.item import Item
@@ -37,11 +42,27 @@ class Renderer:
     '''渲染器的基类
 
     重写 :meth:`render` 以实现具体功能
+
+    如果渲染结果除了物件数据外还依赖于当前时刻（例如视频），需要将 ``time_dependent`` 置为 ``True``，
+    另见 :meth:`~.BuiltTimeline.get_static_frame_key`
+
+    重写 :meth:`get_render_bounds` 可以使得完全位于画面外的物件被剔除，另见 :class:`RenderBounds`
     '''
     data_ctx: ContextVar[RenderData] = ContextVar('Renderer.data_ctx')
 
+    time_dependent: bool = False
+
     def render(self, item) -> None: ...
 
+    @staticmethod
+    def get_render_bounds(item: Item) -> RenderBounds | None:
+        '''
+        得到 ``item`` 在绘制时所占区域的保守估计，返回 ``None`` 表示不进行剔除
+
+        只有绘制结果仅与物件自身数据有关的渲染器才应重写该方法
+        '''
+        return None
+
     @staticmethod
     def get_u_fix_in_frame(prog: mgl.Program) -> mgl.Uniform:
         return prog[FIX_IN_FRAME_KEY]
@@ -57,17 +78,119 @@ class RenderData:
 
     通过 :py:obj:`Renderer.data_ctx` 进行设置和获取
     '''
-    ctx: mgl.Context
+    ctx: mgl.Context | None     # 使用 CPU 渲染时为 None，参考 :class:`~.CPUFrameRenderer`
     camera_info: CameraInfo
     anti_alias_radius: float
 
 
+@dataclass
+class RenderBounds:
+    '''
+    物件在绘制时所占区域的保守估计，用于在 :meth:`~.BuiltTimeline.render_all` 中剔除完全位于画面外的物件，
+    参考 :class:`BoundsCuller`
+
+    - ``corners``：包围框的顶点
+    - ``buff``：投影到画面后额外向外扩展的距离，例如描边的半径
+    - ``fix_in_frame``：是否固定在画面中
+    '''
+    corners: np.ndarray
+    buff: float
+    fix_in_frame: bool
+
+
+class BoundsCuller:
+    '''
+    对一组 :class:`RenderBounds` 一起判断是否完全位于画面外
+
+    相邻帧之间的 :class:`RenderBounds` 往往是同一组，此时会复用先前拼接得到的数组
+    '''
+    def __init__(self):
+        self.bounds: list[RenderBounds] = []
+        self.corners: np.ndarray | None = None
+        self.buff: np.ndarray | None = None
+        self.fix_in_frame: np.ndarray | None = None
+
+    def update(self, bounds: list[RenderBounds]) -> None:
+        if len(bounds) == len(self.bounds) and all(map(operator.is_, bounds, self.bounds)):
+            return
+        count = len(bounds)
+        self.bounds = bounds
+        self.corners = np.stack([b.corners for b in bounds])
+        self.buff = np.fromiter((b.buff for b in bounds), dtype=float, count=count)
+        self.fix_in_frame = np.fromiter((b.fix_in_frame for b in bounds), dtype=bool, count=count)
+
+    def outside_mask(self, bounds: list[RenderBounds], camera_info: CameraInfo, anti_alias_radius: float) -> np.ndarray:
+        '''
+        判断 ``bounds`` 中的各项是否完全位于画面外，返回对应的布尔数组
+
+        有顶点位于摄像机后方时投影不可靠，此时认为不在画面外
+        '''
+        self.update(bounds)
+        corners = self.corners
+        fix_in_frame = self.fix_in_frame
+
+        # 齐次坐标的变换 (x, y, z, 1) @ matrix.T，拆分为线性部分与平移部分以避免拼接数组
+        matrix = camera_info.proj_view_matrix
+        mapped = corners @ matrix[:, :3].T + matrix[:, 3]
+        if fix_in_frame.any():
+            matrix = camera_info.proj_matrix
+            fixed = corners[fix_in_frame] - [0, 0, camera_info.fixed_distance_from_plane]
+            mapped[fix_in_frame] = fixed @ matrix[:, :3].T + matrix[:, 3]
+
+        w = mapped[..., 3]
+        valid = w > 1e-6
+        xy = mapped[..., :2] / np.where(valid, w, 1)[..., np.newaxis] * camera_info.frame_radius
+
+        radius = camera_info.frame_radius
+        buff = (self.buff + anti_alias_radius)[:, np.newaxis]
+        outside = (xy.max(axis=1) + buff < -radius).any(axis=1) | (xy.min(axis=1) - buff > radius).any(axis=1)
+        return outside & valid.all(axis=1)
+
+
+DEFAULT_BLEND_FUNC = (
+    mgl.SRC_ALPHA, mgl.ONE_MINUS_SRC_ALPHA,
+    mgl.ONE, mgl.ONE
+)
+DEFAULT_BLEND_EQUATION = (mgl.FUNC_ADD, mgl.MAX)
+
+# 用于向透明 framebuffer 绘制，framebuffer 中存储的是预乘了 alpha 的颜色
+# 这与 program.py 中 injection_ja_finish_up 的混合方式在数学上是等价的
+PREMULTIPLIED_BLEND_FUNC = (
+    mgl.SRC_ALPHA, mgl.ONE_MINUS_SRC_ALPHA,
+    mgl.ONE, mgl.ONE_MINUS_SRC_ALPHA
+)
+PREMULTIPLIED_BLEND_EQUATION = (mgl.FUNC_ADD, mgl.FUNC_ADD)
+
+
 def create_context(**kwargs) -> mgl.Context:
     ctx = mgl.create_context(**kwargs)
     # 默认是 blend-off 的
-    ctx.blend_func = (
-        mgl.SRC_ALPHA, mgl.ONE_MINUS_SRC_ALPHA,
-        mgl.ONE, mgl.ONE
-    )
-    ctx.blend_equation = mgl.FUNC_ADD, mgl.MAX
+    ctx.blend_func = DEFAULT_BLEND_FUNC
+    ctx.blend_equation = DEFAULT_BLEND_EQUATION
     return ctx
+
+
+def create_standalone_context() -> mgl.Context:
+    '''
+    创建用于离屏渲染的 OpenGL 上下文
+
+    - 使用 ``Config.get.gl_backend`` 指定的后端（例如 ``'egl'``），为空时由 moderngl 自动选择
+    - 若 ``Config.get.gl_threads`` 不为 ``0``，则设置 Mesa llvmpipe 的渲染线程数；
+      该设置只在进程中首次创建上下文之前有效
+    - 优先请求 OpenGL 4.3，不支持时回退到 3.3（此时 :class:`~.VItemRenderer` 会使用兼容模式）
+    '''
+    kwargs = dict(standalone=True)
+
+    backend = Config.get.gl_backend
+    if backend:
+        kwargs['backend'] = backend
+
+    threads = Config.get.gl_threads
+    if threads:
+        os.environ['LP_NUM_THREADS'] = str(threads)
+
+    try:
+        return create_context(**kwargs, require=430)
+    except ValueError:
+        log.debug(_('OpenGL 4.3 is not supported, falling back to OpenGL 3.3'))
+        return create_context(**kwargs, require=330)
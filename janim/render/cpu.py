@@ -0,0 +1,758 @@
+from __future__ import annotations
+
+import math
+import weakref
+from contextvars import ContextVar
+from functools import partial
+from typing import TYPE_CHECKING, Callable
+
+import moderngl as mgl
+import numpy as np
+from PIL import Image
+
+from janim.anims.animation import Animation
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.locale.i18n import get_local_strings
+from janim.logger import log
+from janim.render.base import RenderData, Renderer
+from janim.render.renderer_dotcloud import DotCloudRenderer
+from janim.render.renderer_imageitem import ImageItemRenderer
+from janim.render.renderer_vitem import VItemRenderer
+from janim.utils.data import ContextSetter
+from janim.utils.iterables import resize_with_interpolation
+from janim.utils.profiler import FrameProfiler
+
+if TYPE_CHECKING:
+    from janim.camera.camera_info import CameraInfo
+    from janim.items.image_item import ImageItem
+    from janim.items.item import Item
+    from janim.items.points import DotCloud
+    from janim.items.vitem import VItem
+
+_ = get_local_strings('cpu')
+
+# 每次向量化计算时，像素数量与线段（或点）数量之积的上限，用于限制内存占用
+CHUNK_SIZE = 1 << 22
+
+# 将二次贝塞尔曲线近似为折线时，允许的最大偏差（以像素为单位）
+FLATTEN_TOLERANCE = 0.2
+
+# 跳过远离轮廓的像素时，所使用的分块大小（以像素为单位）
+TILE_SIZE = 16
+
+
+class Canvas:
+    '''
+    CPU 渲染的画布
+
+    以 ``float32`` 存储预乘了 alpha 的 RGBA 颜色，行的顺序与 OpenGL 的 framebuffer 一致（从下到上），
+    因此 :meth:`read` 得到的数据与 ``fbo.read(components=4)`` 的格式相同
+    '''
+    def __init__(self, pw: int, ph: int):
+        self.pw = pw
+        self.ph = ph
+        self.data = np.zeros((ph, pw, 4), dtype=np.float32)
+        self.background = np.zeros(3, dtype=np.float32)
+
+        self.frame_radius = np.ones(2)
+
+    def clear(self, r: float, g: float, b: float, a: float) -> None:
+        self.background[:] = (r, g, b)
+        self.data[:] = (r * a, g * a, b * a, a)
+
+    def set_frame_radius(self, frame_radius: np.ndarray) -> None:
+        self.frame_radius = frame_radius
+
+    @property
+    def pixel_size(self) -> float:
+        '''一个像素在画面坐标中的宽度'''
+        return 2 * self.frame_radius[0] / self.pw
+
+    def to_pixel(self, coords: np.ndarray) -> np.ndarray:
+        '''将画面坐标转换为像素坐标，像素 ``(i, j)`` 的中心位于 ``(i, j)``'''
+        return (coords / self.frame_radius + 1) / 2 * (self.pw, self.ph) - 0.5
+
+    def pixel_range(self, coord_min: np.ndarray, coord_max: np.ndarray) -> tuple[int, int, int, int] | None:
+        '''
+        得到画面坐标范围 ``[coord_min, coord_max]`` 所覆盖的像素范围 ``(x0, x1, y0, y1)``（左闭右开），
+        如果不在画布内则返回 ``None``
+        '''
+        pmin = self.to_pixel(np.asarray(coord_min))
+        pmax = self.to_pixel(np.asarray(coord_max))
+        if not np.all(np.isfinite(pmin)) or not np.all(np.isfinite(pmax)):
+            return None
+        x0 = max(0, math.ceil(pmin[0]))
+        y0 = max(0, math.ceil(pmin[1]))
+        x1 = min(self.pw, math.floor(pmax[0]) + 1)
+        y1 = min(self.ph, math.floor(pmax[1]) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, x1, y0, y1
+
+    def pixel_centers(self, x0: int, x1: int, y0: int, y1: int) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        得到像素范围内各个像素中心的画面坐标，返回值的形状均为 ``(y1 - y0, x1 - x0)``
+        '''
+        xs = ((np.arange(x0, x1, dtype=np.float32) + 0.5) / self.pw * 2 - 1) * self.frame_radius[0]
+        ys = ((np.arange(y0, y1, dtype=np.float32) + 0.5) / self.ph * 2 - 1) * self.frame_radius[1]
+        return np.meshgrid(xs.astype(np.float32), ys.astype(np.float32))
+
+    def pixel_centers_at(self, xs: np.ndarray, ys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        得到指定像素中心的画面坐标
+        '''
+        px = ((xs.astype(np.float32) + 0.5) / self.pw * 2 - 1) * self.frame_radius[0]
+        py = ((ys.astype(np.float32) + 0.5) / self.ph * 2 - 1) * self.frame_radius[1]
+        return px.astype(np.float32), py.astype(np.float32)
+
+    def to_pixel_x(self, x: np.ndarray) -> np.ndarray:
+        return (x / self.frame_radius[0] + 1) / 2 * self.pw - 0.5
+
+    def blend(self, x0: int, x1: int, y0: int, y1: int, premultiplied: np.ndarray) -> None:
+        '''
+        将预乘了 alpha 的颜色 ``premultiplied``（形状为 ``(y1 - y0, x1 - x0, 4)``）叠加到画布的对应区域上
+        '''
+        region = self.data[y0:y1, x0:x1]
+        region *= 1 - premultiplied[..., 3:]
+        region += premultiplied
+
+    def read(self) -> bytes:
+        '''
+        得到 ``uint8`` 的 RGBA 数据，格式与 ``fbo.read(components=4)`` 相同
+        '''
+        return self.to_array().tobytes()
+
+    def read_into(self, buffer: bytearray) -> None:
+        np.frombuffer(buffer, dtype=np.uint8).reshape(self.ph, self.pw, 4)[:] = self.to_array()
+
+    def to_array(self) -> np.ndarray:
+        alpha = self.data[..., 3:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rgb = np.where(alpha > 0, self.data[..., :3] / alpha, self.background)
+        result = np.empty((self.ph, self.pw, 4), dtype=np.float32)
+        result[..., :3] = rgb
+        result[..., 3:] = alpha
+        np.clip(result, 0, 1, out=result)
+        return (result * 255 + 0.5).astype(np.uint8)
+
+    def to_image(self) -> Image.Image:
+        '''
+        得到 PIL 图像（从上到下），可以用于预览图或缩略图
+        '''
+        return Image.fromarray(self.to_array()[::-1], 'RGBA')
+
+
+def smoothstep_aa(x: np.ndarray) -> np.ndarray:
+    '''
+    相当于着色器中的 ``smoothstep(1, -1, x)``
+    '''
+    t = np.clip((1 - x) / 2, 0, 1)
+    return t * t * (3 - 2 * t)
+
+
+def blend_premultiplied(fore: np.ndarray, back: np.ndarray) -> np.ndarray:
+    '''
+    将预乘了 alpha 的颜色 ``fore`` 叠加到 ``back`` 上
+    '''
+    return fore + back * (1 - fore[..., 3:])
+
+
+def premultiply(rgba: np.ndarray) -> np.ndarray:
+    result = rgba.copy()
+    result[..., :3] *= rgba[..., 3:]
+    return result
+
+
+def map_points(camera_info: CameraInfo, points: np.ndarray, fix_in_frame: bool) -> np.ndarray:
+    '''
+    将三维坐标映射到画面坐标，与 ``map_points.comp.glsl`` 一致
+    '''
+    if fix_in_frame:
+        mapped = camera_info.map_fixed_in_frame_points(points)
+    else:
+        mapped = camera_info.map_points(points)
+    return mapped * camera_info.frame_radius
+
+
+class CPURenderer(Renderer):
+    '''
+    CPU 渲染器的基类，将物件绘制到 :py:obj:`canvas_ctx` 所设置的 :class:`Canvas` 上
+
+    另见 :class:`CPUFrameRenderer`
+    '''
+    canvas_ctx: ContextVar[Canvas] = ContextVar('CPURenderer.canvas_ctx')
+
+
+class CPUVItemRenderer(CPURenderer):
+    '''
+    :class:`~.VItemRenderer` 的 CPU 实现
+
+    与 ``vitem.frag.glsl`` 相同，对每个像素计算到轮廓的距离以及是否位于填充区域内，
+    不同的是这里先将二次贝塞尔曲线近似为折线，再对所有像素与线段进行向量化计算
+    '''
+    def render(self, item: VItem) -> None:
+        points = item.points._points.data
+        if len(points) < 3:
+            return
+
+        canvas = self.canvas_ctx.get()
+        render_data = self.data_ctx.get()
+        camera_info = render_data.camera_info
+        aa_radius = render_data.anti_alias_radius
+
+        mapped = map_points(camera_info, points, item._fix_in_frame).astype(np.float32)
+        closepath_flags = item.points.get_closepath_flags()
+
+        anchor_count = (len(points) + 1) // 2
+        radius = resize_with_interpolation(item.radius._radii._data, anchor_count)
+        if item._fix_in_frame:
+            radius = radius * camera_info.scaled_factor
+        stroke = premultiply(resize_with_interpolation(item.stroke._rgbas._data, anchor_count))
+        fill = premultiply(resize_with_interpolation(item.fill._rgbas._data, anchor_count))
+        glow_color = item.glow._rgba._data
+        glow_size = item.glow._size
+        glow_visible = glow_color[3] != 0.0
+
+        # 得到所有曲线 (A, B, C)，剔除子路径之间的分隔以及退化为一点的曲线
+        lim = (len(points) - 1) // 2 * 2
+        start_indices = np.arange(0, lim, 2)
+        A = mapped[0:lim:2]
+        B = mapped[1:lim:2]
+        C = mapped[2:lim + 1:2]
+        valid = ~(np.isnan(A).any(axis=1) | np.isnan(B).any(axis=1) | np.isnan(C).any(axis=1))
+        valid &= ~(np.all(A == B, axis=1) & np.all(B == C, axis=1))
+        if not np.any(valid):
+            return
+        start_indices = start_indices[valid]
+        A, B, C = A[valid], B[valid], C[valid]
+        curve_closed = closepath_flags[start_indices]
+
+        # 确定需要计算的像素范围
+        buff = radius.max() + aa_radius
+        if glow_visible:
+            buff = max(buff, glow_size)
+        coords = np.concatenate([A, B, C])
+        rng = canvas.pixel_range(coords.min(axis=0) - buff, coords.max(axis=0) + buff)
+        if rng is None:
+            return
+        x0, x1, y0, y1 = rng
+
+        seg_start, seg_end, seg_curve = self.flatten(A, B, C, canvas.pixel_size * FLATTEN_TOLERANCE)
+        seg_closed = curve_closed[seg_curve]
+
+        fill_transparent = item.fill.is_transparent()
+        stroke_background = item.stroke_background
+        glow_premultiplied = premultiply(glow_color.astype(np.float32))
+
+        # 使用扫描线按照奇偶规则判断各个像素是否位于闭合路径内（位于内部时为 -1，否则为 1）
+        sgn_grid = self.scanline_sign(canvas, x0, x1, y0, y1, seg_start[seg_closed], seg_end[seg_closed])
+
+        result = np.zeros((y1 - y0, x1 - x0, 4), dtype=np.float32)
+
+        # 距离轮廓足够远的像素既没有描边也没有抗锯齿，
+        # 如果填充色是均匀的，那么这些像素的颜色只取决于是否位于闭合路径内，不需要计算距离
+        any_closed = bool(curve_closed.any())
+        uniform = not glow_visible and (not any_closed or (curve_closed.all() and np.all(fill == fill[0])))
+        if uniform:
+            if any_closed:
+                result[sgn_grid < 0] = fill[0]
+            near = self.near_mask(canvas, x0, x1, y0, y1, seg_start, seg_end, buff)
+        else:
+            near = np.ones((y1 - y0, x1 - x0), dtype=bool)
+
+        ys, xs = np.nonzero(near)
+        per_chunk = max(1, CHUNK_SIZE // len(seg_curve))
+        for start in range(0, len(ys), per_chunk):
+            cys = ys[start:start + per_chunk]
+            cxs = xs[start:start + per_chunk]
+            px, py = canvas.pixel_centers_at(cxs + x0, cys + y0)
+
+            d, nearest_seg = self.distance(px, py, seg_start, seg_end)
+            sgn = sgn_grid[cys, cxs]
+            curve = seg_curve[nearest_seg]
+            anchor = start_indices[curve] // 2
+
+            # 与着色器一致，使用最近曲线的弦计算插值比例
+            e = C[curve] - A[curve]
+            w = np.stack([px, py], axis=1) - A[curve]
+            ee = np.einsum('ij,ij->i', e, e)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.einsum('ij,ij->i', w, e) / ee
+            ratio = np.clip(np.nan_to_num(ratio), 0, 1)[:, None]
+
+            r = radius[anchor] * (1 - ratio[:, 0]) + radius[anchor + 1] * ratio[:, 0]
+            stroke_color = stroke[anchor] * (1 - ratio) + stroke[anchor + 1] * ratio
+            stroke_color *= smoothstep_aa((d - r) / aa_radius)[:, None]
+
+            sgn_d = sgn * d
+            fill_color = fill[anchor] * (1 - ratio) + fill[anchor + 1] * ratio
+            fill_color *= (curve_closed[curve] * smoothstep_aa(sgn_d / aa_radius))[:, None]
+
+            if stroke_background:
+                color = blend_premultiplied(fill_color, stroke_color)
+            else:
+                color = blend_premultiplied(stroke_color, fill_color)
+
+            if glow_visible:
+                factor = 1.0 - (d if fill_transparent else sgn_d) / glow_size
+                factor = np.where((0.0 < factor) & (factor <= 1.0), factor * factor, 0.0)
+                color = blend_premultiplied(color, glow_premultiplied * factor[:, None])
+
+            result[cys, cxs] = color
+
+        canvas.blend(x0, x1, y0, y1, result)
+
+    @staticmethod
+    def flatten(
+        A: np.ndarray,
+        B: np.ndarray,
+        C: np.ndarray,
+        tolerance: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        将二次贝塞尔曲线近似为折线，使得偏差不超过 ``tolerance``
+
+        返回线段的起点、终点，以及每条线段所属曲线的下标
+        '''
+        # 与着色器一致，可以近似为直线的曲线直接使用一条线段
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v1 = B - A
+            v2 = C - B
+            v1 /= np.linalg.norm(v1, axis=1, keepdims=True)
+            v2 /= np.linalg.norm(v2, axis=1, keepdims=True)
+        straight = (np.abs(v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0]) < 1e-3) \
+            & (np.einsum('ij,ij->i', v1, v2) > 0)
+
+        # 二次贝塞尔曲线分为 n 段后，与折线的最大偏差为 |A - 2B + C| / (4 n^2)
+        deviation = np.linalg.norm(A - 2 * B + C, axis=1)
+        counts = np.ceil(np.sqrt(deviation / (4 * tolerance))).astype(np.int64)
+        counts = np.where(straight, 1, np.clip(counts, 2, 32))
+
+        seg_curve = np.repeat(np.arange(len(A)), counts)
+        local = np.arange(len(seg_curve)) - np.repeat(np.cumsum(counts) - counts, counts)
+        n = counts[seg_curve]
+
+        def evaluate(t: np.ndarray) -> np.ndarray:
+            t = t[:, None].astype(np.float32)
+            return (1 - t) ** 2 * A[seg_curve] + 2 * t * (1 - t) * B[seg_curve] + t ** 2 * C[seg_curve]
+
+        return evaluate(local / n), evaluate((local + 1) / n), seg_curve
+
+    @staticmethod
+    def distance(
+        px: np.ndarray,
+        py: np.ndarray,
+        seg_start: np.ndarray,
+        seg_end: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        计算各个点到折线的最近距离，以及最近线段的下标
+        '''
+        ex = seg_end[:, 0] - seg_start[:, 0]
+        ey = seg_end[:, 1] - seg_start[:, 1]
+        ee = ex * ex + ey * ey
+        ee[ee == 0] = 1
+
+        wx = px[:, None] - seg_start[:, 0]
+        wy = py[:, None] - seg_start[:, 1]
+        t = (wx * ex + wy * ey) / ee
+        np.clip(t, 0, 1, out=t)
+        wx -= ex * t
+        wy -= ey * t
+        wx *= wx
+        wy *= wy
+        wx += wy
+
+        nearest = np.argmin(wx, axis=1)
+        d = np.sqrt(np.take_along_axis(wx, nearest[:, None], axis=1)[:, 0])
+        return d, nearest
+
+    @staticmethod
+    def scanline_sign(
+        canvas: Canvas,
+        x0: int,
+        x1: int,
+        y0: int,
+        y1: int,
+        seg_start: np.ndarray,
+        seg_end: np.ndarray
+    ) -> np.ndarray:
+        '''
+        对每一行像素，求出与各条线段的交点，并统计各个像素右侧的交点数量，
+        得到按奇偶规则判断的结果（位于内部时为 ``-1``，否则为 ``1``），形状为 ``(y1 - y0, x1 - x0)``
+        '''
+        width = x1 - x0
+        sgn = np.ones((y1 - y0, width), dtype=np.float32)
+        if len(seg_start) == 0:
+            return sgn
+
+        lo = np.minimum(seg_start[:, 1], seg_end[:, 1])
+        hi = np.maximum(seg_start[:, 1], seg_end[:, 1])
+        dx = seg_end[:, 0] - seg_start[:, 0]
+        dy = seg_end[:, 1] - seg_start[:, 1]
+
+        rows_per_chunk = max(1, CHUNK_SIZE // len(seg_start))
+        for cy0 in range(y0, y1, rows_per_chunk):
+            cy1 = min(y1, cy0 + rows_per_chunk)
+            _, ys = canvas.pixel_centers(x0, x0 + 1, cy0, cy1)
+            ys = ys[:, :1]
+
+            # 与着色器中的判断一致，每条线段只包含较低的端点
+            crossing = (lo <= ys) & (ys < hi)
+            rows, segs = np.nonzero(crossing)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_int = seg_start[segs, 0] + (ys[rows, 0] - seg_start[segs, 1]) * dx[segs] / dy[segs]
+
+            # 交点位于像素中心的右侧时才计入，也就是交点所在列之前的像素
+            cols = np.ceil(canvas.to_pixel_x(x_int)).astype(np.int64) - x0
+            np.clip(cols, 0, width, out=cols)
+            hist = np.bincount(rows * (width + 1) + cols, minlength=(cy1 - cy0) * (width + 1))
+            hist = hist.reshape(cy1 - cy0, width + 1)
+            counts = np.cumsum(hist[:, ::-1], axis=1)[:, ::-1]
+            sgn[cy0 - y0:cy1 - y0][counts[:, 1:] % 2 == 1] = -1
+
+        return sgn
+
+    @classmethod
+    def near_mask(
+        cls,
+        canvas: Canvas,
+        x0: int,
+        x1: int,
+        y0: int,
+        y1: int,
+        seg_start: np.ndarray,
+        seg_end: np.ndarray,
+        buff: float
+    ) -> np.ndarray:
+        '''
+        将像素按 :py:obj:`TILE_SIZE` 分块，标记出可能与轮廓的距离不超过 ``buff`` 的像素
+        '''
+        tx = np.arange(x0, x1, TILE_SIZE)
+        ty = np.arange(y0, y1, TILE_SIZE)
+        gx, gy = np.meshgrid(tx, ty)
+        # 分块中心的画面坐标，以及分块内的像素与中心的最大距离
+        cx = ((gx + TILE_SIZE / 2) / canvas.pw * 2 - 1) * canvas.frame_radius[0]
+        cy = ((gy + TILE_SIZE / 2) / canvas.ph * 2 - 1) * canvas.frame_radius[1]
+        half_diagonal = TILE_SIZE / 2 * math.sqrt(2) * canvas.pixel_size
+
+        d = np.empty(cx.size, dtype=np.float32)
+        per_chunk = max(1, CHUNK_SIZE // len(seg_start))
+        for start in range(0, cx.size, per_chunk):
+            end = start + per_chunk
+            d[start:end], _ = cls.distance(cx.ravel()[start:end].astype(np.float32),
+                                           cy.ravel()[start:end].astype(np.float32),
+                                           seg_start, seg_end)
+        near_tiles = (d - half_diagonal <= buff).reshape(cx.shape)
+
+        near = np.repeat(np.repeat(near_tiles, TILE_SIZE, axis=0), TILE_SIZE, axis=1)
+        return near[:y1 - y0, :x1 - x0]
+
+
+class CPUDotCloudRenderer(CPURenderer):
+    '''
+    :class:`~.DotCloudRenderer` 的 CPU 实现
+    '''
+    def render(self, item: DotCloud) -> None:
+        points = item.points._points.data
+        if len(points) == 0:
+            return
+
+        canvas = self.canvas_ctx.get()
+        render_data = self.data_ctx.get()
+        camera_info = render_data.camera_info
+        aa_radius = render_data.anti_alias_radius
+
+        color = premultiply(resize_with_interpolation(item.color._rgbas.data, len(points)))
+        radius = resize_with_interpolation(item.radius._radii.data, len(points))
+
+        # 与 dotcloud.vert.glsl 和 dotcloud.geom.glsl 一致
+        aligned = np.ones((len(points), 4))
+        aligned[:, :3] = points
+        if item._fix_in_frame:
+            aligned[:, 2] -= camera_info.fixed_distance_from_plane
+        else:
+            aligned = aligned @ camera_info.view_matrix.T
+        clip = aligned @ camera_info.proj_matrix.T
+        w = clip[:, 3]
+        visible = w > 0
+        if not np.any(visible):
+            return
+        clip, w, color, radius = clip[visible], w[visible], color[visible], radius[visible]
+        centers = clip[:, :2] / w[:, None] * camera_info.frame_radius
+        radius = radius * camera_info.proj_matrix[0, 0] / w * camera_info.frame_radius[0]
+
+        # 对每个点计算以其为中心的固定大小窗口中的覆盖率
+        pixel_size = canvas.pixel_size
+        size = math.ceil(2 * (radius.max() + aa_radius) / pixel_size) + 2
+        pixel_centers = canvas.to_pixel(centers)
+        origins = np.floor(pixel_centers - size / 2).astype(np.int64) + 1
+        offsets = np.arange(size)
+
+        per_chunk = max(1, CHUNK_SIZE // (size * size))
+        for start in range(0, len(centers), per_chunk):
+            end = min(len(centers), start + per_chunk)
+            dx = (origins[start:end, 0, None] + offsets - pixel_centers[start:end, 0, None]) * pixel_size
+            dy = (origins[start:end, 1, None] + offsets - pixel_centers[start:end, 1, None]) * pixel_size
+            dist = np.sqrt(dy[:, :, None] ** 2 + dx[:, None, :] ** 2)
+            coverage = smoothstep_aa((dist - radius[start:end, None, None]) / aa_radius)
+            coverage[dist - radius[start:end, None, None] > aa_radius] = 0
+            premultiplied = coverage[..., None] * color[start:end, None, None, :]
+
+            # 各个点之间可能有重叠，因此需要按顺序叠加
+            for i in range(end - start):
+                ox, oy = origins[start + i]
+                x0, y0 = max(0, ox), max(0, oy)
+                x1, y1 = min(canvas.pw, ox + size), min(canvas.ph, oy + size)
+                if x0 >= x1 or y0 >= y1:
+                    continue
+                canvas.blend(x0, x1, y0, y1, premultiplied[i, y0 - oy:y1 - oy, x0 - ox:x1 - ox].astype(np.float32))
+
+
+class CPUImageItemRenderer(CPURenderer):
+    '''
+    :class:`~.ImageItemRenderer` 的 CPU 实现
+
+    使用单应性变换得到各个像素在图像中的坐标；缩小显示时，使用缩小后的图像近似 mipmap
+    '''
+    def __init__(self):
+        # 由于 PIL 的图像定义了 __eq__ 而不可哈希，无法使用 WeakKeyDictionary，
+        # 所以以 id 为键，并在图像被回收时移除对应的纹理，避免之后的图像复用相同的 id 时得到错误的纹理
+        self.textures: dict[int, dict[int, np.ndarray]] = {}
+
+    def get_texture(self, img: Image.Image, reduce: int) -> np.ndarray:
+        key = id(img)
+        textures = self.textures.get(key, None)
+        if textures is None:
+            textures = self.textures[key] = {}
+            weakref.finalize(img, self.textures.pop, key, None)
+
+        texture = textures.get(reduce, None)
+        if texture is None:
+            rgba = img.convert('RGBA')
+            if reduce > 1:
+                rgba = rgba.reduce(reduce)
+            texture = textures[reduce] = np.asarray(rgba, dtype=np.float32) / 255
+        return texture
+
+    def render(self, item: ImageItem) -> None:
+        img = item.image.get()
+        if img is None:
+            return
+
+        canvas = self.canvas_ctx.get()
+        camera_info = self.data_ctx.get().camera_info
+
+        # 四个角依次为左上、左下、右上、右下
+        corners = map_points(camera_info, item.points._points.data, item._fix_in_frame)
+        if not np.all(np.isfinite(corners)):
+            return
+        color = resize_with_interpolation(item.color._rgbas.data, 4)
+
+        rng = canvas.pixel_range(corners.min(axis=0), corners.max(axis=0))
+        if rng is None:
+            return
+        x0, x1, y0, y1 = rng
+
+        try:
+            inv = np.linalg.inv(self.homography(corners))
+        except np.linalg.LinAlgError:
+            return
+
+        px, py = canvas.pixel_centers(x0, x1, y0, y1)
+        uvw = np.stack([px, py, np.ones_like(px)], axis=-1).astype(np.float64) @ inv.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = uvw[..., 0] / uvw[..., 2]
+            v = uvw[..., 1] / uvw[..., 2]
+        inside = (u >= 0) & (u <= 1) & (v >= 0) & (v <= 1)
+        if not np.any(inside):
+            return
+
+        # 根据图像在画面上的大小判断是否缩小显示
+        min_filter, mag_filter = item.image.get_filter()
+        pixel_size = canvas.pixel_size
+        width_px = np.linalg.norm(corners[2] - corners[0]) / pixel_size
+        height_px = np.linalg.norm(corners[1] - corners[0]) / pixel_size
+        scale = max(img.width / max(width_px, 1e-6), img.height / max(height_px, 1e-6))
+        reduce = 1
+        linear = mag_filter == mgl.LINEAR
+        if scale > 1:
+            linear = min_filter != mgl.NEAREST
+            if min_filter in (mgl.NEAREST_MIPMAP_NEAREST, mgl.LINEAR_MIPMAP_NEAREST,
+                              mgl.NEAREST_MIPMAP_LINEAR, mgl.LINEAR_MIPMAP_LINEAR):
+                reduce = 2 ** int(math.log2(scale))
+                reduce = min(reduce, img.width, img.height)
+        texture = self.get_texture(img, reduce)
+
+        u = np.where(inside, u, 0)
+        v = np.where(inside, v, 0)
+        sampled = self.sample(texture, u, v, linear)
+
+        uu = u[..., None]
+        vv = v[..., None]
+        vertex_color = (1 - uu) * (1 - vv) * color[0] + (1 - uu) * vv * color[1] \
+            + uu * (1 - vv) * color[2] + uu * vv * color[3]
+
+        result = premultiply(sampled * vertex_color) * inside[..., None]
+        canvas.blend(x0, x1, y0, y1, result.astype(np.float32))
+
+    @staticmethod
+    def homography(corners: np.ndarray) -> np.ndarray:
+        '''
+        得到将纹理坐标 ``(u, v)`` 映射到画面坐标的单应性矩阵
+        '''
+        uv = np.array([[0, 0], [0, 1], [1, 0], [1, 1]], dtype=np.float64)
+        mat = np.zeros((8, 8))
+        rhs = np.zeros(8)
+        for i, ((u, v), (x, y)) in enumerate(zip(uv, corners)):
+            mat[2 * i] = [u, v, 1, 0, 0, 0, -u * x, -v * x]
+            mat[2 * i + 1] = [0, 0, 0, u, v, 1, -u * y, -v * y]
+            rhs[2 * i] = x
+            rhs[2 * i + 1] = y
+        h = np.linalg.solve(mat, rhs)
+        return np.append(h, 1).reshape(3, 3)
+
+    @staticmethod
+    def sample(texture: np.ndarray, u: np.ndarray, v: np.ndarray, linear: bool) -> np.ndarray:
+        '''
+        对纹理进行采样，超出范围的部分使用边缘的颜色
+        '''
+        h, w = texture.shape[:2]
+        x = u * w - 0.5
+        y = v * h - 0.5
+        if not linear:
+            xi = np.clip(np.floor(x + 0.5).astype(np.int64), 0, w - 1)
+            yi = np.clip(np.floor(y + 0.5).astype(np.int64), 0, h - 1)
+            return texture[yi, xi]
+
+        xf = np.floor(x)
+        yf = np.floor(y)
+        tx = (x - xf)[..., None]
+        ty = (y - yf)[..., None]
+        xa = np.clip(xf.astype(np.int64), 0, w - 1)
+        xb = np.clip(xf.astype(np.int64) + 1, 0, w - 1)
+        ya = np.clip(yf.astype(np.int64), 0, h - 1)
+        yb = np.clip(yf.astype(np.int64) + 1, 0, h - 1)
+        top = texture[ya, xa] * (1 - tx) + texture[ya, xb] * tx
+        bottom = texture[yb, xa] * (1 - tx) + texture[yb, xb] * tx
+        return top * (1 - ty) + bottom * ty
+
+
+cpu_renderer_map: dict[type[Renderer], type[CPURenderer]] = {
+    Renderer: CPURenderer,
+    VItemRenderer: CPUVItemRenderer,
+    DotCloudRenderer: CPUDotCloudRenderer,
+    ImageItemRenderer: CPUImageItemRenderer,
+}
+'''
+GPU 渲染器与对应的 CPU 渲染器，不在其中的渲染器（例如 :class:`~.FrameEffectRenderer`）所绘制的物件会被跳过
+'''
+
+
+class CPUFrameRenderer:
+    '''
+    不依赖 OpenGL 上下文，使用 CPU 渲染 :class:`~.BuiltTimeline` 的画面
+
+    - 支持 :class:`~.VItem`、:class:`~.DotCloud` 以及 :class:`~.ImageItem`，
+      其它物件（例如 :class:`~.FrameEffect`、:class:`~.Video`）会被跳过
+    - 结果与 :meth:`~.BuiltTimeline.render_all` 相近但并不完全相同，适用于预览以及生成缩略图
+
+    .. code-block:: python
+
+        renderer = CPUFrameRenderer(built)
+        renderer.capture(1.5).save('thumbnail.png')
+    '''
+    def __init__(self, built: BuiltTimeline):
+        self.built = built
+        self.canvas = Canvas(built.cfg.pixel_width, built.cfg.pixel_height)
+        self.renderers: dict[type[Renderer], CPURenderer | None] = {}
+
+    def get_renderer(self, renderer_cls: type[Renderer]) -> CPURenderer | None:
+        if renderer_cls not in self.renderers:
+            cpu_renderer_cls = cpu_renderer_map.get(renderer_cls, None)
+            if cpu_renderer_cls is None:
+                log.warning(
+                    _('{renderer} is not supported by the CPU renderer, the related items will be skipped')
+                    .format(renderer=renderer_cls.__name__)
+                )
+                self.renderers[renderer_cls] = None
+            else:
+                self.renderers[renderer_cls] = cpu_renderer_cls()
+        return self.renderers[renderer_cls]
+
+    def get_render_call(self, data: Item, render: Callable) -> Callable | None:
+        '''
+        将 :meth:`~.BuiltTimeline.collect_render_datas` 得到的渲染调用替换为对应的 CPU 渲染调用，
+        不支持时返回 ``None``
+        '''
+        owner = getattr(render, '__self__', None)
+        if isinstance(owner, Timeline.ItemAppearance):
+            renderer = self.get_renderer(data.renderer_cls)
+            return None if renderer is None else renderer.render
+        if isinstance(owner, Renderer):
+            renderer = self.get_renderer(type(owner))
+            return None if renderer is None else renderer.render
+        # 例如 Transform 的额外渲染调用，会在参数中传入渲染器的 render 方法
+        if isinstance(render, partial):
+            args = []
+            for arg in render.args:
+                if isinstance(getattr(arg, '__self__', None), Renderer):
+                    arg = self.get_render_call(data, arg)
+                    if arg is None:
+                        return None
+                args.append(arg)
+            return partial(render.func, *args, **render.keywords)
+        return None
+
+    def render(self, global_t: float, *, transparent: bool = False) -> Canvas:
+        '''
+        渲染 ``global_t`` 时刻的画面，返回绘制结果 :attr:`canvas`
+
+        ``transparent=True`` 时背景是透明的（用于输出 ``.mov``）
+        '''
+        built = self.built
+        timeline = built.timeline
+        global_t = timeline.time_aligner.align_t_for_render(global_t)
+        # 与 render_all 一致，使得最后一帧采用略提早一点点的时间渲染
+        if global_t == built.duration:
+            global_t -= 1e-4
+        built._time = global_t
+        profiler = FrameProfiler.profiler_ctx.get()
+
+        with ContextSetter(Animation.global_t_ctx, global_t), \
+             ContextSetter(Timeline.ctx_var, timeline), \
+             timeline.with_config():
+            camera = timeline.compute_item(timeline.camera, global_t, True)
+            camera_info = camera.points.info
+            anti_alias_radius = built.cfg.anti_alias_width / 2 * camera_info.scaled_factor
+
+            self.canvas.clear(*built.cfg.background_color.rgb, not transparent)
+            self.canvas.set_frame_radius(camera_info.frame_radius)
+
+            with ContextSetter(Renderer.data_ctx, RenderData(ctx=None,
+                                                             camera_info=camera_info,
+                                                             anti_alias_radius=anti_alias_radius)), \
+                 ContextSetter(CPURenderer.canvas_ctx, self.canvas):
+                for data, render in built.collect_render_datas(global_t):
+                    render = self.get_render_call(data, render)
+                    if render is None:
+                        continue
+                    if profiler is None:
+                        render(data)
+                    else:
+                        with profiler.stage(f'render:{self.owner_name(render)}', item=data.__class__.__name__):
+                            render(data)
+
+        return self.canvas
+
+    @staticmethod
+    def owner_name(render: Callable) -> str:
+        while isinstance(render, partial):
+            render = next(arg for arg in render.args if isinstance(getattr(arg, '__self__', None), Renderer))
+        return type(render.__self__).__name__
+
+    def capture(self, global_t: float, *, transparent: bool = True) -> Image.Image:
+        '''
+        渲染 ``global_t`` 时刻的画面并得到 PIL 图像
+        '''
+        return self.render(global_t, transparent=transparent).to_image()
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import subprocess as sp
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from janim.locale.i18n import get_local_strings
+from janim.logger import log
+from janim.utils.config import Config, ConfigGetter
+
+_ = get_local_strings('encoder')
+
+CODEC_ENCODERS: dict[str, list[str]] = {
+    'h264': ['h264_nvenc', 'h264_amf', 'h264_qsv', 'h264_videotoolbox', 'libx264'],
+    'hevc': ['hevc_nvenc', 'hevc_amf', 'hevc_qsv', 'hevc_videotoolbox', 'libx265'],
+    'av1': ['av1_nvenc', 'av1_amf', 'av1_qsv', 'libsvtav1', 'libaom-av1'],
+    'prores': ['prores_videotoolbox', 'prores_ks'],
+}
+'''
+各编码格式可用的编码器，按优先级排列，硬件编码器在前，软件编码器在后
+'''
+
+TRANSPARENT_CODECS = ('prores', 'qtrle')
+'''
+支持透明通道的编码格式，用于 ``.mov`` 的输出
+'''
+
+DEFAULT_PIX_FMTS: dict[str, str | None] = {
+    'h264': 'yuv420p',
+    'hevc': 'yuv420p',
+    'av1': 'yuv420p',
+    'prores': 'yuva444p10le',
+    'qtrle': None,
+}
+'''
+各编码格式默认的像素格式，``None`` 表示由 ffmpeg 决定
+'''
+
+
+def quality_args(encoder: str, crf: int) -> list[str] | None:
+    '''
+    将 CRF 转换为 ``encoder`` 对应的质量参数，不支持的编码器返回 ``None``
+
+    硬件编码器没有 CRF，这里使用其恒定质量模式的参数代替，数值的含义与 CRF 接近但并不完全一致
+    '''
+    if encoder.startswith('lib'):
+        return ['-crf', str(crf)]
+    if encoder.endswith('_nvenc'):
+        return ['-rc', 'vbr', '-cq', str(crf)]
+    if encoder.endswith('_amf'):
+        return ['-rc', 'cqp', '-qp_i', str(crf), '-qp_p', str(crf)]
+    if encoder.endswith('_qsv'):
+        return ['-global_quality', str(crf)]
+    return None
+
+
+encoders_cache: dict[str, set[str]] = {}
+probe_cache: dict[tuple[str, str, str | None], bool] = {}
+# 自动选择编码器的结果，键为 (ffmpeg_bin, codec)
+# 在 ParallelVideoWriter 的子进程中会被设置为主进程的结果，以避免重复查找
+auto_encoder_cache: dict[tuple[str, str], str] = {}
+
+
+def list_encoders(ffmpeg_bin: str) -> set[str]:
+    '''
+    得到 ``ffmpeg -encoders`` 所列出的编码器名称
+    '''
+    encoders = encoders_cache.get(ffmpeg_bin, None)
+    if encoders is not None:
+        return encoders
+
+    from janim.render.writer import VideoWriter
+
+    with VideoWriter.handle_ffmpeg_not_found():
+        process = sp.Popen(
+            [ffmpeg_bin, '-hide_banner', '-encoders'],
+            stdout=sp.PIPE,
+            stderr=sp.PIPE
+        )
+
+    out, err = process.communicate()
+    encoders = set()
+    started = False
+    for line in out.decode(errors='ignore').splitlines():
+        # 列表之前是各标志位的说明，以 ------ 分隔
+        if line.strip().startswith('------'):
+            started = True
+            continue
+        parts = line.split()
+        if started and len(parts) >= 2:
+            encoders.add(parts[1])
+
+    encoders_cache[ffmpeg_bin] = encoders
+    return encoders
+
+
+def probe_encoder(ffmpeg_bin: str, encoder: str, pix_fmt: str | None) -> bool:
+    '''
+    尝试使用 ``encoder`` 编码几帧画面，判断其是否可用
+
+    ``ffmpeg -encoders`` 列出的硬件编码器不一定能够使用（例如没有对应的显卡或驱动），所以需要实际尝试
+    '''
+    key = (ffmpeg_bin, encoder, pix_fmt)
+    result = probe_cache.get(key, None)
+    if result is not None:
+        return result
+
+    command = [
+        ffmpeg_bin,
+        '-hide_banner',
+        '-loglevel', 'error',
+        '-f', 'lavfi',
+        '-i', 'color=size=256x256:rate=30:duration=0.1',
+        '-vcodec', encoder,
+    ]
+    if pix_fmt is not None:
+        command += ['-pix_fmt', pix_fmt]
+    command += ['-f', 'null', '-']
+
+    try:
+        result = sp.run(command, stdout=sp.DEVNULL, stderr=sp.DEVNULL, timeout=30).returncode == 0
+    except (OSError, sp.TimeoutExpired):
+        result = False
+
+    probe_cache[key] = result
+    return result
+
+
+def find_encoder(ffmpeg_bin: str, codec: str, pix_fmt: str | None = None) -> str | None:
+    '''
+    按 :py:obj:`CODEC_ENCODERS` 中的优先级，查找 ``codec`` 可用的编码器，都不可用时返回 ``None``
+    '''
+    available = list_encoders(ffmpeg_bin)
+    for encoder in CODEC_ENCODERS.get(codec, [codec]):
+        if encoder in available and probe_encoder(ffmpeg_bin, encoder, pix_fmt):
+            return encoder
+    return None
+
+
+@dataclass
+class EncoderProfile:
+    '''
+    输出视频时 ffmpeg 的编码参数，通常由 :meth:`from_config` 根据配置中 ``video_`` 开头的项得到
+
+    - ``codec``：编码格式，``h264``、``hevc``、``av1``、``prores`` 或 ``qtrle``
+    - ``encoder``：ffmpeg 的编码器名称，例如 ``libx264``、``h264_nvenc``
+    - ``preset``、``crf``、``threads``：为空或小于 ``0`` 时使用编码器的默认值（``threads`` 为 ``0`` 时也是如此）
+    - ``pix_fmt``：输出的像素格式，为 ``None`` 时由 ffmpeg 决定
+    '''
+    codec: str
+    encoder: str
+    preset: str = ''
+    crf: int = -1
+    threads: int = 0
+    pix_fmt: str | None = None
+
+    @staticmethod
+    def from_config(cfg: Config | ConfigGetter, ext: str) -> EncoderProfile:
+        '''
+        根据配置以及输出的文件格式 ``ext`` 得到编码参数
+
+        - ``.mp4`` 使用 ``video_codec`` 所指定的格式，但 ``prores`` 无法存放在 ``.mp4`` 中，此时使用 ``h264``
+        - ``.mov`` 用于透明背景的输出，``video_codec`` 为 ``prores`` 时使用 ProRes 4444，否则使用 ``qtrle``
+        - ``video_encoder`` 不为空时直接使用所指定的编码器，否则自动选择可用的编码器，优先使用硬件编码器
+        '''
+        codec = cfg.video_codec
+        if ext == '.mov':
+            if codec not in TRANSPARENT_CODECS:
+                codec = 'qtrle'
+        elif codec not in CODEC_ENCODERS or codec == 'prores':
+            log.warning(
+                _('The codec "{codec}" is not supported for "{ext}" output, using h264 instead')
+                .format(codec=codec, ext=ext)
+            )
+            codec = 'h264'
+
+        pix_fmt = cfg.video_pix_fmt or DEFAULT_PIX_FMTS[codec]
+
+        encoder = cfg.video_encoder
+        if not encoder:
+            if codec == 'qtrle':
+                encoder = 'qtrle'
+            else:
+                encoder = EncoderProfile.auto_encoder(cfg.ffmpeg_bin, codec, pix_fmt)
+
+        return EncoderProfile(
+            codec=codec,
+            encoder=encoder,
+            preset=cfg.video_preset,
+            crf=cfg.video_crf,
+            threads=cfg.video_threads,
+            pix_fmt=pix_fmt
+        )
+
+    @staticmethod
+    def auto_encoder(ffmpeg_bin: str, codec: str, pix_fmt: str | None) -> str:
+        key = (ffmpeg_bin, codec)
+        encoder = auto_encoder_cache.get(key, None)
+        if encoder is not None:
+            return encoder
+
+        encoder = find_encoder(ffmpeg_bin, codec, pix_fmt)
+        if encoder is None:
+            # 都不可用时仍使用软件编码器，由 ffmpeg 给出具体的错误信息
+            encoder = CODEC_ENCODERS[codec][-1]
+            log.warning(
+                _('No available encoder found for {codec}, trying {encoder}')
+                .format(codec=codec, encoder=encoder)
+            )
+        else:
+            log.info(
+                _('Using {encoder} for encoding')
+                .format(encoder=encoder)
+            )
+
+        auto_encoder_cache[key] = encoder
+        return encoder
+
+    def ffmpeg_args(self) -> list[str]:
+        '''
+        得到传给 ffmpeg 的输出参数
+        '''
+        args = []
+        if self.pix_fmt is not None:
+            args += ['-pix_fmt', self.pix_fmt]
+        args += ['-vcodec', self.encoder]
+        if self.preset:
+            args += ['-preset', self.preset]
+        if self.crf >= 0:
+            quality = quality_args(self.encoder, self.crf)
+            if quality is None:
+                log.warning(
+                    _('"video_crf" is ignored because {encoder} does not support it')
+                    .format(encoder=self.encoder)
+                )
+            else:
+                args += quality
+        if self.threads > 0:
+            args += ['-threads', str(self.threads)]
+        if self.encoder == 'libx265':
+            # libx265 的输出不受 -loglevel 的控制
+            args += ['-x265-params', 'log-level=error']
+        if self.codec == 'hevc':
+            # 使用 hvc1 标签，否则一些播放器（例如 QuickTime）无法播放
+            args += ['-tag:v', 'hvc1']
+        return args
+
+
+@dataclass
+class EncoderBenchResult:
+    encoder: str
+    codec: str
+    fps: float | None
+    '''编码速度（帧每秒），为 ``None`` 表示编码失败'''
+
+
+def bench_encoders(
+    cfg: Config | ConfigGetter,
+    *,
+    frames: int = 120,
+    codecs: list[str] | None = None
+) -> list[EncoderBenchResult]:
+    '''
+    将合成的画面通过管道输入每个本地可用的编码器，测量编码速度
+
+    - 画面的分辨率与帧率取自 ``cfg``，``video_preset``、``video_crf`` 等编码参数也同样生效，
+      因此可以用来比较不同参数下的速度
+    - 编码结果输出到 ffmpeg 的 ``null``，不包括写入文件的开销
+    - 使用事先生成的画面，不包括渲染的开销
+    '''
+    width, height = cfg.pixel_width, cfg.pixel_height
+    ffmpeg_bin = cfg.ffmpeg_bin
+    available = list_encoders(ffmpeg_bin)
+
+    synthetic = synthetic_frames(width, height)
+
+    results: list[EncoderBenchResult] = []
+    for codec in codecs or [*CODEC_ENCODERS.keys(), 'qtrle']:
+        pix_fmt = cfg.video_pix_fmt or DEFAULT_PIX_FMTS[codec]
+        for encoder in CODEC_ENCODERS.get(codec, [codec]):
+            if encoder not in available or not probe_encoder(ffmpeg_bin, encoder, pix_fmt):
+                continue
+            profile = EncoderProfile(
+                codec=codec,
+                encoder=encoder,
+                preset=cfg.video_preset,
+                crf=cfg.video_crf,
+                threads=cfg.video_threads,
+                pix_fmt=pix_fmt
+            )
+            command = [
+                ffmpeg_bin,
+                '-f', 'rawvideo',
+                '-s', f'{width}x{height}',
+                '-pix_fmt', 'rgba',
+                '-r', str(cfg.fps),
+                '-i', '-',
+                '-an',
+                '-loglevel', 'error',
+                *profile.ffmpeg_args(),
+                '-f', 'null', '-'
+            ]
+            log.info(_('Benchmarking {encoder}').format(encoder=encoder))
+
+            t = time.perf_counter()
+            process = sp.Popen(command, stdin=sp.PIPE, stderr=sp.DEVNULL)
+            try:
+                for i in range(frames):
+                    process.stdin.write(synthetic[i % len(synthetic)])
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            ok = process.wait() == 0
+            elapsed = time.perf_counter() - t
+
+            results.append(EncoderBenchResult(encoder, codec, frames / elapsed if ok else None))
+
+    return results
+
+
+def synthetic_frames(width: int, height: int, count: int = 30) -> list[bytes]:
+    '''
+    生成用于测试编码速度的画面：平滑的渐变背景上有移动的色块，与一般的动画画面类似
+    '''
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.empty((height, width, 4), dtype=np.uint8)
+    base[..., 0] = x * 255 // max(1, width - 1)
+    base[..., 1] = y * 255 // max(1, height - 1)
+    base[..., 2] = 96
+    base[..., 3] = 255
+
+    size = max(1, min(width, height) // 6)
+    frames: list[bytes] = []
+    for i in range(count):
+        frame = base.copy()
+        cx = (width - size) * i // max(1, count - 1)
+        cy = (height - size) // 2
+        frame[cy: cy + size, cx: cx + size, :3] = (255, 255 - i * 8 % 256, i * 8 % 256)
+        frames.append(frame.tobytes())
+    return frames
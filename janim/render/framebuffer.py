@@ -20,7 +20,7 @@ def register_qt_glwidget(w: GLWidget) -> None:
     _qt_glwidget = w
 
 
-def create_framebuffer(ctx: mgl.Context, pw: int, ph: int) -> mgl.Framebuffer:
+def create_framebuffer(ctx: mgl.Context, pw: int, ph: int, *, dtype: str = 'f1') -> mgl.Framebuffer:
     on_qt = _qt_glwidget is not None and _qt_glwidget.ctx is ctx
     if on_qt:
         prev = _qt_glwidget.qfuncs.glGetIntegerv(0x8CA6)   # GL_FRAMEBUFFER_BINDING
@@ -30,6 +30,7 @@ def create_framebuffer(ctx: mgl.Context, pw: int, ph: int) -> mgl.Framebuffer:
             (pw, ph),
             components=4,
             samples=0,
+            dtype=dtype
         ),
         depth_attachment=ctx.depth_renderbuffer(
             (pw, ph),
@@ -0,0 +1,668 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import linecache
+import os
+import shutil
+import sys
+import sysconfig
+import time
+import types
+from bisect import bisect_left, bisect_right
+from enum import Enum
+from functools import lru_cache, partial
+from typing import Any
+
+import numpy as np
+from scipy.spatial.transform import Rotation
+from tqdm import tqdm as ProgressDisplay
+
+import janim
+from janim.anims.anim_stack import AnimStack
+from janim.anims.animation import Animation, TimeRange
+from janim.anims.display import Display
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.components.component import Component, _CmptGroup
+from janim.components.depth import Cmpt_Depth
+from janim.constants import FOREVER
+from janim.exception import FFmpegError
+from janim.items.item import Item
+from janim.locale.i18n import get_local_strings
+from janim.logger import log
+from janim.render.writer import VideoWriter, concat_videos
+from janim.utils.data import Array
+from janim.utils.signal import SIGNAL_OBJ_SLOTS_NAME
+
+_ = get_local_strings('incremental')
+
+MANIFEST_VERSION = 2
+
+# 组件中与数据无关的属性（绑定信息以及缓存）
+SKIPPED_CMPT_ATTRS = {'bind', 'refresh_data', SIGNAL_OBJ_SLOTS_NAME}
+
+# 类中与其行为无关的属性
+SKIPPED_CLASS_ATTRS = {
+    '__module__', '__qualname__', '__doc__', '__dict__', '__weakref__', '__annotations__',
+    '__firstlineno__', '__static_attributes__', '__parameters__', '__orig_bases__', '__type_params__'
+}
+
+# 标准库以及第三方库所在的路径，参考 Fingerprinter.is_library_module
+LIBRARY_PATHS = {
+    os.path.abspath(path)
+    for name in ('stdlib', 'platstdlib', 'purelib', 'platlib')
+    if (path := sysconfig.get_paths().get(name)) is not None
+}
+
+
+class Unhashable(Exception):
+    '''
+    对象中含有无法稳定计算摘要的内容，此时对应的分段总是被视为发生了变化
+    '''
+
+
+class Fingerprinter:
+    '''
+    计算对象的摘要，用于判断两次构建之间动画数据是否发生变化
+
+    - 只会对能够稳定表示的内容（数值、字符串、数组、物件组件数据、函数的字节码等）计算摘要，
+      遇到其它类型的对象或者超过 ``max_depth`` 层的嵌套时会抛出 :class:`Unhashable`，
+      使得对应的分段总是被重新渲染，而不会错误地复用旧的分段
+    - 函数会计算其字节码、常量、用到的名称以及这些名称在 ``__globals__`` 中对应的值、闭包中的值和默认参数，
+      嵌套的函数（例如函数中定义的 ``lambda``）也会被递归地计算；用户代码中定义的类会计算其基类以及类中定义的方法和属性；
+      库（janim、标准库以及第三方库）中的函数、类和模块只记录其名称，因为它们的变化已经由版本号等覆盖
+    - :class:`~.Array` 的数据是只读的，所以会按照 id 缓存其摘要
+    - :class:`~.Cmpt_Depth` 的绘制顺序记录为相对于 ``depth_counter`` （构建开始时的计数）的值
+    - ``item_indices`` 中的物件（即时间轴中被跟踪的物件）只记录其序号，
+      因为这些物件在构建结束后的状态与动画无关，其变化已经由各自的 :class:`~.Display` 记录
+    '''
+    def __init__(
+        self,
+        item_indices: dict[int, int] | None = None,
+        depth_counter: dict[float, int] | None = None,
+        max_depth: int = 8
+    ):
+        self.item_indices = item_indices or {}
+        self.depth_counter = depth_counter or {}
+        self.max_depth = max_depth
+        # 同时持有对象本身，避免对象被回收后 id 被复用
+        self.array_cache: dict[int, tuple[np.ndarray, bytes]] = {}
+        self.anim_cache: dict[int, tuple[Animation, bytes | None]] = {}
+        # 正在计算的动画的时间区段，参考 feed_stack
+        self.anim_ranges: list[TimeRange] = []
+        # 正在计算的函数和类，用于处理递归引用自身的情况
+        self.visiting: set[int] = set()
+
+    def digest(self, obj: Any) -> bytes | None:
+        '''
+        计算 ``obj`` 的摘要，无法计算时返回 ``None``
+        '''
+        h = hashlib.md5()
+        try:
+            self.feed(h, obj, 0)
+        except Unhashable:
+            return None
+        return h.digest()
+
+    def anim_digest(self, anim: Animation) -> bytes | None:
+        '''
+        计算动画的摘要，无法计算时返回 ``None``
+        '''
+        cached = self.anim_cache.get(id(anim))
+        if cached is not None:
+            return cached[1]
+
+        # 先放入占位，避免动画之间相互引用导致无限递归
+        self.anim_cache[id(anim)] = (anim, b'')
+
+        h = hashlib.md5()
+        h.update(type(anim).__qualname__.encode())
+        try:
+            if isinstance(anim, Display):
+                # Display 的作用与其时间区段无关，只取决于所记录的物件数据
+                self.feed(h, anim.data_orig, 0)
+            else:
+                h.update(repr((anim.t_range.at, anim.t_range.end)).encode())
+                self.anim_ranges.append(anim.t_range)
+                try:
+                    for key, value in vars(anim).items():
+                        if key in ('parent', 'timeline', 't_range'):
+                            continue
+                        h.update(key.encode())
+                        self.feed(h, value, 1)
+                finally:
+                    self.anim_ranges.pop()
+        except Unhashable:
+            digest = None
+        else:
+            digest = h.digest()
+
+        self.anim_cache[id(anim)] = (anim, digest)
+        return digest
+
+    def feed(self, h, obj: Any, depth: int) -> None:
+        if obj is None or isinstance(obj, (bool, int, float, complex, str, Enum)):
+            h.update(repr(obj).encode())
+
+        elif isinstance(obj, bytes):
+            h.update(obj)
+
+        elif isinstance(obj, Array):
+            self.feed_ndarray(h, obj.data)
+
+        elif isinstance(obj, np.ndarray):
+            self.feed_ndarray(h, obj)
+
+        elif isinstance(obj, np.generic):
+            h.update(repr(obj.item()).encode())
+
+        elif isinstance(obj, Rotation):
+            self.feed_ndarray(h, obj.as_quat())
+
+        elif isinstance(obj, Item):
+            h.update(type(obj).__qualname__.encode())
+            idx = self.item_indices.get(id(obj))
+            if idx is not None:
+                h.update(f'tracked{idx}'.encode())
+                return
+            for key, cmpt in obj.components.items():
+                h.update(key.encode())
+                self.feed(h, cmpt, depth)
+
+        elif isinstance(obj, Animation):
+            digest = self.anim_digest(obj)
+            if digest is None:
+                raise Unhashable()
+            h.update(digest)
+
+        elif isinstance(obj, Timeline.ItemAppearance):
+            h.update(repr(obj.visibility).encode())
+            self.feed(h, obj.stack, depth)
+
+        elif isinstance(obj, AnimStack):
+            self.feed_stack(h, obj, depth)
+
+        elif isinstance(obj, (types.ModuleType, types.BuiltinFunctionType, np.ufunc)) \
+                or isinstance(obj, type) and self.is_library_module(obj.__module__):
+            h.update(self.get_name(obj).encode())
+
+        elif isinstance(obj, types.FunctionType) and self.is_library_module(obj.__module__):
+            h.update(self.get_name(obj).encode())
+
+        elif depth >= self.max_depth:
+            raise Unhashable()
+
+        elif isinstance(obj, Cmpt_Depth):
+            # 绘制顺序的计数在进程中是全局的，记录相对于构建开始时的值
+            order = obj._order - self.depth_counter.get(obj._depth, 0)
+            h.update(repr((obj._depth, order)).encode())
+
+        elif isinstance(obj, _CmptGroup):
+            # 组合的组件都已经作为物件的组件计算过了
+            h.update(type(obj).__qualname__.encode())
+
+        elif isinstance(obj, Component):
+            h.update(type(obj).__qualname__.encode())
+            for key, value in vars(obj).items():
+                if key in SKIPPED_CMPT_ATTRS or isinstance(value, Item):
+                    continue
+                h.update(key.encode())
+                self.feed(h, value, depth + 1)
+
+        elif isinstance(obj, (list, tuple)):
+            h.update(f'{type(obj).__name__}{len(obj)}'.encode())
+            for value in obj:
+                self.feed(h, value, depth + 1)
+
+        elif isinstance(obj, dict):
+            h.update(f'dict{len(obj)}'.encode())
+            for key, value in obj.items():
+                self.feed(h, key, depth + 1)
+                self.feed(h, value, depth + 1)
+
+        elif dataclasses.is_dataclass(obj):
+            h.update(type(obj).__qualname__.encode())
+            for field in dataclasses.fields(obj):
+                h.update(field.name.encode())
+                self.feed(h, getattr(obj, field.name), depth + 1)
+
+        elif isinstance(obj, types.MethodType):
+            self.feed(h, obj.__self__, depth + 1)
+            self.feed(h, obj.__func__, depth + 1)
+
+        elif isinstance(obj, types.FunctionType):
+            self.feed_function(h, obj, depth)
+
+        elif isinstance(obj, type):
+            self.feed_class(h, obj, depth)
+
+        elif isinstance(obj, (staticmethod, classmethod)):
+            self.feed(h, obj.__func__, depth + 1)
+
+        elif isinstance(obj, property):
+            self.feed(h, (obj.fget, obj.fset, obj.fdel), depth + 1)
+
+        elif isinstance(obj, partial):
+            self.feed(h, (obj.func, obj.args, obj.keywords), depth + 1)
+
+        else:
+            raise Unhashable()
+
+    def feed_stack(self, h, stack: AnimStack, depth: int) -> None:
+        '''
+        计算动画所引用的 :class:`~.AnimStack`
+
+        动画只会在其自身的时间区段中读取 :class:`~.AnimStack` 的结果，所以只计算与该时间区段重叠的部分，
+        使得之后的动画发生变化时不会影响之前的动画的摘要
+        '''
+        times = stack.times
+        at, end = 0, FOREVER
+        if self.anim_ranges:
+            at, end = self.anim_ranges[-1].at, self.anim_ranges[-1].end
+
+        begin_idx = max(0, bisect_right(times, at) - 1)
+        end_idx = len(times) if end is FOREVER else bisect_right(times, end)
+        for i in range(begin_idx, end_idx):
+            h.update(repr((max(times[i], at), len(stack.stacks[i]))).encode())
+            for anim in stack.stacks[i]:
+                self.feed(h, anim, depth)
+
+    def feed_function(self, h, func: types.FunctionType, depth: int) -> None:
+        h.update(func.__qualname__.encode())
+        if id(func) in self.visiting:
+            h.update(b'recursive')
+            return
+
+        self.visiting.add(id(func))
+        try:
+            self.feed_code(h, func.__code__, func.__globals__, depth)
+            self.feed(h, func.__defaults__, depth + 1)
+            self.feed(h, func.__kwdefaults__, depth + 1)
+            for cell in func.__closure__ or ():
+                try:
+                    contents = cell.cell_contents
+                except ValueError:  # 尚未赋值的闭包变量
+                    h.update(b'empty cell')
+                else:
+                    self.feed(h, contents, depth + 1)
+        finally:
+            self.visiting.discard(id(func))
+
+    def feed_class(self, h, cls: type, depth: int) -> None:
+        '''
+        计算在用户代码中定义的类，包括基类以及类中定义的方法和属性
+        '''
+        h.update(self.get_name(cls).encode())
+        if id(cls) in self.visiting:
+            h.update(b'recursive')
+            return
+
+        self.visiting.add(id(cls))
+        try:
+            self.feed(h, cls.__bases__, depth + 1)
+            for key, value in vars(cls).items():
+                if key in SKIPPED_CLASS_ATTRS:
+                    continue
+                h.update(key.encode())
+                self.feed(h, value, depth + 1)
+        finally:
+            self.visiting.discard(id(cls))
+
+    def feed_code(self, h, code: types.CodeType, globals: dict[str, Any], depth: int) -> None:
+        '''
+        计算字节码、常量以及用到的名称，名称在 ``globals`` 中时还会计算其对应的值，嵌套的字节码会被递归计算
+        '''
+        h.update(code.co_code)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                self.feed_code(h, const, globals, depth + 1)
+            else:
+                self.feed(h, const, depth + 1)
+
+        for name in code.co_names:
+            h.update(name.encode())
+            if name in globals:
+                self.feed(h, globals[name], depth + 1)
+
+    @staticmethod
+    def get_name(obj: Any) -> str:
+        module = getattr(obj, '__module__', None)
+        if isinstance(obj, types.ModuleType):
+            return obj.__name__
+        name = getattr(obj, '__qualname__', None) or getattr(obj, '__name__', None) or type(obj).__qualname__
+        return f'{module}.{name}'
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def is_library_module(module_name: str | None) -> bool:
+        '''
+        模块是否属于 janim、标准库或者第三方库，这些模块中的代码不会在两次输出之间变化
+        '''
+        if module_name is None:
+            return False
+        if module_name == 'janim' or module_name.startswith('janim.'):
+            return True
+        module = sys.modules.get(module_name, None)
+        if module is None:
+            return False
+        if getattr(module.__spec__, 'origin', None) in ('built-in', 'frozen'):
+            return True
+        file = getattr(module, '__file__', None)
+        if file is None:
+            return False
+        file = os.path.abspath(file)
+        return any(file.startswith(path + os.sep) for path in LIBRARY_PATHS)
+
+    def feed_ndarray(self, h, arr: np.ndarray) -> None:
+        cached = self.array_cache.get(id(arr))
+        if cached is None:
+            sub = hashlib.md5()
+            sub.update(f'{arr.dtype}{arr.shape}'.encode())
+            sub.update(np.ascontiguousarray(arr).tobytes())
+            cached = self.array_cache[id(arr)] = (arr, sub.digest())
+        h.update(cached[1])
+
+
+def fingerprint_segments(
+    built: BuiltTimeline,
+    ext: str,
+    segment_frames: int,
+    render_options: tuple = ()
+) -> tuple[str, list[str]]:
+    '''
+    计算每个分段的摘要
+
+    返回值的第一个元素是全局摘要（与配置、输出格式、``render_options`` 等有关），第二个元素是各个分段的摘要
+
+    每个分段的摘要由以下内容决定：
+
+    - 在该时间区段中作用的动画（即 :class:`~.AnimStack` 中的 ``times`` 和 ``stacks``）以及物件的显示状态
+    - 在该时间区段中执行的 :meth:`~.Timeline.construct` 代码行（根据 :class:`~.Timeline.TimeOfCode` 得到）
+    - 额外的渲染调用
+
+    如果分段中有无法计算摘要的内容（参考 :class:`Fingerprinter`），该分段的摘要为 ``None``，表示总是需要重新渲染
+    '''
+    timeline = built.timeline
+    cfg = built.cfg
+    fps = cfg.fps
+    frame_count = round(built.duration * fps) + 1
+    fingerprinter = Fingerprinter(
+        {
+            id(item): idx
+            for idx, item in enumerate(timeline.item_appearances.keys())
+        },
+        timeline.depth_counter_at_build
+    )
+
+    global_h = hashlib.md5()
+    global_h.update(repr((
+        MANIFEST_VERSION,
+        janim.__version__,
+        ext,
+        fps,
+        cfg.pixel_width,
+        cfg.pixel_height,
+        cfg.frame_width,
+        cfg.frame_height,
+        cfg.anti_alias_width,
+        str(cfg.background_color),
+        # 编码参数不同的分段无法无损拼接
+        cfg.video_codec,
+        cfg.video_encoder,
+        cfg.video_preset,
+        cfg.video_crf,
+        cfg.video_pix_fmt,
+        render_options,
+    )).encode())
+
+    try:
+        file_name = inspect.getfile(timeline.__class__)
+    except (TypeError, OSError):
+        file_name = None
+    else:
+        linecache.checkcache(file_name)
+
+    toc = timeline.times_of_code
+    toc_times = [item.time for item in toc]
+    apprs = list(timeline.item_appearances.values())
+    camera_appr = timeline.item_appearances[timeline.camera]
+
+    segments: list[str | None] = []
+
+    for start in range(0, frame_count, segment_frames):
+        end = min(start + segment_frames, frame_count)
+        t0 = start / fps
+        t1 = (end - 1) / fps
+        h = hashlib.md5()
+        h.update(repr((start, end)).encode())
+        unhashable = False
+
+        for idx, appr in enumerate(apprs):
+            visible_at_begin = appr.is_visible_at(t0)
+            changes = [t for t in appr.visibility if t0 < t <= t1]
+            if appr is not camera_appr and not visible_at_begin and not changes:
+                continue
+
+            h.update(repr((idx, visible_at_begin, changes)).encode())
+
+            times = appr.stack.times
+            begin_idx = max(0, bisect_left(times, t0) - 1)
+            for i in range(begin_idx, len(times)):
+                if times[i] > t1:
+                    break
+                h.update(repr(max(times[i], t0)).encode())
+                for anim in appr.stack.stacks[i]:
+                    digest = fingerprinter.anim_digest(anim)
+                    if digest is None:
+                        unhashable = True
+                        break
+                    h.update(digest)
+                if unhashable:
+                    break
+            if unhashable:
+                break
+
+        for rcc in timeline.additional_render_calls_callbacks:
+            if rcc.t_range.at > t1 or (rcc.t_range.end is not FOREVER and rcc.t_range.end <= t0):
+                continue
+            h.update(repr((rcc.t_range.at, rcc.t_range.end)).encode())
+            digest = fingerprinter.digest(rcc.func)
+            if digest is None:
+                unhashable = True
+                break
+            h.update(digest)
+
+        if unhashable:
+            segments.append(None)
+            continue
+
+        # 在该区段中执行的代码行：第 i 条记录的代码行对应 (toc[i-1].time, toc[i].time] 的时间区段
+        if file_name is not None and toc:
+            begin_idx = bisect_left(toc_times, t0)
+            for i in range(begin_idx, len(toc)):
+                line = linecache.getline(file_name, toc[i].line).strip()
+                h.update(line.encode())
+                if toc[i].time >= t1:
+                    break
+
+        segments.append(h.hexdigest())
+
+    return global_h.hexdigest(), segments
+
+
+class IncrementalVideoWriter:
+    '''
+    增量输出视频，只重新渲染发生变化的时间区段
+
+    - 将视频按照 ``segment_duration`` 秒切分为若干段，各段的视频文件以及摘要记录（manifest）
+      保存在输出文件旁的 ``{name}_segments`` 文件夹中
+    - 再次输出时，对每段重新计算摘要（参考 :func:`fingerprint_segments`），
+      只有摘要发生变化的分段会被重新渲染，其余的直接复用，最后使用 ffmpeg 的 concat 无损拼接
+
+    摘要只覆盖了能够稳定表示的内容，如果某些改动没有被检测到（例如外部资源文件的变化），
+    删除 ``{name}_segments`` 文件夹即可强制完整地重新输出
+
+    与 :class:`~.VideoWriter` 一样，输出后可以通过 ``temp_file_path`` 和 ``final_file_path`` 得到文件路径，
+    并且可以通过 ``dirty_segments`` 得到被重新渲染的分段序号
+    '''
+    def __init__(self, built: BuiltTimeline, segment_duration: float = 2):
+        self.built = built
+        self.segment_frames = max(1, round(segment_duration * built.cfg.fps))
+        self.frame_count = round(built.duration * built.cfg.fps) + 1
+        self.dirty_segments: list[int] = []
+
+    @staticmethod
+    def writes(built: BuiltTimeline, file_path: str, *, quiet=False, use_pbo=True) -> None:
+        IncrementalVideoWriter(built).write_all(file_path, quiet=quiet, use_pbo=use_pbo)
+
+    def write_all(
+        self,
+        file_path: str,
+        *,
+        quiet=False,
+        use_pbo=True,
+        static_frame_cache=False,
+        premultiplied_alpha=False,
+        _keep_temp=False
+    ) -> None:
+        '''将时间轴动画输出到文件中
+
+        参数含义与 :meth:`~.VideoWriter.write_all` 相同
+        '''
+        stem, ext = os.path.splitext(file_path)
+        self.final_file_path = file_path
+        self.temp_file_path = stem + '_temp' + ext
+
+        if ext == '.gif':
+            log.warning(_('Incremental writing is not supported for gif, writing the whole video'))
+            VideoWriter(self.built).write_all(file_path,
+                                              quiet=quiet,
+                                              use_pbo=use_pbo,
+                                              static_frame_cache=static_frame_cache,
+                                              premultiplied_alpha=premultiplied_alpha,
+                                              _keep_temp=_keep_temp)
+            return
+
+        name = self.built.timeline.__class__.__name__
+        if not quiet:
+            log.info(_('Writing video "{name}" incrementally').format(name=name))
+            t = time.time()
+
+        segments_dir = stem + '_segments'
+        manifest_path = os.path.join(segments_dir, 'manifest.json')
+        os.makedirs(segments_dir, exist_ok=True)
+
+        # 预乘 alpha 只影响透明视频的输出
+        render_options = (ext == '.mov' and premultiplied_alpha,)
+        global_digest, digests = fingerprint_segments(self.built, ext, self.segment_frames, render_options)
+        segment_paths = [
+            os.path.abspath(os.path.join(segments_dir, f'segment_{i}{ext}'))
+            for i in range(len(digests))
+        ]
+
+        prev_digests = self.load_manifest(manifest_path, global_digest)
+        dirty = [
+            i
+            for i, (digest, path) in enumerate(zip(digests, segment_paths))
+            if digest is None
+            or i >= len(prev_digests)
+            or prev_digests[i] != digest
+            or not os.path.exists(path)
+        ]
+
+        self.dirty_segments = dirty
+
+        if not quiet:
+            log.info(
+                _('{dirty}/{total} segments need to be rendered')
+                .format(dirty=len(dirty), total=len(digests))
+            )
+
+        if dirty:
+            writer = VideoWriter(self.built)
+            dirty_frames = sum(
+                min(self.segment_frames, self.frame_count - i * self.segment_frames)
+                for i in dirty
+            )
+            with ProgressDisplay(total=dirty_frames, leave=False, dynamic_ncols=True) as progress_display:
+                for i in dirty:
+                    start = i * self.segment_frames
+                    end = min(start + self.segment_frames, self.frame_count)
+                    writer.write_all(segment_paths[i],
+                                     quiet=True,
+                                     use_pbo=use_pbo,
+                                     frame_range=(start, end),
+                                     static_frame_cache=static_frame_cache,
+                                     premultiplied_alpha=premultiplied_alpha,
+                                     _on_frame=partial(progress_display.update, 1))
+                    # 每完成一段就更新一次记录，使得中途退出时已完成的部分仍可复用
+                    self.save_manifest(manifest_path, global_digest, digests, dirty, i)
+
+        # 删除多余的旧分段
+        for i in range(len(digests), len(prev_digests)):
+            path = os.path.join(segments_dir, f'segment_{i}{ext}')
+            if os.path.exists(path):
+                os.remove(path)
+
+        try:
+            concat_videos(self.built.cfg.ffmpeg_bin, segment_paths, segments_dir, self.temp_file_path)
+        except FFmpegError:
+            # 无法确定是哪个分段导致拼接失败，删除记录使得下次输出时全部重新渲染
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+            raise
+        self.save_manifest(manifest_path, global_digest, digests, [], None)
+
+        if not _keep_temp:
+            shutil.move(self.temp_file_path, self.final_file_path)
+
+        if not quiet:
+            log.info(
+                _('Finished writing video "{name}" in {elapsed:.2f} s')
+                .format(name=name, elapsed=time.time() - t)
+            )
+
+            if not _keep_temp:
+                log.info(
+                    _('File saved to "{file_path}" (video only)')
+                    .format(file_path=file_path)
+                )
+
+    @staticmethod
+    def load_manifest(manifest_path: str, global_digest: str) -> list[str | None]:
+        try:
+            with open(manifest_path, 'rt', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return []
+
+        if manifest.get('version') != MANIFEST_VERSION or manifest.get('global') != global_digest:
+            return []
+        return manifest.get('segments', [])
+
+    @staticmethod
+    def save_manifest(
+        manifest_path: str,
+        global_digest: str,
+        digests: list[str | None],
+        dirty: list[int],
+        finished: int | None
+    ) -> None:
+        '''
+        保存摘要记录
+
+        ``dirty`` 中尚未完成（在 ``finished`` 之后）的分段会被记为 ``None``，使得下次输出时重新渲染
+        '''
+        segments: list[str | None] = digests.copy()
+        for i in dirty:
+            if finished is None or i > finished:
+                segments[i] = None
+
+        with open(manifest_path, 'wt', encoding='utf-8') as file:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'global': global_digest,
+                'segments': segments
+            }, file)
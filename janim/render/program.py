@@ -21,8 +21,13 @@ injection_ja_finish_up = '''if (!JA_BLENDING) {
     }
 '''
 
+# VItem 的逐物件绘制与合并绘制共用的着色部分，详见该文件开头的说明
+injection_ja_vitem_common = readall(os.path.join(get_janim_dir(), 'render/shaders/vitem_common.glsl'))
+
 shader_injection = {
     'fragment_shader': [
+        # 注入的内容中包含 #[JA_FINISH_UP]，所以需要先于其进行替换
+        ('#[JA_VITEM_COMMON]', injection_ja_vitem_common),
         ('#[JA_FINISH_UP]', injection_ja_finish_up)
     ]
 }
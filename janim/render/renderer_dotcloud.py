@@ -5,7 +5,8 @@ from typing import TYPE_CHECKING
 import moderngl as mgl
 import numpy as np
 
-from janim.render.base import Renderer
+from janim.render.arena import BufferArena
+from janim.render.base import RenderBounds, Renderer
 from janim.render.program import get_janim_program
 from janim.utils.iterables import resize_with_interpolation
 
@@ -17,21 +18,41 @@ class DotCloudRenderer(Renderer):
     def __init__(self):
         self.initialized = False
 
+    @staticmethod
+    def get_render_bounds(item: DotCloud) -> RenderBounds | None:
+        points = item.points._points.data
+        if len(points) == 0:
+            return None
+        # 点的半径是在投影前扩展的，所以直接扩展包围框
+        radius = item.radius._radii.data.max()
+        lo = points.min(axis=0) - radius
+        hi = points.max(axis=0) + radius
+        corners = np.array([
+            [x, y, z]
+            for x in (lo[0], hi[0])
+            for y in (lo[1], hi[1])
+            for z in (lo[2], hi[2])
+        ])
+        return RenderBounds(corners, 0, item._fix_in_frame)
+
     def init(self) -> None:
         self.prog = get_janim_program('render/shaders/dotcloud')
 
         self.u_fix = self.get_u_fix_in_frame(self.prog)
 
         self.ctx = self.data_ctx.get().ctx
-        self.vbo_points = self.ctx.buffer(reserve=1)
-        self.vbo_color = self.ctx.buffer(reserve=1)
-        self.vbo_radius = self.ctx.buffer(reserve=1)
-
-        self.vao = self.ctx.vertex_array(self.prog, [
-            (self.vbo_points, '3f', 'in_point'),
-            (self.vbo_color, '4f', 'in_color'),
-            (self.vbo_radius, '1f', 'in_radius')
-        ])
+        self.vbo_points = BufferArena.create_buffer(self.ctx)
+        self.vbo_color = BufferArena.create_buffer(self.ctx)
+        self.vbo_radius = BufferArena.create_buffer(self.ctx)
+
+        # 启用 BufferArena 时数据位于共享的 buffer 中，位置可能发生变化，所以在 bind_attributes 中绑定
+        self.vao = self.ctx.vertex_array(self.prog, [])
+        self.attributes = [
+            (self.vbo_points, '3f', self.prog['in_point'].location),
+            (self.vbo_color, '4f', self.prog['in_color'].location),
+            (self.vbo_radius, '1f', self.prog['in_radius'].location)
+        ]
+        self.bound_locations = None
 
         self.prev_points = None
         self.prev_color = None
@@ -78,5 +99,17 @@ class DotCloudRenderer(Renderer):
             self.vbo_points.write(bytes)
             self.prev_points = new_points
 
+        self.bind_attributes()
         self.update_fix_in_frame(self.u_fix, item)
         self.vao.render(mgl.POINTS, vertices=len(self.prev_points))
+
+    def bind_attributes(self) -> None:
+        '''
+        将各个属性绑定到 buffer 在 :class:`~.BufferArena` 中的位置，仅在位置发生变化时重新绑定
+        '''
+        locations = [(vbo.buffer, vbo.offset) for vbo, _, _ in self.attributes]
+        if locations == self.bound_locations:
+            return
+        for vbo, fmt, location in self.attributes:
+            self.vao.bind(location, 'f', vbo.buffer, fmt, offset=vbo.offset)
+        self.bound_locations = locations
@@ -33,6 +33,8 @@ void main()
 
 
 class FrameEffectRenderer(Renderer):
+    time_dependent = True
+
     def __init__(self):
         self.initialized: bool = False
 
@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 import moderngl as mgl
 import numpy as np
 
-from janim.render.base import Renderer
+from janim.render.base import RenderBounds, Renderer
 from janim.render.framebuffer import FRAME_BUFFER_BINDING
 from janim.render.program import get_janim_program
 from janim.render.texture import get_texture_from_img
@@ -19,6 +19,12 @@ class ImageItemRenderer(Renderer):
     def __init__(self):
         self.initialized: bool = False
 
+    @staticmethod
+    def get_render_bounds(item: ImageItem) -> RenderBounds | None:
+        if len(item.points._points.data) == 0:
+            return None
+        return RenderBounds(np.array(item.points.self_box.get_corners()), 0, item._fix_in_frame)
+
     def init(self) -> None:
         self.prog = get_janim_program('render/shaders/image')
 
@@ -22,6 +22,8 @@ _ = get_local_strings('renderer_video')
 
 
 class VideoRenderer(Renderer):
+    time_dependent = True
+
     def __init__(self):
         self.initialized: bool = False
 
@@ -6,7 +6,9 @@ import moderngl as mgl
 import numpy as np
 import OpenGL.GL as gl
 
-from janim.render.base import Renderer
+from janim.components.packed import PackedRun, PackedStore
+from janim.render.arena import ArenaBuffer, BufferArena, DedicatedBuffer
+from janim.render.base import RenderBounds, Renderer
 from janim.render.program import get_janim_compute_shader, get_janim_program
 from janim.utils.iterables import resize_with_interpolation
 
@@ -18,6 +20,16 @@ class VItemRenderer(Renderer):
     def __init__(self):
         self.initialized: bool = False
 
+    @staticmethod
+    def get_render_bounds(item: VItem) -> RenderBounds | None:
+        if len(item.points._points.data) < 3:
+            return None
+        # 与 render 中 clip_box 的计算方式一致
+        buff = item.radius._radii._data.max()
+        if item.glow._rgba._data[3] != 0.0:
+            buff = max(buff, item.glow._size)
+        return RenderBounds(np.array(item.points.self_box.get_corners()), buff, item._fix_in_frame)
+
     def render(self, item: VItem) -> None:
         self.ctx = self.data_ctx.get().ctx
         compatibility = self.ctx.version_code < 430
@@ -239,11 +251,12 @@ class VItemRenderer(Renderer):
         self.u_glow_size = self.prog['glow_size']
 
         self.vbo_coord = self.ctx.buffer(reserve=4 * 2 * 4)
-        self.vbo_points = self.ctx.buffer(reserve=1)
-        self.vbo_mapped_points = self.ctx.buffer(reserve=1)
-        self.vbo_radius = self.ctx.buffer(reserve=1)
-        self.vbo_stroke_color = self.ctx.buffer(reserve=1)
-        self.vbo_fill_color = self.ctx.buffer(reserve=1)
+        # 通过 storage buffer 读取的数据，启用 BufferArena 时从共享的 slab 中分配
+        self.vbo_points = BufferArena.create_buffer(self.ctx)
+        self.vbo_mapped_points = BufferArena.create_buffer(self.ctx)
+        self.vbo_radius = BufferArena.create_buffer(self.ctx)
+        self.vbo_stroke_color = BufferArena.create_buffer(self.ctx)
+        self.vbo_fill_color = BufferArena.create_buffer(self.ctx)
 
         self.vao = self.ctx.vertex_array(self.prog, self.vbo_coord, 'in_coord')
 
@@ -372,6 +385,7 @@ class VItemRenderer(Renderer):
             self.vbo_points.bind_to_storage_buffer(0)
             self.vbo_mapped_points.bind_to_storage_buffer(1)
             self.update_fix_in_frame(self.comp_u_fix, item)
+            self.vbo_mapped_points.before_shader_write()
             self.comp.run(group_x=(len(new_points) + 255) // 256)   # 相当于 len() / 256 向上取整
 
             self.prev_fix_in_frame = new_fix_in_frame
@@ -392,3 +406,404 @@ class VItemRenderer(Renderer):
         self.vao.render(mgl.TRIANGLE_STRIP)
 
     # endregion
+
+
+class _BatchEntry:
+    '''
+    :class:`VItemBatchRenderer` 中单个物件预处理后的数据
+
+    只与物件的点、半径、颜色数据有关，因此可以在这些数据不变时跨帧复用
+
+    半径与颜色保持原本的长度，插值到锚点数量的操作在 ``map_vitem_batch.comp.glsl`` 中进行
+    '''
+    def __init__(self, item: VItem):
+        # 持有原数据的引用，避免原数据被回收后 id 被复用导致缓存错误
+        self.refs = (
+            item.points._points.data,
+            item.radius._radii._data,
+            item.stroke._rgbas._data,
+            item.fill._rgbas._data
+        )
+        points, radius, stroke, fill = self.refs
+
+        self.anchors = (len(points) + 1) // 2
+
+        self.points = np.empty((len(points), 4), dtype=np.float32)
+        self.points[:, :3] = points
+        self.points[:, 3] = item.points.get_closepath_flags().astype(np.float32)
+
+        self.radius = radius
+        # 描边颜色与填充颜色依次存放，在着色器中共用一个 buffer
+        self.colors = np.concatenate([stroke, fill])
+        self.stroke_count = len(stroke)
+        self.fill_transparent = item.fill.is_transparent()
+
+        self.corners = np.array(item.points.self_box.get_corners())
+        self.radius_max = radius.max()
+
+    @staticmethod
+    def key_of(item: VItem) -> tuple[int, int, int, int]:
+        return (
+            id(item.points._points.data),
+            id(item.radius._radii._data),
+            id(item.stroke._rgbas._data),
+            id(item.fill._rgbas._data)
+        )
+
+
+class _PackedBatch:
+    '''
+    将一组 :class:`_BatchEntry` 的数据按属性打包为连续的数组，每个物件占据其中的一段切片
+
+    在物件数量以及各自的数据长度都不变时，只需要覆写发生变化的物件所对应的切片，
+    而不用重新拼接整个数组，对于大量小物件中只有少数发生变化的情况可以明显减少开销
+
+    如果这组物件恰好是 :class:`~.PackedStore` 中相连的一段，则通过 :meth:`use_run` 直接使用其中的数据，
+    不需要构建 :class:`_BatchEntry`
+    '''
+    ATTRS = ('points', 'radius', 'colors')
+
+    def __init__(self):
+        self.entries: list[_BatchEntry] = []
+        self.run: PackedRun | None = None
+        self.arrays: dict[str, np.ndarray] = {}
+        # 各属性中每个物件的起始位置，长度为物件数量 + 1
+        self.offsets: dict[str, np.ndarray] = {}
+
+        # 每个物件的信息，用于 compute_sources_info 以及 VItemBatchRenderer.compute_items_info
+        self.stroke_counts: np.ndarray = np.empty(0, dtype=int)
+        self.fill_transparent: np.ndarray = np.empty(0, dtype=bool)
+        self.corners: np.ndarray = np.empty((0, 3), dtype=np.float32)
+        self.radius_max: np.ndarray = np.empty(0, dtype=np.float32)
+
+    def use_run(self, run: PackedRun) -> bool:
+        '''
+        使用 :class:`~.PackedStore` 中的一段数据，返回是否需要重新上传（与先前使用的不是同一段时）
+
+        半径与颜色直接引用打包数组中的范围，点数据只需要一次拼接上闭合路径的标记
+        '''
+        if run.is_same(self.run):
+            return False
+        self.run = run
+        self.entries = []
+
+        store = run.store
+        points_start = store.offsets['points'][run.begin]
+        points_stop = store.offsets['points'][run.end]
+
+        points = self.arrays['points'] = np.empty((points_stop - points_start, 4), dtype=np.float32)
+        points[:, :3] = run.array('points')
+        points[:, 3] = store.closepath_flags[points_start: points_stop]
+        self.arrays['radius'] = run.array('radius')
+        self.arrays['colors'] = run.array('colors')
+
+        for attr in ('points', 'radius', 'colors', 'anchors'):
+            self.offsets[attr] = run.offsets(attr)
+
+        self.stroke_counts = store.stroke_counts[run.begin: run.end]
+        self.fill_transparent = store.fill_transparent[run.begin: run.end]
+        self.corners = store.corners(run.begin, run.end)
+        self.radius_max = store.radius_max[run.begin: run.end]
+        return True
+
+    def update(self, batch: list[_BatchEntry]) -> dict[str, list[tuple[int, int]]] | None:
+        '''
+        用 ``batch`` 更新打包的数据
+
+        - 如果需要重新打包（物件数量或者数据长度发生了变化），返回 ``None``
+        - 否则返回各属性中被覆写的范围 ``(start, end)``，没有变化时为空列表
+        '''
+        prev = self.entries
+        self.entries = batch
+        self.run = None
+
+        if len(batch) != len(prev) or any(
+            len(a.points) != len(b.points)
+            or len(a.radius) != len(b.radius)
+            or len(a.colors) != len(b.colors)
+            or a.stroke_count != b.stroke_count
+            for a, b in zip(batch, prev)
+        ):
+            self.repack()
+            return None
+
+        changed = [i for i, (a, b) in enumerate(zip(batch, prev)) if a is not b]
+        if not changed:
+            return {attr: [] for attr in self.ATTRS}
+        self.update_items_info()
+
+        # 合并相邻的物件，减少写入的次数
+        groups: list[list[int]] = [[changed[0], changed[0] + 1]]
+        for i in changed[1:]:
+            if i == groups[-1][1]:
+                groups[-1][1] = i + 1
+            else:
+                groups.append([i, i + 1])
+
+        ranges: dict[str, list[tuple[int, int]]] = {}
+        for attr in self.ATTRS:
+            array = self.arrays[attr]
+            offsets = self.offsets[attr]
+            attr_ranges = ranges[attr] = []
+            for begin, end in groups:
+                start, stop = offsets[begin], offsets[end]
+                array[start:stop] = np.concatenate([getattr(entry, attr) for entry in batch[begin:end]])
+                attr_ranges.append((start, stop))
+
+        return ranges
+
+    def repack(self) -> None:
+        for attr in self.ATTRS:
+            datas = [getattr(entry, attr) for entry in self.entries]
+            self.arrays[attr] = np.concatenate(datas)
+            self.offsets[attr] = self.get_offsets([len(data) for data in datas])
+
+        self.offsets['anchors'] = self.get_offsets([entry.anchors for entry in self.entries])
+        self.update_items_info()
+
+    def update_items_info(self) -> None:
+        self.stroke_counts = np.array([entry.stroke_count for entry in self.entries])
+        self.fill_transparent = np.array([entry.fill_transparent for entry in self.entries])
+        self.corners = np.concatenate([entry.corners for entry in self.entries])
+        self.radius_max = np.array([entry.radius_max for entry in self.entries])
+
+    @staticmethod
+    def get_offsets(counts: list[int]) -> np.ndarray:
+        offsets = np.zeros(len(counts) + 1, dtype=int)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets
+
+    def compute_sources_info(self) -> np.ndarray:
+        '''
+        计算 ``map_vitem_batch.comp.glsl`` 中使用的数据来源表，每个物件占用 12 个 int，依次为：
+
+        - ``(point_start, point_count, anchor_start, 0)``
+        - ``(radius_start, radius_count, 0, 0)``
+        - ``(stroke_start, stroke_count, fill_start, fill_count)``
+        '''
+        info = np.zeros((len(self.stroke_counts), 12), dtype=np.int32)
+
+        for i, attr in enumerate(('points', 'radius')):
+            offsets = self.offsets[attr]
+            info[:, i * 4] = offsets[:-1]
+            info[:, i * 4 + 1] = np.diff(offsets)
+        info[:, 2] = self.offsets['anchors'][:-1]
+
+        stroke_counts = self.stroke_counts
+        colors_offsets = self.offsets['colors']
+        info[:, 8] = colors_offsets[:-1]
+        info[:, 9] = stroke_counts
+        info[:, 10] = colors_offsets[:-1] + stroke_counts
+        info[:, 11] = np.diff(colors_offsets) - stroke_counts
+
+        return info
+
+
+class VItemBatchRenderer(Renderer):
+    '''
+    将多个连续绘制的 :class:`~.VItem` 合并到同一组 buffer 中，通过一次实例化绘制（instancing）完成渲染
+
+    - 所有物件的点数据依次拼接，只需要一次 compute shader 的调用进行映射，
+      并且同时将半径、颜色插值到锚点的数量（参考 ``map_vitem_batch.comp.glsl``），不需要在 CPU 上逐个物件进行插值
+    - 每个物件在各个 buffer 中的偏移以及其它属性记录在物件信息表中，由着色器根据 ``gl_InstanceID`` 读取
+    - 由于同一次绘制中的图元按照实例的顺序进行混合，所以结果与逐个绘制一致
+
+    仅在 OpenGL 4.3 及以上、且开启 blending 时使用，另见 :meth:`~.BuiltTimeline.render_all`
+    '''
+    FLAG_STROKE_BACKGROUND = 1
+    FLAG_FILL_TRANSPARENT = 2
+
+    def __init__(self):
+        self.initialized: bool = False
+
+    def init(self) -> None:
+        self.ctx = self.data_ctx.get().ctx
+
+        self.comp = get_janim_compute_shader('render/shaders/map_vitem_batch.comp.glsl')
+        self.comp_u_fix = self.get_u_fix_in_frame(self.comp)
+        self.comp_u_point_total = self.comp['point_total']
+
+        self.prog = get_janim_program('render/shaders/vitem_batch')
+        self.u_fix = self.get_u_fix_in_frame(self.prog)
+
+        # compute shader 的输入
+        self.vbo_points = BufferArena.create_buffer(self.ctx)
+        self.vbo_radius = BufferArena.create_buffer(self.ctx)
+        self.vbo_colors = BufferArena.create_buffer(self.ctx)
+        self.vbo_sources = BufferArena.create_buffer(self.ctx)
+        # compute shader 的输出，也是绘制时的输入
+        self.vbo_mapped_points = BufferArena.create_buffer(self.ctx)
+        self.vbo_mapped_radius = BufferArena.create_buffer(self.ctx)
+        self.vbo_mapped_stroke_color = BufferArena.create_buffer(self.ctx)
+        self.vbo_mapped_fill_color = BufferArena.create_buffer(self.ctx)
+        self.vbo_items = BufferArena.create_buffer(self.ctx)
+
+        self.vao = self.ctx.vertex_array(self.prog, [])
+
+        self.entries: dict[tuple[int, int, int, int], _BatchEntry] = {}
+        self.packed = _PackedBatch()
+        self.prev_attrs: list[tuple] = []
+        self.prev_camera_info = None
+        self.prev_fix_in_frame = None
+
+    @staticmethod
+    def write_buffer(buffer: ArenaBuffer | DedicatedBuffer, data: np.ndarray) -> None:
+        bytes = data.tobytes()
+        if len(bytes) != buffer.size:
+            buffer.orphan(len(bytes))
+        buffer.write(bytes)
+
+    @staticmethod
+    def reserve_buffer(buffer: ArenaBuffer | DedicatedBuffer, size: int) -> None:
+        if size != buffer.size:
+            buffer.orphan(size)
+
+    def render(self, items: list[VItem]) -> None:
+        if not self.initialized:
+            self.init()
+            self.initialized = True
+
+        render_data = self.data_ctx.get()
+        camera_info = render_data.camera_info
+        fix_in_frame = items[0]._fix_in_frame
+
+        run = PackedStore.find_run(items)
+        if run is not None:
+            # 这组物件的数据都在 PackedStore 中依次相连，不需要逐个物件预处理
+            self.entries = {}
+            ranges = None if self.packed.use_run(run) else {attr: [] for attr in _PackedBatch.ATTRS}
+        else:
+            # 得到各个物件预处理后的数据，数据没有变化的物件直接复用先前的结果
+            entries: dict[tuple[int, int, int, int], _BatchEntry] = {}
+            batch: list[_BatchEntry] = []
+            for item in items:
+                key = _BatchEntry.key_of(item)
+                entry = entries.get(key) or self.entries.get(key)
+                if entry is None:
+                    entry = _BatchEntry(item)
+                entries[key] = entry
+                batch.append(entry)
+            self.entries = entries
+
+            ranges = self.packed.update(batch)
+        is_data_changed = ranges is None or any(ranges.values())
+        is_camera_changed = camera_info is not self.prev_camera_info
+
+        if is_data_changed:
+            buffers = {
+                'points': self.vbo_points,
+                'radius': self.vbo_radius,
+                'colors': self.vbo_colors
+            }
+            for attr, buffer in buffers.items():
+                array = self.packed.arrays[attr]
+                if ranges is None:
+                    self.write_buffer(buffer, array)
+                    continue
+                # 布局不变时只上传发生变化的切片
+                row_size = array[:1].nbytes
+                for start, stop in ranges[attr]:
+                    buffer.write(array[start:stop].tobytes(), offset=start * row_size)
+
+        if ranges is None:
+            self.write_buffer(self.vbo_sources, self.packed.compute_sources_info())
+
+            anchors = self.packed.offsets['anchors'][-1]
+            self.reserve_buffer(self.vbo_mapped_points, self.vbo_points.size)
+            # 保证长度一定是 4 的倍数，因为绘制时以 vec4 的形式读取
+            self.reserve_buffer(self.vbo_mapped_radius, (anchors + 3) // 4 * 16)
+            self.reserve_buffer(self.vbo_mapped_stroke_color, anchors * 16)
+            self.reserve_buffer(self.vbo_mapped_fill_color, anchors * 16)
+
+        if is_data_changed or is_camera_changed or fix_in_frame != self.prev_fix_in_frame:
+            point_total = len(self.packed.arrays['points'])
+
+            for binding, buffer in enumerate((
+                self.vbo_points,
+                self.vbo_radius,
+                self.vbo_colors,
+                self.vbo_sources,
+                self.vbo_mapped_points,
+                self.vbo_mapped_radius,
+                self.vbo_mapped_stroke_color,
+                self.vbo_mapped_fill_color
+            )):
+                buffer.bind_to_storage_buffer(binding)
+            self.comp_u_fix.value = fix_in_frame
+            self.comp_u_point_total.value = point_total
+            # 这些 buffer 属于同一个上下文，插入一次内存屏障即可
+            self.vbo_mapped_points.before_shader_write()
+            self.comp.run(group_x=(point_total + 255) // 256)   # 相当于 point_total / 256 向上取整
+
+        attrs = [
+            (item.glow._rgba._data, item.glow._size, item.stroke_background)
+            for item in items
+        ]
+
+        if is_data_changed \
+                or is_camera_changed \
+                or fix_in_frame != self.prev_fix_in_frame \
+                or any(a[0] is not b[0] or a[1:] != b[1:] for a, b in zip(attrs, self.prev_attrs)):
+            self.write_buffer(self.vbo_items, self.compute_items_info(attrs, fix_in_frame))
+
+        self.prev_attrs = attrs
+        self.prev_camera_info = camera_info
+        self.prev_fix_in_frame = fix_in_frame
+
+        self.vbo_mapped_points.bind_to_storage_buffer(0)
+        self.vbo_mapped_radius.bind_to_storage_buffer(1)
+        self.vbo_mapped_stroke_color.bind_to_storage_buffer(2)
+        self.vbo_mapped_fill_color.bind_to_storage_buffer(3)
+        self.vbo_items.bind_to_storage_buffer(4)
+
+        self.u_fix.value = fix_in_frame
+
+        self.vao.render(mgl.TRIANGLE_STRIP, vertices=4, instances=len(items))
+
+    def compute_items_info(self, attrs: list[tuple], fix_in_frame: bool) -> np.ndarray:
+        '''
+        计算物件信息表，每个物件占用 16 个 float，依次为：
+
+        - 裁剪区域 ``(min_x, min_y, max_x, max_y)``
+        - 偏移 ``(point_start, point_count, anchor_start, flags)``（以 int 存储）
+        - 辉光颜色
+        - 辉光大小
+        '''
+        render_data = self.data_ctx.get()
+        camera_info = render_data.camera_info
+
+        count = len(attrs)
+        info = np.zeros((count, 16), dtype=np.float32)
+        info_int = info.view(np.int32)
+
+        # 裁剪区域，与 VItemRenderer 中的计算方式一致，只是对所有物件一起进行
+        corners = self.packed.corners
+        if fix_in_frame:
+            clip_box = camera_info.map_fixed_in_frame_points(corners)
+        else:
+            clip_box = camera_info.map_points(corners)
+        clip_box *= camera_info.frame_radius
+        clip_box = clip_box.reshape(count, -1, 2)
+
+        glow_visible = np.array([glow_rgba[3] != 0.0 for glow_rgba, _, _ in attrs])
+        glow_size = np.array([size for _, size, _ in attrs])
+        buff = self.packed.radius_max + render_data.anti_alias_radius
+        buff = np.where(glow_visible, np.maximum(buff, glow_size), buff)
+
+        clip_min = np.min(clip_box, axis=1) - buff[:, np.newaxis]
+        clip_max = np.max(clip_box, axis=1) + buff[:, np.newaxis]
+        info[:, 0:2] = np.clip(clip_min / camera_info.frame_radius, -1, 1)
+        info[:, 2:4] = np.clip(clip_max / camera_info.frame_radius, -1, 1)
+
+        point_offsets = self.packed.offsets['points']
+        info_int[:, 4] = point_offsets[:-1]
+        info_int[:, 5] = np.diff(point_offsets)
+        info_int[:, 6] = self.packed.offsets['anchors'][:-1]
+        info_int[:, 7] = np.where([stroke_background for _, _, stroke_background in attrs],
+                                  self.FLAG_STROKE_BACKGROUND, 0) \
+            | np.where(self.packed.fill_transparent, self.FLAG_FILL_TRANSPARENT, 0)
+
+        info[:, 8:12] = [glow_rgba for glow_rgba, _, _ in attrs]
+        info[:, 12] = glow_size
+
+        return info
@@ -0,0 +1,121 @@
+#version 430 core
+
+// 用于 VItemBatchRenderer，在一次调用中完成批量绘制中所有物件的预处理：
+// - 将点映射到画面坐标，与 map_points.comp.glsl 一致
+// - 将半径、描边颜色以及填充颜色插值到锚点的数量，与 resize_with_interpolation 一致
+// 每个调用处理一个点，对于偶数下标的点，同时处理其对应锚点的插值
+
+layout(local_size_x = 256) in;
+
+struct SourceInfo {
+    ivec4 points;   // (point_start, point_count, anchor_start, 0)
+    ivec4 radius;   // (radius_start, radius_count, 0, 0)
+    ivec4 colors;   // (stroke_start, stroke_count, fill_start, fill_count)
+};
+
+layout(std140, binding = 0) buffer InputPoints {
+    vec4 points[];          // (x, y, z, isclosed)
+};
+layout(std430, binding = 1) buffer InputRadii {
+    float radii[];
+};
+// 描边颜色与填充颜色共用一个 buffer，以使 buffer 的数量不超过 GL_MAX_COMPUTE_SHADER_STORAGE_BLOCKS 的最小值 8
+layout(std140, binding = 2) buffer InputColors {
+    vec4 colors[];
+};
+layout(std140, binding = 3) buffer Sources {
+    SourceInfo sources[];
+};
+
+layout(std140, binding = 4) buffer OutputPoints {
+    vec4 mapped_points[];   // (x, y, isclosed, 0)
+};
+layout(std430, binding = 5) buffer OutputRadii {
+    float mapped_radii[];
+};
+layout(std140, binding = 6) buffer OutputColors {
+    vec4 mapped_colors[];
+};
+layout(std140, binding = 7) buffer OutputFills {
+    vec4 mapped_fills[];
+};
+
+uniform int point_total;
+
+uniform bool JA_FIX_IN_FRAME;
+uniform mat4 JA_VIEW_MATRIX;
+uniform mat4 JA_PROJ_MATRIX;
+uniform float JA_FIXED_DIST_FROM_PLANE;
+uniform vec2 JA_FRAME_RADIUS;
+
+// 得到 [0, count) 中的第 idx 个元素在长度为 len 的原数据中插值的位置与比例
+// 返回 (lh, rh, alpha)，与 resize_with_interpolation 的计算方式一致
+vec3 interpolation(int idx, int count, int len) {
+    if (len == count) {
+        return vec3(idx, idx, 0.0);
+    }
+    if (len == 1 || count == 1) {
+        return vec3(0.0, 0.0, 0.0);
+    }
+    float cont = float(idx) * float(len - 1) / float(count - 1);
+    float lh = floor(cont);
+    return vec3(lh, ceil(cont), cont - lh);
+}
+
+void main() {
+    int index = int(gl_GlobalInvocationID.x);
+    if (index >= point_total) {
+        return;
+    }
+
+    vec4 point;
+    if (JA_FIX_IN_FRAME) {
+        point = JA_PROJ_MATRIX * vec4(points[index].xy, points[index].z - JA_FIXED_DIST_FROM_PLANE, 1.0);
+    } else {
+        point = JA_PROJ_MATRIX * JA_VIEW_MATRIX * vec4(points[index].xyz, 1.0);
+    }
+    mapped_points[index].xy = (point.xy / point.w) * JA_FRAME_RADIUS;
+    mapped_points[index].z = points[index].w;
+
+    // 二分查找当前点所属的物件
+    int lo = 0;
+    int hi = sources.length() - 1;
+    while (lo < hi) {
+        int mid = (lo + hi + 1) / 2;
+        if (sources[mid].points.x <= index) {
+            lo = mid;
+        } else {
+            hi = mid - 1;
+        }
+    }
+    SourceInfo src = sources[lo];
+
+    int local = index - src.points.x;
+    if ((local & 1) != 0) {
+        return;
+    }
+    int anchor = local / 2;
+    int anchor_count = (src.points.y + 1) / 2;
+    int dst = src.points.z + anchor;
+
+    vec3 r = interpolation(anchor, anchor_count, src.radius.y);
+    mapped_radii[dst] = mix(
+        radii[src.radius.x + int(r.x)],
+        radii[src.radius.x + int(r.y)],
+        r.z
+    );
+
+    vec3 s = interpolation(anchor, anchor_count, src.colors.y);
+    mapped_colors[dst] = mix(
+        colors[src.colors.x + int(s.x)],
+        colors[src.colors.x + int(s.y)],
+        s.z
+    );
+
+    vec3 f = interpolation(anchor, anchor_count, src.colors.w);
+    mapped_fills[dst] = mix(
+        colors[src.colors.z + int(f.x)],
+        colors[src.colors.z + int(f.y)],
+        f.z
+    );
+}
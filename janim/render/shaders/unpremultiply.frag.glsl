@@ -0,0 +1,17 @@
+#version 330 core
+
+out vec4 f_color;
+
+uniform sampler2D premultiplied;
+uniform vec3 background;
+
+// 将预乘了 alpha 的颜色还原为一般的颜色
+void main()
+{
+    vec4 color = texelFetch(premultiplied, ivec2(gl_FragCoord.xy), 0);
+    if (color.a <= 0.0) {
+        f_color = vec4(background, 0.0);
+    } else {
+        f_color = clamp(vec4(color.rgb / color.a, color.a), 0.0, 1.0);
+    }
+}
@@ -0,0 +1,8 @@
+#version 330 core
+
+// 覆盖整个屏幕的三角形，顶点坐标由 gl_VertexID 得到
+void main()
+{
+    vec2 pos = vec2((gl_VertexID << 1) & 2, gl_VertexID & 2);
+    gl_Position = vec4(pos * 2.0 - 1.0, 0.0, 1.0);
+}
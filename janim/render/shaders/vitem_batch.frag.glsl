@@ -0,0 +1,96 @@
+#version 430 core
+
+flat in int v_instance;
+in vec2 v_coord;
+
+out vec4 f_color;
+
+uniform float JA_CAMERA_SCALED_FACTOR;
+uniform float JA_ANTI_ALIAS_RADIUS;
+uniform bool JA_FIX_IN_FRAME;
+
+struct ItemInfo {
+    vec4 clip;
+    ivec4 offsets;      // (point_start, point_count, anchor_start, flags)
+    vec4 glow_color;
+    vec4 glow_size;
+};
+
+// flags 的各个二进制位
+const int FLAG_STROKE_BACKGROUND = 1;
+const int FLAG_FILL_TRANSPARENT = 2;
+
+// used by JA_FINISH_UP
+uniform bool JA_BLENDING;
+uniform sampler2D JA_FRAMEBUFFER;
+
+layout(std140, binding = 0) buffer MappedPoints
+{
+    vec4 points[];  // vec4(x, y, isclosed, 0)
+};
+layout(std140, binding = 1) buffer Radii
+{
+    vec4 radii[];   // radii[idx / 4][idx % 4]
+};
+layout(std140, binding = 2) buffer Colors
+{
+    vec4 colors[];
+};
+layout(std140, binding = 3) buffer Fills
+{
+    vec4 fills[];
+};
+layout(std140, binding = 4) buffer Items
+{
+    ItemInfo items[];
+};
+
+// 当前物件的数据，在 init_item 中根据 v_instance 设置
+int point_start;
+int point_count;
+int anchor_start;
+bool stroke_background;
+bool is_fill_transparent;
+vec4 glow_color;
+float glow_size;
+
+int get_point_count() {
+    return point_count;
+}
+
+vec2 get_point(int idx) {
+    return points[point_start + idx].xy;
+}
+
+bool get_isclosed(int idx) {
+    return bool(points[point_start + idx].z);
+}
+
+float get_radius(int idx) {
+    idx += anchor_start;
+    if (JA_FIX_IN_FRAME) {
+        return radii[idx / 4][idx % 4] * JA_CAMERA_SCALED_FACTOR;
+    }
+    return radii[idx / 4][idx % 4];
+}
+
+vec4 get_stroke_color(int idx) {
+    return colors[anchor_start + idx];
+}
+
+vec4 get_fill_color(int idx) {
+    return fills[anchor_start + idx];
+}
+
+void init_item() {
+    ItemInfo info = items[v_instance];
+    point_start = info.offsets.x;
+    point_count = info.offsets.y;
+    anchor_start = info.offsets.z;
+    stroke_background = (info.offsets.w & FLAG_STROKE_BACKGROUND) != 0;
+    is_fill_transparent = (info.offsets.w & FLAG_FILL_TRANSPARENT) != 0;
+    glow_color = info.glow_color;
+    glow_size = info.glow_size.x;
+}
+
+#[JA_VITEM_COMMON]
@@ -0,0 +1,34 @@
+#version 430 core
+
+struct ItemInfo {
+    vec4 clip;          // (min_x, min_y, max_x, max_y)，范围为 [-1, 1]
+    ivec4 offsets;      // (point_start, point_count, anchor_start, flags)
+    vec4 glow_color;
+    vec4 glow_size;     // (glow_size, 0, 0, 0)
+};
+
+layout(std140, binding = 4) buffer Items
+{
+    ItemInfo items[];
+};
+
+flat out int v_instance;
+out vec2 v_coord;
+
+uniform vec2 JA_FRAME_RADIUS;
+
+void main()
+{
+    // 与 VItemRenderer 中 clip_box 的顶点顺序一致：
+    // (min_x, min_y), (min_x, max_y), (max_x, min_y), (max_x, max_y)
+    vec4 clip = items[gl_InstanceID].clip;
+    vec2 in_coord = vec2(
+        (gl_VertexID & 2) != 0 ? clip.z : clip.x,
+        (gl_VertexID & 1) != 0 ? clip.w : clip.y
+    );
+
+    gl_Position = vec4(in_coord, 0.0, 1.0);
+
+    v_instance = gl_InstanceID;
+    v_coord = in_coord * JA_FRAME_RADIUS;
+}
@@ -1,25 +1,183 @@
+import ctypes
+import inspect
+import multiprocessing as mp
 import os
+import queue
 import shutil
 import subprocess as sp
+import threading
 import time
-from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from functools import partial
-from typing import Generator
+from typing import Callable, Generator
 
+import attrs
+import moderngl as mgl
+import numpy as np
 import OpenGL.GL as gl
 from tqdm import tqdm as ProgressDisplay
 
-from janim.anims.timeline import BuiltTimeline, Timeline, TimeRange
-from janim.exception import EXITCODE_FFMPEG_NOT_FOUND, ExitException
+from janim.anims.timeline import BuiltTimeline, Timeline, TimelineItem, TimeRange
+from janim.exception import EXITCODE_FFMPEG_NOT_FOUND, ExitException, FFmpegError
+from janim.items.frame_effect import FrameEffect
 from janim.locale.i18n import get_local_strings
 from janim.logger import log
-from janim.render.base import create_context
+from janim.render.base import (DEFAULT_BLEND_EQUATION, DEFAULT_BLEND_FUNC,
+                               PREMULTIPLIED_BLEND_EQUATION,
+                               PREMULTIPLIED_BLEND_FUNC, create_standalone_context)
+from janim.render.cpu import CPUFrameRenderer
+from janim.render.encoder import (DEFAULT_PIX_FMTS, EncoderProfile,
+                                  auto_encoder_cache)
 from janim.render.framebuffer import (blend_context, create_framebuffer,
                                       framebuffer_context)
+from janim.utils.config import (Config, cli_config, config_ctx_var,
+                                default_config)
+from janim.utils.data import ContextSetter
+from janim.utils.file_ops import get_janim_dir, readall
+from janim.utils.profiler import FrameProfiler
 
 _ = get_local_strings('writer')
 
 PBO_COUNT = 3
+PIPE_BUFFER_COUNT = 4
+
+
+class PipeWriterThread:
+    '''
+    在后台线程中将帧数据写入 ffmpeg 管道，使得渲染、读取与编码可以同时进行
+
+    - 使用预先分配的 ``buffer_count`` 个缓冲区循环复用，避免每帧分配新的 ``bytes``
+    - 通过 :meth:`acquire` 得到空闲的缓冲区，填充数据后通过 :meth:`submit` 提交写入；
+      当所有缓冲区都在等待写入时，:meth:`acquire` 会阻塞，以此限制内存占用
+    '''
+    def __init__(self, stream, byte_size: int, buffer_count: int = PIPE_BUFFER_COUNT):
+        self.stream = stream
+        self.free_buffers: queue.Queue[bytearray] = queue.Queue()
+        for _ in range(buffer_count):
+            self.free_buffers.put(bytearray(byte_size))
+        self.pending: queue.Queue[tuple[bytearray, int | None] | None] = queue.Queue()
+        self.error: BaseException | None = None
+        self.aborted = False
+
+        self.thread = threading.Thread(target=self._run, name='PipeWriterThread', daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            buffer, size = item
+            try:
+                if self.error is None and not self.aborted:
+                    self.stream.write(memoryview(buffer)[:size])
+            except BaseException as e:
+                # 记录异常，交给主线程在 submit 或 close 时抛出
+                self.error = e
+            self.free_buffers.put(buffer)
+
+    def acquire(self) -> bytearray:
+        self._check_error()
+        return self.free_buffers.get()
+
+    def submit(self, buffer: bytearray, size: int | None = None) -> None:
+        '''提交缓冲区，指定 ``size`` 时只写入前 ``size`` 个字节'''
+        self._check_error()
+        self.pending.put((buffer, size))
+
+    def close(self) -> None:
+        '''等待所有数据写入完成'''
+        self.pending.put(None)
+        self.thread.join()
+        self._check_error()
+
+    def abort(self) -> None:
+        '''
+        丢弃尚未写入的数据并等待线程结束，不会抛出异常，用于出错时的清理
+
+        如果线程正阻塞在写入上，需要先结束管道的另一端（例如终止 ffmpeg）
+        '''
+        self.aborted = True
+        self.pending.put(None)
+        self.thread.join()
+
+    def _check_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+
+class PremultipliedAlphaTarget:
+    '''
+    用于输出透明视频时，以预乘 alpha 的方式进行绘制
+
+    先使用硬件混合（参考 :data:`~.PREMULTIPLIED_BLEND_FUNC`）将画面绘制到 16 位浮点的 :attr:`fbo` 中，
+    再通过 :meth:`resolve` 将预乘的颜色还原后写入当前的 framebuffer
+
+    这样就不需要像着色器中的混合那样在每次绘制后调用 ``glFlush``，并且可以使用批量绘制
+
+    由于 :attr:`fbo` 中存储的是预乘的颜色，而 :class:`~.FrameEffect` 的着色器可以读取 ``JA_FRAMEBUFFER``，
+    并假定其中是未预乘的颜色，所以存在 :class:`~.FrameEffect` 时不使用该方式，参考 :meth:`check`
+    '''
+    def __init__(self, ctx: mgl.Context, pw: int, ph: int):
+        self.ctx = ctx
+        self.fbo = create_framebuffer(ctx, pw, ph, dtype='f2')
+
+        shader_path = os.path.join(get_janim_dir(), 'render', 'shaders', 'unpremultiply')
+        self.prog = ctx.program(
+            vertex_shader=readall(shader_path + '.vert.glsl'),
+            fragment_shader=readall(shader_path + '.frag.glsl')
+        )
+        self.prog['premultiplied'] = 0
+        self.vao = ctx.vertex_array(self.prog, [])
+
+    @staticmethod
+    def check(built: BuiltTimeline) -> bool:
+        '''
+        检查 ``built`` 是否可以以预乘 alpha 的方式绘制，不可以时给出警告并返回 ``False``
+
+        包含 :class:`~.FrameEffect` 时（包括插入的子时间轴中的）不可以
+        '''
+        if PremultipliedAlphaTarget.has_frame_effect(built):
+            log.warning(_('"premultiplied_alpha" is ignored because FrameEffect reads the framebuffer '
+                          'as straight alpha'))
+            return False
+        return True
+
+    @staticmethod
+    def has_frame_effect(built: BuiltTimeline) -> bool:
+        for item in built.timeline.item_appearances:
+            if isinstance(item, FrameEffect):
+                return True
+            if isinstance(item, TimelineItem) and PremultipliedAlphaTarget.has_frame_effect(item._built):
+                return True
+        return False
+
+    @contextmanager
+    def rendering(self):
+        '''
+        在该上下文中的绘制都会以预乘 alpha 的方式绘制到 :attr:`fbo` 中
+        '''
+        self.ctx.blend_func = PREMULTIPLIED_BLEND_FUNC
+        self.ctx.blend_equation = PREMULTIPLIED_BLEND_EQUATION
+        try:
+            with framebuffer_context(self.fbo):
+                self.fbo.clear(0, 0, 0, 0)
+                yield
+        finally:
+            self.ctx.blend_func = DEFAULT_BLEND_FUNC
+            self.ctx.blend_equation = DEFAULT_BLEND_EQUATION
+
+    def resolve(self, background: tuple[float, float, float]) -> None:
+        '''
+        将 :attr:`fbo` 中预乘的颜色还原，并写入当前的 framebuffer
+
+        完全透明的像素会使用 ``background`` 的颜色，与着色器中混合的结果保持一致
+        '''
+        self.prog['background'] = background
+        self.fbo.color_attachments[0].use(0)
+        self.vao.render(mgl.TRIANGLES, vertices=3)
 
 
 class VideoWriter:
@@ -37,10 +195,7 @@ class VideoWriter:
     '''
     def __init__(self, built: BuiltTimeline):
         self.built = built
-        try:
-            self.ctx = create_context(standalone=True, require=430)
-        except ValueError:
-            self.ctx = create_context(standalone=True, require=330)
+        self.ctx = create_standalone_context()
 
         pw, ph = built.cfg.pixel_width, built.cfg.pixel_height
         self.frame_count = round(built.duration * built.cfg.fps) + 1
@@ -49,6 +204,8 @@ class VideoWriter:
         # PBO 相关初始化
         self.byte_size = pw * ph * 4  # 每帧的字节大小 (RGBA)
 
+        self.frame_profiler: FrameProfiler | None = None
+
     def _init_pbos(self) -> None:
         '''初始化PBO缓冲区'''
         self.pbos = gl.glGenBuffers(PBO_COUNT)
@@ -60,11 +217,39 @@ class VideoWriter:
 
         gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)  # 解绑PBO
 
-    def _read_idx_iter(self) -> Generator[int | None, None, None]:
-        for _ in range(PBO_COUNT - 1):
-            yield None
-        for frame_idx in range(self.frame_count):
-            yield frame_idx % PBO_COUNT
+    def _flush_frame(self, pbo_idx: int | None, pipe_writer: PipeWriterThread) -> None:
+        '''
+        将 ``pbo_idx`` 对应 PBO 中的数据复制到空闲的缓冲区中，并提交给 ``pipe_writer`` 写入
+
+        ``pbo_idx`` 为 ``None`` 表示该帧与上一帧相同，直接重复上一帧的数据
+        '''
+        if pbo_idx is None:
+            self._submit_last_frame(pipe_writer)
+            return
+
+        with self._profile_stage('pipe_wait'):
+            buffer = pipe_writer.acquire()
+        with self._profile_stage('pbo_map'):
+            # 绑定对应的PBO，用于读取数据
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbos[pbo_idx])
+            ptr = gl.glMapBuffer(gl.GL_PIXEL_PACK_BUFFER, gl.GL_READ_ONLY)
+            assert ptr
+            ctypes.memmove((ctypes.c_char * self.byte_size).from_buffer(buffer), ptr, self.byte_size)
+            gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
+        if self.last_frame is not None:
+            self.last_frame[:] = buffer
+        pipe_writer.submit(buffer)
+
+    def _submit_last_frame(self, pipe_writer: PipeWriterThread) -> None:
+        with self._profile_stage('pipe_wait'):
+            buffer = pipe_writer.acquire()
+        buffer[:] = self.last_frame
+        pipe_writer.submit(buffer)
+
+    def _profile_stage(self, name: str):
+        if self.frame_profiler is None:
+            return nullcontext()
+        return self.frame_profiler.stage(name)
 
     def _cleanup_pbos(self) -> None:
         gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)  # 确保解绑
@@ -72,13 +257,45 @@ class VideoWriter:
         gl.glDeleteBuffers(len(self.pbos), self.pbos)
 
     @staticmethod
-    def writes(built: BuiltTimeline, file_path: str, *, quiet=False, use_pbo=True) -> None:
-        VideoWriter(built).write_all(file_path, quiet=quiet, use_pbo=use_pbo)
-
-    def write_all(self, file_path: str, *, quiet=False, use_pbo=True, _keep_temp=False) -> None:
+    def writes(
+        built: BuiltTimeline,
+        file_path: str,
+        *,
+        quiet=False,
+        use_pbo=True,
+        static_frame_cache=False,
+        premultiplied_alpha=False
+    ) -> None:
+        VideoWriter(built).write_all(file_path,
+                                     quiet=quiet,
+                                     use_pbo=use_pbo,
+                                     static_frame_cache=static_frame_cache,
+                                     premultiplied_alpha=premultiplied_alpha)
+
+    def write_all(
+        self,
+        file_path: str,
+        *,
+        quiet=False,
+        use_pbo=True,
+        frame_range: tuple[int, int] | None = None,
+        static_frame_cache=False,
+        premultiplied_alpha=False,
+        frame_profiler: FrameProfiler | None = None,
+        _keep_temp=False,
+        _on_frame: Callable[[], None] | None = None
+    ) -> None:
         '''将时间轴动画输出到文件中
 
         - 指定 ``quiet=True``，则不会输出前后的提示信息，但仍有进度条
+        - 指定 ``frame_range=(start, end)``，则只输出 ``[start, end)`` 范围内的帧，
+          这主要被 :class:`ParallelVideoWriter` 用于分段输出
+        - 指定 ``static_frame_cache=True``，则对于画面与上一帧相同的静止帧（参考 :meth:`~.BuiltTimeline.get_static_frame_key`），
+          跳过计算与渲染，直接重复输出上一帧的数据
+        - 指定 ``premultiplied_alpha=True``，则在输出透明视频（``.mov``）时使用预乘 alpha 的硬件混合，
+          不再需要在每次绘制后调用 ``glFlush``，速度与输出不透明视频相近，参考 :class:`PremultipliedAlphaTarget`；
+          包含 :class:`~.FrameEffect` 时会被忽略
+        - 传入 ``frame_profiler``，则会逐帧记录渲染各个阶段的耗时，参考 :class:`~.FrameProfiler`
         '''
         name = self.built.timeline.__class__.__name__
         if not quiet:
@@ -87,74 +304,122 @@ class VideoWriter:
 
         fps = self.built.cfg.fps
 
-        self.open_video_pipe(file_path)
-
-        progress_display = ProgressDisplay(
-            range(self.frame_count),
-            leave=False,
-            dynamic_ncols=True
-        )
-
-        rgb = self.built.cfg.background_color.rgb
-
-        transparent = self.ext == '.mov'
+        frames = range(self.frame_count) if frame_range is None else range(*frame_range)
 
-        if use_pbo:
-            self._init_pbos()
+        self.open_video_pipe(file_path)
+        # 写入 ffmpeg 的操作交给后台线程，使渲染不会被管道阻塞
+        pipe_writer = PipeWriterThread(self.writing_process.stdin, self.byte_size)
+        try:
+            progress_display = ProgressDisplay(
+                frames,
+                leave=False,
+                dynamic_ncols=True,
+                disable=_on_frame is not None
+            )
 
-            # 使用PBO优化的渲染循环
-            with framebuffer_context(self.fbo):
-                read_idx_iter = self._read_idx_iter()
-                for frame_idx, read_idx in zip(progress_display, read_idx_iter):
-                    # 渲染当前帧
-                    self.fbo.clear(*rgb, not transparent)
-                    if transparent:
-                        gl.glFlush()
+            rgb = self.built.cfg.background_color.rgb
+
+            transparent = self.ext == '.mov'
+            premultiplied = None
+            if transparent and premultiplied_alpha and PremultipliedAlphaTarget.check(self.built):
+                premultiplied = PremultipliedAlphaTarget(self.ctx,
+                                                         self.built.cfg.pixel_width,
+                                                         self.built.cfg.pixel_height)
+
+            # 用于静态帧缓存，记录最近一次输出的帧数据
+            self.last_frame = bytearray(self.byte_size) if static_frame_cache else None
+            prev_key = None
+
+            self.frame_profiler = frame_profiler
+
+            def render(frame_idx: int) -> bool:
+                '''渲染当前帧，如果与上一帧的画面相同，则跳过渲染并返回 ``False``'''
+                nonlocal prev_key
+                if frame_profiler is not None:
+                    frame_profiler.begin_frame(frame_idx)
+                if static_frame_cache:
+                    key = self.built.get_static_frame_key(frame_idx / fps)
+                    if key is not None and key == prev_key:
+                        return False
+                    prev_key = key
+
+                if premultiplied is not None:
+                    with premultiplied.rendering(), ContextSetter(FrameProfiler.profiler_ctx, frame_profiler):
+                        self.built.render_all(self.ctx, frame_idx / fps)
+                    premultiplied.resolve(rgb)
+                    return True
+
+                self.fbo.clear(*rgb, not transparent)
+                # 在输出 mov 时，framebuffer 是透明的
+                # 为了颜色能被正确渲染到透明 framebuffer 上
+                # 这里需要禁用自带 blending 的并使用 shader 里自定义的 blending（参考 program.py 的 injection_ja_finish_up）
+                # 但是 shader 里的 blending 依赖 framebuffer 信息
+                # 所以这里需要使用 glFlush 更新 framebuffer 信息使得正确渲染
+                if transparent:
+                    gl.glFlush()
+                with ContextSetter(FrameProfiler.profiler_ctx, frame_profiler):
                     self.built.render_all(self.ctx, frame_idx / fps, blend_on=not transparent)
-
-                    # 绑定当前PBO来存储新帧
-                    gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbos[frame_idx % PBO_COUNT])
-                    # 注意: 当PBO绑定时，最后一个参数是偏移量而不是指针
-                    gl.glReadPixels(0, 0, self.built.cfg.pixel_width, self.built.cfg.pixel_height,
-                                    gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, 0)
-
-                    # 如果不是第一批，处理上一批的数据
-                    if read_idx is not None:
-                        # 绑定对应的PBO，用于读取数据
-                        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbos[read_idx])
-
-                        # 使用numpy从映射的内存中读取数据
-                        ptr = gl.glMapBuffer(gl.GL_PIXEL_PACK_BUFFER, gl.GL_READ_ONLY)
-                        assert ptr
-                        data = gl.ctypes.string_at(ptr, self.byte_size)
-                        # 写入数据到ffmpeg
-                        self.writing_process.stdin.write(data)
-                        gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
-
-                # 处理最后一批
-                for read_idx in read_idx_iter:
-                    gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbos[read_idx])
-                    data = gl.glGetBufferSubData(gl.GL_PIXEL_PACK_BUFFER, 0, self.byte_size)
-                    self.writing_process.stdin.write(data)
-
-            self._cleanup_pbos()
-        else:
-            # 原始渲染循环（不使用PBO）
-            with framebuffer_context(self.fbo):
-                for frame in progress_display:
-                    self.fbo.clear(*rgb, not transparent)
-                    # 在输出 mov 时，framebuffer 是透明的
-                    # 为了颜色能被正确渲染到透明 framebuffer 上
-                    # 这里需要禁用自带 blending 的并使用 shader 里自定义的 blending（参考 program.py 的 injection_ja_finish_up）
-                    # 但是 shader 里的 blending 依赖 framebuffer 信息
-                    # 所以这里需要使用 glFlush 更新 framebuffer 信息使得正确渲染
-                    if transparent:
-                        gl.glFlush()
-                    self.built.render_all(self.ctx, frame / fps, blend_on=not transparent)
-                    bytes = self.fbo.read(components=4)
-                    self.writing_process.stdin.write(bytes)
-
-        self.close_video_pipe(_keep_temp)
+                return True
+
+            if use_pbo:
+                self._init_pbos()
+
+                # 使用PBO优化的渲染循环
+                # in_flight 按顺序记录尚未写入的帧：PBO 的下标，或者 None 表示重复上一帧
+                try:
+                    in_flight: deque[int | None] = deque()
+                    pbo_counter = 0
+                    with framebuffer_context(self.fbo):
+                        for frame_idx in progress_display:
+                            if render(frame_idx):
+                                # 绑定当前PBO来存储新帧
+                                pbo_idx = pbo_counter % PBO_COUNT
+                                pbo_counter += 1
+                                gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbos[pbo_idx])
+                                with self._profile_stage('readback'):
+                                    # 注意: 当PBO绑定时，最后一个参数是偏移量而不是指针
+                                    gl.glReadPixels(0, 0, self.built.cfg.pixel_width, self.built.cfg.pixel_height,
+                                                    gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, 0)
+                                in_flight.append(pbo_idx)
+                            else:
+                                in_flight.append(None)
+
+                            # 处理较早的帧，此时其 PBO 中的数据大概率已经传输完成
+                            while len(in_flight) >= PBO_COUNT:
+                                self._flush_frame(in_flight.popleft(), pipe_writer)
+
+                            if _on_frame is not None:
+                                _on_frame()
+
+                        # 处理最后一批
+                        while in_flight:
+                            self._flush_frame(in_flight.popleft(), pipe_writer)
+                finally:
+                    self._cleanup_pbos()
+            else:
+                # 原始渲染循环（不使用PBO）
+                with framebuffer_context(self.fbo):
+                    for frame_idx in progress_display:
+                        if render(frame_idx):
+                            with self._profile_stage('pipe_wait'):
+                                buffer = pipe_writer.acquire()
+                            with self._profile_stage('readback'):
+                                self.fbo.read_into(buffer, components=4)
+                            if self.last_frame is not None:
+                                self.last_frame[:] = buffer
+                            pipe_writer.submit(buffer)
+                        else:
+                            self._submit_last_frame(pipe_writer)
+
+                        if _on_frame is not None:
+                            _on_frame()
+
+            pipe_writer.close()
+            self.close_video_pipe(_keep_temp)
+        except BaseException:
+            # 写入失败（例如 ffmpeg 提前退出）、渲染出错或者被中断时，结束 ffmpeg 并删除不完整的 _temp 文件
+            self.abort_video_pipe(pipe_writer)
+            raise
 
         if not quiet:
             log.info(
@@ -186,17 +451,9 @@ class VideoWriter:
             '-loglevel', 'error',
         ]
 
-        if self.ext == '.mp4':
-            command += [
-                '-pix_fmt', 'yuv420p',
-                '-vcodec', self.find_encoder(self.built.cfg.ffmpeg_bin),
-            ]
-        elif self.ext == '.mov':
-            # This is if the background of the exported
-            # video should be transparent.
-            command += [
-                '-vcodec', 'qtrle',
-            ]
+        if self.ext in ('.mp4', '.mov'):
+            # .mov 用于透明背景的输出，参考 EncoderProfile.from_config
+            command += EncoderProfile.from_config(self.built.cfg, self.ext).ffmpeg_args()
         elif self.ext == '.gif':
             pass
         else:
@@ -206,35 +463,10 @@ class VideoWriter:
         with self.handle_ffmpeg_not_found():
             self.writing_process = sp.Popen(command, stdin=sp.PIPE)
 
-    encoder_cache: str | None = None
-
     @staticmethod
-    def find_encoder(ffmpeg_bin: str) -> str:
-        '''查找编码器，优先使用硬件编码器'''
-        if VideoWriter.encoder_cache is not None:
-            return VideoWriter.encoder_cache
-
-        # call ffmpeg to test nvenc/amf support
-        with VideoWriter.handle_ffmpeg_not_found():
-            test_availability = sp.Popen(
-                [ffmpeg_bin, '-hide_banner', '-encoders'],
-                stdout=sp.PIPE,
-                stderr=sp.PIPE
-            )
-
-        out, err = test_availability.communicate()
-        if b'h264_nvenc' in out:
-            encoder = 'h264_nvenc'
-            log.info(_('Using h264_nvenc for encoding'))
-        elif b'h264_amf' in out:
-            encoder = 'h264_amf'
-            log.info(_('Using h264_amf for encoding'))
-        else:
-            encoder = 'libx264'
-            log.info(_('No hardware encoder found. Using libx264 for encoding'))
-
-        VideoWriter.encoder_cache = encoder
-        return encoder
+    def find_encoder(ffmpeg_bin: str, codec: str = 'h264') -> str:
+        '''查找编码器，优先使用硬件编码器，另见 :meth:`~.EncoderProfile.auto_encoder`'''
+        return EncoderProfile.auto_encoder(ffmpeg_bin, codec, DEFAULT_PIX_FMTS[codec])
 
     def close_video_pipe(self, _keep_temp: bool) -> None:
         self.writing_process.stdin.close()
@@ -243,6 +475,14 @@ class VideoWriter:
         if not _keep_temp:
             shutil.move(self.temp_file_path, self.final_file_path)
 
+    def abort_video_pipe(self, pipe_writer: PipeWriterThread) -> None:
+        '''
+        在输出中途出错时调用：终止 ffmpeg 以及 ``pipe_writer`` 的线程，并删除不完整的 _temp 文件
+        '''
+        abort_process(self.writing_process, pipe_writer)
+        if os.path.exists(self.temp_file_path):
+            os.remove(self.temp_file_path)
+
     @staticmethod
     @contextmanager
     def handle_ffmpeg_not_found():
@@ -254,6 +494,602 @@ class VideoWriter:
             raise ExitException(EXITCODE_FFMPEG_NOT_FOUND)
 
 
+class CPUVideoWriter(VideoWriter):
+    '''
+    与 :class:`VideoWriter` 类似，但使用 :class:`~.CPUFrameRenderer` 进行渲染，不需要 OpenGL 上下文
+
+    适用于无法创建 OpenGL 上下文的环境，例如用于生成预览视频；
+    不支持的物件（例如 :class:`~.FrameEffect`）会被跳过
+    '''
+    def __init__(self, built: BuiltTimeline):
+        self.built = built
+        self.renderer = CPUFrameRenderer(built)
+
+        pw, ph = built.cfg.pixel_width, built.cfg.pixel_height
+        self.frame_count = round(built.duration * built.cfg.fps) + 1
+        self.byte_size = pw * ph * 4
+
+        self.frame_profiler: FrameProfiler | None = None
+
+    def write_all(
+        self,
+        file_path: str,
+        *,
+        quiet=False,
+        use_pbo=True,
+        frame_range: tuple[int, int] | None = None,
+        static_frame_cache=False,
+        premultiplied_alpha=False,
+        frame_profiler: FrameProfiler | None = None,
+        _keep_temp=False,
+        _on_frame: Callable[[], None] | None = None
+    ) -> None:
+        '''将时间轴动画输出到文件中
+
+        参数与 :meth:`VideoWriter.write_all` 相同，其中 ``use_pbo`` 与 ``premultiplied_alpha`` 对 CPU 渲染没有作用，会被忽略
+        '''
+        name = self.built.timeline.__class__.__name__
+        if not quiet:
+            log.info(_('Writing video "{name}"').format(name=name))
+            t = time.time()
+
+        fps = self.built.cfg.fps
+
+        frames = range(self.frame_count) if frame_range is None else range(*frame_range)
+
+        self.open_video_pipe(file_path)
+        pipe_writer = PipeWriterThread(self.writing_process.stdin, self.byte_size)
+        try:
+            progress_display = ProgressDisplay(
+                frames,
+                leave=False,
+                dynamic_ncols=True,
+                disable=_on_frame is not None
+            )
+
+            transparent = self.ext == '.mov'
+
+            self.last_frame = bytearray(self.byte_size) if static_frame_cache else None
+            prev_key = None
+
+            self.frame_profiler = frame_profiler
+
+            for frame_idx in progress_display:
+                if frame_profiler is not None:
+                    frame_profiler.begin_frame(frame_idx)
+                if static_frame_cache:
+                    key = self.built.get_static_frame_key(frame_idx / fps)
+                    if key is not None and key == prev_key:
+                        self._submit_last_frame(pipe_writer)
+                        if _on_frame is not None:
+                            _on_frame()
+                        continue
+                    prev_key = key
+
+                with ContextSetter(FrameProfiler.profiler_ctx, frame_profiler):
+                    canvas = self.renderer.render(frame_idx / fps, transparent=transparent)
+                with self._profile_stage('pipe_wait'):
+                    buffer = pipe_writer.acquire()
+                with self._profile_stage('readback'):
+                    canvas.read_into(buffer)
+                if self.last_frame is not None:
+                    self.last_frame[:] = buffer
+                pipe_writer.submit(buffer)
+
+                if _on_frame is not None:
+                    _on_frame()
+
+            pipe_writer.close()
+            self.close_video_pipe(_keep_temp)
+        except BaseException:
+            self.abort_video_pipe(pipe_writer)
+            raise
+
+        if not quiet:
+            log.info(
+                _('Finished writing video "{name}" in {elapsed:.2f} s')
+                .format(name=name, elapsed=time.time() - t)
+            )
+
+            if not _keep_temp:
+                log.info(
+                    _('File saved to "{file_path}" (video only)')
+                    .format(file_path=file_path)
+                )
+
+
+class TiledVideoWriter(VideoWriter):
+    '''
+    与 :class:`VideoWriter` 类似，但是将画面切分为 ``tile_size x tile_size`` 的若干块分别渲染，
+    用于输出超过 framebuffer 尺寸限制（``GL_MAX_TEXTURE_SIZE``）或显存不足的高分辨率视频与图像
+
+    - 每一块使用偏轴投影（参考 :meth:`~.CameraInfo.sub_frustum`）渲染到同一个 ``tile_size`` 大小的 framebuffer 中，
+      因此显存占用只与 ``tile_size`` 有关，与输出的分辨率无关
+    - 同一行的块读取后拼接为一个横条，按行依次写入 ffmpeg 管道
+
+    注：不支持包含 :class:`~.FrameEffect` 的时间轴，此时会抛出 ``ValueError``，另见 :meth:`check`
+    '''
+    def __init__(self, built: BuiltTimeline, tile_size: int = 2048):
+        if PremultipliedAlphaTarget.has_frame_effect(built):
+            raise ValueError(_('TiledVideoWriter cannot render timelines that contain FrameEffect'))
+
+        self.built = built
+        self.ctx = create_standalone_context()
+
+        pw, ph = built.cfg.pixel_width, built.cfg.pixel_height
+        self.frame_count = round(built.duration * built.cfg.fps) + 1
+
+        self.tile_width = min(tile_size, pw)
+        self.tile_height = min(tile_size, ph)
+        self.fbo = create_framebuffer(self.ctx, self.tile_width, self.tile_height)
+
+        # 每个横条的字节大小，最后一个横条可能更小
+        self.byte_size = pw * self.tile_height * 4
+
+        self.frame_profiler: FrameProfiler | None = None
+
+    @staticmethod
+    def check(built: BuiltTimeline) -> bool:
+        '''
+        检查 ``built`` 是否可以分块渲染，不可以时给出警告并返回 ``False``
+
+        包含 :class:`~.FrameEffect` 时（包括插入的子时间轴中的）不可以：
+        :class:`~.FrameEffect` 的着色器以整个画面为范围读取 framebuffer 并计算坐标，
+        分块渲染时每一块得到的都是错误的结果，而不只是在块的边缘处不连续；
+        并且其使用的 framebuffer 仍然是完整画面的大小，显存占用也不再受 ``tile_size`` 限制
+        '''
+        if PremultipliedAlphaTarget.has_frame_effect(built):
+            log.warning(_('"tile_size" is ignored because FrameEffect must be applied to the whole frame'))
+            return False
+        return True
+
+    def iter_tiles(self) -> Generator[tuple[int, int, int, int], None, None]:
+        '''
+        按照 framebuffer 中的顺序（从下到上、从左到右）遍历各个块的像素范围 ``(x0, y0, x1, y1)``
+        '''
+        pw, ph = self.built.cfg.pixel_width, self.built.cfg.pixel_height
+        for y0 in range(0, ph, self.tile_height):
+            for x0 in range(0, pw, self.tile_width):
+                yield x0, y0, min(x0 + self.tile_width, pw), min(y0 + self.tile_height, ph)
+
+    def render_tile(
+        self,
+        global_t: float,
+        x0: int,
+        y0: int,
+        *,
+        transparent: bool,
+        premultiplied: PremultipliedAlphaTarget | None
+    ) -> None:
+        '''
+        将左下角位于 ``(x0, y0)`` 的块渲染到 :attr:`fbo` 中，超出画面的部分也会被渲染，在读取时舍去
+        '''
+        pw, ph = self.built.cfg.pixel_width, self.built.cfg.pixel_height
+        tile = (
+            (x0 / pw * 2 - 1, y0 / ph * 2 - 1),
+            ((x0 + self.tile_width) / pw * 2 - 1, (y0 + self.tile_height) / ph * 2 - 1)
+        )
+        rgb = self.built.cfg.background_color.rgb
+
+        with framebuffer_context(self.fbo):
+            if premultiplied is not None:
+                with premultiplied.rendering():
+                    self.built.render_all(self.ctx, global_t, tile=tile)
+                premultiplied.resolve(rgb)
+                return
+
+            self.fbo.clear(*rgb, not transparent)
+            # 与 VideoWriter 相同，向透明 framebuffer 绘制时需要使用着色器中的混合
+            if transparent:
+                gl.glFlush()
+            self.built.render_all(self.ctx, global_t, blend_on=not transparent, tile=tile)
+
+    def write_all(
+        self,
+        file_path: str,
+        *,
+        quiet=False,
+        use_pbo=True,
+        frame_range: tuple[int, int] | None = None,
+        static_frame_cache=False,
+        premultiplied_alpha=False,
+        frame_profiler: FrameProfiler | None = None,
+        _keep_temp=False,
+        _on_frame: Callable[[], None] | None = None
+    ) -> None:
+        '''将时间轴动画输出到文件中
+
+        参数与 :meth:`VideoWriter.write_all` 相同；
+        其中 ``use_pbo`` 与 ``static_frame_cache`` 需要保存整帧的数据，会被忽略
+        '''
+        name = self.built.timeline.__class__.__name__
+        if not quiet:
+            log.info(_('Writing video "{name}"').format(name=name))
+            t = time.time()
+
+        fps = self.built.cfg.fps
+
+        frames = range(self.frame_count) if frame_range is None else range(*frame_range)
+
+        self.open_video_pipe(file_path)
+        pipe_writer = PipeWriterThread(self.writing_process.stdin, self.byte_size)
+        try:
+            progress_display = ProgressDisplay(
+                frames,
+                leave=False,
+                dynamic_ncols=True,
+                disable=_on_frame is not None
+            )
+
+            if self.ext == '.mov' and premultiplied_alpha:
+                premultiplied_alpha = PremultipliedAlphaTarget.check(self.built)
+
+            self.frame_profiler = frame_profiler
+            with ContextSetter(FrameProfiler.profiler_ctx, frame_profiler):
+                for frame_idx in progress_display:
+                    if frame_profiler is not None:
+                        frame_profiler.begin_frame(frame_idx)
+                    self.write_frame(pipe_writer, frame_idx / fps, premultiplied_alpha)
+
+                    if _on_frame is not None:
+                        _on_frame()
+
+            pipe_writer.close()
+            self.close_video_pipe(_keep_temp)
+        except BaseException:
+            self.abort_video_pipe(pipe_writer)
+            raise
+
+        if not quiet:
+            log.info(
+                _('Finished writing video "{name}" in {elapsed:.2f} s')
+                .format(name=name, elapsed=time.time() - t)
+            )
+
+            if not _keep_temp:
+                log.info(
+                    _('File saved to "{file_path}" (video only)')
+                    .format(file_path=file_path)
+                )
+
+    def write_frame(self, pipe_writer: PipeWriterThread, global_t: float, premultiplied_alpha: bool) -> None:
+        '''
+        逐块渲染 ``global_t`` 时刻的画面，并按横条写入 ``pipe_writer``
+        '''
+        pw = self.built.cfg.pixel_width
+        transparent = self.ext == '.mov'
+        premultiplied = None
+        if transparent and premultiplied_alpha:
+            if getattr(self, 'premultiplied', None) is None:
+                self.premultiplied = PremultipliedAlphaTarget(self.ctx, self.tile_width, self.tile_height)
+            premultiplied = self.premultiplied
+
+        buffer = None
+        band = None
+        for x0, y0, x1, y1 in self.iter_tiles():
+            if x0 == 0:
+                with self._profile_stage('pipe_wait'):
+                    buffer = pipe_writer.acquire()
+                band = np.frombuffer(buffer, dtype=np.uint8).reshape(self.tile_height, pw, 4)
+
+            self.render_tile(global_t, x0, y0, transparent=transparent, premultiplied=premultiplied)
+            with self._profile_stage('readback'):
+                data = self.fbo.read(viewport=(0, 0, x1 - x0, y1 - y0), components=4)
+                band[:y1 - y0, x0:x1] = np.frombuffer(data, dtype=np.uint8).reshape(y1 - y0, x1 - x0, 4)
+
+            if x1 == pw:
+                pipe_writer.submit(buffer, (y1 - y0) * pw * 4)
+
+    def write_image(self, file_path: str, global_t: float, *, premultiplied_alpha=False) -> None:
+        '''
+        将 ``global_t`` 时刻的画面输出为图像（例如 ``.png``），用于输出高分辨率的静态画面
+        '''
+        self.ext = os.path.splitext(file_path)[1]
+        command = [
+            self.built.cfg.ffmpeg_bin,
+            '-y',
+            '-f', 'rawvideo',
+            '-s', f'{self.built.cfg.pixel_width}x{self.built.cfg.pixel_height}',
+            '-pix_fmt', 'rgba',
+            '-i', '-',
+            '-vf', 'vflip',
+            '-frames:v', '1',
+            '-loglevel', 'error',
+            file_path
+        ]
+        with self.handle_ffmpeg_not_found():
+            process = sp.Popen(command, stdin=sp.PIPE, stderr=sp.PIPE)
+
+        pipe_writer = PipeWriterThread(process.stdin, self.byte_size, buffer_count=2)
+        try:
+            self.write_frame(pipe_writer, global_t, premultiplied_alpha)
+            pipe_writer.close()
+            stderr = process.communicate()[1]
+        except BaseException:
+            abort_process(process, pipe_writer)
+            raise
+
+        if process.returncode != 0:
+            raise FFmpegError(
+                _('Failed to write image "{file_path}" (exit code {code}): {stderr}')
+                .format(file_path=file_path,
+                        code=process.returncode,
+                        stderr=stderr.decode(errors='replace').strip())
+            )
+
+
+class ParallelVideoWriter:
+    '''
+    将时间轴动画按帧区间切分为若干段，使用多个进程并行渲染，最后拼接为完整的视频
+
+    - 每个子进程会重新载入时间轴所在的文件并独立构建，因此要求时间轴类定义在文件的顶层
+    - 每段使用与 :class:`VideoWriter` 相同的编码参数输出，最后使用 ffmpeg 的 concat 无损拼接
+    - 对于 gif 格式，或是无法在子进程中载入时间轴的情况，会回退到 :class:`VideoWriter` 的单进程输出
+
+    与 :class:`VideoWriter` 一样，输出后可以通过 ``temp_file_path`` 和 ``final_file_path`` 得到文件路径
+    '''
+    def __init__(self, built: BuiltTimeline, workers: int | None = None):
+        self.built = built
+        self.workers = workers or os.cpu_count() or 1
+        self.frame_count = round(built.duration * built.cfg.fps) + 1
+
+    @staticmethod
+    def writes(
+        built: BuiltTimeline,
+        file_path: str,
+        *,
+        workers: int | None = None,
+        quiet=False,
+        use_pbo=True,
+        static_frame_cache=False,
+        premultiplied_alpha=False
+    ) -> None:
+        ParallelVideoWriter(built, workers).write_all(file_path,
+                                                      quiet=quiet,
+                                                      use_pbo=use_pbo,
+                                                      static_frame_cache=static_frame_cache,
+                                                      premultiplied_alpha=premultiplied_alpha)
+
+    def split_frames(self) -> list[tuple[int, int]]:
+        '''将 ``[0, frame_count)`` 均分为连续的若干段'''
+        count = max(1, min(self.workers, self.frame_count))
+        bounds = [round(i * self.frame_count / count) for i in range(count + 1)]
+        return [(start, end) for start, end in zip(bounds, bounds[1:]) if start != end]
+
+    def _can_write_parallel(self, ext: str) -> bool:
+        if ext == '.gif':
+            log.warning(_('Parallel writing is not supported for gif, falling back to a single process'))
+            return False
+
+        timeline_cls = self.built.timeline.__class__
+        try:
+            inspect.getfile(timeline_cls)
+        except (TypeError, OSError):
+            can_load = False
+        else:
+            can_load = timeline_cls.__qualname__ == timeline_cls.__name__
+
+        if not can_load:
+            log.warning(
+                _('"{name}" cannot be loaded by worker processes, falling back to a single process')
+                .format(name=timeline_cls.__name__)
+            )
+            return False
+
+        return True
+
+    def write_all(
+        self,
+        file_path: str,
+        *,
+        quiet=False,
+        use_pbo=True,
+        static_frame_cache=False,
+        premultiplied_alpha=False,
+        _keep_temp=False
+    ) -> None:
+        '''将时间轴动画输出到文件中
+
+        参数含义与 :meth:`VideoWriter.write_all` 相同
+        '''
+        stem, ext = os.path.splitext(file_path)
+        self.final_file_path = file_path
+        self.temp_file_path = stem + '_temp' + ext
+
+        ranges = self.split_frames()
+        if len(ranges) <= 1 or not self._can_write_parallel(ext):
+            writer = VideoWriter(self.built)
+            writer.write_all(file_path,
+                             quiet=quiet,
+                             use_pbo=use_pbo,
+                             static_frame_cache=static_frame_cache,
+                             premultiplied_alpha=premultiplied_alpha,
+                             _keep_temp=_keep_temp)
+            return
+
+        name = self.built.timeline.__class__.__name__
+        if not quiet:
+            log.info(
+                _('Writing video "{name}" with {count} processes')
+                .format(name=name, count=len(ranges))
+            )
+            t = time.time()
+
+        parts_dir = stem + '_parts'
+        os.makedirs(parts_dir, exist_ok=True)
+        part_paths = [
+            os.path.abspath(os.path.join(parts_dir, f'part_{i}{ext}'))
+            for i in range(len(ranges))
+        ]
+
+        timeline_cls = self.built.timeline.__class__
+        # 在主进程中选择编码器，子进程直接使用其结果
+        if ext in ('.mp4', '.mov'):
+            EncoderProfile.from_config(self.built.cfg, ext)
+        encoder_cache = dict(auto_encoder_cache)
+        cli_config_dict = attrs.asdict(cli_config, recurse=False)
+        # 调用方通过 with Config(...) 设置的配置也需要传递给子进程
+        config_dicts = [
+            attrs.asdict(config, recurse=False)
+            for config in config_ctx_var.get()
+            if config is not default_config
+        ]
+
+        mp_ctx = mp.get_context('spawn')
+        with mp_ctx.Manager() as manager, \
+                ProcessPoolExecutor(len(ranges), mp_context=mp_ctx) as executor:
+            progress_queue = manager.Queue()
+            futures = [
+                executor.submit(
+                    _write_video_segment,
+                    inspect.getfile(timeline_cls),
+                    timeline_cls.__name__,
+                    cli_config_dict,
+                    config_dicts,
+                    self.built.timeline.hide_subtitles,
+                    encoder_cache,
+                    part_path,
+                    frame_range,
+                    use_pbo,
+                    static_frame_cache,
+                    premultiplied_alpha,
+                    progress_queue
+                )
+                for part_path, frame_range in zip(part_paths, ranges)
+            ]
+
+            with ProgressDisplay(total=self.frame_count, leave=False, dynamic_ncols=True) as progress_display:
+                while not all(future.done() for future in futures):
+                    try:
+                        progress_display.update(progress_queue.get(timeout=0.1))
+                    except queue.Empty:
+                        pass
+                while not progress_queue.empty():
+                    progress_display.update(progress_queue.get())
+
+            # 如果有子进程出错，在这里抛出
+            for future in futures:
+                future.result()
+
+        self.concat_parts(part_paths, parts_dir)
+
+        if not _keep_temp:
+            shutil.move(self.temp_file_path, self.final_file_path)
+
+        if not quiet:
+            log.info(
+                _('Finished writing video "{name}" in {elapsed:.2f} s')
+                .format(name=name, elapsed=time.time() - t)
+            )
+
+            if not _keep_temp:
+                log.info(
+                    _('File saved to "{file_path}" (video only)')
+                    .format(file_path=file_path)
+                )
+
+    def concat_parts(self, part_paths: list[str], parts_dir: str) -> None:
+        '''
+        使用 ffmpeg 的 concat 将各段视频无损拼接到 ``temp_file_path``，并删除分段文件
+
+        拼接失败时抛出 :class:`~.FFmpegError`，并保留分段文件
+        '''
+        concat_videos(self.built.cfg.ffmpeg_bin, part_paths, parts_dir, self.temp_file_path)
+        # 拼接失败时保留分段文件，以便检查或重新拼接
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def abort_process(process: sp.Popen, pipe_writer: PipeWriterThread) -> None:
+    '''
+    终止通过 ``pipe_writer`` 写入数据的 ffmpeg 进程，并等待其结束
+    '''
+    # 先终止进程，使得阻塞在写入上的线程能够结束
+    process.terminate()
+    pipe_writer.abort()
+    try:
+        process.stdin.close()
+    except OSError:
+        # 关闭时写入缓冲区中剩余的数据，进程已经结束时会失败
+        pass
+    process.wait()
+
+
+def concat_videos(ffmpeg_bin: str, paths: list[str], parts_dir: str, output_path: str) -> None:
+    '''
+    使用 ffmpeg 的 concat 将 ``paths`` 中编码参数相同的视频无损拼接到 ``output_path``，
+    拼接所用的文件列表写入 ``parts_dir`` 中
+
+    被 :class:`ParallelVideoWriter` 与 :class:`~.IncrementalVideoWriter` 使用，拼接失败时抛出 :class:`~.FFmpegError`
+    '''
+    list_path = os.path.join(parts_dir, 'list.txt')
+    with open(list_path, 'wt', encoding='utf-8') as file:
+        for path in paths:
+            escaped = path.replace('\\', '/').replace("'", "'\\''")
+            file.write(f"file '{escaped}'\n")
+
+    command = [
+        ffmpeg_bin,
+        '-y',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', list_path,
+        '-c', 'copy',
+        # 默认情况下无法读取的分段会被跳过，导致输出被截断
+        '-xerror',
+        '-loglevel', 'error',
+        output_path
+    ]
+
+    with VideoWriter.handle_ffmpeg_not_found():
+        concat_process = sp.run(command, stderr=sp.PIPE)
+
+    if concat_process.returncode != 0:
+        raise FFmpegError(
+            _('Failed to concatenate video parts in "{parts_dir}" (exit code {code}): {stderr}')
+            .format(parts_dir=parts_dir,
+                    code=concat_process.returncode,
+                    stderr=concat_process.stderr.decode(errors='replace').strip())
+        )
+
+
+def _write_video_segment(
+    file_name: str,
+    timeline_name: str,
+    cli_config_dict: dict,
+    config_dicts: list[dict],
+    hide_subtitles: bool,
+    encoder_cache: dict[tuple[str, str], str],
+    part_path: str,
+    frame_range: tuple[int, int],
+    use_pbo: bool,
+    static_frame_cache: bool,
+    premultiplied_alpha: bool,
+    progress_queue
+) -> None:
+    '''在 :class:`ParallelVideoWriter` 的子进程中执行，载入并构建时间轴，输出 ``frame_range`` 范围内的帧'''
+    from janim.cli import get_module
+
+    for key, value in cli_config_dict.items():
+        setattr(cli_config, key, value)
+    config_ctx_var.set([default_config, *[Config(**config_dict) for config_dict in config_dicts]])
+
+    auto_encoder_cache.update(encoder_cache)
+
+    module = get_module(file_name)
+    timeline_cls: type[Timeline] = getattr(module, timeline_name)
+    built = timeline_cls().build(quiet=True, hide_subtitles=hide_subtitles)
+
+    VideoWriter(built).write_all(
+        part_path,
+        quiet=True,
+        use_pbo=use_pbo,
+        frame_range=frame_range,
+        static_frame_cache=static_frame_cache,
+        premultiplied_alpha=premultiplied_alpha,
+        _on_frame=partial(progress_queue.put, 1)
+    )
+
+
 class AudioWriter:
     def __init__(self, built: BuiltTimeline):
         self.built = built
@@ -241,6 +241,18 @@ def interpolate(start, end, alpha):
     return (1 - alpha) * start + alpha * end
 
 
+def interpolate_stacked(start: np.ndarray, end: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    '''
+    对一组 ``alphas`` 同时进行 :func:`interpolate`，结果的形状为 ``(len(alphas), *start.shape)``
+
+    系数会先转换为 ``start`` 的数据类型，使结果与逐个调用 :func:`interpolate` 时一致
+    '''
+    alphas = np.asarray(alphas, dtype=np.float64)
+    shape = (len(alphas),) + (1,) * start.ndim
+    return (1 - alphas).astype(start.dtype).reshape(shape) * start \
+        + alphas.astype(start.dtype).reshape(shape) * end
+
+
 def outer_interpolate(
     start: np.ndarray | float,
     end: np.ndarray | float,
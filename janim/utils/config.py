@@ -54,6 +54,22 @@ class Config(metaclass=_ConfigMeta):
     - ``preview_fps``: 在预览窗口时的帧率
     - 在代码内设置 ``background_color`` 时，不能使用 ``background_color='#RRGGBB'``，应使用 ``background_color=Color('#RRGGBB')``
     - ``output_dir`` 以 ``:`` 开头时，表示相对于 ``.py`` 文件的路径，例如 ``output_dir=':/videos'``
+    - ``gl_backend`` 是离屏渲染时使用的 OpenGL 后端，为空表示由 moderngl 自动选择，
+      在没有显示服务器的机器上可以使用 ``'egl'``，另见 :func:`~.create_standalone_context`
+    - ``gl_threads`` 是软件渲染（Mesa llvmpipe）使用的线程数，为 ``0`` 表示使用 Mesa 的默认值
+    - ``prefetch_assets`` 为 ``True`` 时，构建时会在后台预先编译和解析上一次构建用到的 Typst 文档以及 SVG 文件，
+      参考 :class:`~.AssetPrefetcher`
+    - ``buffer_arena`` 为 ``True`` 时，渲染器的 buffer 从每个 OpenGL 上下文共享的 slab 中分配，而不是各自创建，
+      参考 :class:`~.BufferArena`，例如 ``janim write your_file.py YourTimeline -c buffer_arena true``；
+      其上传量与碎片率只在 ``--profile_render`` 的逐帧记录中输出
+    - ``video_`` 开头的项是输出视频时的编码参数，参考 :class:`~.EncoderProfile`：
+
+      - ``video_codec`` 是编码格式，可以是 ``h264``、``hevc``、``av1`` 或 ``prores``（仅用于透明背景的 ``.mov``）
+      - ``video_encoder`` 是 ffmpeg 的编码器名称，为空表示自动选择，优先使用硬件编码器
+      - ``video_preset``、``video_pix_fmt`` 为空，``video_crf`` 为 ``-1``，``video_threads`` 为 ``0`` 时使用编码器的默认值
+
+      例如 ``janim write your_file.py YourTimeline -c video_preset veryfast`` 可以用于快速输出草稿，
+      可以使用 ``janim tool encoder-bench`` 比较本地各个编码器的速度
 
     基础用法
     ------------
@@ -140,6 +156,19 @@ class Config(metaclass=_ConfigMeta):
 
     client_search_port: int = _field(validator=_opt_int_validator)
 
+    gl_backend: str = None
+    gl_threads: int = _field(validator=_opt_int_validator)
+
+    prefetch_assets: bool = _field(validator=optional_type_validator(bool, 'bool'))
+    buffer_arena: bool = _field(validator=optional_type_validator(bool, 'bool'))
+
+    video_codec: str = None
+    video_encoder: str = None
+    video_preset: str = None
+    video_crf: int = _field(validator=_opt_int_validator)
+    video_threads: int = _field(validator=_opt_int_validator)
+    video_pix_fmt: str = None
+
     def __enter__(self) -> Self:
         lst = config_ctx_var.get()
         self.token = config_ctx_var.set([*lst, self])
@@ -185,7 +214,20 @@ default_config = Config(
     temp_dir=guarantee_existence(os.path.join(tempfile.gettempdir(), 'janim')),
     asset_dir='',
 
-    client_search_port=40565
+    client_search_port=40565,
+
+    gl_backend='',
+    gl_threads=0,
+
+    prefetch_assets=False,
+    buffer_arena=False,
+
+    video_codec='h264',
+    video_encoder='',
+    video_preset='',
+    video_crf=-1,
+    video_threads=0,
+    video_pix_fmt=''
 )
 '''
 默认配置
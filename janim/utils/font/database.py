@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import json
+import os
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import TYPE_CHECKING, Callable
 
 import freetype as FT
@@ -14,6 +16,7 @@ from janim.locale.i18n import get_local_strings
 from janim.logger import log
 from janim.utils.bezier import PathBuilder
 from janim.utils.font.exception import EXCEPTION_MAP
+from janim.utils.font.glyph_store import GlyphStore
 from janim.utils.font.variant import (WEIGHT_MAP, Style, StyleName, Weight,
                                       WeightName)
 
@@ -65,44 +68,94 @@ class FontFamily:
         return 2
 
 
+@dataclass
+class FontRecord:
+    '''
+    从字体文件中读取的、用于查找字体的信息，会被缓存到 ``temp_dir`` 中，参考 :func:`get_database`
+
+    - ``weight`` 和 ``fs_selection`` 分别是 ``OS/2`` 表中的 ``usWeightClass`` 和 ``fsSelection``，没有 ``OS/2`` 表时为 ``None``
+    - ``family_names`` 是各个语言的字体族名称，每项为 ``(platformID, langID, name)``
+    '''
+    family_name: str
+    full_name: str
+    postscript_name: str | None
+    unique_name: str | None
+    weight: int | None
+    fs_selection: int | None
+    family_names: list[tuple[int, int, str]]
+
+    @staticmethod
+    def from_font(font: TTFont) -> FontRecord:
+        name: table__n_a_m_e = font['name']
+        os2: table_O_S_2f_2 | None = font.get('OS/2', None)
+
+        family_names = []
+        for record in name.names:
+            if record.nameID != 1:
+                continue
+            family_names.append((
+                record.platformID,
+                record.langID,
+                record.string.decode('utf-16-be' if record.isUnicode() else 'latin-1', errors='replace')
+            ))
+
+        return FontRecord(
+            family_name=name.getBestFamilyName(),
+            full_name=name.getBestFullName(),
+            postscript_name=name.getDebugName(6),
+            unique_name=name.getDebugName(4),
+            weight=None if os2 is None else os2.usWeightClass,
+            fs_selection=None if os2 is None else os2.fsSelection,
+            family_names=family_names
+        )
+
+
 class FontInfo:
-    def __init__(self, filepath: str, font: TTFont, index: int):
+    def __init__(self, filepath: str, index: int, record: FontRecord):
         self.filepath = filepath
         self.index = index
-
-        self.name: table__n_a_m_e = font['name']
-        self.os2: table_O_S_2f_2 = font.get('OS/2', None)
+        self.record = record
 
         self.exception = EXCEPTION_MAP.get(self.postscript_name, None)
 
+    @property
+    def name(self) -> table__n_a_m_e:
+        '''
+        字体的 ``name`` 表，在第一次访问时才会读取字体文件
+        '''
+        font = TTCollection(self.filepath, lazy=True).fonts[self.index] \
+            if self.filepath.endswith('ttc')                             \
+            else TTFont(self.filepath, lazy=True)
+        return font['name']
+
     @property
     def family_name(self) -> str:
-        return self.name.getBestFamilyName()
+        return self.record.family_name
 
     @property
     def full_name(self) -> str:
-        return self.name.getBestFullName()
+        return self.record.full_name
 
     @property
     def postscript_name(self) -> str:
-        return self.name.getDebugName(6)
+        return self.record.postscript_name
 
     @property
     def weight(self) -> int:
         if self.exception is not None and self.exception.weight is not None:
             return self.exception.weight
-        if self.os2 is None:
+        if self.record.weight is None:
             return 400
-        return self.os2.usWeightClass
+        return self.record.weight
 
     @property
     def style(self) -> Style:
         if self.exception is not None and self.exception.style is not None:
             return self.exception.style
-        if self.os2 is None:
+        if self.record.fs_selection is None:
             return Style.Normal
 
-        fs_selection = self.os2.fsSelection
+        fs_selection = self.record.fs_selection
         if fs_selection & 0x01:
             return Style.Italic
         if fs_selection & 0x200:
@@ -113,34 +166,103 @@ class FontInfo:
 
 _database: FontDatabase | None = None
 
+DATABASE_CACHE_VERSION = 1
+
 
 def get_database() -> FontDatabase:
+    '''
+    得到系统中所有字体的信息
+
+    读取字体文件的 ``name`` 表较慢，在字体较多时可能需要数秒，
+    因此读取的结果会以 ``(路径, 修改时间, 大小)`` 为键缓存到 ``temp_dir`` 的 ``font_database.json`` 中，
+    之后只有新增或变化的字体文件才会被重新读取
+    '''
     global _database
 
     if _database is not None:
         return _database
 
+    from janim.utils.config import Config
     from janim.utils.font_manager import findSystemFonts
 
+    _database = load_database(findSystemFonts(), os.path.join(Config.get.temp_dir, 'font_database.json'))
+    return _database
+
+
+def load_database(filepaths: list[str], cache_path: str | None = None) -> FontDatabase:
+    '''
+    读取 ``filepaths`` 中的字体并得到 :class:`FontDatabase`，``cache_path`` 为缓存文件的路径，参考 :func:`get_database`
+    '''
+    cache = read_database_cache(cache_path) if cache_path is not None else {}
+    new_cache: dict[str, dict] = {}
+    changed = False
+
     family_by_name = defaultdict(FontFamily)
     font_by_full_name = {}
 
-    for filepath in findSystemFonts():
+    for filepath in filepaths:
         try:
-            fonts = TTCollection(filepath, lazy=True).fonts \
-                if filepath.endswith('ttc')                 \
-                else [TTFont(filepath, lazy=True)]
-        except TTLibError:
-            log.debug(_('Skipped font "{filepath}"').format(filepath=filepath))
+            stat = os.stat(filepath)
+        except OSError:
             continue
 
-        for i, font in enumerate(fonts):
-            info = FontInfo(filepath, font, i)
+        entry = cache.get(filepath, None)
+        if entry is None or entry['mtime'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+            entry = {
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'fonts': [asdict(record) for record in read_font_records(filepath)]
+            }
+            changed = True
+        new_cache[filepath] = entry
+
+        for i, record_dict in enumerate(entry['fonts']):
+            record = FontRecord(**record_dict)
+            record.family_names = [tuple(item) for item in record.family_names]
+            info = FontInfo(filepath, i, record)
             family_by_name[info.family_name].add(info)
             font_by_full_name[info.full_name] = info
 
-    _database = FontDatabase(family_by_name, font_by_full_name)
-    return _database
+    # 有字体文件被移除时也需要更新缓存
+    if cache_path is not None and (changed or len(new_cache) != len(cache)):
+        write_database_cache(cache_path, new_cache)
+
+    return FontDatabase(family_by_name, font_by_full_name)
+
+
+def read_font_records(filepath: str) -> list[FontRecord]:
+    try:
+        fonts = TTCollection(filepath, lazy=True).fonts \
+            if filepath.endswith('ttc')                 \
+            else [TTFont(filepath, lazy=True)]
+        return [FontRecord.from_font(font) for font in fonts]
+    except (TTLibError, KeyError):
+        # 无法读取的文件同样会被缓存，使得之后不会重复尝试
+        log.debug(_('Skipped font "{filepath}"').format(filepath=filepath))
+        return []
+
+
+def read_database_cache(cache_path: str) -> dict[str, dict]:
+    try:
+        with open(cache_path, 'rt', encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != DATABASE_CACHE_VERSION:
+        return {}
+    files = data.get('files', None)
+    return files if isinstance(files, dict) else {}
+
+
+def write_database_cache(cache_path: str, files: dict[str, dict]) -> None:
+    # 先写入临时文件再替换，避免多个进程同时写入时读到不完整的文件
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'wt', encoding='utf-8') as file:
+            json.dump({'version': DATABASE_CACHE_VERSION, 'files': files}, file, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        log.debug(_('Unable to write font database cache "{cache_path}"').format(cache_path=cache_path))
 
 
 def get_font_info_by_attrs(
@@ -164,7 +286,7 @@ def get_font_info_by_attrs(
 
     # deprecated
     for full_name, info in db.font_by_full_name.items():
-        if info.name.getDebugName(4) == name:
+        if info.record.unique_name == name:
             log.warning(
                 _('font="{deprecated}" is deprecated and will no longer be available in JAnim 3.3, '
                   'use font="{full_name}" instead')
@@ -217,6 +339,8 @@ class Font:
         self.face.set_char_size(48 << 6, 0, FRAME_PPI, FRAME_PPI)
 
         self.cached_glyph: dict[int, Font.GlyphData] = {}
+        # 读取过的字形轮廓会被持久化存储，在多个进程以及多次运行之间共享，参考 GlyphStore
+        self.glyph_store = GlyphStore.get(filepath, index, (48 << 6, FRAME_PPI))
 
     @dataclass
     class GlyphData:
@@ -229,6 +353,21 @@ class Font:
         if cached is not None:
             return cached.array, cached.advance
 
+        stored = self.glyph_store.lookup(value)
+        if stored is None:
+            outline, advance = self.decompose_glyph(value)
+            stored = (self.glyph_store.add(value, outline, advance), advance)
+
+        data = Font.GlyphData(stored[0].astype(np.float64), stored[1])
+        data.array.setflags(write=False)
+        self.cached_glyph[value] = data
+
+        return data.array, data.advance
+
+    def decompose_glyph(self, value: int) -> tuple[np.ndarray, tuple[int, int]]:
+        '''
+        使用 freetype 读取字符 ``value`` 的轮廓，返回 ``(轮廓, advance)``
+        '''
         # 读取字符
         self.face.load_char(value, FT.FT_LOAD_DEFAULT | FT.FT_LOAD_NO_BITMAP)
         glyph: FT.Glyph = self.face.glyph
@@ -250,8 +389,4 @@ class Font:
             wrap_points(builder.cubic_to)
         )
 
-        data = Font.GlyphData(builder.get(), (glyph.advance.x, glyph.advance.y))
-        data.array.setflags(write=False)
-        self.cached_glyph[value] = data
-
-        return data.array, data.advance
+        return builder.get(), (glyph.advance.x, glyph.advance.y)
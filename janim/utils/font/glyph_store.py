@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+from janim.locale.i18n import get_local_strings
+from janim.logger import log
+
+_ = get_local_strings('glyph_store')
+
+MAGIC = b'JAGLYPH1'
+HEADER = struct.Struct('<8sII')     # (magic, glyph_count, point_count)
+INDEX_DTYPE = np.dtype([
+    ('codepoint', '<u4'),
+    ('offset', '<u4'),
+    ('count', '<u4'),
+    ('advance_x', '<i4'),
+    ('advance_y', '<i4'),
+])
+
+
+class GlyphStore:
+    '''
+    字形轮廓的持久化存储，每个字体（文件路径与字体序号）对应 ``temp_dir/glyphs`` 中的一个文件
+
+    - 文件由索引（按码位排序）以及所有字形轮廓的 ``float32`` 点数据组成，使用内存映射只读地访问，
+      因此多个进程（例如 :class:`~.ParallelVideoWriter` 的各个子进程）可以共享，并且在多次运行之间复用
+    - 文件名由字体文件的路径、修改时间、大小以及读取字形时使用的参数决定，字体文件变化后会使用新的文件
+    - 新读取的字形先记录在 ``pending`` 中，在 :meth:`flush` 时与文件中已有的字形合并，
+      写入临时文件后再替换，不会影响其它进程正在读取的内容；替换失败时保留 ``pending``，在下一次 :meth:`flush` 时重试
+
+    :meth:`~.Timeline.build` 结束时以及进程退出时会调用 :func:`flush_glyph_stores`
+    '''
+    stores: dict[tuple[str, int, tuple], GlyphStore] = {}
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self.pending: dict[int, tuple[np.ndarray, tuple[int, int]]] = {}
+
+        self.index = np.empty(0, dtype=INDEX_DTYPE)
+        self.points = np.empty((0, 3), dtype=np.float32)
+        if path is not None:
+            self.index, self.points = self.read(path)
+
+    @staticmethod
+    def get(filepath: str, index: int, params: tuple) -> GlyphStore:
+        '''
+        得到 ``filepath`` 中第 ``index`` 个字体的存储，``params`` 为读取字形时使用的参数（例如字号），参数不同的字形分开存储
+        '''
+        key = (filepath, index, params)
+        store = GlyphStore.stores.get(key, None)
+        if store is not None:
+            return store
+
+        store = GlyphStore.stores[key] = GlyphStore(GlyphStore.store_path(filepath, index, params))
+        return store
+
+    @staticmethod
+    def store_path(filepath: str, index: int, params: tuple) -> str | None:
+        from janim.utils.config import Config
+
+        try:
+            stat = os.stat(filepath)
+            directory = os.path.join(Config.get.temp_dir, 'glyphs')
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            return None
+
+        key = repr((MAGIC, os.path.abspath(filepath), index, stat.st_mtime_ns, stat.st_size, params))
+        return os.path.join(directory, hashlib.md5(key.encode()).hexdigest() + '.glyphs')
+
+    @staticmethod
+    def read(path: str) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        以内存映射的方式读取文件，返回索引以及点数据，文件不存在或者无效时返回空的数据
+        '''
+        empty = (np.empty(0, dtype=INDEX_DTYPE), np.empty((0, 3), dtype=np.float32))
+        try:
+            if os.path.getsize(path) < HEADER.size:
+                return empty
+            mapped = np.memmap(path, dtype=np.uint8, mode='r')
+        except (OSError, ValueError):
+            return empty
+
+        magic, glyph_count, point_count = HEADER.unpack(mapped[:HEADER.size].tobytes())
+        index_end = HEADER.size + glyph_count * INDEX_DTYPE.itemsize
+        if magic != MAGIC or len(mapped) != index_end + point_count * 12:
+            return empty
+
+        index = mapped[HEADER.size: index_end].view(INDEX_DTYPE)
+        points = mapped[index_end:].view('<f4').reshape(point_count, 3)
+        return index, points
+
+    def lookup(self, codepoint: int) -> tuple[np.ndarray, tuple[int, int]] | None:
+        '''
+        查找 ``codepoint`` 对应的字形，返回 ``(轮廓, advance)``，没有记录时返回 ``None``
+
+        从文件中读取的轮廓会被复制，使得返回值不会引用内存映射，
+        否则调用方持有返回值时，在 Windows 上 :meth:`flush` 会因为文件仍被映射而一直无法替换
+        '''
+        pending = self.pending.get(codepoint, None)
+        if pending is not None:
+            return pending
+
+        codepoints = self.index['codepoint']
+        i = np.searchsorted(codepoints, codepoint)
+        if i == len(codepoints) or codepoints[i] != codepoint:
+            return None
+
+        entry = self.index[i]
+        offset, count = int(entry['offset']), int(entry['count'])
+        outline = np.array(self.points[offset: offset + count], copy=True)
+        return outline, (int(entry['advance_x']), int(entry['advance_y']))
+
+    def add(self, codepoint: int, outline: np.ndarray, advance: tuple[int, int]) -> np.ndarray:
+        '''
+        记录新读取的字形，返回转换为 ``float32`` 后的轮廓，使得结果与之后从文件中读取的一致
+        '''
+        outline = np.ascontiguousarray(outline, dtype=np.float32).reshape(-1, 3)
+        self.pending[codepoint] = (outline, advance)
+        return outline
+
+    def flush(self) -> None:
+        '''
+        将新读取的字形与文件中已有的字形合并后写入文件
+        '''
+        if not self.pending or self.path is None:
+            return
+
+        # 重新读取，以合并其它进程在此期间写入的字形
+        index, points = self.read(self.path)
+        glyphs: dict[int, tuple[np.ndarray, tuple[int, int]]] = {
+            int(entry['codepoint']): (
+                points[entry['offset']: entry['offset'] + entry['count']],
+                (int(entry['advance_x']), int(entry['advance_y']))
+            )
+            for entry in index
+        }
+        glyphs.update(self.pending)
+
+        codepoints = sorted(glyphs)
+        new_index = np.empty(len(codepoints), dtype=INDEX_DTYPE)
+        offset = 0
+        for i, codepoint in enumerate(codepoints):
+            outline, advance = glyphs[codepoint]
+            new_index[i] = (codepoint, offset, len(outline), advance[0], advance[1])
+            offset += len(outline)
+        new_points = np.concatenate([glyphs[codepoint][0] for codepoint in codepoints]).astype('<f4')
+
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'wb') as file:
+                file.write(HEADER.pack(MAGIC, len(codepoints), len(new_points)))
+                file.write(new_index.tobytes())
+                file.write(new_points.tobytes())
+            # 释放对旧文件的映射，否则在 Windows 上无法替换
+            del index, points, glyphs
+            self.index = new_index
+            self.points = new_points
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            # 例如在 Windows 上其它进程正在映射该文件时无法替换，保留 pending 中的字形，在下一次 flush 时重试
+            log.warning(_('Unable to write glyph store "{path}": {exc}').format(path=self.path, exc=e))
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        self.pending.clear()
+        self.index, self.points = self.read(self.path)
+
+
+def flush_glyph_stores() -> None:
+    '''
+    将所有 :class:`GlyphStore` 中新读取的字形写入文件
+    '''
+    for store in GlyphStore.stores.values():
+        store.flush()
+
+
+atexit.register(flush_glyph_stores)
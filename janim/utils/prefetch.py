@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import inspect
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Generator
+
+from janim.locale.i18n import get_local_strings
+from janim.logger import log
+
+if TYPE_CHECKING:
+    from janim.anims.timeline import Timeline
+    from janim.items.svg.typst import TypstArgs
+
+_ = get_local_strings('prefetch')
+
+MANIFEST_VERSION = 1
+
+
+class AssetManifest:
+    '''
+    记录一次构建中用到的 Typst 文档以及 SVG 文件，按照首次用到的顺序排列
+
+    - ``typst``：传给 :meth:`~.TypstDoc.compile_typst` 的参数
+    - ``svg``：SVG 文件的路径以及解析时使用的 ``group_key``
+    '''
+    def __init__(
+        self,
+        typst: list[TypstArgs] | None = None,
+        svg: list[tuple[str, str | None]] | None = None
+    ):
+        # 使用 dict 去除重复并保持顺序
+        self.typst: dict[TypstArgs, None] = dict.fromkeys(typst or [])
+        self.svg: dict[tuple[str, str | None], None] = dict.fromkeys(svg or [])
+
+    @staticmethod
+    def get_path(timeline: Timeline) -> str:
+        '''
+        得到 ``timeline`` 的记录所在的路径，由时间轴所在的文件以及类名决定
+        '''
+        from janim.utils.config import Config
+
+        cls = timeline.__class__
+        try:
+            source = os.path.abspath(inspect.getfile(cls))
+        except TypeError:
+            source = cls.__module__
+        key = repr((source, cls.__qualname__))
+
+        directory = os.path.join(Config.get.temp_dir, 'prefetch')
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, hashlib.md5(key.encode()).hexdigest() + '.json')
+
+    @staticmethod
+    def load(path: str) -> AssetManifest | None:
+        '''
+        读取记录，文件不存在或者无效时返回 ``None``
+        '''
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('version') != MANIFEST_VERSION:
+                return None
+            return AssetManifest(
+                [tuple(args) for args in data['typst']],
+                [tuple(entry) for entry in data['svg']]
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        data = {
+            'version': MANIFEST_VERSION,
+            'typst': list(self.typst),
+            'svg': list(self.svg)
+        }
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError:
+            log.debug(_('Unable to write prefetch manifest "{path}"').format(path=path))
+
+
+class AssetPrefetcher:
+    '''
+    在 :meth:`~.Timeline.construct` 执行的同时，在后台预先编译 Typst 文档以及解析 SVG 文件
+
+    - 要预取的内容来自上一次构建时的记录 :class:`AssetManifest`，本次构建用到的内容会被记录下来供下一次使用
+    - 后台线程先使用 :meth:`~.TypstDoc.compile_typst_batch` 批量编译所有 Typst 文档，
+      再按照记录的顺序依次解析 SVG 文件，结果存放在原本的缓存中
+    - :meth:`~.TypstDoc.compile_typst` 和 :meth:`~.SVGItem.get_items_from_file` 通过
+      :func:`request_typst` 和 :func:`request_svg` 通知该对象：
+
+      - 对于 Typst 文档，只等待包含该文档的那一份批量编译完成，而不是等待所有文档编译完成；
+        批量编译按照记录的顺序分份，所以先用到的文档通常在先完成的部分中
+      - 对于 SVG 文件，如果正在后台处理，则等待其完成；如果还没有开始处理，则将其从后台的队列中移除，直接在当前线程处理
+
+    - 退出 :meth:`prefetching` 时，尚未开始的预取会被取消，并等待后台线程结束，
+      最多需要等待正在进行的一份 Typst 批量编译或者一个 SVG 文件的解析
+
+    通过 ``Config.prefetch_assets`` 启用，例如 ``janim run your_file.py YourTimeline -c prefetch_assets true``
+    '''
+    ctx_var: ContextVar[AssetPrefetcher | None] = ContextVar('AssetPrefetcher.ctx_var', default=None)
+
+    def __init__(self, manifest: AssetManifest | None):
+        self.recorded = AssetManifest()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread: threading.Thread | None = None
+
+        # 每个要预取的 Typst 文档对应的事件，在包含它的那一份批量编译完成后被设置
+        self.typst_events: dict[str, threading.Event] = {}
+        self.typst_args: list[TypstArgs] = []
+
+        self.svg_pending: dict[tuple[str, str | None], None] = {}
+        self.svg_running: dict[str, threading.Event] = {}
+
+        if manifest is not None:
+            from janim.items.svg.typst import TypstDoc
+
+            for args in manifest.typst:
+                path = TypstDoc.get_svg_file_path(*args)
+                if not os.path.exists(path) and path not in self.typst_events:
+                    self.typst_args.append(args)
+                    self.typst_events[path] = threading.Event()
+            self.svg_pending = dict(manifest.svg)
+
+    @staticmethod
+    @contextmanager
+    def prefetching(timeline: Timeline) -> Generator[AssetPrefetcher, None, None]:
+        '''
+        在该上下文中预取 ``timeline`` 上一次构建时用到的内容，并在正常退出时保存本次的记录
+        '''
+        path = AssetManifest.get_path(timeline)
+        prefetcher = AssetPrefetcher(AssetManifest.load(path))
+        prefetcher.start()
+
+        token = AssetPrefetcher.ctx_var.set(prefetcher)
+        try:
+            yield prefetcher
+        finally:
+            AssetPrefetcher.ctx_var.reset(token)
+            prefetcher.stop()
+
+        prefetcher.recorded.save(path)
+
+    def start(self) -> None:
+        if not self.typst_args and not self.svg_pending:
+            return
+
+        log.debug(_('Prefetching {typst} typst documents and {svg} svg files')
+                  .format(typst=len(self.typst_args), svg=len(self.svg_pending)))
+
+        # 复制上下文，使得后台线程中可以得到当前的 Config
+        ctx = contextvars.copy_context()
+        self.thread = threading.Thread(target=ctx.run, args=(self.run,), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        '''
+        取消尚未开始的预取，并等待后台线程结束
+        '''
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self) -> None:
+        from janim.items.svg.svg_item import SVGItem
+        from janim.items.svg.typst import TypstDoc
+
+        if self.typst_args:
+            try:
+                TypstDoc.compile_typst_batch(self.typst_args,
+                                             fallback=False,
+                                             on_batch_done=self.on_typst_batch_done,
+                                             stop_event=self.stopped)
+            except Exception as e:
+                log.debug(_('Failed to prefetch typst documents: {exc}').format(exc=e))
+            finally:
+                # 编译失败或者被跳过的文档也需要设置，使得等待的一方可以自行编译
+                for event in self.typst_events.values():
+                    event.set()
+
+        while not self.stopped.is_set():
+            with self.lock:
+                if not self.svg_pending:
+                    break
+                file_path, group_key = entry = next(iter(self.svg_pending))
+                del self.svg_pending[entry]
+                event = self.svg_running[file_path] = threading.Event()
+
+            try:
+                SVGItem.get_builders_from_file(file_path, group_key)
+            except Exception as e:
+                log.debug(_('Failed to prefetch "{path}": {exc}').format(path=file_path, exc=e))
+            finally:
+                with self.lock:
+                    del self.svg_running[file_path]
+                event.set()
+
+    def on_typst_batch_done(self, paths: list[str]) -> None:
+        for path in paths:
+            event = self.typst_events.get(path, None)
+            if event is not None:
+                event.set()
+
+    def request_typst(self, args: TypstArgs, svg_file_path: str) -> None:
+        self.recorded.typst[args] = None
+        event = self.typst_events.get(svg_file_path, None)
+        if event is not None:
+            event.wait()
+
+    def request_svg(self, file_path: str, group_key: str | None) -> None:
+        file_path = os.path.abspath(file_path)
+        entry = (file_path, group_key)
+        self.recorded.svg[entry] = None
+
+        with self.lock:
+            if entry in self.svg_pending:
+                del self.svg_pending[entry]
+                return
+            event = self.svg_running.get(file_path, None)
+
+        if event is not None:
+            event.wait()
+
+
+def request_typst(args: TypstArgs, svg_file_path: str) -> None:
+    '''
+    由 :meth:`~.TypstDoc.compile_typst` 调用，记录用到的 Typst 文档，如果其正在预取则等待完成
+    '''
+    prefetcher = AssetPrefetcher.ctx_var.get()
+    if prefetcher is not None:
+        prefetcher.request_typst(args, svg_file_path)
+
+
+def request_svg(file_path: str, group_key: str | None) -> None:
+    '''
+    由 :meth:`~.SVGItem.get_items_from_file` 调用，记录用到的 SVG 文件，如果其正在预取则等待完成
+    '''
+    prefetcher = AssetPrefetcher.ctx_var.get()
+    if prefetcher is not None:
+        prefetcher.request_svg(file_path, group_key)
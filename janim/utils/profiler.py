@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import csv
+import json
+import linecache
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import CodeType
+from typing import TYPE_CHECKING, Generator
+
+from janim.locale.i18n import get_local_strings
+from janim.logger import log
+
+if TYPE_CHECKING:
+    from janim.anims.timeline import Timeline
+
+_ = get_local_strings('profiler')
+
+MONITORING = sys.monitoring
+
+
+@dataclass
+class ProfileStat:
+    '''
+    某一项（代码行、动画类或构建阶段）的累计开销
+
+    ``mem`` 是执行期间 ``tracemalloc`` 统计的内存的净增量，也就是分配减去释放，
+    而不是分配的总量，因此可能为负数；分配后又被释放的临时对象不会被计入
+    '''
+    name: str
+    calls: int = 0
+    time: float = 0
+    mem: int = 0
+
+
+@dataclass
+class _Frame:
+    code: CodeType
+    key: str
+    obj_id: int
+    start: float
+    mem_start: int
+    children_time: float = 0
+    children_mem: int = 0
+
+
+@dataclass
+class _TraceEvent:
+    name: str
+    cat: str
+    start: float
+    duration: float
+    args: dict = field(default_factory=dict)
+
+
+class BuildProfiler:
+    '''
+    用于 :meth:`~.Timeline.build` 的性能分析，将耗时与内存分配归属到：
+
+    - :meth:`~.Timeline.construct` 中的代码行（包含该行中调用的所有函数）
+    - 动画类的 ``__init__`` 与 ``_time_fixed``（不包含嵌套的子动画，例如 :class:`~.AnimGroup` 的子动画）
+    - 构建过程的各个阶段
+
+    基于 ``sys.monitoring``，只在上述函数对应的代码对象上开启事件，因此不会影响其它代码的执行速度；
+    内存的净增量通过 ``tracemalloc`` 统计（参考 :class:`ProfileStat`），这会使构建本身变慢，但各项之间的比例仍可参考
+
+    一般通过 ``Timeline.build(profile=True)`` 或 ``janim write --profile_build`` 使用
+    '''
+    TOOL_ID = MONITORING.PROFILER_ID
+
+    def __init__(self, timeline: Timeline):
+        self.timeline = timeline
+        self.construct_code: CodeType = type(timeline).construct.__code__
+
+        self.lines: dict[int, ProfileStat] = {}
+        self.anims: dict[str, ProfileStat] = {}
+        self.phases: dict[str, ProfileStat] = {}
+        self.events: list[_TraceEvent] = []
+
+        self.monitored: dict[CodeType, str] = {}
+        self.stack: list[_Frame] = []
+        self.current_line: int | None = None
+        self.line_start: float = 0
+        self.line_mem_start: int = 0
+
+        self.begin_time: float = 0
+        self.tracing_malloc: bool = False
+        self.active: bool = False
+
+    # region 记录
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    def traced_memory(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.tracing_malloc else 0
+
+    @contextmanager
+    def profiling(self) -> Generator[None, None, None]:
+        '''
+        在该上下文中进行性能分析
+        '''
+        try:
+            MONITORING.use_tool_id(self.TOOL_ID, 'janim-build-profiler')
+        except ValueError:
+            log.warning(_('Another profiler is already active, build profiling is disabled'))
+            yield
+            return
+
+        self.tracing_malloc = not tracemalloc.is_tracing()
+        if self.tracing_malloc:
+            tracemalloc.start()
+
+        events = MONITORING.events
+        MONITORING.register_callback(self.TOOL_ID, events.PY_START, self._on_start)
+        MONITORING.register_callback(self.TOOL_ID, events.PY_RETURN, self._on_return)
+        MONITORING.register_callback(self.TOOL_ID, events.LINE, self._on_line)
+
+        self._collect_monitored()
+        for code in self.monitored:
+            MONITORING.set_local_events(self.TOOL_ID, code, events.PY_START | events.PY_RETURN)
+        MONITORING.set_local_events(self.TOOL_ID, self.construct_code, events.LINE | events.PY_RETURN)
+
+        self.begin_time = self.now()
+        self.active = True
+        try:
+            yield
+        finally:
+            self.active = False
+            for code in self.monitored:
+                MONITORING.set_local_events(self.TOOL_ID, code, 0)
+            MONITORING.set_local_events(self.TOOL_ID, self.construct_code, 0)
+            for event in (events.PY_START, events.PY_RETURN, events.LINE):
+                MONITORING.register_callback(self.TOOL_ID, event, None)
+            MONITORING.free_tool_id(self.TOOL_ID)
+
+            if self.tracing_malloc:
+                tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        '''
+        记录构建过程中的一个阶段
+        '''
+        if not self.active:
+            yield
+            return
+        start = self.now()
+        mem_start = self.traced_memory()
+        try:
+            yield
+        finally:
+            duration = self.now() - start
+            stat = self.phases.setdefault(name, ProfileStat(name))
+            stat.calls += 1
+            stat.time += duration
+            stat.mem += self.traced_memory() - mem_start
+            self.events.append(_TraceEvent(name, 'phase', start, duration))
+
+    def _collect_monitored(self) -> None:
+        from janim.anims.animation import Animation
+
+        classes = [Animation]
+        while classes:
+            cls = classes.pop()
+            classes.extend(cls.__subclasses__())
+            for name in ('__init__', '_time_fixed'):
+                func = cls.__dict__.get(name, None)
+                code = getattr(func, '__code__', None)
+                if code is not None:
+                    self.monitored[code] = name
+
+    def _on_start(self, code: CodeType, offset: int) -> None:
+        # sys._getframe(1) 即被监视的函数所在的帧
+        obj = sys._getframe(1).f_locals.get('self', None)
+        key = f'{type(obj).__name__}.{self.monitored[code]}'
+        self.stack.append(_Frame(code, key, id(obj), self.now(), self.traced_memory()))
+
+    def _on_return(self, code: CodeType, offset: int, retval: object) -> None:
+        if code is self.construct_code:
+            self._finish_line()
+            return
+
+        # 出现异常时不会产生 PY_RETURN 事件，因此需要找到与之对应的帧
+        while self.stack:
+            frame = self.stack.pop()
+            if frame.code is code:
+                break
+        else:
+            return
+
+        now = self.now()
+        duration = now - frame.start
+        mem = self.traced_memory() - frame.mem_start
+
+        parent = self.stack[-1] if self.stack else None
+        if parent is not None:
+            # 同一个动画对象中通过 super() 调用的基类方法，合并到外层的调用中
+            if parent.obj_id == frame.obj_id and parent.key == frame.key:
+                parent.children_time += frame.children_time
+                parent.children_mem += frame.children_mem
+                return
+            parent.children_time += duration
+            parent.children_mem += mem
+
+        stat = self.anims.setdefault(frame.key, ProfileStat(frame.key))
+        stat.calls += 1
+        stat.time += duration - frame.children_time
+        stat.mem += mem - frame.children_mem
+        self.events.append(_TraceEvent(frame.key, 'anim', frame.start, duration))
+
+    def _on_line(self, code: CodeType, line: int) -> None:
+        self._finish_line()
+        self.current_line = line
+        self.line_start = self.now()
+        self.line_mem_start = self.traced_memory()
+
+    def _finish_line(self) -> None:
+        if self.current_line is None:
+            return
+        duration = self.now() - self.line_start
+        stat = self.lines.get(self.current_line, None)
+        if stat is None:
+            text = linecache.getline(self.construct_code.co_filename, self.current_line).strip()
+            stat = self.lines[self.current_line] = ProfileStat(f'{self.current_line}: {text}')
+        stat.calls += 1
+        stat.time += duration
+        stat.mem += self.traced_memory() - self.line_mem_start
+        self.events.append(_TraceEvent(stat.name, 'construct', self.line_start, duration))
+        self.current_line = None
+
+    # endregion
+
+    # region 输出
+
+    SORT_KEYS = ('time', 'mem', 'calls', 'name')
+
+    def report(self, sort: str = 'time', limit: int | None = 20) -> str:
+        '''
+        生成文本形式的报告
+
+        - ``sort`` 可以是 ``'time'``、``'mem'``（内存的净增量）、``'calls'`` 或 ``'name'``
+        - ``limit`` 表示每个表格最多列出的条目数量，``None`` 表示不限制
+        '''
+        if sort not in self.SORT_KEYS:
+            raise ValueError(_('Unknown sort key "{sort}", available: {keys}')
+                             .format(sort=sort, keys=', '.join(self.SORT_KEYS)))
+
+        def sort_key(stat: ProfileStat):
+            value = getattr(stat, sort)
+            return value if sort == 'name' else -value
+
+        lines = [_('Build profile of "{name}"').format(name=type(self.timeline).__name__)]
+        tables = (
+            (_('Phases'), self.phases),
+            (_('Lines of construct'), self.lines),
+            (_('Animations (self time)'), self.anims),
+        )
+        for title, stats in tables:
+            if not stats:
+                continue
+            lines.append('')
+            lines.append(f'{title}:')
+            lines.append(f'{"time (s)":>10} {"mem (MB)":>11} {"calls":>7}  name')
+            for stat in sorted(stats.values(), key=sort_key)[:limit]:
+                lines.append(f'{stat.time:10.4f} {stat.mem / 1e6:11.3f} {stat.calls:7d}  {stat.name}')
+
+        return '\n'.join(lines)
+
+    def chrome_trace(self) -> dict:
+        '''
+        生成 Chrome Trace 格式的数据，可以在 ``chrome://tracing`` 或 Perfetto 中查看
+        '''
+        return _chrome_trace(self.events, self.begin_time, {'phase': 0, 'construct': 1, 'anim': 2})
+
+    def save_chrome_trace(self, file_path: str) -> None:
+        '''
+        将 :meth:`chrome_trace` 的结果保存到 ``file_path``
+        '''
+        with open(file_path, 'wt') as file:
+            json.dump(self.chrome_trace(), file)
+
+    # endregion
+
+
+class FrameProfiler:
+    '''
+    逐帧记录渲染过程中各个阶段的耗时，用于找出输出视频时的性能瓶颈
+
+    记录的阶段有：
+
+    - ``compute``：计算各个物件在当前时刻的数据（:meth:`~.AnimStack.compute`）
+    - ``sort``：按深度排序
+    - ``render:<渲染器类名>``：各个渲染器的 ``render`` 调用，按渲染器类分组
+    - ``readback``：从 framebuffer 读取像素（``glReadPixels``）
+    - ``pbo_map``：映射 PBO 并复制数据（由于 PBO 的延迟读取，记录在稍后的帧中）
+    - ``pipe_wait``：等待 ffmpeg 管道的空闲缓冲区，也就是被编码速度阻塞的时间
+
+    除了耗时，还可以通过 :meth:`record` 逐帧记录一些数值，例如 :class:`~.BufferArena` 的上传量与碎片率
+
+    由于 OpenGL 的调用是异步的，``render`` 阶段默认只包含 CPU 端的耗时；
+    传入 ``sync_gpu=True`` 会在每次渲染调用后等待 GPU 完成，使得 GPU 的耗时也被计入，但会使整体变慢
+
+    一般通过 :meth:`~.VideoWriter.write_all` 的 ``frame_profiler`` 参数或 ``janim write --profile_render`` 使用
+    '''
+    profiler_ctx: ContextVar[FrameProfiler | None] = ContextVar('FrameProfiler.profiler_ctx', default=None)
+
+    def __init__(self, *, sync_gpu: bool = False):
+        self.sync_gpu = sync_gpu
+        self.frame: int = -1
+        self.frames: list[dict[str, ProfileStat]] = []
+        self.values: list[dict[str, float]] = []
+        self.events: list[_TraceEvent] = []
+        self.begin_time: float = time.perf_counter()
+
+    def begin_frame(self, frame_idx: int) -> None:
+        '''
+        开始记录第 ``frame_idx`` 帧，之后记录的阶段都归属于该帧
+        '''
+        self.frame = frame_idx
+        self.frames.append({})
+        self.values.append({})
+
+    @contextmanager
+    def stage(self, name: str, **args) -> Generator[None, None, None]:
+        '''
+        记录一个阶段的耗时，``args`` 会作为附加信息写入 Chrome Trace
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if not self.frames:
+                self.frames.append({})
+                self.values.append({})
+            stat = self.frames[-1].setdefault(name, ProfileStat(name))
+            stat.calls += 1
+            stat.time += duration
+            self.events.append(_TraceEvent(name, 'frame', start, duration, dict(frame=self.frame, **args)))
+
+    def record(self, name: str, value: float) -> None:
+        '''
+        记录当前帧的一项数值，同一帧中多次记录时会累加
+        '''
+        if not self.frames:
+            self.frames.append({})
+            self.values.append({})
+        values = self.values[-1]
+        values[name] = values.get(name, 0) + value
+
+    def value_names(self) -> list[str]:
+        names: dict[str, None] = {}
+        for values in self.values:
+            names.update(dict.fromkeys(values))
+        return list(names)
+
+    def stage_names(self) -> list[str]:
+        names: dict[str, None] = {}
+        for stats in self.frames:
+            names.update(dict.fromkeys(stats))
+        return list(names)
+
+    def report(self) -> str:
+        '''
+        生成各阶段的汇总报告，按总耗时排序
+        '''
+        totals: dict[str, list[float]] = {}
+        for stats in self.frames:
+            for name, stat in stats.items():
+                totals.setdefault(name, []).append(stat.time)
+
+        lines = [
+            _('Render profile of {count} frames').format(count=len(self.frames)),
+            f'{"total (s)":>10} {"mean (ms)":>10} {"max (ms)":>10}  stage'
+        ]
+        for name, times in sorted(totals.items(), key=lambda x: -sum(x[1])):
+            lines.append(
+                f'{sum(times):10.4f} {sum(times) / len(self.frames) * 1e3:10.3f} {max(times) * 1e3:10.3f}  {name}'
+            )
+
+        value_names = self.value_names()
+        if value_names:
+            lines.append(f'{"total":>10} {"mean":>10} {"max":>10}  value')
+            for name in value_names:
+                values = [frame_values.get(name, 0) for frame_values in self.values]
+                lines.append(f'{sum(values):10.4g} {sum(values) / len(values):10.4g} {max(values):10.4g}  {name}')
+        return '\n'.join(lines)
+
+    def save_csv(self, file_path: str) -> None:
+        '''
+        保存为 CSV 文件，每一行对应一帧，每一列对应一个阶段的耗时（毫秒），之后的列为 :meth:`record` 记录的数值
+        '''
+        names = self.stage_names()
+        value_names = self.value_names()
+        with open(file_path, 'wt', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame', *names, *value_names])
+            for frame_idx, (stats, values) in enumerate(zip(self.frames, self.values)):
+                writer.writerow([
+                    frame_idx,
+                    *(f'{stats[name].time * 1e3:.4f}' if name in stats else '' for name in names),
+                    *(f'{values[name]:g}' if name in values else '' for name in value_names)
+                ])
+
+    def chrome_trace(self) -> dict:
+        '''
+        生成 Chrome Trace 格式的数据，可以在 ``chrome://tracing`` 或 Perfetto 中查看
+        '''
+        return _chrome_trace(self.events, self.begin_time, {'frame': 0})
+
+    def save_chrome_trace(self, file_path: str) -> None:
+        '''
+        将 :meth:`chrome_trace` 的结果保存到 ``file_path``
+        '''
+        with open(file_path, 'wt') as file:
+            json.dump(self.chrome_trace(), file)
+
+
+def _chrome_trace(events: list[_TraceEvent], begin_time: float, tids: dict[str, int]) -> dict:
+    return {
+        'traceEvents': [
+            {
+                'name': event.name,
+                'cat': event.cat,
+                'ph': 'X',
+                'ts': (event.start - begin_time) * 1e6,
+                'dur': event.duration * 1e6,
+                'pid': os.getpid(),
+                'tid': tids[event.cat],
+                'args': event.args
+            }
+            for event in events
+        ],
+        'displayTimeUnit': 'ms'
+    }
@@ -1,5 +1,7 @@
+import gc
 import inspect
 import math
+from contextlib import contextmanager
 from functools import lru_cache
 
 import numpy as np
@@ -9,6 +11,22 @@ def decode_utf8(utf8: str) -> str:
     return bytes(utf8, encoding='utf-8').decode('utf-8')
 
 
+@contextmanager
+def gc_paused():
+    '''
+    在该上下文中暂停自动垃圾回收，用于一次性创建大量物件的情况（例如字符较多的 :class:`~.Text`）
+
+    大量创建对象时会频繁触发分代回收，而此时新创建的对象都不会成为垃圾，暂停后在退出时恢复原本的状态
+    '''
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 def sigmoid(x):
     return 1.0 / (1 + np.exp(-x))
 
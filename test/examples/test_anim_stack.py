@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+
+from janim.anims.anim_stack import AnimStack
+from janim.anims.timeline import Timeline
+from janim.anims.updater import DataUpdater
+from janim.constants import PI, RIGHT, UP
+from janim.items.geometry.arc import Circle
+from janim.items.geometry.polygon import Square
+from janim.utils.config import Config
+
+
+class StackedTimeline(Timeline):
+    def construct(self) -> None:
+        self.square = Square(color='#58C4DD', fill_alpha=0.5).show()
+        self.circle = Circle(color='#FC6255').show()
+
+        self.forward(0.5)
+        # 单独占据区段的 .anim，可以批量计算
+        self.play(self.square.anim.points.shift(RIGHT * 2).r.color.set('#FFFFFF').r.radius.set(0.1))
+        # 非直线路径，退回逐帧计算
+        self.play(self.square.anim(path_arc=PI / 2).points.shift(UP))
+        # 同一区段中有多个动画，退回逐帧计算
+        self.play(self.square.anim.points.scale(0.5),
+                  DataUpdater(self.square, lambda data, p: data.points.rotate(p.alpha * PI)))
+        self.forward(0.5)
+
+        # 点数发生变化
+        self.play(self.circle.anim.become(Square(color='#83C167')))
+        self.forward(0.5)
+
+
+class ComputeStackedTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+        self.built = StackedTimeline().build(quiet=True)
+        self.timeline: StackedTimeline = self.built.timeline
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    def get_stack(self, item) -> AnimStack:
+        return self.timeline.item_appearances[item].stack
+
+    def assert_same_as_compute(self, stack: AnimStack, times: np.ndarray, cmpt_name: str) -> None:
+        with self.timeline.with_config():
+            stacked = stack.compute_stacked(times, cmpt_name)
+            expected = [stack.compute(float(t), True).components[cmpt_name].get() for t in times]
+
+        self.assertIsNotNone(stacked)
+        self.assertEqual(stacked.shape, (len(times), *expected[0].shape))
+        for t, data1, data2 in zip(times, stacked, expected):
+            np.testing.assert_array_equal(data1, data2, f't: {t}, cmpt: {cmpt_name}')
+
+    def test_same_as_compute(self) -> None:
+        stack = self.get_stack(self.timeline.square)
+        # 包含各区段的端点，以及乱序的时间点
+        times = np.concatenate([
+            np.array(stack.times[:-1]),
+            np.linspace(0, self.built.duration, 37),
+        ])
+        np.random.default_rng(1).shuffle(times)
+
+        self.assert_same_as_compute(stack, times, 'points')
+        # .anim 会将颜色数据对齐到锚点的数量，与前后区段的形状不同，因此无法合并
+        self.assertIsNone(stack.compute_stacked(times, 'stroke'))
+
+    def test_each_segment(self) -> None:
+        stack = self.get_stack(self.timeline.square)
+        for at, end in zip(stack.times, stack.times[1:]):
+            with self.subTest(at=at, end=end):
+                times = np.linspace(at, end, 9, endpoint=False)
+                for cmpt_name in ('points', 'stroke', 'fill', 'radius'):
+                    self.assert_same_as_compute(stack, times, cmpt_name)
+
+    def test_unsupported(self) -> None:
+        stack = self.get_stack(self.timeline.circle)
+        # 动画前后点数不同，无法合并
+        self.assertIsNone(stack.compute_stacked([0, self.built.duration], 'points'))
+        # 但分开时仍然可以计算
+        self.assert_same_as_compute(stack, np.array([0, 0.2]), 'points')
+        # 不存在的组件
+        self.assertIsNone(stack.compute_stacked([0], 'not_exists'))
+        self.assertIsNone(stack.compute_stacked([], 'points'))
+
+        with self.assertRaises(ValueError):
+            stack.compute_stacked([-1, 0], 'points')
@@ -0,0 +1,328 @@
+import gc
+import unittest
+import weakref
+
+import moderngl as mgl
+import numpy as np
+
+import janim.examples as examples
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.anims.transform import TransformMatchingShapes
+from janim.anims.updater import ItemUpdater
+from janim.constants import PI
+from janim.items.text import Text
+from janim.render.arena import (MIN_BLOCK_SIZE, SLAB_BLOCKS, SLAB_SIZE,
+                                ArenaBuffer, ArenaStats, BufferArena,
+                                DedicatedBuffer)
+from janim.render.base import create_standalone_context
+from janim.render.framebuffer import create_framebuffer, framebuffer_context
+from janim.utils.config import Config
+from janim.utils.data import ContextSetter
+from janim.utils.profiler import FrameProfiler
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+
+
+class BufferArenaTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ctx = create_standalone_context()
+        self.arena = BufferArena.get(self.ctx)
+
+    def tearDown(self) -> None:
+        self.arena.release()
+
+    def make_buffer(self, data: bytes) -> ArenaBuffer:
+        buf = self.arena.buffer()
+        buf.orphan(len(data))
+        buf.write(data)
+        return buf
+
+    def read(self, buf: ArenaBuffer) -> bytes:
+        return buf.buffer.read(buf.size, offset=buf.offset)
+
+    def assert_no_overlap(self) -> None:
+        blocks = sorted(self.arena.live_blocks, key=lambda block: (id(block.buffer), block.offset))
+        for block1, block2 in zip(blocks, blocks[1:]):
+            if block1.buffer is block2.buffer:
+                self.assertLessEqual(block1.offset + block1.capacity, block2.offset)
+        for block in blocks:
+            self.assertEqual(block.offset % block.capacity, 0)
+            self.assertLessEqual(block.offset + block.capacity, block.buffer.size)
+            self.assertLessEqual(block.used, block.capacity)
+
+    def test_size_class(self) -> None:
+        min_size = self.arena.min_block_size
+        self.assertGreaterEqual(min_size, MIN_BLOCK_SIZE)
+        # 最小的块需要满足 storage buffer 偏移的对齐要求
+        if self.ctx.version_code >= 430:
+            import OpenGL.GL as gl
+            self.assertEqual(min_size % gl.glGetIntegerv(gl.GL_SHADER_STORAGE_BUFFER_OFFSET_ALIGNMENT), 0)
+
+        for size in (1, min_size - 1, min_size):
+            self.assertEqual(self.arena.size_class(size), min_size)
+        self.assertEqual(self.arena.size_class(min_size + 1), min_size * 2)
+        self.assertEqual(self.arena.size_class(1000), max(min_size, 1024))
+        self.assertEqual(self.arena.size_class(1024), max(min_size, 1024))
+        self.assertEqual(self.arena.size_class(1025), max(min_size, 2048))
+        self.assertEqual(self.arena.size_class(SLAB_SIZE + 1), SLAB_SIZE * 2)
+
+    def test_slabs(self) -> None:
+        min_size = self.arena.min_block_size
+        # 同一等级的块从同一个 slab 中依次切分，满了之后才创建新的 slab
+        bufs = [self.make_buffer(bytes([i]) * min_size) for i in range(SLAB_BLOCKS + 1)]
+        self.assertEqual(len(self.arena.slabs), 2)
+        self.assertEqual([buf.offset for buf in bufs[:SLAB_BLOCKS]], list(range(0, min_size * SLAB_BLOCKS, min_size)))
+        self.assertIs(bufs[0].buffer, bufs[SLAB_BLOCKS - 1].buffer)
+        self.assertIsNot(bufs[0].buffer, bufs[SLAB_BLOCKS].buffer)
+
+        # 不同等级使用各自的 slab，slab 的大小不超过 SLAB_SIZE，超过时单独占用一个 slab
+        large = self.make_buffer(b'\x01' * (SLAB_SIZE // 4 + 1))
+        huge = self.make_buffer(b'\x02' * (SLAB_SIZE + 1))
+        self.assertEqual(large.buffer.size, SLAB_SIZE)
+        self.assertEqual(huge.buffer.size, SLAB_SIZE * 2)
+        self.assertEqual(len(self.arena.slabs), 4)
+
+        stats = self.arena.stats()
+        self.assertEqual(stats.slabs, 4)
+        self.assertEqual(stats.capacity, sum(slab.size for slab in self.arena.slabs))
+        self.assertEqual(stats.allocated, min_size * (SLAB_BLOCKS + 1) + SLAB_SIZE // 2 + SLAB_SIZE * 2)
+        self.assertEqual(stats.used, min_size * (SLAB_BLOCKS + 1) + SLAB_SIZE // 4 + 1 + SLAB_SIZE + 1)
+        self.assertEqual(self.arena.take_uploaded(), stats.used)
+        self.assertEqual(self.arena.take_uploaded(), 0)
+        self.assert_no_overlap()
+
+    def test_no_shared_memory(self) -> None:
+        rng = np.random.default_rng(1)
+        datas = {}
+        for i in range(200):
+            data = rng.integers(0, 256, int(rng.integers(1, 5000)), dtype=np.uint8).tobytes()
+            datas[self.make_buffer(data)] = data
+            # 穿插着改变大小、释放，使得块在各个等级之间被反复复用
+            if i % 3 == 0:
+                buf = next(iter(datas))
+                data = rng.integers(0, 256, int(rng.integers(1, 5000)), dtype=np.uint8).tobytes()
+                buf.orphan(len(data))
+                buf.write(data)
+                datas[buf] = data
+            if i % 5 == 0:
+                buf = list(datas)[len(datas) // 2]
+                del datas[buf]
+                buf.release()
+
+        self.assert_no_overlap()
+        for buf, data in datas.items():
+            self.assertEqual(self.read(buf), data)
+
+    def test_orphan(self) -> None:
+        min_size = self.arena.min_block_size
+        buf = self.arena.buffer()
+        self.assertIsNone(buf.buffer)
+        self.assertEqual(buf.size, 0)
+
+        buf.orphan(min_size * 4)
+        block = buf._block[0]
+        self.assertEqual(block.capacity, min_size * 4)
+
+        # 在 (capacity / 4, capacity] 的范围内不重新分配
+        for size in (min_size * 4, min_size * 2, min_size + 1):
+            buf.orphan(size)
+            self.assertIs(buf._block[0], block)
+            self.assertEqual(buf.size, size)
+        self.assertEqual(self.arena.stats().used, min_size + 1)
+
+        # 超出当前块时重新分配，原本的块被归还
+        buf.orphan(min_size * 4 + 1)
+        self.assertIsNot(buf._block[0], block)
+        self.assertEqual(buf._block[0].capacity, min_size * 8)
+        self.assertNotIn(block, self.arena.live_blocks)
+        self.assertIn(block, self.arena.free_blocks[min_size * 4])
+
+        # 不足当前块的四分之一时重新分配为更小的块
+        block = buf._block[0]
+        buf.orphan(min_size * 2)
+        self.assertIsNot(buf._block[0], block)
+        self.assertEqual(buf._block[0].capacity, min_size * 2)
+        self.assertEqual(buf.size, min_size * 2)
+
+        buf.orphan(0)
+        self.assertIsNone(buf.buffer)
+        self.assertEqual(len(self.arena.live_blocks), 0)
+
+    def test_write_out_of_range(self) -> None:
+        buf = self.arena.buffer()
+        buf.orphan(16)
+        # 块的容量比 16 大，但只允许写入已设置的大小，避免写入相邻的块
+        with self.assertRaises(AssertionError):
+            buf.write(b'\x00' * 17)
+        with self.assertRaises(AssertionError):
+            buf.write(b'\x00' * 8, offset=12)
+
+    def test_freed_on_gc(self) -> None:
+        buf1 = self.make_buffer(b'\x01' * 100)
+        buf2 = self.make_buffer(b'\x02' * 100)
+        offset = buf1.offset
+        block = buf1._block[0]
+
+        del buf1
+        gc.collect()
+        self.assertEqual(len(self.arena.live_blocks), 1)
+        self.assertIn(block, self.arena.free_blocks[block.capacity])
+
+        # 被归还的块会被之后的分配复用
+        buf3 = self.make_buffer(b'\x03' * 50)
+        self.assertEqual(buf3.offset, offset)
+        self.assertEqual(self.read(buf2), b'\x02' * 100)
+        self.assertEqual(self.read(buf3), b'\x03' * 50)
+
+        # 主动释放后再被回收，不会重复归还
+        buf3.release()
+        del buf3
+        gc.collect()
+        self.assertEqual(self.arena.free_blocks[block.capacity].count(block), 1)
+
+    def test_release(self) -> None:
+        buf = self.make_buffer(b'\x01' * 100)
+        slab = buf.buffer
+        self.assertIs(BufferArena.find(self.ctx), self.arena)
+
+        self.arena.release()
+        self.assertIsNone(BufferArena.find(self.ctx))
+        self.assertEqual(self.arena.slabs, [])
+        self.assertEqual(self.arena.stats(), ArenaStats(0, 0, 0, 100, 0))
+        self.assertIsInstance(slab.mglo, mgl.InvalidObject)
+
+        # 在 release 之后归还的块被忽略
+        buf.release()
+        del buf
+        gc.collect()
+        self.assertEqual(self.arena.free_blocks, {})
+
+        # 之后重新创建新的分配器
+        arena = BufferArena.get(self.ctx)
+        self.assertIsNot(arena, self.arena)
+        self.assertIs(BufferArena.get(self.ctx), arena)
+        arena.release()
+
+    def test_tied_to_context(self) -> None:
+        ctx = create_standalone_context()
+        arena = BufferArena.get(ctx)
+        self.assertIsNot(arena, self.arena)
+        self.assertIs(BufferArena.find(ctx), arena)
+
+        # 分配器不会使上下文一直存活（moderngl 自身会持有上下文，直到调用 ctx.release()）
+        ctx_ref = weakref.ref(ctx)
+        arena_ref = weakref.ref(arena)
+        buf = arena.buffer()
+        buf.orphan(100)
+        ctx.release()
+        del ctx, arena, buf
+        gc.collect()
+        self.assertIsNone(ctx_ref())
+        self.assertIsNone(arena_ref())
+
+    def test_create_buffer(self) -> None:
+        # 默认不启用
+        self.assertIsInstance(BufferArena.create_buffer(self.ctx), DedicatedBuffer)
+        with Config(buffer_arena=False):
+            self.assertIsInstance(BufferArena.create_buffer(self.ctx), DedicatedBuffer)
+        with Config(buffer_arena=True):
+            buf = BufferArena.create_buffer(self.ctx)
+        self.assertIsInstance(buf, ArenaBuffer)
+        self.assertIs(buf.arena, self.arena)
+
+
+class ArenaRenderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    @staticmethod
+    def render_frames(
+        timeline_cls: type[Timeline],
+        enabled: bool,
+        profiler: FrameProfiler | None = None
+    ) -> tuple[mgl.Context, list[np.ndarray]]:
+        # 渲染器会绑定首次绘制时的 OpenGL 上下文，并在创建时决定是否使用 BufferArena，因此每次各自构建
+        built: BuiltTimeline = timeline_cls().build(quiet=True)
+        ctx = create_standalone_context()
+        fbo = create_framebuffer(ctx, WIDTH, HEIGHT)
+        frames = []
+        with framebuffer_context(fbo), Config(buffer_arena=enabled), \
+                ContextSetter(FrameProfiler.profiler_ctx, profiler):
+            for i, t in enumerate(np.linspace(0, built.duration, 12)):
+                if profiler is not None:
+                    profiler.begin_frame(i)
+                fbo.clear(*built.cfg.background_color.rgb, 1)
+                built.render_all(ctx, t)
+                frames.append(np.frombuffer(fbo.read(components=4), dtype=np.uint8).reshape(HEIGHT, WIDTH, 4))
+        return ctx, frames
+
+    def test_shared_renderer(self) -> None:
+        class UpdaterTimeline(Timeline):
+            def construct(self) -> None:
+                # ItemUpdater 中同一个渲染器在一帧内依次绘制各个字符，其中有多个点数相同的字符
+                self.prepare(ItemUpdater(None, lambda p: Text('Width = 2.00')), duration=1)
+                self.forward(1)
+
+        class StaticTimeline(Timeline):
+            def construct(self) -> None:
+                Text('Width = 2.00').show()
+                self.forward(1)
+
+        for enabled in (True, False):
+            with self.subTest(enabled=enabled):
+                _, frames1 = self.render_frames(UpdaterTimeline, enabled)
+                _, frames2 = self.render_frames(StaticTimeline, enabled)
+                for frame1, frame2 in zip(frames1, frames2):
+                    np.testing.assert_array_equal(frame1, frame2)
+
+    def test_same_as_dedicated(self) -> None:
+        for timeline_cls in (examples.SimpleCurveExample, examples.UpdaterExample, examples.MarkedItemExample):
+            with self.subTest(timeline=timeline_cls.__name__):
+                ctx, frames1 = self.render_frames(timeline_cls, True)
+                arena = BufferArena.find(ctx)
+                self.assertIsNotNone(arena)
+                self.assertGreater(len(arena.live_blocks), 0)
+                arena.release()
+
+                _, frames2 = self.render_frames(timeline_cls, False)
+                for frame1, frame2 in zip(frames1, frames2):
+                    self.assertFalse(np.array_equal(frame2, np.broadcast_to(frame2[0, 0], frame2.shape)),
+                                     'nothing is rendered')
+                    np.testing.assert_array_equal(frame1, frame2)
+
+    def test_transform_matching_shapes(self) -> None:
+        class TransformTimeline(Timeline):
+            def construct(self) -> None:
+                # 各个字符的点数量在动画中逐帧变化
+                a = Text('the morse code').show()
+                b = Text('here come dots')
+                self.play(TransformMatchingShapes(a, b, path_arc=PI / 2))
+                self.play(TransformMatchingShapes(b, a, path_arc=PI / 2))
+
+        profiler = FrameProfiler()
+        ctx, frames1 = self.render_frames(TransformTimeline, True, profiler)
+        arena = BufferArena.find(ctx)
+        self.assertIsNotNone(arena)
+        arena.release()
+
+        _, frames2 = self.render_frames(TransformTimeline, False)
+        for frame1, frame2 in zip(frames1, frames2):
+            np.testing.assert_array_equal(frame1, frame2)
+
+        # 统计信息只被记录在 FrameProfiler 中
+        self.assertEqual(profiler.value_names(),
+                         ['arena_uploaded_bytes', 'arena_capacity_bytes', 'arena_fragmentation'])
+        self.assertEqual(len(profiler.values), len(frames1))
+        for values in profiler.values:
+            self.assertGreater(values['arena_uploaded_bytes'], 0)
+            self.assertGreater(values['arena_capacity_bytes'], 0)
+            self.assertTrue(0 <= values['arena_fragmentation'] < 1)
+        # 点数量变化时复用已有的块，slab 不会一直增加
+        capacities = [values['arena_capacity_bytes'] for values in profiler.values]
+        half = len(capacities) // 2
+        self.assertEqual(capacities[half:], [capacities[-1]] * (len(capacities) - half))
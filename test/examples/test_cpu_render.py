@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from janim.anims.timeline import Timeline
+from janim.constants import LEFT
+from janim.items.geometry.polygon import Square
+from janim.items.image_item import ImageItem
+from janim.items.points import DotCloud
+from janim.render.base import create_standalone_context
+from janim.render.cpu import CPUFrameRenderer
+from janim.render.framebuffer import create_framebuffer, framebuffer_context
+from janim.utils.config import Config
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+
+
+class VItemTimeline(Timeline):
+    def construct(self) -> None:
+        Square(color='#58C4DD', fill_alpha=0.5, stroke_radius=0.04).show()
+        self.forward()
+
+
+class DotCloudTimeline(Timeline):
+    def construct(self) -> None:
+        DotCloud(*[[x, y, 0] for x in range(-3, 4) for y in range(-2, 3)], color='#FC6255', radius=0.1).show()
+        self.forward()
+
+
+class ImageItemTimeline(Timeline):
+    def construct(self) -> None:
+        # 使用颜色平滑变化的图像，使得两者采样方式的差异不会被放大
+        x = np.linspace(0, 255, 64, dtype=np.uint8)
+        data = np.stack(np.broadcast_arrays(x[None, :], x[:, None], np.uint8(128)), axis=-1)
+        img = Image.fromarray(np.ascontiguousarray(data), 'RGB')
+        ImageItem(img, height=4).show()
+        ImageItem(img, height=2, alpha=0.5).points.shift(LEFT * 3.5).r.show()
+        self.forward()
+
+
+class CPURenderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    @staticmethod
+    def render_gl(timeline_cls: type[Timeline], t: float) -> np.ndarray:
+        built = timeline_cls().build(quiet=True)
+        ctx = create_standalone_context()
+        fbo = create_framebuffer(ctx, WIDTH, HEIGHT)
+        with framebuffer_context(fbo):
+            fbo.clear(*built.cfg.background_color.rgb, 1)
+            built.render_all(ctx, t)
+        data = np.frombuffer(fbo.read(components=4), dtype=np.uint8).reshape(HEIGHT, WIDTH, 4)
+        return data[::-1]
+
+    @staticmethod
+    def render_cpu(timeline_cls: type[Timeline], t: float) -> np.ndarray:
+        built = timeline_cls().build(quiet=True)
+        return np.asarray(CPUFrameRenderer(built).capture(t, transparent=False).convert('RGBA'))
+
+    def assert_close(self, timeline_cls: type[Timeline], t: float = 0.5) -> None:
+        gl = self.render_gl(timeline_cls, t).astype(np.int16)[..., :3]
+        cpu = self.render_cpu(timeline_cls, t).astype(np.int16)[..., :3]
+        self.assertFalse(np.array_equal(gl, np.broadcast_to(gl[0, 0], gl.shape)), 'nothing is rendered')
+
+        delta = np.abs(gl - cpu).max(axis=-1)
+        # 抗锯齿以及纹理采样方式的不同只会在边缘处产生较大的差异
+        self.assertLess(delta.mean(), 1.5)
+        self.assertLess(np.count_nonzero(delta > 32) / delta.size, 0.01)
+
+    def test_vitem(self) -> None:
+        self.assert_close(VItemTimeline)
+
+    def test_dotcloud(self) -> None:
+        self.assert_close(DotCloudTimeline)
+
+    def test_imageitem(self) -> None:
+        self.assert_close(ImageItemTimeline)
@@ -0,0 +1,127 @@
+import unittest
+
+import numpy as np
+
+from janim.anims.animation import Animation
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.camera.camera import Camera
+from janim.constants import LEFT, RIGHT, UP
+from janim.items.geometry.polygon import Square
+from janim.items.item import Item
+from janim.render.base import BoundsCuller, RenderBounds, RenderData, Renderer
+from janim.utils.data import ContextSetter
+
+
+class CullTimeline(Timeline):
+    def construct(self) -> None:
+        # 缩放后画面的半宽约为 3.56，半高为 2
+        self.camera.points.scale(0.5)
+
+        Square(1).show()                                # inside
+        Square(1).points.shift(RIGHT * 5).r.show()      # outside
+        Square(1).points.shift(UP * 3).r.show()         # above
+        # 横跨画面的右边缘
+        Square(1).points.shift(RIGHT * 3.5).r.show()    # partial
+        # 在画面外的位置移动
+        moving = Square(1).points.shift(LEFT * 5).r.show()
+
+        self.forward(1)
+        self.play(moving.anim.points.shift(LEFT))
+        self.forward(1)
+
+
+def name_of(item: Item) -> str:
+    x, y = item.points.box.center[:2]
+    if y > 2:
+        return 'above'
+    if x > 4.5:
+        return 'outside'
+    if x > 3:
+        return 'partial'
+    if x < -4:
+        return 'moving'
+    return 'inside'
+
+
+def collected_names(built: BuiltTimeline, global_t: float) -> set[str]:
+    '''与 :meth:`~.BuiltTimeline.render_all` 一样设置上下文后调用 ``collect_render_datas``，得到将被渲染的物件'''
+    timeline = built.timeline
+    with ContextSetter(Animation.global_t_ctx, global_t), \
+         ContextSetter(Timeline.ctx_var, timeline), \
+         timeline.with_config():
+        camera = timeline.compute_item(timeline.camera, global_t, True)
+        camera_info = camera.points.info
+        anti_alias_radius = built.cfg.anti_alias_width / 2 * camera_info.scaled_factor
+        with ContextSetter(Renderer.data_ctx, RenderData(ctx=None,
+                                                         camera_info=camera_info,
+                                                         anti_alias_radius=anti_alias_radius)):
+            render_datas = built.collect_render_datas(global_t)
+    names = [name_of(data) for data, _ in render_datas]
+    assert len(set(names)) == len(names)
+    return set(names)
+
+
+class CullTest(unittest.TestCase):
+    def test_collect_render_datas(self) -> None:
+        built = CullTimeline().build(quiet=True)
+        all_names = {'inside', 'outside', 'above', 'partial', 'moving'}
+
+        for t in (0.5, 2.5):
+            with self.subTest(t=t):
+                # 静止且完全位于画面外的物件被剔除，部分位于画面内的保留
+                self.assertEqual(collected_names(built, t), {'inside', 'partial'})
+
+        # 处于动画中的物件即使在画面外也不会被剔除
+        self.assertEqual(collected_names(built, 1.5), {'inside', 'partial', 'moving'})
+
+        built.cull_offscreen = False
+        for t in (0.5, 1.5, 2.5):
+            self.assertEqual(collected_names(built, t), all_names)
+
+    def test_outside_mask(self) -> None:
+        camera_info = Camera().points.info
+        radius_x, radius_y = camera_info.frame_radius
+
+        def box(x0: float, x1: float, y0: float, y1: float) -> np.ndarray:
+            return np.array([[x, y, 0] for x in (x0, x1) for y in (y0, y1)], dtype=float)
+
+        bounds = [
+            # 与画面右边缘相距 0.1
+            RenderBounds(box(radius_x + 0.1, radius_x + 1, -1, 1), 0, False),
+            # 与画面下边缘相距 0.1，但描边的半径为 0.05
+            RenderBounds(box(-1, 1, -radius_y - 1, -radius_y - 0.1), 0.05, False),
+            # 位于画面内
+            RenderBounds(box(-1, 1, -1, 1), 0, False),
+            # 完全包住画面
+            RenderBounds(box(-20, 20, -20, 20), 0, False),
+        ]
+        culler = BoundsCuller()
+        # 抗锯齿的范围越大，越不容易被剔除
+        for anti_alias_radius, expected in [
+            (0, [True, True, False, False]),
+            (0.04, [True, True, False, False]),
+            (0.06, [True, False, False, False]),
+            (0.11, [False, False, False, False]),
+        ]:
+            with self.subTest(anti_alias_radius=anti_alias_radius):
+                mask = culler.outside_mask(bounds, camera_info, anti_alias_radius)
+                self.assertEqual(mask.tolist(), expected)
+
+    def test_outside_mask_camera(self) -> None:
+        bounds = [
+            RenderBounds(np.array([[-1, -1, 0], [1, 1, 0]], dtype=float), 0, False),
+            # 固定在画面中的物件不受摄像机位置影响
+            RenderBounds(np.array([[-1, -1, 0], [1, 1, 0]], dtype=float), 0, True),
+            # 部分顶点位于摄像机后方，投影不可靠，不会被剔除
+            RenderBounds(np.array([[30, 0, -20], [30, 0, 20]], dtype=float), 0, False),
+        ]
+        camera = Camera()
+        camera.points.shift(RIGHT * 20)
+        mask = BoundsCuller().outside_mask(bounds, camera.points.info, 0)
+        self.assertEqual(mask.tolist(), [True, False, False])
+
+        # 缩放并移动摄像机后，原本在画面中央的物件被剔除
+        camera = Camera()
+        camera.points.scale(0.1).shift(RIGHT * 2)
+        mask = BoundsCuller().outside_mask(bounds[:2], camera.points.info, 0)
+        self.assertEqual(mask.tolist(), [True, False])
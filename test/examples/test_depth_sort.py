@@ -0,0 +1,90 @@
+import random
+import unittest
+
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.items.geometry.polygon import Square
+from janim.items.item import Item
+
+
+class EmptyTimeline(Timeline):
+    def construct(self) -> None:
+        self.forward()
+
+
+def make_item(depth: float, order: int) -> Item:
+    item = Square()
+    item.depth.set(depth, order, root_only=True)
+    return item
+
+
+def render_datas_of(items: list[Item]) -> list[tuple[Item, None]]:
+    return [(item, None) for item in items]
+
+
+def full_sort(items: list[Item]) -> list[Item]:
+    keys = [item.depth.get_raw() for item in items]
+    return [items[i] for i in sorted(range(len(items)), key=keys.__getitem__, reverse=True)]
+
+
+class DepthSortTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.built: BuiltTimeline = EmptyTimeline().build(quiet=True)
+
+    def sort(self, items: list[Item]) -> list[Item]:
+        return [item for item, _ in self.built.sort_by_depth(render_datas_of(items))]
+
+    def test_reuse(self) -> None:
+        items = [make_item(depth, order) for depth, order in [(1, 0), (3, 0), (2, 0), (2, -1)]]
+        self.assertEqual(self.sort(items), [items[1], items[2], items[3], items[0]])
+        order = self.built._depth_order
+
+        # 每帧的物件都是新计算的，(depth, order) 相同时复用上一次的结果
+        copies = [item.copy() for item in items]
+        self.assertEqual(self.sort(copies), [copies[1], copies[2], copies[3], copies[0]])
+        self.assertIs(self.built._depth_order, order)
+
+    def test_depth_change(self) -> None:
+        items = [make_item(i, 0) for i in range(5)]
+        self.assertEqual(self.sort(items), items[::-1])
+
+        items[0].depth.set(10, 0, root_only=True)
+        self.assertEqual(self.sort(items), [items[0], items[4], items[3], items[2], items[1]])
+
+        # 物件消失与出现
+        new_item = make_item(2.5, 0)
+        items = [items[0], items[1], new_item, items[3]]
+        self.assertEqual(self.sort(items), [items[0], items[3], new_item, items[1]])
+
+        self.assertEqual(self.sort([]), [])
+        self.assertEqual(self.sort(items), [items[0], items[3], new_item, items[1]])
+
+    def test_ties(self) -> None:
+        # (depth, order) 完全相同的物件，例如额外的渲染调用中物件的副本，保持原有的顺序
+        a, b, c = [make_item(1, 0) for _ in range(3)]
+        front = make_item(0, 0)
+        back = make_item(2, 0)
+        self.assertEqual(self.sort([a, front, b, back, c]), [back, a, b, c, front])
+        self.assertEqual(self.sort([c, b, front, a, back]), [back, c, b, a, front])
+
+        # 其中一个的深度发生变化后又变回
+        b.depth.set(5, 0, root_only=True)
+        self.assertEqual(self.sort([c, b, front, a, back]), [b, back, c, a, front])
+        b.depth.set(1, 0, root_only=True)
+        self.assertEqual(self.sort([c, b, front, a, back]), [back, c, b, a, front])
+
+    def test_same_as_full_sort(self) -> None:
+        rng = random.Random(0)
+        pool = [make_item(rng.randint(0, 5), rng.randint(-3, 0)) for _ in range(60)]
+        items = rng.sample(pool, 30)
+        for _ in range(200):
+            items = list(items)
+            for _ in range(rng.randint(0, 3)):
+                action = rng.randrange(3)
+                if action == 0 and items:
+                    items.pop(rng.randrange(len(items)))
+                elif action == 1:
+                    items.insert(rng.randint(0, len(items)), rng.choice(pool))
+                elif items:
+                    item = rng.choice(items)
+                    item.depth.set(rng.randint(0, 5), rng.randint(-3, 0), root_only=True)
+            self.assertEqual(self.sort(items), full_sort(items))
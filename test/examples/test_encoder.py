@@ -0,0 +1,107 @@
+import os
+import stat
+import tempfile
+import unittest
+
+from janim.logger import log
+from janim.render.encoder import (CODEC_ENCODERS, EncoderProfile,
+                                  auto_encoder_cache, encoders_cache,
+                                  list_encoders, probe_cache)
+from janim.utils.config import Config
+
+# 只有软件编码器可用的 ffmpeg：h264_nvenc 虽然被列出，但是没有对应的显卡，无法使用
+FAKE_FFMPEG = '''#!/bin/sh
+case " $* " in
+    *" -encoders "*)
+        cat <<'EOF'
+Encoders:
+ V..... = Video
+ A..... = Audio
+ ------
+ V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)
+ V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)
+ V....D libx265              libx265 H.265 / HEVC (codec hevc)
+ V....D qtrle                QuickTime Animation (RLE) video
+ A....D aac                  AAC (Advanced Audio Coding)
+EOF
+        exit 0 ;;
+    *" -vcodec h264_nvenc "*)
+        exit 1 ;;
+esac
+exit 0
+'''
+
+
+@unittest.skipIf(os.name == 'nt', 'requires a shell script')
+class EncoderProfileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ffmpeg_bin = os.path.join(self.temp_dir.name, 'ffmpeg')
+        with open(self.ffmpeg_bin, 'wt') as file:
+            file.write(FAKE_FFMPEG)
+        os.chmod(self.ffmpeg_bin, os.stat(self.ffmpeg_bin).st_mode | stat.S_IEXEC)
+
+        self.config = Config(ffmpeg_bin=self.ffmpeg_bin)
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+        for cache in (encoders_cache, probe_cache, auto_encoder_cache):
+            for key in [key for key in cache if self.ffmpeg_bin in (key if isinstance(key, tuple) else (key,))]:
+                del cache[key]
+        self.temp_dir.cleanup()
+
+    def args(self, ext: str) -> list[str]:
+        return EncoderProfile.from_config(Config.get, ext).ffmpeg_args()
+
+    def test_defaults(self) -> None:
+        self.assertEqual(list_encoders(self.ffmpeg_bin), {'libx264', 'h264_nvenc', 'libx265', 'qtrle', 'aac'})
+
+        # 与原先写死的参数一致
+        with self.assertLogs(log, level='INFO'):
+            self.assertEqual(self.args('.mp4'), ['-pix_fmt', 'yuv420p', '-vcodec', 'libx264'])
+        self.assertEqual(self.args('.mov'), ['-vcodec', 'qtrle'])
+
+    def test_auto_encoder(self) -> None:
+        # 硬件编码器无法使用时使用软件编码器
+        with self.assertLogs(log, level='INFO') as cm:
+            self.assertEqual(EncoderProfile.auto_encoder(self.ffmpeg_bin, 'h264', 'yuv420p'), 'libx264')
+        self.assertEqual(len(cm.records), 1)
+        self.assertIn('libx264', cm.output[0])
+        self.assertFalse(probe_cache[(self.ffmpeg_bin, 'h264_nvenc', 'yuv420p')])
+        # 结果被缓存，不会再次查找
+        self.assertEqual(auto_encoder_cache[(self.ffmpeg_bin, 'h264')], 'libx264')
+        with self.assertNoLogs(log, level='INFO'):
+            self.assertEqual(EncoderProfile.auto_encoder(self.ffmpeg_bin, 'h264', 'yuv420p'), 'libx264')
+
+        # 都不可用时使用软件编码器，由 ffmpeg 给出具体的错误信息
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(EncoderProfile.auto_encoder(self.ffmpeg_bin, 'av1', 'yuv420p'), CODEC_ENCODERS['av1'][-1])
+
+    def test_overrides(self) -> None:
+        with Config(video_codec='hevc', video_encoder='libx265', video_crf=20, video_preset='fast', video_threads=2):
+            self.assertEqual(self.args('.mp4'), [
+                '-pix_fmt', 'yuv420p',
+                '-vcodec', 'libx265',
+                '-preset', 'fast',
+                '-crf', '20',
+                '-threads', '2',
+                '-x265-params', 'log-level=error',
+                '-tag:v', 'hvc1',
+            ])
+
+        with Config(video_encoder='h264_nvenc', video_crf=23, video_pix_fmt='yuv444p'):
+            self.assertEqual(self.args('.mp4'), ['-pix_fmt', 'yuv444p', '-vcodec', 'h264_nvenc', '-rc', 'vbr', '-cq', '23'])
+
+        # 不支持 CRF 的编码器忽略 video_crf
+        with Config(video_encoder='h264_videotoolbox', video_crf=23):
+            with self.assertLogs(level='WARNING'):
+                self.assertEqual(self.args('.mp4'), ['-pix_fmt', 'yuv420p', '-vcodec', 'h264_videotoolbox'])
+
+        with Config(video_codec='prores'):
+            # 没有列出 ProRes 的编码器，使用软件编码器
+            with self.assertLogs(level='WARNING'):
+                self.assertEqual(self.args('.mov'), ['-pix_fmt', 'yuva444p10le', '-vcodec', 'prores_ks'])
+            # prores 无法存放在 .mp4 中
+            with self.assertLogs(level='WARNING'):
+                self.assertEqual(self.args('.mp4'), ['-pix_fmt', 'yuv420p', '-vcodec', 'libx264'])
@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from janim.utils.font.database import (DATABASE_CACHE_VERSION, FontDatabase,
+                                       load_database)
+from janim.utils.font_manager import findSystemFonts
+
+
+class FontDatabaseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fonts = [path for path in findSystemFonts() if path.endswith('.ttf')]
+        if not fonts:
+            self.skipTest('no .ttf font is installed')
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.font_path = os.path.join(self.temp_dir.name, 'font.ttf')
+        self.cache_path = os.path.join(self.temp_dir.name, 'font_database.json')
+        shutil.copyfile(fonts[0], self.font_path)
+
+        self.family_name = self.load().family_by_name.popitem()[0]
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def load(self, *filepaths: str) -> FontDatabase:
+        return load_database(list(filepaths or [self.font_path]), self.cache_path)
+
+    def read_cache(self) -> dict:
+        with open(self.cache_path, 'rt', encoding='utf-8') as file:
+            return json.load(file)
+
+    def plant_family_name(self) -> None:
+        '''将缓存中的字体族名称改为 ``'Cached Family'``，以此判断之后是否使用了缓存'''
+        data = self.read_cache()
+        data['files'][self.font_path]['fonts'][0]['family_name'] = 'Cached Family'
+        with open(self.cache_path, 'wt', encoding='utf-8') as file:
+            json.dump(data, file)
+
+    def get_family_names(self, *filepaths: str) -> list[str]:
+        return list(self.load(*filepaths).family_by_name)
+
+    def test_cache_reused(self) -> None:
+        stat = os.stat(self.font_path)
+        entry = self.read_cache()['files'][self.font_path]
+        self.assertEqual(entry['mtime'], stat.st_mtime_ns)
+        self.assertEqual(entry['size'], stat.st_size)
+        self.assertEqual(entry['fonts'][0]['family_name'], self.family_name)
+
+        self.plant_family_name()
+        db = self.load()
+        self.assertEqual(list(db.family_by_name), ['Cached Family'])
+        info = db.family_by_name['Cached Family'].infos[0]
+        self.assertEqual((info.filepath, info.index), (self.font_path, 0))
+        # 缓存的 family_names 在读取后仍然是元组
+        self.assertTrue(all(isinstance(item, tuple) for item in info.record.family_names))
+
+    def test_invalidated_by_mtime(self) -> None:
+        self.plant_family_name()
+        stat = os.stat(self.font_path)
+        os.utime(self.font_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertEqual(self.get_family_names(), [self.family_name])
+        self.assertEqual(self.read_cache()['files'][self.font_path]['mtime'], stat.st_mtime_ns + 10**9)
+
+    def test_invalidated_by_size(self) -> None:
+        self.plant_family_name()
+        stat = os.stat(self.font_path)
+        # 文件末尾多余的数据不影响读取；修改时间保持不变，只有大小发生变化
+        with open(self.font_path, 'ab') as file:
+            file.write(b'\x00' * 4)
+        os.utime(self.font_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(self.get_family_names(), [self.family_name])
+        self.assertEqual(self.read_cache()['files'][self.font_path]['size'], stat.st_size + 4)
+
+    def test_removed_file(self) -> None:
+        missing_path = os.path.join(self.temp_dir.name, 'missing.ttf')
+        self.load(self.font_path, missing_path)
+        self.assertEqual(list(self.read_cache()['files']), [self.font_path])
+
+        other_path = os.path.join(self.temp_dir.name, 'other.ttf')
+        shutil.copyfile(self.font_path, other_path)
+        self.load(self.font_path, other_path)
+        self.assertEqual(set(self.read_cache()['files']), {self.font_path, other_path})
+
+        # 字体文件被移除后，缓存中对应的条目也会被移除
+        self.load()
+        self.assertEqual(list(self.read_cache()['files']), [self.font_path])
+
+    def test_unreadable_cached_as_empty(self) -> None:
+        broken_paths = []
+        for name, data in [('garbage.ttf', b'not a font'), ('truncated.ttf', self.read_font()[:1000])]:
+            path = os.path.join(self.temp_dir.name, name)
+            with open(path, 'wb') as file:
+                file.write(data)
+            broken_paths.append(path)
+
+        self.assertEqual(self.get_family_names(self.font_path, *broken_paths), [self.family_name])
+        files = self.read_cache()['files']
+        for path in broken_paths:
+            self.assertEqual(files[path]['fonts'], [])
+
+        # 再次读取时全部命中缓存，不会重新写入缓存文件
+        stat = os.stat(self.cache_path)
+        os.utime(self.cache_path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+        self.assertEqual(self.get_family_names(self.font_path, *broken_paths), [self.family_name])
+        self.assertEqual(os.stat(self.cache_path).st_mtime_ns, stat.st_mtime_ns - 10**9)
+
+    def test_corrupt_cache(self) -> None:
+        contents = [
+            '{"version": 1, "files": {"',
+            '',
+            '[]',
+            json.dumps({'version': DATABASE_CACHE_VERSION + 1, 'files': {}}),
+            json.dumps({'version': DATABASE_CACHE_VERSION, 'files': []}),
+        ]
+        for content in contents:
+            with self.subTest(content=content):
+                with open(self.cache_path, 'wt', encoding='utf-8') as file:
+                    file.write(content)
+
+                # 无法使用的缓存会被忽略，重新读取字体文件并覆盖缓存
+                self.assertEqual(self.get_family_names(), [self.family_name])
+                data = self.read_cache()
+                self.assertEqual(data['version'], DATABASE_CACHE_VERSION)
+                self.assertIn(self.font_path, data['files'])
+
+    def test_without_cache_path(self) -> None:
+        os.remove(self.cache_path)
+        db = load_database([self.font_path])
+        self.assertEqual(list(db.family_by_name), [self.family_name])
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def read_font(self) -> bytes:
+        with open(self.font_path, 'rb') as file:
+            return file.read()
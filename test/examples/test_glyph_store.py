@@ -0,0 +1,202 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from janim.utils.config import Config
+from janim.utils.font.database import Font
+from janim.utils.font.glyph_store import HEADER, MAGIC, GlyphStore
+from janim.utils.font_manager import findSystemFonts
+
+
+def make_outline(count: int, value: float) -> np.ndarray:
+    return np.arange(count * 3, dtype=np.float64).reshape(count, 3) + value
+
+
+class GlyphStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'test.glyphs')
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def assert_glyph(self, store: GlyphStore, codepoint: int, outline: np.ndarray, advance: tuple[int, int]) -> None:
+        result = store.lookup(codepoint)
+        self.assertIsNotNone(result, f'codepoint: {codepoint}')
+        np.testing.assert_array_equal(result[0], outline.astype(np.float32))
+        self.assertEqual(result[0].dtype, np.float32)
+        self.assertEqual(result[1], advance)
+
+    def test_round_trip(self) -> None:
+        glyphs = {
+            ord('b'): (make_outline(5, 0.25), (10, 0)),
+            ord('a'): (make_outline(3, 1.5), (12, -1)),
+            ord('字'): (make_outline(0, 0), (20, 0)),
+            0x1F600: (make_outline(7, -2), (24, 3)),
+        }
+        store = GlyphStore(self.path)
+        self.assertIsNone(store.lookup(ord('a')))
+        for codepoint, (outline, advance) in glyphs.items():
+            added = store.add(codepoint, outline, advance)
+            np.testing.assert_array_equal(added, outline.astype(np.float32))
+
+        # 写入前可以从 pending 中查找
+        self.assert_glyph(store, ord('a'), *glyphs[ord('a')])
+        store.flush()
+        self.assertEqual(store.pending, {})
+        self.assertEqual(list(store.index['codepoint']), sorted(glyphs))
+
+        for reopened in (store, GlyphStore(self.path)):
+            for codepoint, glyph in glyphs.items():
+                self.assert_glyph(reopened, codepoint, *glyph)
+            self.assertIsNone(reopened.lookup(ord('c')))
+
+        # 没有新的字形时不会写入
+        mtime = os.stat(self.path).st_mtime_ns
+        store.flush()
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+    def test_lookup_copies(self) -> None:
+        store = GlyphStore(self.path)
+        store.add(ord('a'), make_outline(4, 0), (10, 0))
+        store.flush()
+
+        store = GlyphStore(self.path)
+        outline, _ = store.lookup(ord('a'))
+        # 返回值不引用内存映射，调用方持有它不会妨碍之后替换文件
+        self.assertFalse(np.shares_memory(outline, store.points))
+        self.assertNotIsInstance(outline.base, np.memmap)
+        self.assertTrue(outline.flags.writeable)
+
+        store.add(ord('b'), make_outline(2, 1), (11, 0))
+        store.flush()
+        np.testing.assert_array_equal(outline, make_outline(4, 0))
+
+    def test_merge(self) -> None:
+        # 两个存储同时打开同一个文件，例如两个进程
+        store1 = GlyphStore(self.path)
+        store2 = GlyphStore(self.path)
+
+        store1.add(ord('a'), make_outline(3, 0), (10, 0))
+        store1.add(ord('c'), make_outline(4, 0), (12, 0))
+        store1.flush()
+
+        store2.add(ord('b'), make_outline(5, 1), (11, 0))
+        # 对于同一个字形，以 pending 中的为准
+        store2.add(ord('c'), make_outline(2, 1), (13, 0))
+        store2.flush()
+
+        expected = {
+            ord('a'): (make_outline(3, 0), (10, 0)),
+            ord('b'): (make_outline(5, 1), (11, 0)),
+            ord('c'): (make_outline(2, 1), (13, 0)),
+        }
+        for store in (store2, GlyphStore(self.path)):
+            self.assertEqual(list(store.index['codepoint']), sorted(expected))
+            for codepoint, glyph in expected.items():
+                self.assert_glyph(store, codepoint, *glyph)
+
+        # store1 在下一次 flush 前仍然使用先前读取的内容
+        self.assertIsNone(store1.lookup(ord('b')))
+        store1.add(ord('d'), make_outline(1, 2), (14, 0))
+        store1.flush()
+        self.assert_glyph(store1, ord('b'), *expected[ord('b')])
+
+    def test_invalid_file(self) -> None:
+        store = GlyphStore(self.path)
+        store.add(ord('a'), make_outline(3, 0), (10, 0))
+        store.add(ord('b'), make_outline(4, 0), (10, 0))
+        store.flush()
+        with open(self.path, 'rb') as file:
+            data = file.read()
+
+        contents = {
+            'empty': b'',
+            'header only': data[:HEADER.size - 1],
+            'truncated index': data[:HEADER.size + 4],
+            'truncated points': data[:-4],
+            'extra data': data + b'\x00' * 12,
+            'wrong magic': b'JAGLYPH0' + data[len(MAGIC):],
+        }
+        for name, content in contents.items():
+            with self.subTest(name=name):
+                with open(self.path, 'wb') as file:
+                    file.write(content)
+
+                index, points = GlyphStore.read(self.path)
+                self.assertEqual(len(index), 0)
+                self.assertEqual(points.shape, (0, 3))
+
+                store = GlyphStore(self.path)
+                self.assertIsNone(store.lookup(ord('a')))
+
+                # 无效的文件在 flush 时会被覆盖
+                store.add(ord('c'), make_outline(2, 0), (10, 0))
+                store.flush()
+                self.assertEqual(list(GlyphStore(self.path).index['codepoint']), [ord('c')])
+
+        index, points = GlyphStore.read(os.path.join(self.temp_dir.name, 'missing.glyphs'))
+        self.assertEqual(len(index), 0)
+
+    def test_without_path(self) -> None:
+        store = GlyphStore(None)
+        store.add(ord('a'), make_outline(3, 0), (10, 0))
+        store.flush()
+        self.assert_glyph(store, ord('a'), make_outline(3, 0), (10, 0))
+
+    def test_store_path(self) -> None:
+        font_path = os.path.join(self.temp_dir.name, 'font.ttf')
+        with open(font_path, 'wb') as file:
+            file.write(b'font')
+
+        with Config(temp_dir=self.temp_dir.name):
+            path = GlyphStore.store_path(font_path, 0, (48 << 6, 144))
+            self.assertEqual(os.path.dirname(path), os.path.join(self.temp_dir.name, 'glyphs'))
+            self.assertEqual(GlyphStore.store_path(font_path, 0, (48 << 6, 144)), path)
+
+            # 字号等参数、字体序号不同的字形分开存储
+            others = [
+                GlyphStore.store_path(font_path, 0, (24 << 6, 144)),
+                GlyphStore.store_path(font_path, 0, (48 << 6, 72)),
+                GlyphStore.store_path(font_path, 1, (48 << 6, 144)),
+            ]
+            self.assertEqual(len({path, *others}), 4)
+
+            # 字体文件变化后使用新的文件
+            stat = os.stat(font_path)
+            os.utime(font_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertNotEqual(GlyphStore.store_path(font_path, 0, (48 << 6, 144)), path)
+
+            self.assertIsNone(GlyphStore.store_path(os.path.join(self.temp_dir.name, 'missing.ttf'), 0, ()))
+
+    def test_font(self) -> None:
+        fonts = [path for path in findSystemFonts() if path.endswith('.ttf')]
+        if not fonts:
+            self.skipTest('no .ttf font is installed')
+        font_path = os.path.join(self.temp_dir.name, 'font.ttf')
+        shutil.copyfile(fonts[0], font_path)
+
+        text = 'JAnim 0123'
+        with Config(temp_dir=self.temp_dir.name):
+            font = Font(font_path)
+            expected = [font.decompose_glyph(ord(char)) for char in text]
+            for char in text:
+                font.get_glyph_data(char)
+            font.glyph_store.flush()
+
+            # 从文件中读取的字形与直接读取的一致（精度为 float32）
+            store_key = next(key for key, store in GlyphStore.stores.items() if store is font.glyph_store)
+            del GlyphStore.stores[store_key]
+            try:
+                font = Font(font_path)
+                self.assertEqual(font.glyph_store.pending, {})
+                for char, (outline, advance) in zip(text, expected):
+                    array, font_advance = font.get_glyph_data(char)
+                    np.testing.assert_array_equal(array, outline.astype(np.float32).astype(np.float64))
+                    self.assertEqual(font_advance, advance)
+                self.assertEqual(font.glyph_store.pending, {})
+            finally:
+                GlyphStore.stores.pop(store_key, None)
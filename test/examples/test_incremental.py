@@ -0,0 +1,129 @@
+import os
+import shutil
+import subprocess as sp
+import unittest
+
+import numpy as np
+
+from janim.anims.timeline import Timeline
+from janim.constants import RIGHT, UP
+from janim.exception import FFmpegError
+from janim.items.geometry.arc import Circle
+from janim.items.geometry.polygon import Square
+from janim.render.incremental import IncrementalVideoWriter
+from janim.render.writer import ParallelVideoWriter, VideoWriter
+from janim.utils.config import Config
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+FPS = 5
+
+TEMP_DIR = 'test/__test_tempdir__'
+
+
+class IncrementalTimeline(Timeline):
+    shift = RIGHT
+
+    def construct(self) -> None:
+        square = Square()
+        circle = Circle()
+        self.play(square.anim.points.shift(UP))        # 0s ~ 1s
+        self.play(circle.anim.points.shift(RIGHT))     # 1s ~ 2s
+        self.play(square.anim.points.shift(self.shift))    # 2s ~ 3s
+
+
+class ChangedIncrementalTimeline(IncrementalTimeline):
+    # 只改变了最后一个 play
+    shift = 2 * UP
+
+
+def get_frames(video_path: str) -> np.ndarray:
+    ffmpeg_command = [
+        'ffmpeg',
+        '-i', video_path,
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgba',
+        '-'
+    ]
+    out = sp.run(ffmpeg_command, stdout=sp.PIPE, stderr=sp.DEVNULL).stdout
+    return np.frombuffer(out, dtype=np.uint8).reshape(-1, HEIGHT, WIDTH, 4)
+
+
+class IncrementalWriterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, fps=FPS, temp_dir=TEMP_DIR)
+        self.config.__enter__()
+        self.output_dir = os.path.join(TEMP_DIR, 'incremental')
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+        os.makedirs(self.output_dir)
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def write(self, timeline_cls: type[Timeline], file_path: str) -> IncrementalVideoWriter:
+        writer = IncrementalVideoWriter(timeline_cls().build(quiet=True), segment_duration=1)
+        writer.write_all(file_path, quiet=True)
+        return writer
+
+    def test_dirty_segments(self) -> None:
+        file_path = os.path.join(self.output_dir, 'incremental.mov')
+
+        # 3s 的时间轴，每段 1s，共 16 帧，分为 [0, 5) [5, 10) [10, 15) [15, 16) 四段
+        writer = self.write(IncrementalTimeline, file_path)
+        self.assertEqual(writer.dirty_segments, [0, 1, 2, 3])
+
+        writer = self.write(IncrementalTimeline, file_path)
+        self.assertEqual(writer.dirty_segments, [])
+
+        writer = self.write(ChangedIncrementalTimeline, file_path)
+        self.assertEqual(writer.dirty_segments, [2, 3])
+
+        # 拼接得到的结果应与完整输出的一致
+        full_path = os.path.join(self.output_dir, 'full.mov')
+        VideoWriter.writes(ChangedIncrementalTimeline().build(quiet=True), full_path, quiet=True)
+        np.testing.assert_array_equal(get_frames(file_path), get_frames(full_path))
+
+    def test_concat_failure(self) -> None:
+        file_path = os.path.join(self.output_dir, 'incremental.mov')
+        segments_dir = os.path.join(self.output_dir, 'incremental_segments')
+        manifest_path = os.path.join(segments_dir, 'manifest.json')
+
+        self.write(IncrementalTimeline, file_path)
+        mtime = os.stat(file_path).st_mtime_ns
+
+        # 损坏一个分段，使得拼接失败
+        with open(os.path.join(segments_dir, 'segment_1.mov'), 'wb') as file:
+            file.write(b'corrupted')
+
+        with self.assertRaises(FFmpegError):
+            self.write(IncrementalTimeline, file_path)
+
+        # 拼接失败时不应覆盖已有的输出，并且记录应被删除
+        self.assertEqual(os.stat(file_path).st_mtime_ns, mtime)
+        self.assertFalse(os.path.exists(manifest_path))
+
+        writer = self.write(IncrementalTimeline, file_path)
+        self.assertEqual(writer.dirty_segments, [0, 1, 2, 3])
+
+    def test_parallel_concat_failure(self) -> None:
+        built = IncrementalTimeline().build(quiet=True)
+        writer = ParallelVideoWriter(built)
+        writer.temp_file_path = os.path.join(self.output_dir, 'parallel_temp.mov')
+
+        parts_dir = os.path.join(self.output_dir, 'parallel_parts')
+        part_paths = [
+            os.path.abspath(os.path.join(parts_dir, f'part_{i}.mov'))
+            for i in range(2)
+        ]
+        os.makedirs(parts_dir)
+        VideoWriter.writes(built, part_paths[0], quiet=True)
+        # 损坏第二个分段，ffmpeg 默认会跳过它并正常退出
+        with open(part_paths[1], 'wb') as file:
+            file.write(b'corrupted')
+
+        with self.assertRaises(FFmpegError):
+            writer.concat_parts(part_paths, parts_dir)
+
+        # 拼接失败时保留分段文件
+        self.assertTrue(all(os.path.exists(path) for path in part_paths))
@@ -0,0 +1,172 @@
+import gc
+import unittest
+
+import moderngl as mgl
+import numpy as np
+
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.components.packed import PackedStore
+from janim.constants import RIGHT
+from janim.items.points import Group
+from janim.items.text import Text
+from janim.items.vitem import VItem
+from janim.render.base import create_standalone_context
+from janim.render.framebuffer import create_framebuffer, framebuffer_context
+from janim.render.renderer_vitem import _BatchEntry
+from janim.utils.config import Config
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+
+
+def make_text() -> Text:
+    txt = Text('Packed scene\nstore', font_size=36)
+    txt[1].set(fill_alpha=0)
+    return txt
+
+
+class PackedTimeline(Timeline):
+    packed: bool = True
+
+    def construct(self) -> None:
+        txt = make_text()
+        if self.packed:
+            PackedStore.pack(txt)
+        txt.show()
+
+        self.forward(0.5)
+        # 单个字符脱离打包数组，之后该组物件回退到逐个物件的处理
+        self.play(txt[0][1].anim.points.rotate(1).r.color.set('#FC6255'))
+        self.forward(0.5)
+
+
+class PackedStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    @staticmethod
+    def vitems(txt: Text) -> list[VItem]:
+        return [
+            item
+            for item in txt.walk_self_and_descendants()
+            if isinstance(item, VItem) and len(item.points.get()) >= 3
+        ]
+
+    def test_pack(self) -> None:
+        empty = VItem()
+        txt = make_text()
+        items = self.vitems(txt)
+        expected = [
+            (item.points.get().copy(), item.radius.get().copy(), item.stroke.get().copy(), item.fill.get().copy())
+            for item in items
+        ]
+        entries = [_BatchEntry(item) for item in items]
+
+        store = PackedStore.pack(Group(txt, empty))
+        # 点数量不足的物件不被打包
+        self.assertEqual(store.count, len(items))
+        self.assertIsNone(empty.points._points._data.base)
+
+        for item, datas in zip(items, expected):
+            for array, data in zip((item.points._points, item.radius._radii, item.stroke._rgbas, item.fill._rgbas),
+                                   datas):
+                np.testing.assert_array_equal(array.data, data)
+                self.assertFalse(array.data.flags.writeable)
+        self.assertIs(items[-1].points._points._data.base, items[0].points._points._data.base)
+
+        # 预先计算的信息与逐个物件计算的结果一致
+        offsets = store.offsets['points']
+        np.testing.assert_array_equal(store.closepath_flags, np.concatenate([entry.points[:, 3] for entry in entries]))
+        np.testing.assert_array_equal(store.corners(0, len(items)),
+                                      np.concatenate([entry.corners for entry in entries]))
+        np.testing.assert_array_equal(store.radius_max, [entry.radius_max for entry in entries])
+        np.testing.assert_array_equal(store.fill_transparent, [entry.fill_transparent for entry in entries])
+        self.assertTrue(store.fill_transparent.any() and not store.fill_transparent.all())
+        self.assertEqual(list(np.diff(offsets)), [len(entry.points) for entry in entries])
+
+        # 打包数组随物件一起回收
+        key = id(items[0].points._points._data.base)
+        self.assertIs(PackedStore.stores[key], store)
+        del txt, empty, items, item, array, entries
+        gc.collect()
+        self.assertNotIn(key, PackedStore.stores)
+
+    def test_find_run(self) -> None:
+        txt = make_text()
+        PackedStore.pack(txt)
+        items = self.vitems(txt)
+
+        run = PackedStore.find_run(items)
+        self.assertEqual((run.begin, run.end), (0, len(items)))
+        run = PackedStore.find_run(items[2:5])
+        self.assertEqual((run.begin, run.end), (2, 5))
+        np.testing.assert_array_equal(run.offsets('points'),
+                                      np.cumsum([0] + [len(item.points.get()) for item in items[2:5]]))
+        self.assertIs(run.array('radius').base, items[0].radius._radii._data.base)
+
+        # 副本引用同样的切片
+        stored = txt.copy()
+        self.assertIsNotNone(PackedStore.find_run(self.vitems(stored)))
+
+        # 顺序不连续
+        self.assertIsNone(PackedStore.find_run([items[0], items[2]]))
+        self.assertIsNone(PackedStore.find_run(items[::-1]))
+        # 未打包的物件
+        self.assertIsNone(PackedStore.find_run(self.vitems(make_text())))
+
+        # 修改数据后只有该物件脱离打包数组
+        items[3].points.shift(RIGHT)
+        items[4].fill.set(alpha=0.5)
+        self.assertIsNone(PackedStore.find_run(items))
+        self.assertIsNone(PackedStore.find_run(items[4:]))
+        self.assertIsNotNone(PackedStore.find_run(items[:3]))
+        self.assertIsNotNone(PackedStore.find_run(items[5:]))
+        self.assertIsNotNone(PackedStore.find_run(self.vitems(stored)))
+
+        # 被修改的物件的数据不再与其它物件共用
+        stored_items = self.vitems(stored)
+        np.testing.assert_array_equal(items[3].points.get(), stored_items[3].points.get() + RIGHT)
+        self.assertNotEqual(items[4].fill.get()[0, 3], stored_items[4].fill.get()[0, 3])
+        np.testing.assert_array_equal(items[4].stroke.get(), stored_items[4].stroke.get())
+
+    @staticmethod
+    def render_frames(ctx: mgl.Context, built: BuiltTimeline, times: list[float]) -> list[np.ndarray]:
+        fbo = create_framebuffer(ctx, WIDTH, HEIGHT)
+        frames = []
+        with framebuffer_context(fbo):
+            for t in times:
+                fbo.clear(*built.cfg.background_color.rgb, 1)
+                built.render_all(ctx, t)
+                frames.append(np.frombuffer(fbo.read(components=4), dtype=np.uint8).reshape(HEIGHT, WIDTH, 4))
+        return frames
+
+    def test_render(self) -> None:
+        ctx = create_standalone_context()
+        if ctx.version_code < 430:
+            self.skipTest('batched rendering requires OpenGL 4.3')
+
+        times = [0, 0.25, 0.75, 1, 1.5, 0.25]
+
+        PackedTimeline.packed = False
+        expected = self.render_frames(ctx, PackedTimeline().build(quiet=True), times)
+
+        PackedTimeline.packed = True
+        built = PackedTimeline().build(quiet=True)
+        runs = []
+        for t in times:
+            self.render_frames(ctx, built, [t])
+            (renderer, ) = built.vitem_batch_renderers[ctx]
+            runs.append(renderer.packed.run is not None)
+        # 静止时直接使用打包数组，字符被修改后回退
+        self.assertEqual(runs, [True, True, False, False, False, True])
+
+        result = self.render_frames(ctx, PackedTimeline().build(quiet=True), times)
+        for t, frame1, frame2 in zip(times, expected, result):
+            with self.subTest(t=t):
+                self.assertFalse(np.array_equal(frame1, np.broadcast_to(frame1[0, 0], frame1.shape)))
+                delta = np.abs(frame1.astype(np.int16) - frame2.astype(np.int16))
+                self.assertLessEqual(delta.max(), 1)
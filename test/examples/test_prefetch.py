@@ -0,0 +1,209 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from janim.anims.timeline import Timeline
+from janim.items.svg.svg_item import SVGItem
+from janim.items.svg.typst import TypstDoc
+from janim.utils.config import Config
+from janim.utils.file_ops import get_janim_dir
+from janim.utils.prefetch import (MANIFEST_VERSION, AssetManifest,
+                                  AssetPrefetcher)
+
+BRACE_SVG = os.path.join(get_janim_dir(), 'items', 'svg', 'brace.svg')
+
+
+class SVGTimeline(Timeline):
+    file_path: str
+
+    def construct(self) -> None:
+        SVGItem(self.file_path).show()
+        self.forward()
+
+
+class AssetPrefetcherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config = Config(temp_dir=self.temp_dir.name)
+        self.config.__enter__()
+
+        # SVG 的解析结果以文件名缓存，因此每个测试使用不同的文件名
+        self.svg_paths = []
+        for i in range(4):
+            path = os.path.join(self.temp_dir.name, f'{self.id().rsplit(".", 1)[-1]}_{i}.svg')
+            shutil.copy(BRACE_SVG, path)
+            self.svg_paths.append(path)
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+        for path in self.svg_paths:
+            SVGItem.vitem_builders_map.pop(self.svg_key(path), None)
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def svg_key(path: str) -> tuple[str, float]:
+        return (os.path.splitext(os.path.basename(path))[0], os.path.getmtime(path))
+
+    def is_parsed(self, path: str) -> bool:
+        return self.svg_key(path) in SVGItem.vitem_builders_map
+
+    def test_manifest(self) -> None:
+        path = os.path.join(self.temp_dir.name, 'manifest.json')
+        typst = [('a', 'shared', ''), ('b', 'shared', '#set text(blue)'), ('a', 'shared', '')]
+        svg = [(self.svg_paths[1], None), (self.svg_paths[0], 'id'), (self.svg_paths[1], None)]
+        AssetManifest(typst, svg).save(path)
+
+        # 去除重复并保持首次出现的顺序
+        manifest = AssetManifest.load(path)
+        self.assertEqual(list(manifest.typst), typst[:2])
+        self.assertEqual(list(manifest.svg), svg[:2])
+        self.assertFalse(any(name.endswith('.tmp') for name in os.listdir(self.temp_dir.name)))
+
+        # 文件不存在、版本不同或者内容无效时得到 None
+        self.assertIsNone(AssetManifest.load(os.path.join(self.temp_dir.name, 'missing.json')))
+        for data in [
+            '{"version": %d, "typst": [], "svg": []' % MANIFEST_VERSION,
+            json.dumps({'version': MANIFEST_VERSION + 1, 'typst': [], 'svg': []}),
+            json.dumps({'version': MANIFEST_VERSION, 'typst': []}),
+            json.dumps({'version': MANIFEST_VERSION, 'typst': 1, 'svg': []}),
+        ]:
+            with self.subTest(data=data):
+                with open(path, 'wt', encoding='utf-8') as file:
+                    file.write(data)
+                self.assertIsNone(AssetManifest.load(path))
+
+    def test_manifest_of_build(self) -> None:
+        SVGTimeline.file_path = self.svg_paths[0]
+        path = AssetManifest.get_path(SVGTimeline())
+
+        # 没有启用时不会记录
+        SVGTimeline().build(quiet=True)
+        self.assertFalse(os.path.exists(path))
+
+        with Config(prefetch_assets=True):
+            SVGTimeline().build(quiet=True)
+            manifest = AssetManifest.load(path)
+            self.assertEqual(list(manifest.svg), [(os.path.abspath(self.svg_paths[0]), None)])
+
+            # 第二次构建时在后台解析上一次记录的文件
+            SVGItem.vitem_builders_map.pop(self.svg_key(self.svg_paths[0]))
+            SVGTimeline.file_path = self.svg_paths[1]
+            SVGTimeline().build(quiet=True)
+            self.assertTrue(self.is_parsed(self.svg_paths[0]))
+            # 记录的是本次构建用到的文件
+            manifest = AssetManifest.load(path)
+            self.assertEqual(list(manifest.svg), [(os.path.abspath(self.svg_paths[1]), None)])
+
+    def test_request_svg_pending(self) -> None:
+        entries = [(os.path.abspath(path), None) for path in self.svg_paths]
+        prefetcher = AssetPrefetcher(AssetManifest(svg=entries))
+
+        # 还没有开始处理的文件从队列中移除，由调用方自行解析
+        prefetcher.request_svg(self.svg_paths[2], None)
+        self.assertEqual(list(prefetcher.svg_pending), entries[:2] + entries[3:])
+        self.assertEqual(list(prefetcher.recorded.svg), [entries[2]])
+
+        # 不在记录中的文件也会被记录
+        prefetcher.request_svg(self.svg_paths[2], 'id')
+        self.assertEqual(list(prefetcher.recorded.svg), [entries[2], (entries[2][0], 'id')])
+        self.assertEqual(len(prefetcher.svg_pending), 3)
+
+        # 后台只解析剩下的文件
+        prefetcher.start()
+        prefetcher.thread.join()
+        prefetcher.stop()
+        self.assertEqual(prefetcher.svg_pending, {})
+        self.assertEqual([self.is_parsed(path) for path in self.svg_paths], [True, True, False, True])
+
+    def test_request_svg_running(self) -> None:
+        entry = (os.path.abspath(self.svg_paths[0]), None)
+        prefetcher = AssetPrefetcher(AssetManifest(svg=[entry]))
+
+        # 模拟后台线程正在解析该文件
+        with prefetcher.lock:
+            del prefetcher.svg_pending[entry]
+            event = prefetcher.svg_running[entry[0]] = threading.Event()
+
+        thread = threading.Thread(target=prefetcher.request_svg, args=entry)
+        thread.start()
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+
+        event.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+    def test_request_typst(self) -> None:
+        args_list = [TypstDoc.get_typst_args(text) for text in ('a', 'b', 'c')]
+        paths = [TypstDoc.get_svg_file_path(*args) for args in args_list]
+        # 已有缓存的文档不需要预取
+        with open(paths[2], 'wb') as file:
+            file.write(b'cached')
+
+        prefetcher = AssetPrefetcher(AssetManifest(typst=args_list))
+        self.assertEqual(prefetcher.typst_args, args_list[:2])
+        self.assertEqual(list(prefetcher.typst_events), paths[:2])
+
+        def request(i: int) -> threading.Thread:
+            thread = threading.Thread(target=prefetcher.request_typst, args=(args_list[i], paths[i]))
+            thread.start()
+            return thread
+
+        # 只等待包含该文档的那一份编译完成
+        threads = [request(0), request(1)]
+        prefetcher.on_typst_batch_done([paths[1]])
+        threads[1].join(5)
+        self.assertFalse(threads[1].is_alive())
+        threads[0].join(0.2)
+        self.assertTrue(threads[0].is_alive())
+
+        prefetcher.on_typst_batch_done([paths[0]])
+        threads[0].join(5)
+        self.assertFalse(threads[0].is_alive())
+
+        # 没有预取的文档不需要等待
+        request(2).join(5)
+        self.assertEqual(list(prefetcher.recorded.typst), [args_list[0], args_list[1], args_list[2]])
+
+    def test_stop_typst(self) -> None:
+        args_list = [TypstDoc.get_typst_args(text) for text in ('a', 'b')]
+        entries = [(os.path.abspath(path), None) for path in self.svg_paths]
+        prefetcher = AssetPrefetcher(AssetManifest(typst=args_list, svg=entries))
+
+        # 开始前已经停止，所有的预取都被取消
+        prefetcher.stopped.set()
+        prefetcher.start()
+        prefetcher.stop()
+        self.assertIsNone(prefetcher.thread)
+
+        for args in args_list:
+            self.assertFalse(os.path.exists(TypstDoc.get_svg_file_path(*args)))
+        # 等待的一方不会被阻塞，可以自行编译
+        self.assertTrue(all(event.is_set() for event in prefetcher.typst_events.values()))
+        prefetcher.request_typst(args_list[0], TypstDoc.get_svg_file_path(*args_list[0]))
+
+        self.assertEqual(list(prefetcher.svg_pending), entries)
+        self.assertFalse(any(self.is_parsed(path) for path in self.svg_paths))
+
+    def test_stop_svg(self) -> None:
+        entries = [(os.path.abspath(path), None) for path in self.svg_paths]
+        prefetcher = AssetPrefetcher(AssetManifest(svg=entries))
+
+        # 后台线程在取出第一个文件时等待，期间设置停止
+        with prefetcher.lock:
+            prefetcher.start()
+            prefetcher.thread.join(0.1)
+            prefetcher.stopped.set()
+        prefetcher.stop()
+        self.assertIsNone(prefetcher.thread)
+
+        # 最多只有已经开始的那一个文件完成解析，其余的被取消
+        parsed = [self.is_parsed(path) for path in self.svg_paths]
+        count = sum(parsed)
+        self.assertLessEqual(count, 1)
+        self.assertEqual(parsed, [True] * count + [False] * (len(parsed) - count))
+        self.assertEqual(list(prefetcher.svg_pending), entries[count:])
+        self.assertEqual(prefetcher.svg_running, {})
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+import OpenGL.GL as gl
+
+import janim.examples as examples
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.constants import BLUE, GREEN, LEFT, RED, RIGHT, UP
+from janim.items.geometry.arc import Circle
+from janim.items.geometry.polygon import Square
+from janim.render.base import create_standalone_context
+from janim.render.framebuffer import create_framebuffer, framebuffer_context
+from janim.render.writer import PremultipliedAlphaTarget
+from janim.utils.config import Config
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+
+
+class OverlapTimeline(Timeline):
+    def construct(self) -> None:
+        # 半透明的填充、描边相互重叠
+        Square(3, color=RED, fill_alpha=0.5, stroke_alpha=0.7, stroke_radius=0.1).points.shift(LEFT).r.show()
+        Circle(1.5, color=GREEN, fill_alpha=0.4, stroke_alpha=0.3).points.shift(RIGHT).r.show()
+        square = Square(2, color=BLUE, fill_alpha=0.6, stroke_alpha=1).points.shift(UP).r.show()
+        self.play(square.anim.points.shift(RIGHT * 2).rotate(1))
+
+
+class PremultipliedAlphaTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    @staticmethod
+    def read(fbo) -> np.ndarray:
+        return np.frombuffer(fbo.read(components=4), dtype=np.uint8).reshape(HEIGHT, WIDTH, 4)
+
+    def render_shader_blending(self, built: BuiltTimeline, times: list[float]) -> list[np.ndarray]:
+        # 与 VideoWriter 输出透明视频时默认的绘制方式相同
+        ctx = create_standalone_context()
+        fbo = create_framebuffer(ctx, WIDTH, HEIGHT)
+        frames = []
+        with framebuffer_context(fbo):
+            for t in times:
+                fbo.clear(*built.cfg.background_color.rgb, 0)
+                gl.glFlush()
+                built.render_all(ctx, t, blend_on=False)
+                frames.append(self.read(fbo))
+        return frames
+
+    def render_premultiplied(self, built: BuiltTimeline, times: list[float]) -> list[np.ndarray]:
+        ctx = create_standalone_context()
+        fbo = create_framebuffer(ctx, WIDTH, HEIGHT)
+        target = PremultipliedAlphaTarget(ctx, WIDTH, HEIGHT)
+        frames = []
+        with framebuffer_context(fbo):
+            for t in times:
+                with target.rendering():
+                    built.render_all(ctx, t)
+                target.resolve(built.cfg.background_color.rgb)
+                frames.append(self.read(fbo))
+        return frames
+
+    def test_same_as_shader_blending(self) -> None:
+        times = [0, 0.5, 1]
+        for timeline_cls in (OverlapTimeline, examples.SimpleCurveExample):
+            # 渲染器会绑定首次绘制时的 OpenGL 上下文，因此每种绘制方式各自构建一次
+            expected = self.render_shader_blending(timeline_cls().build(quiet=True), times)
+            result = self.render_premultiplied(timeline_cls().build(quiet=True), times)
+            for t, frame1, frame2 in zip(times, expected, result):
+                with self.subTest(timeline=timeline_cls.__name__, t=t):
+                    alpha = frame1[..., 3]
+                    # 存在半透明的区域以及相互重叠的区域
+                    self.assertTrue(np.any((alpha > 0) & (alpha < 255)), 'nothing is semi-transparent')
+
+                    delta = np.abs(frame1.astype(np.int16) - frame2.astype(np.int16))
+                    self.assertLessEqual(delta[..., 3].max(), 1)
+                    # 完全透明的像素的颜色不可见，着色器中的混合可能会在这些像素中留下任意的颜色，因此不比较
+                    visible = (alpha > 0) | (frame2[..., 3] > 0)
+                    self.assertLessEqual(delta[visible, :3].max(), 1)
@@ -0,0 +1,114 @@
+import csv
+import json
+import os
+import shutil
+import sys
+import unittest
+
+from janim.anims.composition import Succession
+from janim.anims.creation import Create
+from janim.anims.fading import FadeIn
+from janim.anims.timeline import Timeline
+from janim.constants import RIGHT
+from janim.items.geometry.arc import Circle
+from janim.items.geometry.polygon import Square
+from janim.locale.i18n import get_local_strings
+from janim.render.writer import VideoWriter
+from janim.utils.config import Config
+from janim.utils.profiler import BuildProfiler, FrameProfiler
+
+_ = get_local_strings('profiler')
+
+TEMP_DIR = 'test/__test_tempdir__'
+
+
+class ProfiledTimeline(Timeline):
+    def construct(self) -> None:
+        square = Square()
+        circle = Circle()
+        self.play(Create(square))
+        self.play(Succession(FadeIn(circle), circle.anim.points.shift(RIGHT)))
+        self.forward(0.5)
+
+
+class ProfilerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=192 * 2, pixel_height=108 * 2, fps=10, temp_dir=TEMP_DIR)
+        self.config.__enter__()
+        self.output_dir = os.path.join(TEMP_DIR, 'profiler')
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+        os.makedirs(self.output_dir)
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_build_profile(self) -> None:
+        self.assertIsNone(ProfiledTimeline().build(quiet=True).build_profiler)
+
+        built = ProfiledTimeline().build(quiet=True, profile=True)
+        profiler = built.build_profiler
+        self.assertIsInstance(profiler, BuildProfiler)
+        # 结束后释放了 sys.monitoring 的工具标识
+        self.assertIsNone(sys.monitoring.get_tool(BuildProfiler.TOOL_ID))
+
+        self.assertEqual(set(profiler.phases), {'construct', 'detect_change_if_not', 'BuiltTimeline'})
+        lines = [stat.name.split(': ', 1)[1] for stat in profiler.lines.values()]
+        self.assertIn('self.play(Create(square))', lines)
+        self.assertIn('self.forward(0.5)', lines)
+        # 子动画单独计入
+        for key in ('Create.__init__', 'Succession.__init__', 'FadeIn.__init__'):
+            self.assertIn(key, profiler.anims)
+
+        report = profiler.report()
+        self.assertTrue(report.startswith(_('Build profile of "{name}"').format(name='ProfiledTimeline')))
+        for title in (_('Phases'), _('Lines of construct'), _('Animations (self time)')):
+            self.assertIn(f'\n{title}:\n', report)
+        self.assertIn('self.play(Create(square))', report)
+
+        # 每个表格最多列出 limit 项
+        report = profiler.report(sort='name', limit=1)
+        self.assertEqual(len(report.splitlines()), 1 + 3 * 4)
+        with self.assertRaises(ValueError):
+            profiler.report(sort='unknown')
+
+        file_path = os.path.join(self.output_dir, 'build.json')
+        profiler.save_chrome_trace(file_path)
+        with open(file_path) as file:
+            trace = json.load(file)
+        events = trace['traceEvents']
+        self.assertEqual({event['cat'] for event in events}, {'phase', 'construct', 'anim'})
+        self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in events))
+
+    def test_frame_profile(self) -> None:
+        built = ProfiledTimeline().build(quiet=True)
+        profiler = FrameProfiler()
+        writer = VideoWriter(built)
+        writer.write_all(os.path.join(self.output_dir, 'video.mov'), quiet=True, frame_profiler=profiler)
+
+        frame_count = writer.frame_count
+        self.assertEqual(len(profiler.frames), frame_count)
+        self.assertTrue(profiler.report().startswith(_('Render profile of {count} frames').format(count=frame_count)))
+
+        stages = profiler.stage_names()
+        for name in ('compute', 'sort', 'readback', 'pipe_wait'):
+            self.assertIn(name, stages)
+        self.assertTrue(any(name.startswith('render:') for name in stages))
+
+        csv_path = os.path.join(self.output_dir, 'render.csv')
+        profiler.save_csv(csv_path)
+        with open(csv_path, newline='') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], ['frame', *stages, *profiler.value_names()])
+        self.assertEqual(len(rows), frame_count + 1)
+        for i, row in enumerate(rows[1:]):
+            self.assertEqual(int(row[0]), i)
+            self.assertTrue(all(float(value) >= 0 for value in row[1:] if value))
+
+        trace_path = os.path.join(self.output_dir, 'render.json')
+        profiler.save_chrome_trace(trace_path)
+        with open(trace_path) as file:
+            trace = json.load(file)
+        events = trace['traceEvents']
+        self.assertEqual({event['name'] for event in events}, set(stages))
+        self.assertEqual({event['args']['frame'] for event in events}, set(range(frame_count)))
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from janim.items.text import Text, TextChar, TextLine
+from janim.utils.config import Config
+
+
+class UnarrangedText(Text):
+    '''构造时不排列字符，用于对比不同的排列方式'''
+    def arrange_chars(self, center: bool = True):
+        return self
+
+
+def arrange_by_steps(text: Text, center: bool) -> None:
+    '''原先在 ``Text.__init__`` 中逐步排列的方式'''
+    for line in text.children:
+        line.arrange_in_line()
+    text.arrange_in_lines()
+    if center:
+        text.points.to_center()
+
+
+class TextArrangeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    def assert_same_layout(self, text1: Text, text2: Text) -> None:
+        items1 = list(text1.walk_descendants())
+        items2 = list(text2.walk_descendants())
+        self.assertEqual(len(items1), len(items2))
+        for item1, item2 in zip(items1, items2):
+            self.assertIs(type(item1), type(item2))
+            if isinstance(item1, (TextLine, TextChar)):
+                np.testing.assert_array_equal(item1.mark.get_points(), item2.mark.get_points())
+            np.testing.assert_array_equal(item1.points.get(), item2.points.get())
+
+    def test_same_as_steps(self) -> None:
+        texts = [
+            'Single line',
+            'Multiple\nlines\nof text',
+            '\nleading empty line',
+            'trailing empty line\n',
+            'empty\n\n\nlines',
+            '   \nspaces only',
+            '\n',
+            '',
+            '<fs 1.6>Big</fs> and <fs 0.5>small</fs>\n<c RED>red</c> line\n\n<fs 2>tall</fs>',
+            'A <fs 0.7>nested <fs 2>scale</fs> act</fs>\n<<escaped>> brackets',
+        ]
+        for center in (True, False):
+            for string in texts:
+                with self.subTest(text=string, center=center):
+                    text = UnarrangedText(string, format=Text.Format.RichText)
+                    arranged = text.copy()
+                    Text.arrange_chars(arranged, center)
+                    arrange_by_steps(text, center)
+                    self.assert_same_layout(arranged, text)
+
+                    # 与直接构造的结果一致
+                    self.assert_same_layout(Text(string, format=Text.Format.RichText, center=center), text)
+
+    def test_center(self) -> None:
+        text = Text('first line\n\n<fs 2>third</fs> line', format=Text.Format.RichText)
+        np.testing.assert_allclose(text.points.box.center, 0, atol=1e-6)
+
+        text = Text('first line\nsecond', center=False)
+        # 不居中时，第一行的起点位于原点
+        np.testing.assert_array_equal(text[0].get_mark_orig(), 0)
+        np.testing.assert_array_equal(text[0][0].get_mark_orig(), 0)
+        self.assertLess(text[1].get_mark_orig()[1], 0)
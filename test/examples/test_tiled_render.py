@@ -0,0 +1,92 @@
+import os
+import unittest
+
+import numpy as np
+from PIL import Image
+
+import janim.examples as examples
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.exception import FFmpegError
+from janim.render.base import create_standalone_context
+from janim.render.framebuffer import create_framebuffer, framebuffer_context
+from janim.render.writer import TiledVideoWriter
+from janim.utils.config import Config
+from janim.utils.file_ops import guarantee_existence
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+
+
+class TiledRenderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    @staticmethod
+    def render_whole(built: BuiltTimeline, times: list[float]) -> list[np.ndarray]:
+        # 与 VideoWriter 输出非透明视频时的绘制方式相同
+        ctx = create_standalone_context()
+        fbo = create_framebuffer(ctx, WIDTH, HEIGHT)
+        frames = []
+        with framebuffer_context(fbo):
+            for t in times:
+                fbo.clear(*built.cfg.background_color.rgb, 1)
+                built.render_all(ctx, t)
+                data = np.frombuffer(fbo.read(components=4), dtype=np.uint8).reshape(HEIGHT, WIDTH, 4)
+                frames.append(data[::-1])
+        return frames
+
+    @staticmethod
+    def render_tiled(built: BuiltTimeline, times: list[float], tile_size: int) -> list[np.ndarray]:
+        file_path = os.path.join(guarantee_existence(Config.get.temp_dir), 'test_tiled_render.png')
+        writer = TiledVideoWriter(built, tile_size)
+        frames = []
+        for t in times:
+            writer.write_image(file_path, t)
+            with Image.open(file_path) as img:
+                frames.append(np.asarray(img.convert('RGBA')))
+        return frames
+
+    def test_same_as_whole(self) -> None:
+        times = [0.5, 2.5, 4.0]
+        # 渲染器会绑定首次绘制时的 OpenGL 上下文，因此每种绘制方式各自构建一次
+        whole = self.render_whole(examples.SimpleCurveExample().build(quiet=True), times)
+
+        # 100 不能整除画面的宽高，使得最后一行、一列的块超出画面
+        for tile_size in (100, 128):
+            tiled = self.render_tiled(examples.SimpleCurveExample().build(quiet=True), times, tile_size)
+            for t, frame1, frame2 in zip(times, whole, tiled):
+                with self.subTest(tile_size=tile_size, t=t):
+                    self.assertFalse(np.array_equal(frame1, np.broadcast_to(frame1[0, 0], frame1.shape)),
+                                     'nothing is rendered')
+
+                    delta = np.abs(frame1.astype(np.int16) - frame2.astype(np.int16)).max(axis=-1)
+                    # 偏轴投影的浮点误差只会在物件边缘的抗锯齿处产生细微差异
+                    self.assertLessEqual(delta.max(), 2)
+                    self.assertLess(np.count_nonzero(delta) / delta.size, 0.001)
+
+    def test_frame_effect_is_rejected(self) -> None:
+        class SubTimeline(Timeline):
+            def construct(self) -> None:
+                examples.FrameEffectExample().build(quiet=True).to_item().show()
+                self.forward()
+
+        for timeline_cls in (examples.FrameEffectExample, SubTimeline):
+            with self.subTest(timeline=timeline_cls.__name__):
+                built = timeline_cls().build(quiet=True)
+                with self.assertLogs(level='WARNING'):
+                    self.assertFalse(TiledVideoWriter.check(built))
+                with self.assertRaises(ValueError):
+                    TiledVideoWriter(built, 100)
+
+        self.assertTrue(TiledVideoWriter.check(examples.SimpleCurveExample().build(quiet=True)))
+
+    def test_write_image_error(self) -> None:
+        # 输出到不存在的目录，ffmpeg 以非零的退出码结束
+        file_path = os.path.join(Config.get.temp_dir, 'missing_dir', 'test_tiled_render.png')
+        writer = TiledVideoWriter(examples.SimpleCurveExample().build(quiet=True), 128)
+        with self.assertRaises(FFmpegError):
+            writer.write_image(file_path, 0.5)
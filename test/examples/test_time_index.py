@@ -0,0 +1,57 @@
+import itertools as it
+import random
+import unittest
+
+from janim.anims.animation import TimeAligner, TimeIndex, TimeRange
+from janim.anims.timeline import Timeline
+from janim.constants import FOREVER
+
+
+def make_index(apprs: list[Timeline.ItemAppearance]) -> TimeIndex[Timeline.ItemAppearance]:
+    # 与 BuiltTimeline 中 visible_item_index 的构建方式相同
+    return TimeIndex(
+        apprs,
+        lambda appr: (
+            TimeRange(*range) if len(range) == 2 else TimeRange(range[0], FOREVER)
+            for range in it.batched(appr.visibility, 2)
+        )
+    )
+
+
+class TimeIndexTest(unittest.TestCase):
+    def test_against_is_visible_at(self) -> None:
+        rng = random.Random(20240601)
+        aligner = TimeAligner()
+
+        for _ in range(20):
+            apprs: list[Timeline.ItemAppearance] = []
+            for _ in range(rng.randint(1, 60)):
+                appr = Timeline.ItemAppearance(aligner)
+                # 取整到 0.25 使得不同物件的区段端点会重合，也会出现长度为 0 的区段
+                appr.visibility = sorted(rng.randint(0, 40) / 4 for _ in range(rng.randint(0, 7)))
+                apprs.append(appr)
+
+            index = make_index(apprs)
+
+            boundaries = sorted({t for appr in apprs for t in appr.visibility})
+            times = [-1.0, 0.0, 11.0]
+            times += boundaries
+            times += [t - 1e-6 for t in boundaries] + [t + 1e-6 for t in boundaries]
+            times += [rng.uniform(-1, 11) for _ in range(50)]
+
+            # 顺序、逆序以及随机跳转的查询
+            for order in (sorted(times), sorted(times, reverse=True), rng.sample(times, len(times))):
+                for t in order:
+                    expected = tuple(appr for appr in apprs if appr.is_visible_at(t))
+                    self.assertEqual(index.get(t), expected, f't={t}')
+
+    def test_result_is_immutable(self) -> None:
+        index = TimeIndex(['a', 'b'], lambda x: TimeRange(0, 2) if x == 'a' else TimeRange(1, FOREVER))
+
+        result = index.get(1.5)
+        self.assertEqual(result, ('a', 'b'))
+        self.assertIsInstance(result, tuple)
+
+        # 之后的查询不会改变之前得到的结果
+        self.assertEqual(index.get(3), ('b',))
+        self.assertEqual(result, ('a', 'b'))
@@ -0,0 +1,238 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from janim.exception import (EXITCODE_TYPST_COMPILE_ERROR,
+                             EXITCODE_TYPST_NOT_FOUND, ExitException)
+from janim.items.svg.typst import (TypstArgs, TypstDoc, TypstMath, TypstText,
+                                   get_typst_template)
+from janim.utils.config import Config
+from janim.utils.file_ops import get_typst_temp_dir
+
+# 依赖于计数器的文档，若每一页开头没有重置计数器，批量编译时后面的文档会得到不同的结果
+COUNTER_DOCS = [
+    'page #context counter(page).display()',
+    '#set math.equation(numbering: "(1)")\n$ a^2 $\n$ b^2 $',
+    '#set heading(numbering: "1.")\n= First\n= Second',
+    '#figure(table(columns: 1)[x], caption: [Table])',
+    '#figure(rect(width: 1cm, height: 1cm), kind: image, caption: [Image])',
+    '#figure(```py\nx = 1\n```, caption: [Code])',
+]
+
+DOCS = [
+    *COUNTER_DOCS,
+    'Hello, world',
+    '$ sum_(i=1)^n i = (n(n+1))/2 $',
+    '#text(red)[colored] text',
+    '#box(width: 2cm, height: 1cm, stroke: white)',
+    # 与批量编译的分页相关
+    'trailing\n#pagebreak(weak: true)',
+    '#pagebreak(weak: true)\nleading',
+]
+
+
+def make_args(texts: list[str], additional_preamble: str = '') -> list[TypstArgs]:
+    return [TypstDoc.get_typst_args(text, additional_preamble=additional_preamble) for text in texts]
+
+
+class TypstBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config = Config(temp_dir=os.path.join(self.temp_dir.name, 'batch'))
+        self.config.__enter__()
+
+        if shutil.which(Config.get.typst_bin) is None:
+            self.skipTest('typst is not installed')
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+        self.temp_dir.cleanup()
+
+    def compile_single(self, args_list: list[TypstArgs]) -> list[bytes | None]:
+        '''
+        在另一个缓存目录中逐个调用 :meth:`~.TypstDoc.compile_typst`，编译失败的为 ``None``
+        '''
+        results = []
+        with Config(temp_dir=os.path.join(self.temp_dir.name, 'single')):
+            for args in args_list:
+                try:
+                    path = TypstDoc.compile_typst(*args)
+                except ExitException as e:
+                    self.assertEqual(e.exit_code, EXITCODE_TYPST_COMPILE_ERROR)
+                    results.append(None)
+                    continue
+                results.append(read_bytes(path))
+        return results
+
+    def assert_same_as_single(self, args_list: list[TypstArgs], paths: list[str]) -> None:
+        expected = self.compile_single(args_list)
+        self.assertEqual(len(paths), len(args_list))
+        for args, path, data in zip(args_list, paths, expected):
+            with self.subTest(text=args[0]):
+                self.assertEqual(path, TypstDoc.get_svg_file_path(*args))
+                if data is None:
+                    self.assertFalse(os.path.exists(path))
+                else:
+                    self.assertEqual(read_bytes(path), data)
+
+    def test_same_as_single(self) -> None:
+        args_list = make_args(DOCS)
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                shutil.rmtree(get_typst_temp_dir())
+                paths = TypstDoc.compile_typst_batch(args_list, workers)
+                self.assert_same_as_single(args_list, paths)
+
+    def test_counters_reset(self) -> None:
+        # 每个文档有两个不同的副本，使得第二轮的文档前面都有使用同一个计数器的文档
+        args_list = make_args([f'{text}\n\n{i}' for i in range(2) for text in COUNTER_DOCS])
+        batches = []
+        paths = TypstDoc.compile_typst_batch(args_list, 1, on_batch_done=batches.append)
+        # 所有文档都在同一份中，也就是同一个多页文档中
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), len(args_list))
+        self.assert_same_as_single(args_list, paths)
+
+    def test_pages(self) -> None:
+        items = [(os.path.join(self.temp_dir.name, f'{i}.svg'), text) for i, text in enumerate(DOCS)]
+        self.assertTrue(TypstDoc._compile_typst_pages(Config.get.typst_bin, get_typst_temp_dir(), '', '', items))
+        # 每一页被放到对应的路径，临时目录被移除
+        datas = [read_bytes(path) for path, text in items]
+        self.assertEqual(len(set(datas)), len(items))
+        self.assertEqual(os.listdir(get_typst_temp_dir()), [])
+
+        # 页数与文档数不一致
+        items = [(os.path.join(self.temp_dir.name, f'page-{i}.svg'), text)
+                 for i, text in enumerate(['first', 'second\n#pagebreak()\nthird'])]
+        self.assertFalse(TypstDoc._compile_typst_pages(Config.get.typst_bin, get_typst_temp_dir(), '', '', items))
+        self.assertFalse(any(os.path.exists(path) for path, text in items))
+        self.assertEqual(os.listdir(get_typst_temp_dir()), [])
+
+    def test_page_count_mismatch(self) -> None:
+        args_list = make_args(['before', 'second\n#pagebreak()\nthird', 'after'])
+        self.assertFalse(TypstDoc._compile_typst_pages(
+            Config.get.typst_bin,
+            get_typst_temp_dir(),
+            args_list[0][1],
+            args_list[0][2],
+            [(TypstDoc.get_svg_file_path(*args), args[0]) for args in args_list]
+        ))
+
+        # 退回逐个编译，结果（包括是否编译失败）与逐个调用 compile_typst 一致
+        try:
+            paths = TypstDoc.compile_typst_batch(args_list, 1)
+        except ExitException as e:
+            self.assertEqual(e.exit_code, EXITCODE_TYPST_COMPILE_ERROR)
+            paths = [TypstDoc.get_svg_file_path(*args) for args in args_list]
+        self.assert_same_as_single(args_list, paths)
+
+    def test_syntax_error(self) -> None:
+        args_list = make_args(['before', '#let x = (', 'after', '$ x^2 $'])
+
+        # 不退回时，包含错误的那一份全部被跳过
+        paths = TypstDoc.compile_typst_batch(args_list, 1, fallback=False)
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+        # 退回时，其余的文档仍然被编译，之后抛出编译错误
+        with self.assertRaises(ExitException) as cm, self.assertLogs(level='ERROR'):
+            TypstDoc.compile_typst_batch(args_list, 1)
+        self.assertEqual(cm.exception.exit_code, EXITCODE_TYPST_COMPILE_ERROR)
+        self.assert_same_as_single(args_list, paths)
+
+    def test_groups_and_cache(self) -> None:
+        args_list = [
+            *make_args(['a', 'b', 'a']),
+            *make_args(['a', 'c'], additional_preamble='#set text(blue)'),
+            *make_args(['$ x $'], additional_preamble='#set text(size: 20pt)'),
+        ]
+        # 已有缓存的文档不会被重新编译
+        cached_path = TypstDoc.get_svg_file_path(*args_list[1])
+        with open(cached_path, 'wb') as file:
+            file.write(b'cached')
+
+        batches = []
+        paths = TypstDoc.compile_typst_batch(args_list, 1, on_batch_done=batches.append)
+        # 按 preamble 分为三份，并且去除了重复的文档
+        self.assertEqual(sorted(len(batch) for batch in batches), [1, 1, 2])
+        self.assertEqual(paths[0], paths[2])
+        self.assertNotEqual(paths[0], paths[3])
+        self.assertEqual(read_bytes(cached_path), b'cached')
+
+        del args_list[1]
+        del paths[1]
+        self.assert_same_as_single(args_list, paths)
+
+        # 全部已有缓存时不会启动 Typst
+        batches.clear()
+        TypstDoc.compile_typst_batch(args_list, on_batch_done=batches.append)
+        self.assertEqual(batches, [])
+
+    def test_stop_event(self) -> None:
+        args_list = [
+            *make_args(['a', 'b']),
+            *make_args(['c', 'd'], additional_preamble='#set text(blue)'),
+            *make_args(['e', 'f'], additional_preamble='#set text(red)'),
+        ]
+        all_paths = {TypstDoc.get_svg_file_path(*args) for args in args_list}
+
+        # 开始前已经设置，所有部分都被跳过，但仍然会调用 on_batch_done
+        stop_event = threading.Event()
+        stop_event.set()
+        batches = []
+        paths = TypstDoc.compile_typst_batch(args_list, 1, fallback=False,
+                                             on_batch_done=batches.append, stop_event=stop_event)
+        self.assertEqual(set(paths), all_paths)
+        self.assertEqual({path for batch in batches for path in batch}, all_paths)
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+        # 第一份完成后设置，之后的部分被跳过
+        stop_event.clear()
+        batches.clear()
+
+        def on_batch_done(paths: list[str]) -> None:
+            batches.append(paths)
+            stop_event.set()
+
+        TypstDoc.compile_typst_batch(args_list, 1, fallback=False,
+                                     on_batch_done=on_batch_done, stop_event=stop_event)
+        self.assertEqual(len(batches), 3)
+        self.assertTrue(all(os.path.exists(path) for path in batches[0]))
+        self.assertFalse(any(os.path.exists(path) for batch in batches[1:] for path in batch))
+
+    def test_precompile(self) -> None:
+        TypstMath.precompile(['x^2', 'y^2'])
+        TypstText.precompile(['text'], preamble='#set text(blue)')
+
+        for args in [
+            TypstMath.get_typst_args('x^2'),
+            TypstMath.get_typst_args('y^2'),
+            TypstText.get_typst_args('text', preamble='#set text(blue)'),
+        ]:
+            self.assertTrue(os.path.exists(TypstDoc.get_svg_file_path(*args)))
+
+        # 之后创建物件时直接使用缓存，不再需要 Typst
+        with Config(typst_bin=os.path.join(self.temp_dir.name, 'typst-not-found')):
+            self.assertGreater(len(TypstMath('x^2')), 0)
+            self.assertGreater(len(TypstText('text', preamble='#set text(blue)')), 0)
+
+
+class TypstBatchNotFoundTest(unittest.TestCase):
+    def test_typst_not_found(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                Config(temp_dir=temp_dir, typst_bin=os.path.join(temp_dir, 'typst-not-found')):
+            args_list = make_args(['a', 'b'])
+            self.assertIsNotNone(get_typst_template())
+
+            paths = TypstDoc.compile_typst_batch(args_list, fallback=False)
+            self.assertFalse(any(os.path.exists(path) for path in paths))
+
+            with self.assertRaises(ExitException) as cm, self.assertLogs(level='ERROR'):
+                TypstDoc.compile_typst_batch(args_list)
+            self.assertEqual(cm.exception.exit_code, EXITCODE_TYPST_NOT_FOUND)
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
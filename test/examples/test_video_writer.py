@@ -0,0 +1,227 @@
+import os
+import shutil
+import stat
+import subprocess as sp
+import threading
+import unittest
+
+import numpy as np
+
+from janim.anims.timeline import Timeline
+from janim.anims.updater import DataUpdater
+from janim.constants import RIGHT, UP
+from janim.items.geometry.arc import Circle
+from janim.items.geometry.polygon import Square
+from janim.render.writer import ParallelVideoWriter, VideoWriter
+from janim.utils.config import Config
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+FPS = 5
+
+TEMP_DIR = 'test/__test_tempdir__'
+
+# 创建 _temp 文件后立即退出的 ffmpeg，使得写入管道失败
+FAILING_FFMPEG = '''#!/bin/sh
+for last; do :; done
+case "$last" in
+    *_temp.*) echo partial > "$last" ;;
+esac
+exit 1
+'''
+
+
+class WriterTimeline(Timeline):
+    def construct(self) -> None:
+        square = Square()
+        circle = Circle()
+        self.play(square.anim.points.shift(UP))
+        self.forward(1)
+        self.play(circle.anim.points.shift(RIGHT))
+
+
+class StaticTimeline(Timeline):
+    def construct(self) -> None:
+        square = Square().show()
+        circle = Circle().show()
+        self.forward(1)                                 # 0s ~ 1s 静止
+        self.play(square.anim.points.shift(UP))         # 1s ~ 2s
+        self.forward(1)                                 # 2s ~ 3s 静止
+        self.play(                                      # 3s ~ 4s
+            DataUpdater(
+                circle,
+                lambda data, p: data.points.shift(RIGHT * p.alpha)
+            )
+        )
+        self.forward(1)                                 # 4s ~ 5s 静止
+
+
+def get_frames(video_path: str) -> np.ndarray:
+    ffmpeg_command = [
+        Config.get.ffmpeg_bin,
+        '-i', video_path,
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgba',
+        '-'
+    ]
+    out = sp.run(ffmpeg_command, stdout=sp.PIPE, stderr=sp.DEVNULL).stdout
+    return np.frombuffer(out, dtype=np.uint8).reshape(-1, HEIGHT, WIDTH, 4)
+
+
+class VideoWriterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, fps=FPS, temp_dir=TEMP_DIR)
+        self.config.__enter__()
+        self.output_dir = os.path.join(TEMP_DIR, 'video_writer')
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+        os.makedirs(self.output_dir)
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def assert_aborted(self, writer: VideoWriter, file_path: str) -> None:
+        # ffmpeg 已经结束，写入线程也已结束，并且没有留下 _temp 文件
+        self.assertIsNotNone(writer.writing_process.poll())
+        self.assertTrue(writer.writing_process.stdin.closed)
+        self.assertFalse(any(thread.name.startswith('PipeWriter') for thread in threading.enumerate()))
+        self.assertFalse(os.path.exists(writer.temp_file_path))
+        self.assertFalse(os.path.exists(file_path))
+
+    @unittest.skipIf(os.name == 'nt', 'requires a shell script')
+    def test_write_failure(self) -> None:
+        ffmpeg_path = os.path.join(self.output_dir, 'ffmpeg')
+        with open(ffmpeg_path, 'wt') as file:
+            file.write(FAILING_FFMPEG)
+        os.chmod(ffmpeg_path, os.stat(ffmpeg_path).st_mode | stat.S_IEXEC)
+
+        # 构建时确定配置，因此在 with 中构建
+        with Config(ffmpeg_bin=ffmpeg_path):
+            built = WriterTimeline().build(quiet=True)
+        file_path = os.path.join(self.output_dir, 'failure.mp4')
+        for use_pbo in (True, False):
+            with self.subTest(use_pbo=use_pbo):
+                writer = VideoWriter(built)
+                with self.assertRaises(BrokenPipeError):
+                    writer.write_all(file_path, quiet=True, use_pbo=use_pbo)
+                self.assert_aborted(writer, file_path)
+
+    def test_render_failure(self) -> None:
+        built = WriterTimeline().build(quiet=True)
+        file_path = os.path.join(self.output_dir, 'failure.mp4')
+
+        frames = 0
+
+        def on_frame() -> None:
+            nonlocal frames
+            frames += 1
+            if frames == 3:
+                raise KeyboardInterrupt
+
+        writer = VideoWriter(built)
+        with self.assertRaises(KeyboardInterrupt):
+            writer.write_all(file_path, quiet=True, _on_frame=on_frame)
+        self.assert_aborted(writer, file_path)
+
+    def test_static_frame_key(self) -> None:
+        built = StaticTimeline().build(quiet=True)
+
+        def key(t: float) -> tuple | None:
+            return built.get_static_frame_key(t)
+
+        # 静止的区间内得到相同的标识
+        hold1 = key(0)
+        self.assertIsNotNone(hold1)
+        for t in (0.2, 0.6, 0.9):
+            self.assertEqual(key(t), hold1)
+
+        hold2 = key(2.2)
+        self.assertIsNotNone(hold2)
+        self.assertEqual(key(2.8), hold2)
+        # 经过动画后画面不同
+        self.assertNotEqual(hold2, hold1)
+
+        # 动画以及 updater 作用的区间没有标识
+        for t in (1.2, 1.5, 1.8, 3.2, 3.5, 3.8):
+            self.assertIsNone(key(t), f't={t}')
+
+        hold3 = key(4.5)
+        self.assertIsNotNone(hold3)
+        self.assertEqual(key(built.duration), hold3)
+        self.assertNotEqual(hold3, hold2)
+
+    def test_static_frame_cache(self) -> None:
+        for use_pbo in (True, False):
+            frames = {}
+            render_counts = {}
+            for static_frame_cache in (False, True):
+                built = StaticTimeline().build(quiet=True)
+                render_all = built.render_all
+                count = 0
+
+                def counting_render_all(*args, **kwargs):
+                    nonlocal count
+                    count += 1
+                    return render_all(*args, **kwargs)
+
+                built.render_all = counting_render_all
+
+                file_path = os.path.join(self.output_dir, f'cache_{use_pbo}_{static_frame_cache}.mov')
+                VideoWriter.writes(built, file_path, quiet=True, use_pbo=use_pbo,
+                                   static_frame_cache=static_frame_cache)
+                frames[static_frame_cache] = get_frames(file_path)
+                render_counts[static_frame_cache] = count
+
+            with self.subTest(use_pbo=use_pbo):
+                frame_count = round(5 * FPS) + 1
+                self.assertEqual(len(frames[False]), frame_count)
+                self.assertEqual(render_counts[False], frame_count)
+                # 每个静止区间只渲染第一帧
+                self.assertLess(render_counts[True], frame_count - 3 * (FPS - 2))
+                np.testing.assert_array_equal(frames[True], frames[False])
+
+    def test_parallel(self) -> None:
+        single_path = os.path.join(self.output_dir, 'single.mov')
+        VideoWriter.writes(WriterTimeline().build(quiet=True), single_path, quiet=True)
+
+        parallel_path = os.path.join(self.output_dir, 'parallel.mov')
+        writer = ParallelVideoWriter(WriterTimeline().build(quiet=True), workers=2)
+        self.assertEqual(len(writer.split_frames()), 2)
+        # 没有回退到单进程输出
+        with self.assertNoLogs(level='WARNING'):
+            writer.write_all(parallel_path, quiet=True)
+
+        # 拼接后删除了分段文件
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'parallel_parts')))
+        self.assertFalse(os.path.exists(writer.temp_file_path))
+
+        single = get_frames(single_path)
+        parallel = get_frames(parallel_path)
+        self.assertEqual(len(single), writer.frame_count)
+        self.assertEqual(len(parallel), writer.frame_count)
+        np.testing.assert_array_equal(parallel, single)
+
+    def test_parallel_fallback(self) -> None:
+        # 定义在函数中的时间轴无法被子进程载入
+        class LocalTimeline(WriterTimeline):
+            pass
+
+        single_path = os.path.join(self.output_dir, 'single.mov')
+        VideoWriter.writes(WriterTimeline().build(quiet=True), single_path, quiet=True)
+        single = get_frames(single_path)
+
+        for timeline_cls, ext in ((LocalTimeline, '.mov'), (WriterTimeline, '.gif')):
+            with self.subTest(timeline=timeline_cls.__name__, ext=ext):
+                writer = ParallelVideoWriter(timeline_cls().build(quiet=True), workers=2)
+                with self.assertLogs(level='WARNING'):
+                    self.assertFalse(writer._can_write_parallel(ext))
+
+                file_path = os.path.join(self.output_dir, f'fallback{ext}')
+                with self.assertLogs(level='WARNING'):
+                    writer.write_all(file_path, quiet=True)
+
+                self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'fallback_parts')))
+                frames = get_frames(file_path)
+                self.assertEqual(len(frames), writer.frame_count)
+                if ext == '.mov':
+                    np.testing.assert_array_equal(frames, single)
@@ -0,0 +1,155 @@
+import unittest
+
+import moderngl as mgl
+import numpy as np
+
+from janim.anims.timeline import BuiltTimeline, Timeline
+from janim.constants import DOWN, LEFT, RIGHT, UP
+from janim.items.geometry.arc import Circle
+from janim.items.geometry.polygon import Square
+from janim.items.text import Text
+from janim.render.base import create_standalone_context
+from janim.render.framebuffer import create_framebuffer, framebuffer_context
+from janim.render.renderer_vitem import _BatchEntry, _PackedBatch
+from janim.utils.config import Config
+
+WIDTH = 192 * 2
+HEIGHT = 108 * 2
+
+
+class BatchTimeline(Timeline):
+    def construct(self) -> None:
+        txt = Text('Batched\nrendering', font_size=36).show()
+        txt.points.to_border(UP)
+
+        squares = [
+            Square(0.8, color='#58C4DD', fill_alpha=0.5, stroke_radius=0.02 + 0.01 * i)
+            .points.shift(LEFT * 4 + RIGHT * i).r
+            for i in range(8)
+        ]
+        for square in squares:
+            square.show()
+        squares[1].set_stroke_background()
+        squares[2].glow.set('#FC6255', 0.8, size=0.4)
+        squares[3].fill.set(alpha=0)
+        squares[3].glow.set('#FFFF00', 0.6, size=0.3)
+
+        circle = Circle(0.6, color='#83C167', fill_alpha=0.8).show()
+        circle.points.shift(DOWN * 2)
+        Circle(0.3, color='#FFFF00').fix_in_frame().show().points.to_border(DOWN + RIGHT)
+
+        self.forward(0.5)
+        # 只有部分物件发生变化，使得合并绘制时只更新其中的一部分切片
+        self.play(squares[4].anim.points.rotate(1),
+                  squares[6].anim.color.set('#FFFFFF'),
+                  circle.anim.points.shift(LEFT * 2))
+        # 点数发生变化，使得合并绘制时重新打包
+        self.play(squares[5].anim.become(Circle(0.4, color='#FC6255').points.move_to(squares[5]).r))
+        self.forward(0.5)
+
+
+class VItemBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = Config(pixel_width=WIDTH, pixel_height=HEIGHT, temp_dir='test/__test_tempdir__')
+        self.config.__enter__()
+
+    def tearDown(self) -> None:
+        self.config.__exit__(None, None, None)
+
+    @staticmethod
+    def render_frames(ctx: mgl.Context, built: BuiltTimeline, times: list[float]) -> list[np.ndarray]:
+        fbo = create_framebuffer(ctx, WIDTH, HEIGHT)
+        frames = []
+        with framebuffer_context(fbo):
+            for t in times:
+                fbo.clear(*built.cfg.background_color.rgb, 1)
+                built.render_all(ctx, t)
+                frames.append(np.frombuffer(fbo.read(components=4), dtype=np.uint8).reshape(HEIGHT, WIDTH, 4))
+        return frames
+
+    def test_batched_matches_unbatched(self) -> None:
+        ctx = create_standalone_context()
+        if ctx.version_code < 430:
+            self.skipTest('batched rendering requires OpenGL 4.3')
+
+        built = BatchTimeline().build(quiet=True)
+
+        # 按顺序渲染多个时间点，以覆盖合并绘制中跨帧复用、部分更新以及重新打包的情况
+        times = list(np.arange(0, built.duration + 1e-6, 0.25))
+
+        batched = self.render_frames(ctx, built, times)
+        self.assertTrue(any(built.vitem_batch_renderers.values()), 'no batched draw was issued')
+
+        unbatched_built = BatchTimeline().build(quiet=True)
+        unbatched_built.batch_vitems = False
+        unbatched = self.render_frames(ctx, unbatched_built, times)
+
+        for t, frame1, frame2 in zip(times, batched, unbatched):
+            delta = np.abs(frame1.astype(np.int16) - frame2.astype(np.int16))
+            self.assertFalse(np.array_equal(frame2, np.broadcast_to(frame2[0, 0], frame2.shape)), 'nothing is rendered')
+            self.assertLessEqual(delta.max(), 1, f't: {t}')
+
+
+def make_entry(points_count: int, value: float) -> _BatchEntry:
+    entry = _BatchEntry.__new__(_BatchEntry)
+    entry.anchors = (points_count + 1) // 2
+    entry.points = np.full((points_count, 4), value, dtype=np.float32)
+    entry.radius = np.full(entry.anchors, value, dtype=np.float32)
+    entry.colors = np.full((entry.anchors * 2, 4), value, dtype=np.float32)
+    entry.stroke_count = entry.anchors
+    entry.fill_transparent = False
+    entry.corners = np.full((8, 3), value, dtype=np.float32)
+    entry.radius_max = value
+    return entry
+
+
+class PackedBatchTest(unittest.TestCase):
+    def assert_packed(self, packed: _PackedBatch, batch: list[_BatchEntry]) -> None:
+        for attr in _PackedBatch.ATTRS:
+            datas = [getattr(entry, attr) for entry in batch]
+            np.testing.assert_array_equal(packed.arrays[attr], np.concatenate(datas))
+            np.testing.assert_array_equal(packed.offsets[attr], np.cumsum([0] + [len(data) for data in datas]))
+
+    def test_repack_on_layout_change(self) -> None:
+        packed = _PackedBatch()
+        batch = [make_entry(3, 1), make_entry(5, 2)]
+        self.assertIsNone(packed.update(batch))
+        self.assert_packed(packed, batch)
+
+        # 数量变化
+        batch = [*batch, make_entry(3, 3)]
+        self.assertIsNone(packed.update(batch))
+        self.assert_packed(packed, batch)
+
+        # 数量不变，但其中一个物件的长度变化
+        batch = [batch[0], make_entry(7, 4), batch[2]]
+        self.assertIsNone(packed.update(batch))
+        self.assert_packed(packed, batch)
+        np.testing.assert_array_equal(packed.offsets['anchors'], [0, 2, 6, 8])
+
+    def test_partial_update(self) -> None:
+        packed = _PackedBatch()
+        batch = [make_entry(3, i) for i in range(6)]
+        packed.update(batch)
+
+        ranges = packed.update(list(batch))
+        self.assertEqual(ranges, {attr: [] for attr in _PackedBatch.ATTRS})
+
+        # 相邻的物件合并为同一段
+        batch = [batch[0], make_entry(3, 10), make_entry(3, 11), batch[3], make_entry(3, 12), batch[5]]
+        ranges = packed.update(batch)
+        self.assertEqual(ranges['points'], [(3, 9), (12, 15)])
+        self.assertEqual(ranges['radius'], [(2, 6), (8, 10)])
+        self.assertEqual(ranges['colors'], [(4, 12), (16, 20)])
+        self.assert_packed(packed, batch)
+
+    def test_sources_info(self) -> None:
+        packed = _PackedBatch()
+        batch = [make_entry(3, 0), make_entry(5, 1)]
+        batch[1].stroke_count = 1
+        packed.update(batch)
+
+        info = packed.compute_sources_info()
+        np.testing.assert_array_equal(info[:, :4], [[0, 3, 0, 0], [3, 5, 2, 0]])
+        np.testing.assert_array_equal(info[:, 4:6], [[0, 2], [2, 3]])
+        np.testing.assert_array_equal(info[:, 8:], [[0, 2, 2, 2], [4, 1, 5, 5]])